@@ -0,0 +1,6 @@
+"""
+Micro-benchmarks for the document processing pipeline
+
+Run from the repository root, e.g.:
+    python -m start_project.benchmarks.bench_database
+"""
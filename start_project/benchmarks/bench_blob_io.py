@@ -0,0 +1,99 @@
+"""
+Benchmark file I/O of extract_from_blob() on in-memory content
+
+Extracts a large PDF held in memory (text pages plus an embedded
+attachment padding it to --size MB) with HybridExtractor and reports the
+bytes read and written by the process (/proc/self/io, Linux only):
+
+- temp file: the old route, a mkstemp() file in the default temp
+  directory that is written, extracted and deleted
+- tmpfs path: FileUtils.blob_as_path(), the fallback for backends that
+  need a path (written to /dev/shm when available)
+- stream: extract_from_blob() opening the bytes in memory
+
+Usage:
+    python -m start_project.benchmarks.bench_blob_io --size 100
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from ..extractors.hybrid_extractor import PYMUPDF_AVAILABLE, HybridExtractor
+from ..utils import FileUtils
+from .bench_vlm_concurrency import make_pdf
+
+
+def make_large_pdf(size_mb: int, tmp: str) -> bytes:
+    """PDF of 10 text pages with a random attachment of size_mb"""
+    import fitz
+    
+    path = os.path.join(tmp, 'large.pdf')
+    make_pdf(path, 10)
+    with fitz.open(path) as doc:
+        doc.embfile_add('padding.bin', os.urandom(size_mb * 1024 * 1024))
+        return doc.tobytes(garbage=0, deflate=False)
+
+
+def io_counters() -> dict:
+    """rchar/wchar (all reads/writes) and read_bytes/write_bytes (storage)"""
+    try:
+        with open('/proc/self/io') as f:
+            return {key: int(value) for key, value in (line.split(': ') for line in f)}
+    except OSError:
+        return {}
+
+
+def measure(run) -> tuple:
+    before = io_counters()
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    after = io_counters()
+    delta = {key: after[key] - before[key] for key in after}
+    return elapsed, delta, result['success']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=100, help='Document size in MB')
+    args = parser.parse_args()
+    
+    if not PYMUPDF_AVAILABLE:
+        raise SystemExit("PyMuPDF is not installed")
+    
+    extractor = HybridExtractor()
+    
+    def temp_file(blob: bytes) -> dict:
+        temp_path = FileUtils.create_temp_file(blob, suffix='.pdf')
+        try:
+            return extractor.extract(temp_path)
+        finally:
+            os.remove(temp_path)
+    
+    def tmpfs_path(blob: bytes) -> dict:
+        with FileUtils.blob_as_path(blob, suffix='.pdf') as temp_path:
+            return extractor.extract(temp_path)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        blob = make_large_pdf(args.size, tmp)
+    
+    rows = [
+        ('temp file', measure(lambda: temp_file(blob))),
+        (f"tmpfs path ({FileUtils.memory_temp_dir() or 'default temp dir'})", measure(lambda: tmpfs_path(blob))),
+        ('stream', measure(lambda: extractor.extract_from_blob(blob, '.pdf')))
+    ]
+    
+    mb = 1024 * 1024
+    print(f"{'=' * 88}")
+    print(f"extract_from_blob I/O: {len(blob) / mb:.1f} MB PDF in memory")
+    print(f"{'=' * 88}")
+    print(f"{'route':<28} {'seconds':>8} {'read MB':>8} {'written MB':>11} {'disk write MB':>14} {'success':>8}")
+    for name, (elapsed, delta, success) in rows:
+        print(f"{name:<28} {elapsed:>8.2f} {delta.get('rchar', 0) / mb:>8.1f} {delta.get('wchar', 0) / mb:>11.1f} "
+              f"{delta.get('write_bytes', 0) / mb:>14.1f} {str(success):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark peak memory of storing and restoring inline file blobs
+
+Compares whole-file bytes (legacy insert_file(file_blob=...) and
+get_file_blob) against chunked blobopen streaming (insert_file without
+file_blob and copy_file_blob). Every measurement runs in a fresh
+subprocess so ru_maxrss reflects that operation only. The database uses
+inline_blobs=True, a 2 MB page cache and mmap_size=0 so SQLite's own
+caches do not hide the difference.
+
+Usage:
+    python -m start_project.benchmarks.bench_blob_memory --sizes 10 50 100
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from ..core.database import DatabaseManager
+
+
+MODES = ['legacy_store', 'stream_store', 'legacy_read', 'stream_read']
+
+
+def open_db(db_path: str) -> DatabaseManager:
+    return DatabaseManager(db_path, inline_blobs=True, cache_size=-2000, mmap_size=0)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_worker(mode: str, db_path: str, src_path: str, out_path: str):
+    """Run one operation and print 'baseline_mb peak_mb seconds'"""
+    db = open_db(db_path)
+    db.get_file_by_hash('warmup')
+    baseline = peak_rss_mb()
+    file_size = os.path.getsize(src_path)
+    
+    start = time.perf_counter()
+    if mode == 'legacy_store':
+        with open(src_path, 'rb') as f:
+            data = f.read()
+        ok = db.insert_file('bench', src_path, 'bench.bin', '.bin', file_size, file_blob=data)
+    elif mode == 'stream_store':
+        ok = db.insert_file('bench', src_path, 'bench.bin', '.bin', file_size)
+    elif mode == 'legacy_read':
+        data = db.get_file_blob('bench')
+        with open(out_path, 'wb') as f:
+            f.write(data)
+        ok = data is not None
+    else:
+        with open(out_path, 'wb') as f:
+            ok = db.copy_file_blob('bench', f) == file_size
+    elapsed = time.perf_counter() - start
+    db.close()
+    
+    if not ok:
+        sys.exit(1)
+    print(f"{baseline:.1f} {peak_rss_mb():.1f} {elapsed:.3f}")
+
+
+def measure(mode: str, db_path: str, src_path: str, out_path: str):
+    result = subprocess.run(
+        [sys.executable, '-m', __spec__.name, '--worker', mode, db_path, src_path, out_path],
+        capture_output=True, text=True, check=True
+    )
+    baseline, peak, seconds = map(float, result.stdout.split()[-3:])
+    return peak - baseline, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 100],
+                        help='File sizes in MB')
+    parser.add_argument('--worker', nargs=4, metavar=('MODE', 'DB', 'SRC', 'OUT'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker:
+        run_worker(*args.worker)
+        return
+    
+    print(f"{'=' * 60}")
+    print("Inline blob peak memory (RSS growth over baseline)")
+    print(f"{'=' * 60}")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in args.sizes:
+            src_path = os.path.join(tmp, f"src_{size_mb}.bin")
+            out_path = os.path.join(tmp, "out.bin")
+            with open(src_path, 'wb') as f:
+                for _ in range(size_mb):
+                    f.write(os.urandom(1024 * 1024))
+            
+            print(f"\n{size_mb} MB file")
+            for mode in MODES:
+                # Each store starts from an empty database; reads reuse it
+                db_path = os.path.join(tmp, f"{size_mb}_{mode.split('_')[0]}.db")
+                growth, seconds = measure(mode, db_path, src_path, out_path)
+                print(f"  {mode:<14} {growth:>8.1f} MB  ({seconds:.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
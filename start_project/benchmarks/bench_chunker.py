@@ -0,0 +1,146 @@
+"""
+Benchmark chunking throughput on the Japanese manuals
+
+Chunks the test_files PDFs (text layer per page via PyMuPDF) or, without
+PyMuPDF, the saved unstructured results in extraction_results, in every
+Chunker mode and reports MB/s of UTF-8 input. The documents are repeated
+until --min-mb of text is chunked. "write" runs chunk straight into
+content_chunks of a temporary database; "langchain" is the
+RecursiveCharacterTextSplitter of the reference scripts (if installed).
+
+Usage:
+    python -m start_project.benchmarks.bench_chunker --min-mb 20 --chunk-size 500
+"""
+
+import argparse
+import glob
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from ..core.database import DatabaseManager
+from ..processors.chunker import Chunker
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_documents() -> list:
+    """(name, page results) of the Japanese manuals"""
+    documents = []
+    try:
+        import fitz
+        for path in sorted(glob.glob(os.path.join(ROOT, 'test_files', '**', '*.pdf'), recursive=True)):
+            with fitz.open(path) as doc:
+                pages = [
+                    {'page_number': page.number + 1, 'text': page.get_text(), 'tables': []}
+                    for page in doc
+                ]
+            documents.append((os.path.basename(path), pages))
+    except ImportError:
+        pass
+    
+    if not any(page['text'].strip() for _, pages in documents for page in pages):
+        # Scanned PDFs have no text layer; use the saved OCR results
+        documents = []
+        for path in sorted(glob.glob(os.path.join(ROOT, 'start_project', 'extraction_results', '*_full.json'))):
+            with open(path, encoding='utf-8') as f:
+                result = json.load(f)
+            documents.append((os.path.basename(path), [dict(result, page_number=None)]))
+    return documents
+
+
+def document_bytes(pages: list) -> int:
+    size = 0
+    for page in pages:
+        elements = (page.get('metadata') or {}).get('elements')
+        if elements:
+            size += sum(len(element.get('text', '').encode('utf-8')) for element in elements)
+        else:
+            size += len(page.get('text', '').encode('utf-8'))
+            size += sum(len((table.get('text') or '').encode('utf-8')) for table in page.get('tables') or [])
+    return size
+
+
+def run(name: str, func, documents: list, repeat: int, total_bytes: int) -> tuple:
+    """Time func over all repeats, then trace peak memory of one document pass"""
+    start = time.perf_counter()
+    chunks = 0
+    for n in range(repeat):
+        for doc_name, pages in documents:
+            chunks += func(f"{doc_name}_{n}", pages)
+    elapsed = time.perf_counter() - start
+    
+    tracemalloc.start()
+    for doc_name, pages in documents:
+        func(f"{doc_name}_traced", pages)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return name, elapsed, total_bytes / (1024 * 1024) / elapsed, chunks, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--min-mb', type=float, default=20.0, help='Text to chunk per run')
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--chunk-overlap', type=int, default=50)
+    args = parser.parse_args()
+    
+    documents = load_documents()
+    if not documents:
+        raise SystemExit("No test documents found")
+    
+    corpus_bytes = sum(document_bytes(pages) for _, pages in documents)
+    repeat = max(1, int(args.min_mb * 1024 * 1024 / max(corpus_bytes, 1)) + 1)
+    total_bytes = corpus_bytes * repeat
+    
+    rows = []
+    for mode in Chunker.MODES:
+        chunker = Chunker(mode=mode, chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+        rows.append(run(
+            mode, lambda file_hash, pages: sum(1 for _ in chunker.iter_chunks(file_hash, iter(pages))),
+            documents, repeat, total_bytes
+        ))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'), synchronous='OFF')
+        chunker = Chunker(mode='japanese', chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+        rows.append(run(
+            'japanese + write', lambda file_hash, pages: chunker.write_chunks(db, file_hash, iter(pages)),
+            documents, repeat, total_bytes
+        ))
+        db.close()
+    
+    try:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+    except ImportError:
+        try:
+            from langchain.text_splitter import RecursiveCharacterTextSplitter
+        except ImportError:
+            RecursiveCharacterTextSplitter = None
+    if RecursiveCharacterTextSplitter is not None:
+        splitter = RecursiveCharacterTextSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+        
+        def langchain_split(file_hash, pages):
+            # The reference scripts load the whole document into one string
+            text = "\n\n".join(
+                "\n\n".join(e.get('text', '') for e in (p.get('metadata') or {}).get('elements') or [])
+                or p.get('text', '')
+                for p in pages
+            )
+            return len(splitter.split_text(text))
+        
+        rows.append(run('langchain', langchain_split, documents, repeat, total_bytes))
+    
+    print(f"{'=' * 72}")
+    print(f"Chunking {len(documents)} documents x {repeat} = {total_bytes / (1024 * 1024):.1f} MB "
+          f"(chunk_size {args.chunk_size}, overlap {args.chunk_overlap})")
+    print(f"{'=' * 72}")
+    print(f"{'run':<18} {'seconds':>8} {'MB/s':>8} {'chunks':>8} {'peak KB/doc':>12}")
+    for name, elapsed, mb_per_second, chunks, peak in rows:
+        print(f"{name:<18} {elapsed:>8.2f} {mb_per_second:>8.2f} {chunks:>8} {peak:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark DatabaseManager row throughput
+
+Compares the legacy connect-per-statement pattern against the pooled,
+WAL-mode connection manager for insert_chunk and get_file_by_hash, plus insert_chunks_bulk.
+
+Usage:
+    python -m start_project.benchmarks.bench_database --rows 5000
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from ..core.database import DatabaseManager
+
+
+def legacy_insert_chunk(db_path: str, i: int):
+    """Replicates the old insert_chunk: new connection + commit per row"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT OR REPLACE INTO content_chunks
+        (chunk_id, file_hash, chunk_index, chunk_text, chunk_size,
+         chunk_metadata, embedding_vector)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (f"chunk_{i}", "bench", i, "x" * 500, 500, None, None))
+    conn.commit()
+    conn.close()
+
+
+def legacy_get_file_by_hash(db_path: str, file_hash: str):
+    """Replicates the old get_file_by_hash: new connection per lookup"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT file_hash, file_path, file_name, file_extension,
+               file_size, processed_date, last_modified, model_used,
+               extractor_used, status, chunk_count, metadata_json
+        FROM processed_files
+        WHERE file_hash = ?
+    ''', (file_hash,))
+    result = cursor.fetchone()
+    conn.close()
+    return result
+
+
+def rate(rows: int, seconds: float) -> str:
+    return f"{rows / seconds:>12,.0f} rows/sec  ({seconds:.3f}s)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5000)
+    args = parser.parse_args()
+    rows = args.rows
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        sample_file = os.path.join(tmp, "sample.pdf")
+        with open(sample_file, 'wb') as f:
+            f.write(b"%PDF-1.4 benchmark")
+        
+        # Legacy: rollback journal, one connection per statement
+        legacy_path = os.path.join(tmp, "legacy.db")
+        DatabaseManager(legacy_path, journal_mode="DELETE", synchronous="FULL").close()
+        
+        start = time.perf_counter()
+        for i in range(rows):
+            legacy_insert_chunk(legacy_path, i)
+        legacy_insert = time.perf_counter() - start
+        
+        # Pooled: WAL, one commit per row
+        pooled_path = os.path.join(tmp, "pooled.db")
+        db = DatabaseManager(pooled_path)
+        
+        start = time.perf_counter()
+        for i in range(rows):
+            db.insert_chunk(f"chunk_{i}", "bench", i, "x" * 500)
+        pooled_insert = time.perf_counter() - start
+        
+        # Pooled: WAL, all rows in one transaction
+        start = time.perf_counter()
+        with db.transaction():
+            for i in range(rows):
+                db.insert_chunk(f"txn_chunk_{i}", "bench", i, "x" * 500)
+        txn_insert = time.perf_counter() - start
+        
+        # Pooled: executemany over a generator
+        start = time.perf_counter()
+        db.insert_chunks_bulk(
+            {'chunk_id': f"bulk_chunk_{i}", 'file_hash': "bench",
+             'chunk_index': i, 'chunk_text': "x" * 500}
+            for i in range(rows)
+        )
+        bulk_insert = time.perf_counter() - start
+        
+        # Lookups
+        with db.transaction():
+            for i in range(rows):
+                db.insert_file(
+                    file_hash=f"hash_{i}",
+                    file_path=sample_file,
+                    file_name="sample.pdf",
+                    file_extension=".pdf",
+                    file_size=18,
+                    file_blob=b"%PDF-1.4 benchmark"
+                )
+        db.close()
+        
+        start = time.perf_counter()
+        for i in range(rows):
+            legacy_get_file_by_hash(pooled_path, f"hash_{i}")
+        legacy_lookup = time.perf_counter() - start
+        
+        db = DatabaseManager(pooled_path)
+        start = time.perf_counter()
+        for i in range(rows):
+            db.get_file_by_hash(f"hash_{i}")
+        pooled_lookup = time.perf_counter() - start
+        db.close()
+    
+    print(f"{'=' * 60}")
+    print(f"DatabaseManager benchmark ({rows:,} rows)")
+    print(f"{'=' * 60}")
+    print(f"insert_chunk     legacy (connect/row)  {rate(rows, legacy_insert)}")
+    print(f"insert_chunk     pooled (commit/row)   {rate(rows, pooled_insert)}")
+    print(f"insert_chunk     pooled (transaction)  {rate(rows, txn_insert)}")
+    print(f"insert_chunks_bulk                     {rate(rows, bulk_insert)}")
+    print(f"get_file_by_hash legacy (connect/row)  {rate(rows, legacy_lookup)}")
+    print(f"get_file_by_hash pooled                {rate(rows, pooled_lookup)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark Docling converter reuse
+
+Compares the old behaviour (a new DocumentConverter, and therefore a new
+layout/table/OCR model load, for every document) with DoclingExtractor's
+cached converter, used per file via extract() and as a batch via
+extract_many(). Reports the latency of the first document and the
+median/mean latency of the following ones.
+
+Usage:
+    python -m start_project.benchmarks.bench_docling docs/*.pdf --repeat 3
+"""
+
+import argparse
+import statistics
+import time
+from typing import Dict, List
+
+from ..extractors.docling_extractor import DoclingExtractor
+
+
+def per_document_converter(extractor: DoclingExtractor, paths: List[str]) -> List[float]:
+    """Old behaviour: build a converter for every document"""
+    latencies = []
+    for path in paths:
+        start = time.perf_counter()
+        extractor.DocumentConverter().convert(path)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def cached_extract(extractor: DoclingExtractor, paths: List[str]) -> List[float]:
+    latencies = []
+    for path in paths:
+        start = time.perf_counter()
+        extractor.extract(path)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def cached_batch(extractor: DoclingExtractor, paths: List[str]) -> List[float]:
+    latencies = []
+    start = time.perf_counter()
+    for _ in extractor.extract_many(paths):
+        now = time.perf_counter()
+        latencies.append(now - start)
+        start = now
+    return latencies
+
+
+def summarize(latencies: List[float]) -> Dict:
+    rest = latencies[1:] or latencies
+    return {
+        'first': latencies[0],
+        'nth_median': statistics.median(rest),
+        'nth_mean': statistics.mean(rest),
+        'total': sum(latencies)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('files', nargs='+', help='Documents to convert')
+    parser.add_argument('--repeat', type=int, default=1, help='Pass the file list N times')
+    parser.add_argument('--ocr-engine', default='auto')
+    parser.add_argument('--table-mode', default='accurate')
+    args = parser.parse_args()
+    paths = args.files * args.repeat
+    
+    extractor = DoclingExtractor(ocr_engine=args.ocr_engine, table_mode=args.table_mode)
+    if not extractor.available:
+        raise SystemExit("docling is not installed")
+    
+    results = {}
+    for name, func in (
+        ('new converter per doc', per_document_converter),
+        ('cached, extract()', cached_extract),
+        ('cached, extract_many()', cached_batch)
+    ):
+        # Every variant starts without a cached converter
+        extractor.close()
+        results[name] = summarize(func(extractor, paths))
+    extractor.close()
+    
+    print(f"{'=' * 72}")
+    print(f"Docling converter reuse ({len(paths)} documents)")
+    print(f"{'=' * 72}")
+    print(f"{'variant':<24} {'first':>9} {'Nth median':>11} {'Nth mean':>9} {'total':>9}")
+    for name, row in results.items():
+        print(f"{name:<24} {row['first']:>8.2f}s {row['nth_median']:>10.2f}s "
+              f"{row['nth_mean']:>8.2f}s {row['total']:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
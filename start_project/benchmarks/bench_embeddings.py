@@ -0,0 +1,155 @@
+"""
+Benchmark embedding throughput and storage per precision
+
+Chunks the saved unstructured results in extraction_results into a
+temporary database (repeated until --chunks chunks, each repeat made
+distinct) and embeds them with EmbeddingGenerator at every precision.
+Reports chunks/s, model calls and bytes per stored vector. A second
+"re-ingest" run re-chunks the same documents under new file hashes; its
+vectors must all be reused from the first run instead of recomputed.
+
+Uses the sentence-transformers model given by --model, or a pure-Python
+hashing model of --dim dimensions when sentence-transformers is not
+installed (measures batching and storage, not model speed).
+
+Usage:
+    python -m start_project.benchmarks.bench_embeddings --chunks 2000 --threads 4
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import math
+import os
+import tempfile
+import time
+
+from ..core.database import DatabaseManager
+from ..processors.chunker import Chunker
+from ..processors.embedding_generator import PRECISIONS, EmbeddingGenerator, SentenceTransformerModel
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class HashingModel:
+    """Unit-length character trigram hashing vectors"""
+    
+    def __init__(self, dimension: int = 384):
+        self.name = f"hashing-{dimension}"
+        self.dimension = dimension
+        self.calls = 0
+    
+    def encode(self, texts):
+        self.calls += 1
+        vectors = []
+        for text in texts:
+            vector = [0.0] * self.dimension
+            for i in range(max(1, len(text) - 2)):
+                digest = hashlib.md5(text[i:i + 3].encode('utf-8')).digest()
+                vector[int.from_bytes(digest[:4], 'little') % self.dimension] += 1.0 if digest[4] & 1 else -1.0
+            norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+            vectors.append([value / norm for value in vector])
+        return vectors
+
+
+class CountingModel:
+    """Counts model calls of a wrapped model"""
+    
+    def __init__(self, model):
+        self.model = model
+        self.name = model.name
+        self.calls = 0
+    
+    @property
+    def dimension(self):
+        return self.model.dimension
+    
+    def encode(self, texts):
+        self.calls += 1
+        return self.model.encode(texts)
+
+
+def load_results() -> list:
+    """Saved unstructured results of the Japanese manuals"""
+    results = []
+    for path in sorted(glob.glob(os.path.join(ROOT, 'start_project', 'extraction_results', '*_full.json'))):
+        with open(path, encoding='utf-8') as f:
+            results.append(json.load(f))
+    return results
+
+
+def fill(db: DatabaseManager, chunker: Chunker, results: list, target: int, prefix: str) -> int:
+    """Write chunks until target; repeat n gets a distinguishing suffix"""
+    count = 0
+    n = 0
+    while count < target:
+        for i, result in enumerate(results):
+            chunks = chunker(f"{prefix}{n}_{i}", result)
+            for chunk in chunks:
+                chunk['chunk_text'] = f"{chunk['chunk_text']} [{n}]"
+            db.insert_chunks_bulk(chunks)
+            count += len(chunks)
+        n += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--chunks', type=int, default=2000, help='Chunks to embed per precision')
+    parser.add_argument('--model', help='sentence-transformers model (default: hashing model if not installed)')
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--dim', type=int, default=384, help='Hashing model dimension')
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--max-batch-tokens', type=int, default=16384)
+    args = parser.parse_args()
+    
+    results = load_results()
+    if not results:
+        raise SystemExit("No saved extraction results found")
+    
+    try:
+        import sentence_transformers  # noqa: F401
+        options = {'model_name': args.model} if args.model else {}
+        model = SentenceTransformerModel(threads=args.threads, **options)
+    except ImportError:
+        model = HashingModel(args.dim)
+    
+    chunker = Chunker(mode='japanese', chunk_size=args.chunk_size, chunk_overlap=50)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for precision in PRECISIONS:
+            db = DatabaseManager(os.path.join(tmp, f'{precision}.db'), synchronous='OFF')
+            counting = CountingModel(model)
+            generator = EmbeddingGenerator(
+                model=counting, precision=precision, max_batch_tokens=args.max_batch_tokens
+            )
+            
+            count = fill(db, chunker, results, args.chunks, 'file')
+            start = time.perf_counter()
+            stats = generator.embed_file(db)
+            elapsed = time.perf_counter() - start
+            rows.append((precision, stats['chunks'], stats['embedded'], counting.calls, elapsed,
+                         stats['bytes'] / max(stats['chunks'], 1)))
+            
+            fill(db, chunker, results, count, 'again')
+            calls_before = counting.calls
+            start = time.perf_counter()
+            stats = generator.embed_file(db)
+            elapsed = time.perf_counter() - start
+            rows.append((f"{precision} re-ingest", stats['chunks'], stats['embedded'],
+                         counting.calls - calls_before, elapsed, stats['bytes'] / max(stats['chunks'], 1)))
+            db.close()
+    
+    print(f"{'=' * 78}")
+    print(f"Embedding {args.chunks}+ chunks with {model.name} "
+          f"(max_batch_tokens {args.max_batch_tokens}, threads {args.threads or 'default'})")
+    print(f"{'=' * 78}")
+    print(f"{'run':<20} {'chunks':>7} {'embedded':>9} {'calls':>6} {'seconds':>8} {'chunks/s':>9} {'bytes/vec':>10}")
+    for name, chunks, embedded, calls, elapsed, per_vector in rows:
+        print(f"{name:<20} {chunks:>7} {embedded:>9} {calls:>6} {elapsed:>8.2f} "
+              f"{chunks / elapsed:>9.0f} {per_vector:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark the extraction result cache
+
+Extracts one PDF twice with a HybridExtractor through extract_cached()
+(as extract_text_only() followed by extract_tables_only() do), with the
+VLM pages answered by the fake Ollama server (or a real server with
+--host/--model). Variants: no cache (every call extracts), a cold cache,
+a warm cache after a restart (new DatabaseManager and extractor, same
+database file), and a warm cache with a changed router option, which
+must extract again. The synthetic PDF holds scanned pages (page images
+without a text layer), which the router sends to the VLM.
+
+Usage:
+    python -m start_project.benchmarks.bench_extraction_cache --pdf "test_files/21AC001.../21AC001(2)...pdf"
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from ..core.database import DatabaseManager
+from ..extractors.hybrid_extractor import PYMUPDF_AVAILABLE, HybridExtractor
+from ..extractors.page_router import PageRouter
+from ..extractors.vlm_processor import VLMProcessor
+from .bench_vlm_concurrency import make_pdf
+from .fake_ollama import FakeOllamaServer
+
+
+def make_scanned_pdf(path: str, pages: int, tmp: str):
+    """Write a PDF whose pages are images of text pages"""
+    import fitz
+    
+    text_path = os.path.join(tmp, 'text.pdf')
+    make_pdf(text_path, pages)
+    with fitz.open(text_path) as text_doc, fitz.open() as doc:
+        for text_page in text_doc:
+            pix = text_page.get_pixmap(matrix=fitz.Matrix(1.5, 1.5), colorspace=fitz.csGRAY)
+            page = doc.new_page(width=text_page.rect.width, height=text_page.rect.height)
+            page.insert_image(page.rect, stream=pix.tobytes('png'))
+        doc.save(path)
+
+
+def run(pdf_path: str, db_path: str, host: str, model: str, router: PageRouter, cached: bool = True):
+    vlm = VLMProcessor(model_name=model, ollama_host=host, auto_pull=False, max_concurrency=4)
+    extractor = HybridExtractor(vlm=vlm, router=router)
+    db = None
+    if cached:
+        db = DatabaseManager(db_path)
+        extractor.set_result_cache(db)
+    
+    start = time.perf_counter()
+    text = extractor.extract_cached(pdf_path)['text']
+    tables = extractor.extract_cached(pdf_path)['tables']
+    elapsed = time.perf_counter() - start
+    
+    if db is not None:
+        db.close()
+    return elapsed, extractor.extraction_count, extractor.cache_hits, len(text), len(tables)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pdf', help='PDF to process (default: synthetic scanned PDF)')
+    parser.add_argument('--pages', type=int, default=8)
+    parser.add_argument('--host', help='Real Ollama server (default: start the fake server)')
+    parser.add_argument('--model', default='fake-vlm:latest')
+    parser.add_argument('--latency', type=float, default=0.5, help='Fake server seconds per page')
+    args = parser.parse_args()
+    
+    if not PYMUPDF_AVAILABLE:
+        raise SystemExit("PyMuPDF is not installed")
+    
+    server = None
+    if args.host is None:
+        server = FakeOllamaServer(model_name=args.model, latency=args.latency, parallel=4).start()
+    host = args.host or server.url
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = args.pdf
+        if pdf_path is None:
+            pdf_path = os.path.join(tmp, 'bench.pdf')
+            make_scanned_pdf(pdf_path, args.pages, tmp)
+        db_path = os.path.join(tmp, 'cache.db')
+        
+        rows = [
+            ('no cache', run(pdf_path, db_path, host, args.model, PageRouter(), cached=False)),
+            ('cold cache', run(pdf_path, db_path, host, args.model, PageRouter())),
+            # New DatabaseManager and extractor = new process, same database
+            ('warm cache (restart)', run(pdf_path, db_path, host, args.model, PageRouter())),
+            ('changed option', run(pdf_path, db_path, host, args.model, PageRouter(max_image_coverage=0.4)))
+        ]
+    
+    if server is not None:
+        server.stop()
+    
+    print(f"{'=' * 80}")
+    print(f"Two extract_cached() calls: {os.path.basename(args.pdf or 'synthetic')}")
+    print(f"{'=' * 80}")
+    print(f"{'variant':<22} {'seconds':>8} {'extractions':>12} {'cache hits':>11} {'text chars':>11} {'tables':>7}")
+    for name, (elapsed, extractions, hits, text_chars, tables) in rows:
+        print(f"{name:<22} {elapsed:>8.2f} {extractions:>12} {hits:>11} {text_chars:>11} {tables:>7}")
+
+
+if __name__ == "__main__":
+    main()
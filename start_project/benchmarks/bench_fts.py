@@ -0,0 +1,175 @@
+"""
+Benchmark the FTS5 chunk index against in-memory BM25Okapi
+
+Chunks the saved unstructured results in extraction_results into a
+temporary database (repeated until --chunks chunks) and compares:
+
+- fts: DatabaseManager.search_chunks() on the trigram FTS5 index that
+  the content_chunks triggers maintain. Build time is rebuild_fts()
+  over all chunks; the trigger cost is the slowdown of
+  insert_chunks_bulk() against a database without the index triggers.
+- bm25okapi: the reference scripts' path (rank_bm25.BM25Okapi over
+  whitespace-split chunk texts, built on every process start,
+  get_scores() + argsort per query), if rank_bm25 is installed.
+
+Queries are 4-8 character passages of random chunks with whitespace
+removed, as a user would type them. hit@1 is the share of queries whose
+top result contains the passage; precision is the share of the top k
+results that contain it (both ignoring whitespace).
+
+Usage:
+    python -m start_project.benchmarks.bench_fts --chunks 20000 --queries 200
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import tempfile
+import time
+
+from ..core.database import DatabaseManager
+from ..processors.chunker import Chunker
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_results() -> list:
+    """Saved unstructured results of the Japanese manuals"""
+    results = []
+    for path in sorted(glob.glob(os.path.join(ROOT, 'start_project', 'extraction_results', '*_full.json'))):
+        with open(path, encoding='utf-8') as f:
+            results.append(json.load(f))
+    return results
+
+
+def make_chunks(results: list, target: int, chunk_size: int) -> list:
+    """Chunks of the results, repeated under new file hashes until target"""
+    chunker = Chunker(mode='japanese', chunk_size=chunk_size, chunk_overlap=50)
+    chunks = []
+    n = 0
+    while len(chunks) < target:
+        for i, result in enumerate(results):
+            chunks.extend(chunker(f"r{n}_{i}", result))
+        n += 1
+    return chunks[:target]
+
+
+def make_queries(rng: random.Random, chunks: list, count: int) -> list:
+    """4-8 characters of random chunks, whitespace removed"""
+    queries = []
+    while len(queries) < count:
+        chunk = rng.choice(chunks)
+        text = re.sub(r'\s+', '', chunk['chunk_text'])
+        length = rng.randint(4, 8)
+        if len(text) < length:
+            continue
+        start = rng.randrange(len(text) - length + 1)
+        query = text[start:start + length]
+        if re.fullmatch(r'\w+', query):
+            queries.append(query)
+    return queries
+
+
+def percentile(values: list, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def run_queries(search, queries: list, texts: dict) -> tuple:
+    """(latencies in ms, hit@1, precision) of search(query) -> chunk ids"""
+    latencies = []
+    hits = 0
+    precision = 0.0
+    for query in queries:
+        start = time.perf_counter()
+        chunk_ids = search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        matches = [query in texts[chunk_id] for chunk_id in chunk_ids]
+        hits += bool(matches and matches[0])
+        precision += sum(matches) / len(matches) if matches else 0.0
+    return latencies, hits / len(queries), precision / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--chunks', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--chunk-size', type=int, default=500)
+    args = parser.parse_args()
+    
+    results = load_results()
+    if not results:
+        raise SystemExit("No saved extraction results found")
+    
+    chunks = make_chunks(results, args.chunks, args.chunk_size)
+    queries = make_queries(random.Random(0), chunks, args.queries)
+    texts = {chunk['chunk_id']: re.sub(r'\s+', '', chunk['chunk_text']) for chunk in chunks}
+    corpus_mb = sum(len(chunk['chunk_text'].encode('utf-8')) for chunk in chunks) / (1024 * 1024)
+    
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'fts.db'), synchronous='OFF')
+        if not db.fts_available:
+            raise SystemExit("This SQLite build has no FTS5")
+        
+        # Insert cost with and without the FTS triggers
+        plain = DatabaseManager(os.path.join(tmp, 'plain.db'), synchronous='OFF')
+        with plain.transaction() as conn:
+            for fts in DatabaseManager.FTS_TABLES:
+                for trigger in ('insert', 'delete', 'update'):
+                    conn.execute(f"DROP TRIGGER {fts}_{trigger}")
+        start = time.perf_counter()
+        plain.insert_chunks_bulk(chunks)
+        plain_seconds = time.perf_counter() - start
+        plain.close()
+        
+        start = time.perf_counter()
+        db.insert_chunks_bulk(chunks)
+        insert_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        db.rebuild_fts()
+        build_seconds = time.perf_counter() - start
+        
+        rows.append(('fts (trigram)', build_seconds) + run_queries(
+            lambda query: [hit['chunk_id'] for hit in db.search_chunks(query, args.k)], queries, texts
+        ) + (
+                     f"insert {insert_seconds:.2f}s vs {plain_seconds:.2f}s without triggers",))
+        
+        try:
+            from rank_bm25 import BM25Okapi
+        except ImportError:
+            BM25Okapi = None
+        if BM25Okapi is not None:
+            import numpy as np
+            
+            start = time.perf_counter()
+            stored = db.connection().execute('SELECT chunk_id, chunk_text FROM content_chunks').fetchall()
+            chunk_ids = [row[0] for row in stored]
+            bm25 = BM25Okapi([row[1].split() for row in stored])
+            bm25_seconds = time.perf_counter() - start
+            
+            def bm25_search(query):
+                scores = bm25.get_scores(query.split())
+                return [chunk_ids[i] for i in np.argsort(scores)[::-1][:args.k]]
+            
+            rows.append(('bm25okapi', bm25_seconds) + run_queries(bm25_search, queries, texts)
+                        + ('rebuilt every process start',))
+        db.close()
+    
+    print(f"{'=' * 96}")
+    print(f"Keyword search over {len(chunks)} chunks ({corpus_mb:.1f} MB), "
+          f"{len(queries)} queries, top {args.k}")
+    print(f"{'=' * 96}")
+    print(f"{'index':<15} {'build s':>8} {'p50 ms':>8} {'p99 ms':>8} {'hit@1':>6} {'prec@k':>7}  notes")
+    for name, build, latencies, hit_rate, precision, notes in rows:
+        print(f"{name:<15} {build:>8.2f} {percentile(latencies, 50):>8.2f} "
+              f"{percentile(latencies, 99):>8.2f} {hit_rate:>6.2f} {precision:>7.2f}  {notes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Benchmark HybridRetriever against full-corpus score fusion
+
+For each size in --sizes a synthetic corpus is written to a temporary
+database and VectorIndex: chunks belong to one of --topics topics, their
+vectors are the topic centre plus noise and their texts are space-separated
+CJK words, drawn Zipf-distributed from a shared vocabulary and from a small
+vocabulary of the topic. A query is three consecutive words of a random
+chunk plus that chunk's vector with extra noise (a paraphrase); hit@k is
+the share of queries whose chunk is in the top k.
+
+Compared per query:
+- hybrid rrf / hybrid weighted: HybridRetriever.retrieve() (top
+  --candidates from the vector index and from the FTS5 index, fused by
+  chunk id, texts read for the top k only)
+- full fusion: the reference fusion_retrieval() approach, scoring every
+  chunk with BM25Okapi and an exact matrix product, min-max normalising
+  both over the corpus and sorting it (without materialising every
+  document as the reference script does), if rank_bm25 is installed
+- vector / keyword: each side of the hybrid alone
+
+The growth column is the exponent b of latency ~ chunks^b between the
+smallest and the largest size: 1 is linear, below 1 sublinear.
+
+Usage:
+    python -m start_project.benchmarks.bench_hybrid --sizes 10000,100000,300000
+"""
+
+import argparse
+import math
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from ..core.database import DatabaseManager
+from ..retrieval.hybrid_retriever import HybridRetriever
+from ..retrieval.vector_index import VectorIndex
+
+try:
+    from rank_bm25 import BM25Okapi
+except ImportError:
+    BM25Okapi = None
+
+
+class Corpus:
+    """Synthetic chunks with topic-correlated texts and vectors"""
+    
+    def __init__(self, seed: int, dim: int, topics: int, vocabulary: int, words: int):
+        self.rng = np.random.default_rng(seed)
+        self.words = words
+        chars = [chr(0x4E00 + i) for i in range(3000)]
+        vocab = set()
+        while len(vocab) < vocabulary:
+            length = int(self.rng.integers(3, 5))
+            vocab.add(''.join(chars[i] for i in self.rng.integers(0, len(chars), length)))
+        self.vocab = np.array(sorted(vocab))
+        self.rng.shuffle(self.vocab)
+        ranks = np.arange(1, vocabulary + 1, dtype=np.float64)
+        self.p = 1.0 / ranks
+        self.p /= self.p.sum()
+        # Topic words come from the rarer half of the vocabulary
+        self.topic_words = self.rng.integers(vocabulary // 2, vocabulary, (topics, 50))
+        self.centers = self.rng.standard_normal((topics, dim)).astype(np.float32)
+    
+    def make(self, n: int, offset: int) -> tuple:
+        """(chunk dicts, vectors) of n new chunks"""
+        topics = self.rng.integers(0, len(self.centers), n)
+        shared = self.rng.choice(len(self.vocab), (n, self.words - self.words // 4), p=self.p)
+        own = self.topic_words[topics[:, None], self.rng.integers(0, 50, (n, self.words // 4))]
+        words = np.concatenate([shared, own], axis=1)
+        words = self.rng.permuted(words, axis=1)
+        vectors = self.centers[topics] + self.rng.standard_normal((n, self.centers.shape[1])).astype(np.float32)
+        chunks = [
+            {
+                'chunk_id': f"chunk_{offset + i}",
+                'file_hash': f"file_{(offset + i) // 100}",
+                'chunk_index': (offset + i) % 100,
+                'chunk_text': ' '.join(self.vocab[row])
+            }
+            for i, row in enumerate(words)
+        ]
+        return chunks, vectors.astype(np.float32)
+
+
+def percentile(values: list, p: float) -> float:
+    return float(np.percentile(values, p))
+
+
+def full_fusion(bm25, matrix, chunk_ids, query: str, query_vector, k: int, alpha: float = 0.5) -> list:
+    """The reference approach: score, normalise and sort the whole corpus"""
+    q = query_vector / np.linalg.norm(query_vector)
+    vector_scores = matrix @ q
+    bm25_scores = bm25.get_scores(query.split())
+    
+    def normalize(scores):
+        span = scores.max() - scores.min()
+        return (scores - scores.min()) / span if span > 0 else np.zeros_like(scores)
+    
+    combined = alpha * normalize(vector_scores) + (1 - alpha) * normalize(bm25_scores)
+    return [chunk_ids[i] for i in np.argsort(combined)[::-1][:k]]
+
+
+def run(search, queries: list, k: int) -> tuple:
+    """(latencies in ms, hit@k) of search(query, vector) -> chunk ids"""
+    latencies = []
+    hits = 0
+    for target, query, vector in queries:
+        start = time.perf_counter()
+        chunk_ids = search(query, vector)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += target in chunk_ids[:k]
+    return latencies, hits / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='10000,100000,300000')
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--candidates', type=int, default=50)
+    parser.add_argument('--dim', type=int, default=128)
+    parser.add_argument('--topics', type=int, default=500)
+    parser.add_argument('--vocabulary', type=int, default=50000)
+    parser.add_argument('--words', type=int, default=40, help='Words per chunk')
+    parser.add_argument('--noise', type=float, default=1.0, help='Extra noise on query vectors')
+    parser.add_argument('--batch', type=int, default=50000)
+    parser.add_argument('--no-full', action='store_true', help='Skip the full-corpus baseline')
+    args = parser.parse_args()
+    
+    sizes = sorted(int(size) for size in args.sizes.split(','))
+    corpus = Corpus(0, args.dim, args.topics, args.vocabulary, args.words)
+    
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'hybrid.db'), synchronous='OFF')
+        if not db.fts_available:
+            raise SystemExit("This SQLite build has no FTS5")
+        index = VectorIndex(os.path.join(tmp, 'index'))
+        retriever = HybridRetriever(db, index, k_candidates=args.candidates)
+        texts = []
+        matrix = np.empty((0, args.dim), dtype=np.float32)
+        
+        for size in sizes:
+            # Grow the same corpus to the next size
+            start = time.perf_counter()
+            while len(texts) < size:
+                n = min(args.batch, size - len(texts))
+                chunks, vectors = corpus.make(n, len(texts))
+                db.insert_chunks_bulk(chunks)
+                index.add([chunk['chunk_id'] for chunk in chunks], vectors,
+                          [chunk['file_hash'] for chunk in chunks])
+                texts.extend(chunk['chunk_text'] for chunk in chunks)
+                matrix = np.concatenate([matrix, vectors / np.linalg.norm(vectors, axis=1, keepdims=True)])
+            if index.info()['ivf']:
+                index.train()
+            build_seconds = time.perf_counter() - start
+            
+            rng = np.random.default_rng(size)
+            queries = []
+            for i in rng.integers(0, size, args.queries).tolist():
+                words = texts[i].split()
+                first = int(rng.integers(0, len(words) - 2))
+                vector = matrix[i] + args.noise / math.sqrt(args.dim) * rng.standard_normal(args.dim).astype(np.float32)
+                queries.append((f"chunk_{i}", ' '.join(words[first:first + 3]), vector))
+            
+            def hybrid(fusion):
+                return lambda query, vector: [
+                    hit['chunk_id'] for hit in retriever.retrieve(query, args.k, query_vector=vector, fusion=fusion)
+                ]
+            
+            searches = [
+                ('hybrid rrf', hybrid('rrf'), f"index build {build_seconds:.1f}s, ivf {index.info()['ivf']}"),
+                ('hybrid weighted', hybrid('weighted'), ''),
+                ('vector only', lambda query, vector: [chunk_id for chunk_id, _ in index.search(vector, args.k)], ''),
+                ('keyword only', lambda query, vector: [hit['chunk_id'] for hit in db.search_chunks(query, args.k)], '')
+            ]
+            if BM25Okapi is not None and not args.no_full:
+                start = time.perf_counter()
+                bm25 = BM25Okapi([text.split() for text in texts])
+                chunk_ids = [f"chunk_{i}" for i in range(len(texts))]
+                bm25_seconds = time.perf_counter() - start
+                searches.append((
+                    'full fusion',
+                    lambda query, vector: full_fusion(bm25, matrix, chunk_ids, query, vector, args.k),
+                    f"BM25Okapi build {bm25_seconds:.1f}s per process start"
+                ))
+            
+            for name, search, notes in searches:
+                latencies, hit_rate = run(search, queries, args.k)
+                rows.append((size, name, hit_rate, latencies, notes))
+        
+        index.close()
+        db.close()
+    
+    print(f"{'=' * 96}")
+    print(f"Hybrid retrieval, top {args.k} of {args.candidates} candidates per side, "
+          f"{args.queries} queries ({args.dim}-d, {args.words} words per chunk)")
+    print(f"{'=' * 96}")
+    print(f"{'chunks':>8} {'search':<16} {'hit@k':>6} {'p50 ms':>8} {'p99 ms':>8}  notes")
+    for size, name, hit_rate, latencies, notes in rows:
+        print(f"{size:>8} {name:<16} {hit_rate:>6.2f} {percentile(latencies, 50):>8.2f} "
+              f"{percentile(latencies, 99):>8.2f}  {notes}")
+    
+    if len(sizes) > 1:
+        print(f"\nLatency growth (p50 ~ chunks^b, {sizes[0]} -> {sizes[-1]} chunks)")
+        p50 = {(size, name): percentile(latencies, 50) for size, name, _, latencies, _ in rows}
+        for name in dict.fromkeys(name for _, name, _, _, _ in rows):
+            if (sizes[0], name) in p50 and (sizes[-1], name) in p50:
+                b = math.log(p50[sizes[-1], name] / p50[sizes[0], name]) / math.log(sizes[-1] / sizes[0])
+                print(f"  {name:<16} b = {b:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark page image encoding options for VLM input
+
+For every PageImageEncoder preset (and the original PIL PNG path) it
+reports render + encode time per page, the size of the base64 payload
+sent to Ollama, the output resolution, and the end-to-end latency per
+page of VLMProcessor._process_pdf. Payload size is what drives upload
+time and the model's image token count; end-to-end latency is only
+meaningful against a real server (--host/--model), the default fake
+server shows the client-side cost.
+
+Usage:
+    python -m start_project.benchmarks.bench_image_encoding --pdf start_project/test_pdf.pdf
+    python -m start_project.benchmarks.bench_image_encoding --pdf manual.pdf \
+        --host http://localhost:11434 --model qwen2.5vl:3b-q4_K_M
+"""
+
+import argparse
+import base64
+import statistics
+import time
+from io import BytesIO
+from typing import Dict, List
+
+from ..extractors.image_encoder import PageImageEncoder
+from ..extractors.vlm_processor import PYMUPDF_AVAILABLE, VLMProcessor
+from .fake_ollama import FakeOllamaServer
+
+
+class LegacyPngEncoder(PageImageEncoder):
+    """The original path: 2x pixmap -> PIL image -> PNG -> base64"""
+    
+    def encode(self, page) -> bytes:
+        import fitz
+        from PIL import Image
+        
+        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
+        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+        buffered = BytesIO()
+        img.save(buffered, format="PNG")
+        return buffered.getvalue()
+
+
+def measure_encoding(encoder: PageImageEncoder, pdf_path: str, repeat: int) -> Dict:
+    import fitz
+    
+    times, payloads, sizes = [], [], []
+    with fitz.open(pdf_path) as doc:
+        for _ in range(repeat):
+            for page in doc:
+                start = time.perf_counter()
+                payload = base64.b64encode(encoder.encode(page))
+                times.append(time.perf_counter() - start)
+                payloads.append(len(payload))
+                zoom = 2.0 if isinstance(encoder, LegacyPngEncoder) else encoder.page_zoom(page)
+                sizes.append(f"{round(page.rect.width * zoom)}x{round(page.rect.height * zoom)}")
+    return {
+        'encode_ms': statistics.median(times) * 1000,
+        'payload_kb': statistics.mean(payloads) / 1024,
+        'resolution': sizes[0]
+    }
+
+
+def measure_end_to_end(encoder: PageImageEncoder, pdf_path: str, host: str, model: str) -> float:
+    vlm = VLMProcessor(model_name=model, ollama_host=host, auto_pull=False, image_encoder=encoder)
+    if not vlm.available:
+        raise SystemExit("VLMProcessor not available (PyMuPDF, server and model required)")
+    start = time.perf_counter()
+    result = vlm._process_pdf(pdf_path)
+    return (time.perf_counter() - start) / max(result['metadata']['total_pages'], 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pdf', default='start_project/test_pdf.pdf')
+    parser.add_argument('--presets', nargs='+', default=list(PageImageEncoder.PRESETS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--host', help='Real Ollama server (default: start the fake server)')
+    parser.add_argument('--model', default='fake-vlm:latest')
+    parser.add_argument('--latency', type=float, default=0.2, help='Fake server seconds per page')
+    args = parser.parse_args()
+    
+    if not PYMUPDF_AVAILABLE:
+        raise SystemExit("PyMuPDF is not installed")
+    
+    encoders = [('legacy PIL png', LegacyPngEncoder())]
+    encoders += [(name, PageImageEncoder.from_preset(name)) for name in args.presets]
+    
+    server = None
+    if args.host is None:
+        server = FakeOllamaServer(model_name=args.model, latency=args.latency).start()
+    host = args.host or server.url
+    
+    rows: List = []
+    for name, encoder in encoders:
+        stats = measure_encoding(encoder, args.pdf, args.repeat)
+        stats['e2e_s'] = measure_end_to_end(encoder, args.pdf, host, args.model)
+        rows.append((name, stats))
+    
+    if server is not None:
+        server.stop()
+    
+    base = rows[0][1]
+    print(f"{'=' * 84}")
+    print(f"Page image encoding ({args.pdf}; end-to-end against {'fake server' if server else host})")
+    print(f"{'=' * 84}")
+    print(f"{'encoder':<16} {'resolution':>11} {'encode ms':>10} {'payload KB':>11} "
+          f"{'vs legacy':>10} {'e2e s/page':>11}")
+    for name, stats in rows:
+        print(f"{name:<16} {stats['resolution']:>11} {stats['encode_ms']:>10.1f} {stats['payload_kb']:>11.1f} "
+              f"{stats['payload_kb'] / base['payload_kb']:>9.0%} {stats['e2e_s']:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark the rendered-page cache across VLM modes
+
+Runs extract(), process_flowchart() and process_tables() on one PDF, as
+an application inspecting a document in all three modes would, and
+reports how many pages were rasterised and the time spent. Variants:
+no cache, the memory tier, and a second process start with only the
+disk tier warm. The fake Ollama server answers instantly by default so
+the rendering cost is visible.
+
+Usage:
+    python -m start_project.benchmarks.bench_page_cache --pdf "test_files/21AC001.../21AC001(2)...pdf"
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from ..extractors.vlm_processor import PYMUPDF_AVAILABLE, VLMProcessor
+from ..utils import PageRenderCache
+from .bench_vlm_concurrency import make_pdf
+from .fake_ollama import FakeOllamaServer
+
+
+def run(pdf_path: str, host: str, model: str, cache: PageRenderCache):
+    vlm = VLMProcessor(model_name=model, ollama_host=host, auto_pull=False, page_cache=cache)
+    if not vlm.available:
+        raise SystemExit("VLMProcessor not available (PyMuPDF, server and model required)")
+    
+    renders = 0
+    encode = vlm.image_encoder.encode
+    
+    def counting_encode(page):
+        nonlocal renders
+        renders += 1
+        return encode(page)
+    
+    vlm.image_encoder.encode = counting_encode
+    start = time.perf_counter()
+    vlm.extract(pdf_path)
+    vlm.process_flowchart(pdf_path)
+    vlm.process_tables(pdf_path)
+    return time.perf_counter() - start, renders, cache.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pdf', help='PDF to process (default: synthetic text PDF)')
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--host', help='Real Ollama server (default: start the fake server)')
+    parser.add_argument('--model', default='fake-vlm:latest')
+    parser.add_argument('--latency', type=float, default=0.0, help='Fake server seconds per page')
+    args = parser.parse_args()
+    
+    if not PYMUPDF_AVAILABLE:
+        raise SystemExit("PyMuPDF is not installed")
+    
+    server = None
+    if args.host is None:
+        server = FakeOllamaServer(model_name=args.model, latency=args.latency, parallel=4).start()
+    host = args.host or server.url
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = args.pdf
+        if pdf_path is None:
+            pdf_path = os.path.join(tmp, 'bench.pdf')
+            make_pdf(pdf_path, args.pages)
+        cache_dir = os.path.join(tmp, 'page_cache')
+        
+        rows = [
+            ('no cache', run(pdf_path, host, args.model, PageRenderCache(max_memory_bytes=0))),
+            ('memory + disk (cold)', run(pdf_path, host, args.model, PageRenderCache(cache_dir=cache_dir))),
+            # New cache object = new process: memory empty, disk warm
+            ('disk only (warm)', run(pdf_path, host, args.model, PageRenderCache(cache_dir=cache_dir)))
+        ]
+    
+    if server is not None:
+        server.stop()
+    
+    print(f"{'=' * 80}")
+    print(f"extract + process_flowchart + process_tables: {os.path.basename(args.pdf or 'synthetic')}")
+    print(f"{'=' * 80}")
+    print(f"{'variant':<22} {'seconds':>8} {'renders':>8} {'mem hits':>9} {'disk hits':>10} {'misses':>7} {'hit rate':>9}")
+    for name, (elapsed, renders, stats) in rows:
+        print(f"{name:<22} {elapsed:>8.2f} {renders:>8} {stats['memory_hits']:>9} {stats['disk_hits']:>10} "
+              f"{stats['misses']:>7} {stats['hit_rate']:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark page routing: HybridExtractor vs sending every page to the VLM
+
+Classifies every page of the given PDFs with PageRouter, prints the
+route split with the reason per page, then extracts each PDF twice:
+VLMProcessor on all pages, and HybridExtractor (VLM only on 'vlm'
+pages). Runs against the local fake Ollama server (or a real server
+with --host/--model).
+
+Usage:
+    python -m start_project.benchmarks.bench_page_router test_files/*/*.pdf --latency 2
+    python -m start_project.benchmarks.bench_page_router manual.pdf \
+        --host http://localhost:11434 --model qwen2.5vl:3b-q4_K_M
+"""
+
+import argparse
+import os
+import time
+
+from ..extractors.hybrid_extractor import HybridExtractor
+from ..extractors.page_router import PageRouter
+from ..extractors.vlm_processor import PYMUPDF_AVAILABLE, VLMProcessor
+from .fake_ollama import FakeOllamaServer
+
+
+def print_routes(pdf_path: str, decisions):
+    print(f"\n{os.path.basename(pdf_path)}")
+    print(f"  {'page':>4} {'route':<6} {'chars':>6} {'images':>7} {'drawings':>9}  reason")
+    for d in decisions:
+        print(f"  {d['page_number']:>4} {d['route']:<6} {d['text_chars']:>6} {d['image_coverage']:>7.2f} "
+              f"{d['drawings']:>9}  {d['reason']}")
+    print(f"  split: {PageRouter.summarize(decisions)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('pdfs', nargs='+', help='PDFs to route and extract')
+    parser.add_argument('--host', help='Real Ollama server (default: start the fake server)')
+    parser.add_argument('--model', default='fake-vlm:latest')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=2.0, help='Fake server seconds per page')
+    parser.add_argument('--parallel', type=int, default=1, help='Fake server OLLAMA_NUM_PARALLEL')
+    args = parser.parse_args()
+    
+    if not PYMUPDF_AVAILABLE:
+        raise SystemExit("PyMuPDF is not installed")
+    
+    server = None
+    if args.host is None:
+        server = FakeOllamaServer(model_name=args.model, latency=args.latency, parallel=args.parallel).start()
+    host = args.host or server.url
+    
+    vlm = VLMProcessor(model_name=args.model, ollama_host=host, auto_pull=False, max_concurrency=args.concurrency)
+    if not vlm.available:
+        raise SystemExit("VLMProcessor not available (PyMuPDF, server and model required)")
+    hybrid = HybridExtractor(vlm=vlm)
+    
+    rows = []
+    for pdf_path in args.pdfs:
+        print_routes(pdf_path, hybrid.route(pdf_path))
+        
+        start = time.perf_counter()
+        vlm.extract(pdf_path)
+        vlm_all = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        result = hybrid.extract(pdf_path)
+        routed = time.perf_counter() - start
+        
+        rows.append((os.path.basename(pdf_path), result['metadata']['routes'], vlm_all, routed))
+    
+    if server is not None:
+        server.stop()
+    
+    print(f"\n{'=' * 90}")
+    print(f"Page routing ({'fake server, ' + str(args.latency) + 's/page' if server else host})")
+    print(f"{'=' * 90}")
+    print(f"{'file':<40} {'text':>5} {'table':>6} {'vlm':>4} {'all-VLM s':>10} {'hybrid s':>9} {'speedup':>8}")
+    for name, routes, vlm_all, routed in rows:
+        print(f"{name[:40]:<40} {routes['text']:>5} {routes['table']:>6} {routes['vlm']:>4} "
+              f"{vlm_all:>10.2f} {routed:>9.2f} {vlm_all / routed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
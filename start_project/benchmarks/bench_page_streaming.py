@@ -0,0 +1,105 @@
+"""
+Benchmark page streaming and checkpointed resume
+
+Extracts a PDF with VLMProcessor against the fake Ollama server (or a
+real server with --host/--model) and reports when the first page was
+available to the caller with extract() and with iter_pages(). A second
+run through iter_pages_checkpointed() is interrupted after --stop-after
+pages and then resumed; the resumed run must only send the remaining
+pages to the model.
+
+Usage:
+    python -m start_project.benchmarks.bench_page_streaming --pages 20 --latency 0.5
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from ..core.database import DatabaseManager
+from ..extractors.vlm_processor import PYMUPDF_AVAILABLE, VLMProcessor
+from .bench_vlm_concurrency import make_pdf
+from .fake_ollama import FakeOllamaServer
+
+
+def first_and_total(pages) -> tuple:
+    """Seconds until the first page and until the last page of an iterator"""
+    start = time.perf_counter()
+    first = None
+    count = 0
+    for _ in pages:
+        count += 1
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', help='Real Ollama server (default: start the fake server)')
+    parser.add_argument('--model', default='fake-vlm:latest')
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.5, help='Fake server seconds per page')
+    parser.add_argument('--concurrency', type=int, default=2)
+    parser.add_argument('--stop-after', type=int, default=15, help='Pages before the interruption')
+    args = parser.parse_args()
+    
+    if not PYMUPDF_AVAILABLE:
+        raise SystemExit("PyMuPDF is not installed")
+    
+    server = None
+    if args.host is None:
+        server = FakeOllamaServer(model_name=args.model, latency=args.latency, parallel=args.concurrency).start()
+    host = args.host or server.url
+    
+    vlm = VLMProcessor(model_name=args.model, ollama_host=host, auto_pull=False, max_concurrency=args.concurrency)
+    if not vlm.available:
+        raise SystemExit("VLMProcessor not available (server and model required)")
+    
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, 'bench.pdf')
+        make_pdf(pdf_path, args.pages)
+        
+        start = time.perf_counter()
+        vlm.extract(pdf_path)
+        elapsed = time.perf_counter() - start
+        rows.append(('extract()', elapsed, elapsed, args.pages, None))
+        
+        rows.append(('iter_pages()',) + first_and_total(vlm.iter_pages(pdf_path)) + (None,))
+        
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        pages = vlm.iter_pages_checkpointed(pdf_path, db)
+        requests_before = server.requests if server else None
+        start = time.perf_counter()
+        for n, _ in enumerate(pages, 1):
+            if n == args.stop_after:
+                break
+        pages.close()
+        elapsed = time.perf_counter() - start
+        sent = server.requests - requests_before if server else None
+        rows.append((f"interrupted at {args.stop_after}", None, elapsed, args.stop_after, sent))
+        
+        requests_before = server.requests if server else None
+        first, elapsed, count = first_and_total(vlm.iter_pages_checkpointed(pdf_path, db))
+        sent = server.requests - requests_before if server else None
+        rows.append(('resumed', first, elapsed, count, sent))
+        db.close()
+    
+    if server is not None:
+        server.stop()
+    
+    print(f"{'=' * 72}")
+    print(f"Page streaming ({args.pages} pages, concurrency {args.concurrency}, "
+          f"{'fake server ' + str(args.latency) + 's/page' if server else host})")
+    print(f"{'=' * 72}")
+    print(f"{'run':<22} {'first page s':>12} {'total s':>8} {'pages':>6} {'requests':>9}")
+    for name, first, elapsed, count, sent in rows:
+        first = f"{first:.2f}" if first is not None else '-'
+        sent = sent if sent is not None else '-'
+        print(f"{name:<22} {first:>12} {elapsed:>8.2f} {count:>6} {sent:>9}")
+
+
+if __name__ == "__main__":
+    main()
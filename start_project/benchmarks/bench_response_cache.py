@@ -0,0 +1,90 @@
+"""
+Benchmark the persistent VLM response cache
+
+Extracts a PDF, then re-runs the extraction the way a restart after a
+crash or a code change would: new DatabaseManager, new VLMProcessor,
+same database file. The second run should send no generate requests.
+A third run with bypass=True refreshes every entry. Runs against the
+local fake Ollama server (or a real server with --host/--model).
+
+Usage:
+    python -m start_project.benchmarks.bench_response_cache --pages 12 --latency 1
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from ..core.database import DatabaseManager
+from ..extractors.response_cache import VLMResponseCache
+from ..extractors.vlm_processor import PYMUPDF_AVAILABLE, VLMProcessor
+from .bench_vlm_concurrency import make_pdf
+from .fake_ollama import FakeOllamaServer
+
+
+def run(pdf_path: str, db_path: str, host: str, model: str, bypass: bool = False):
+    db = DatabaseManager(db_path)
+    cache = VLMResponseCache(db, bypass=bypass)
+    vlm = VLMProcessor(model_name=model, ollama_host=host, auto_pull=False, response_cache=cache)
+    if not vlm.available:
+        raise SystemExit("VLMProcessor not available (PyMuPDF, server and model required)")
+    
+    start = time.perf_counter()
+    result = vlm.extract(pdf_path)
+    elapsed = time.perf_counter() - start
+    stats = cache.stats()
+    db.close()
+    return elapsed, result, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pdf', help='PDF to process (default: synthetic text PDF)')
+    parser.add_argument('--pages', type=int, default=12)
+    parser.add_argument('--host', help='Real Ollama server (default: start the fake server)')
+    parser.add_argument('--model', default='fake-vlm:latest')
+    parser.add_argument('--latency', type=float, default=1.0, help='Fake server seconds per page')
+    args = parser.parse_args()
+    
+    if not PYMUPDF_AVAILABLE:
+        raise SystemExit("PyMuPDF is not installed")
+    
+    server = None
+    if args.host is None:
+        server = FakeOllamaServer(model_name=args.model, latency=args.latency).start()
+    host = args.host or server.url
+    
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = args.pdf
+        if pdf_path is None:
+            pdf_path = os.path.join(tmp, 'bench.pdf')
+            make_pdf(pdf_path, args.pages)
+        db_path = os.path.join(tmp, 'cache.db')
+        
+        first_text = None
+        for name, bypass in (('first run', False), ('re-run', False), ('re-run, bypass', True)):
+            if server is not None:
+                server.reset_stats()
+            elapsed, result, stats = run(pdf_path, db_path, host, args.model, bypass)
+            first_text = first_text or result['text']
+            rows.append((
+                name, elapsed, server.generate_requests if server else '', stats,
+                result['text'] == first_text
+            ))
+    
+    if server is not None:
+        server.stop()
+    
+    print(f"{'=' * 80}")
+    print(f"VLM response cache ({os.path.basename(args.pdf or 'synthetic')})")
+    print(f"{'=' * 80}")
+    print(f"{'run':<16} {'seconds':>8} {'requests':>9} {'hits':>5} {'misses':>7} {'stores':>7} {'entries':>8} {'same text':>10}")
+    for name, elapsed, requests, stats, same in rows:
+        print(f"{name:<16} {elapsed:>8.2f} {requests:>9} {stats['hits']:>5} {stats['misses']:>7} "
+              f"{stats['stores']:>7} {stats['entries']:>8} {str(same):>10}")
+
+
+if __name__ == "__main__":
+    main()
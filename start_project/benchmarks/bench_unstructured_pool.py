@@ -0,0 +1,58 @@
+"""
+Benchmark UnstructuredExtractor.extract_many() scaling
+
+Runs the same documents through extract() in the calling process and
+through extract_many() with an increasing number of worker processes,
+and reports throughput and speedup over the sequential run. Worker
+start-up and warm-up (model load) are included in the pool timings.
+Scaling is only meaningful up to the number of physical cores.
+
+Usage:
+    python -m start_project.benchmarks.bench_unstructured_pool docs/*.pdf --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import time
+
+from ..extractors.unstructured_extractor import UnstructuredExtractor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('files', nargs='+', help='Documents to extract')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--strategy', default='hi_res')
+    parser.add_argument('--repeat', type=int, default=1, help='Pass the file list N times')
+    args = parser.parse_args()
+    paths = args.files * args.repeat
+    
+    extractor = UnstructuredExtractor(strategy=args.strategy)
+    if not extractor.available:
+        raise SystemExit("unstructured is not installed")
+    
+    rows = []
+    
+    extractor.warmup()
+    start = time.perf_counter()
+    failed = sum(not extractor.extract(path)['success'] for path in paths)
+    rows.append(('sequential extract()', time.perf_counter() - start, failed))
+    
+    for workers in args.workers:
+        start = time.perf_counter()
+        failed = sum(not result['success'] for result in extractor.extract_many(paths, workers=workers))
+        rows.append((f"extract_many({workers})", time.perf_counter() - start, failed))
+    
+    baseline = rows[0][1]
+    print(f"{'=' * 66}")
+    print(f"UnstructuredExtractor scaling ({len(paths)} documents, strategy={args.strategy}, "
+          f"{os.cpu_count()} CPUs)")
+    print(f"{'=' * 66}")
+    print(f"{'variant':<22} {'seconds':>9} {'docs/s':>8} {'speedup':>8} {'failed':>7}")
+    for name, seconds, failed in rows:
+        print(f"{name:<22} {seconds:>9.2f} {len(paths) / seconds:>8.2f} "
+              f"{baseline / seconds:>7.2f}x {failed:>7}")
+
+
+if __name__ == "__main__":
+    main()
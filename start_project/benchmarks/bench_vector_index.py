@@ -0,0 +1,103 @@
+"""
+Benchmark VectorIndex recall against latency
+
+Builds an index of synthetic clustered vectors (a Gaussian mixture, like
+embeddings of many documents on a few hundred topics) for each size in
+--sizes and compares exact search with IVF search at several nprobe
+values. Recall@k is measured against the exact results; latency is per
+single query (p50/p99 over --queries queries).
+
+Usage:
+    python -m start_project.benchmarks.bench_vector_index --sizes 10000,100000,1000000 --dim 128
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from ..retrieval.vector_index import VectorIndex
+
+
+def make_vectors(rng, centers, n: int, spread: float):
+    """n vectors around randomly chosen centers"""
+    labels = rng.integers(0, len(centers), n)
+    vectors = centers[labels] + spread * rng.standard_normal((n, centers.shape[1])).astype(np.float32)
+    return vectors.astype(np.float32)
+
+
+def timed(func, queries) -> tuple:
+    """(results, latencies in ms) of func per query"""
+    results = []
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(func(query))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--dim', type=int, default=128)
+    parser.add_argument('--clusters', type=int, default=500, help='Mixture components of the data')
+    parser.add_argument('--spread', type=float, default=1.0, help='Noise scale around each component')
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--nprobe', default='1,4,16,64')
+    parser.add_argument('--batch', type=int, default=100000, help='Vectors per add() call')
+    args = parser.parse_args()
+    
+    sizes = [int(size) for size in args.sizes.split(',')]
+    nprobes = [int(nprobe) for nprobe in args.nprobe.split(',')]
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((args.clusters, args.dim)).astype(np.float32)
+    queries = make_vectors(rng, centers, args.queries, args.spread)
+    
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            index = VectorIndex(os.path.join(tmp, str(size)), mode='exact')
+            
+            start = time.perf_counter()
+            for offset in range(0, size, args.batch):
+                n = min(args.batch, size - offset)
+                index.add([f"chunk_{i}" for i in range(offset, offset + n)], make_vectors(rng, centers, n, args.spread))
+            add_seconds = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            index.train()
+            train_seconds = time.perf_counter() - start
+            nlist = index.info()['nlist']
+            
+            truth, latencies = timed(lambda q: index.search(q, args.k, exact=True), queries)
+            truth = [{chunk_id for chunk_id, _ in hits} for hits in truth]
+            rows.append((size, 'exact', 1.0, latencies, f"add {add_seconds:.1f}s"))
+            
+            for nprobe in nprobes:
+                if nprobe > nlist:
+                    continue
+                results, latencies = timed(lambda q: index.search(q, args.k, nprobe=nprobe, exact=False), queries)
+                recall = np.mean([
+                    len(expected & {chunk_id for chunk_id, _ in hits}) / max(len(expected), 1)
+                    for expected, hits in zip(truth, results)
+                ])
+                rows.append((size, f"ivf nprobe={nprobe}", recall, latencies,
+                             f"nlist {nlist}, train {train_seconds:.1f}s"))
+            index.close()
+    
+    print(f"{'=' * 84}")
+    print(f"VectorIndex recall@{args.k} vs latency ({args.dim}-d, {args.clusters} clusters, "
+          f"spread {args.spread}, {args.queries} queries)")
+    print(f"{'=' * 84}")
+    print(f"{'vectors':>9} {'search':<15} {'recall':>7} {'p50 ms':>8} {'p99 ms':>8}  notes")
+    for size, name, recall, latencies, notes in rows:
+        print(f"{size:>9} {name:<15} {recall:>7.3f} {np.percentile(latencies, 50):>8.2f} "
+              f"{np.percentile(latencies, 99):>8.2f}  {notes}")
+
+
+if __name__ == "__main__":
+    main()
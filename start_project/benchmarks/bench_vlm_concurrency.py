@@ -0,0 +1,120 @@
+"""
+Benchmark VLMProcessor page throughput vs request concurrency
+
+Runs a PDF through VLMProcessor._process_pdf against the local fake
+Ollama server (or a real server with --host/--model) with an increasing
+number of in-flight requests. The first row is the old sequential
+behaviour: one request at a time and no render-ahead. The fake server
+is started with --parallel slots; concurrency beyond that only queues
+on the server. It also reports the TCP connections opened per run
+(pooled keep-alive connections are reused across pages).
+
+Usage:
+    python -m start_project.benchmarks.bench_vlm_concurrency --pages 24 --latency 1 --parallel 4
+    python -m start_project.benchmarks.bench_vlm_concurrency --pdf manual.pdf \
+        --host http://localhost:11434 --model qwen2.5vl:3b-q4_K_M --concurrency 1 2 4
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from ..extractors.vlm_processor import PYMUPDF_AVAILABLE, VLMProcessor
+from .fake_ollama import FakeOllamaServer
+
+
+def make_pdf(path: str, pages: int):
+    """Write a text PDF with the given number of pages"""
+    import fitz
+    
+    doc = fitz.open()
+    for n in range(pages):
+        page = doc.new_page()
+        for line in range(40):
+            page.insert_text((50, 60 + line * 18), f"Page {n + 1}, line {line + 1}: benchmark text")
+    doc.save(path)
+    doc.close()
+
+
+def page_count(pdf_path: str) -> int:
+    import fitz
+    
+    with fitz.open(pdf_path) as doc:
+        return len(doc)
+
+
+def run(pdf_path: str, host: str, model: str, concurrency: int, render_ahead: int) -> float:
+    vlm = VLMProcessor(
+        model_name=model,
+        ollama_host=host,
+        auto_pull=False,
+        max_concurrency=concurrency,
+        render_ahead=render_ahead
+    )
+    if not vlm.available:
+        raise SystemExit("VLMProcessor not available (PyMuPDF, Pillow, server and model required)")
+    
+    start = time.perf_counter()
+    result = vlm._process_pdf(pdf_path)
+    elapsed = time.perf_counter() - start
+    if result['metadata']['failed_pages']:
+        print(f"  failed pages: {result['metadata']['failed_pages']}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pdf', help='PDF to process (default: synthetic text PDF)')
+    parser.add_argument('--pages', type=int, default=24)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--render-ahead', type=int, default=2)
+    parser.add_argument('--host', help='Real Ollama server (default: start the fake server)')
+    parser.add_argument('--model', default='fake-vlm:latest')
+    parser.add_argument('--latency', type=float, default=1.0, help='Fake server seconds per page')
+    parser.add_argument('--parallel', type=int, default=4, help='Fake server OLLAMA_NUM_PARALLEL')
+    args = parser.parse_args()
+    
+    if not PYMUPDF_AVAILABLE:
+        raise SystemExit("PyMuPDF is not installed")
+    
+    server = None
+    if args.host is None:
+        server = FakeOllamaServer(model_name=args.model, latency=args.latency, parallel=args.parallel).start()
+    host = args.host or server.url
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = args.pdf
+        if pdf_path is None:
+            pdf_path = os.path.join(tmp, 'bench.pdf')
+            make_pdf(pdf_path, args.pages)
+        pages = page_count(pdf_path)
+        
+        rows = [('sequential, no render-ahead', run(pdf_path, host, args.model, 1, 0), None)]
+        for concurrency in args.concurrency:
+            if server is not None:
+                server.reset_stats()
+            elapsed = run(pdf_path, host, args.model, concurrency, args.render_ahead)
+            rows.append((
+                f"concurrency {concurrency}",
+                elapsed,
+                (server.max_active, server.connections) if server else None
+            ))
+    
+    if server is not None:
+        server.stop()
+    
+    baseline = rows[0][1]
+    print(f"{'=' * 70}")
+    print(f"VLM page throughput ({pages} pages, "
+          f"{'fake server, ' + str(args.parallel) + ' slots, ' + str(args.latency) + 's/page' if server else host})")
+    print(f"{'=' * 70}")
+    print(f"{'variant':<30} {'seconds':>8} {'pages/min':>10} {'speedup':>8} {'max active':>11} {'connections':>12}")
+    for name, elapsed, server_stats in rows:
+        max_active, connections = server_stats or ('', '')
+        print(f"{name:<30} {elapsed:>8.2f} {pages * 60 / elapsed:>10.1f} {baseline / elapsed:>7.2f}x "
+              f"{max_active:>11} {connections:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark streamed vs non-streamed VLM page requests
+
+Sends one page to the fake Ollama server (or a real server with
+--host/--model) and reports when the first text was available to the
+caller, the total time, and what is left of the page when generation
+stalls (the fake server pauses after --stall-after tokens) or the token
+budget is hit.
+
+Usage:
+    python -m start_project.benchmarks.bench_vlm_streaming --latency 4 --tokens 400
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from ..extractors.vlm_processor import PYMUPDF_AVAILABLE, VLMProcessor
+from .bench_vlm_concurrency import make_pdf
+from .fake_ollama import FakeOllamaServer
+
+
+def run(pdf_path: str, host: str, model: str, **options) -> tuple:
+    first_text = None
+    start = time.perf_counter()
+    
+    def on_page_text(page_num: int, text: str):
+        nonlocal first_text
+        if first_text is None:
+            first_text = time.perf_counter() - start
+    
+    vlm = VLMProcessor(model_name=model, ollama_host=host, auto_pull=False, on_page_text=on_page_text, **options)
+    if not vlm.available:
+        raise SystemExit("VLMProcessor not available (PyMuPDF, server and model required)")
+    
+    start = time.perf_counter()
+    result = vlm.extract(pdf_path)
+    elapsed = time.perf_counter() - start
+    if first_text is None and result['metadata'].get('pages_processed'):
+        # Without streaming the text arrives with the complete response
+        first_text = elapsed
+    
+    page = (result['metadata'].get('pages_data') or [{}])[0]
+    return first_text, elapsed, page, result['metadata'].get('failed_pages')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', help='Real Ollama server (default: start the fake server)')
+    parser.add_argument('--model', default='fake-vlm:latest')
+    parser.add_argument('--latency', type=float, default=4.0, help='Fake server seconds per page')
+    parser.add_argument('--tokens', type=int, default=400, help='Fake server tokens per page')
+    parser.add_argument('--stall-after', type=int, default=150, help='Fake server tokens before the stall')
+    args = parser.parse_args()
+    
+    if not PYMUPDF_AVAILABLE:
+        raise SystemExit("PyMuPDF is not installed")
+    
+    server = None
+    if args.host is None:
+        server = FakeOllamaServer(model_name=args.model, latency=args.latency, tokens=args.tokens, parallel=4).start()
+    host = args.host or server.url
+    
+    stall_timeout = 1.0
+    scenarios = [
+        ('non-streaming', {}, None),
+        ('streaming', {'stream': True}, None),
+        ('token budget 100', {'stream': True, 'max_tokens': 100}, None),
+        ('stall, non-streaming', {'timeout': args.latency + 2}, args.stall_after),
+        ('stall, streaming', {'stream': True, 'stall_timeout': stall_timeout}, args.stall_after)
+    ]
+    
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, 'bench.pdf')
+        make_pdf(pdf_path, 1)
+        
+        for name, options, stall_after in scenarios:
+            if server is not None:
+                server.stall_after = stall_after
+                server.stall_seconds = args.latency + 5 if stall_after is not None else 0
+            elif stall_after is not None:
+                continue
+            rows.append((name,) + run(pdf_path, host, args.model, **options))
+    
+    if server is not None:
+        server.stop()
+    
+    print(f"{'=' * 96}")
+    print(f"Streaming ({'fake server, ' + str(args.latency) + 's and ' + str(args.tokens) + ' tokens per page' if server else host})")
+    print(f"{'=' * 96}")
+    print(f"{'scenario':<22} {'first text s':>12} {'total s':>8} {'tokens':>7} {'ttft s':>7} {'tok/s':>7} {'stop':>13} {'failed':>7}")
+    for name, first_text, elapsed, page, failed in rows:
+        first = f"{first_text:.2f}" if first_text is not None else '-'
+        print(f"{name:<22} {first:>12} {elapsed:>8.2f} {page.get('tokens_used', 0):>7} "
+              f"{str(page.get('ttft_seconds', '-')):>7} {str(page.get('tokens_per_second', '-')):>7} "
+              f"{str(page.get('stop_reason', '-')):>13} {str(failed or ''):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Local stand-in for the Ollama HTTP API
+
+Serves /api/tags, /api/pull and /api/generate (plain JSON or the NDJSON
+token stream) with a configurable per-request latency and a limited
+number of parallel slots, like a real server started with
+OLLAMA_NUM_PARALLEL. Requests beyond the slots wait for a free one.
+The response text is derived from the image digest and prompt, so
+identical requests get identical answers.
+
+Usage:
+    with FakeOllamaServer(latency=0.5, parallel=4) as server:
+        vlm = VLMProcessor(model_name=server.model_name, ollama_host=server.url)
+    
+    python -m start_project.benchmarks.fake_ollama --port 11434 --latency 2 --parallel 4
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+class FakeOllamaServer:
+    """
+    Threaded HTTP server imitating Ollama
+    
+    Counters (requests, connections, max_active) let tests check
+    concurrency and connection reuse.
+    """
+    
+    def __init__(
+        self,
+        model_name: str = "fake-vlm:latest",
+        latency: float = 0.5,
+        parallel: int = 1,
+        tokens: int = 200,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        stall_after: Optional[int] = None,
+        stall_seconds: float = 0.0
+    ):
+        """
+        Initialize fake server
+        
+        Args:
+            model_name: Model reported by /api/tags
+            latency: Seconds of "inference" for a full response of
+                tokens tokens (shorter answers take proportionally less)
+            parallel: Requests served at once (OLLAMA_NUM_PARALLEL)
+            tokens: Tokens (words) per response
+            host: Bind address
+            port: Bind port (0 picks a free port)
+            stall_after: Streamed responses pause after this many tokens
+            stall_seconds: Length of that pause
+        """
+        self.model_name = model_name
+        self.latency = latency
+        self.parallel = parallel
+        self.tokens = tokens
+        self.host = host
+        self.port = port
+        self.stall_after = stall_after
+        self.stall_seconds = stall_seconds
+        
+        self._slots = threading.Semaphore(parallel)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        self.active = 0
+        self.reset_stats()
+    
+    def reset_stats(self):
+        """Clear the counters (requests still being served stay active)"""
+        with self._lock:
+            self.requests = 0
+            self.generate_requests = 0
+            self.tags_requests = 0
+            self.connections = 0
+            self.max_active = self.active
+    
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+    
+    def start(self) -> 'FakeOllamaServer':
+        """Start serving in a background thread"""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Stop the server"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+    
+    def __enter__(self) -> 'FakeOllamaServer':
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+    
+    def _count(self, name: str, delta: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + delta)
+            if name == 'active':
+                self.max_active = max(self.max_active, self.active)
+    
+    def generation_time(self, tokens: int) -> float:
+        """Seconds of simulated inference for an answer of tokens tokens"""
+        return self.latency * tokens / max(self.tokens, 1)
+    
+    def answer(self, body: Dict) -> str:
+        """Deterministic response text for a generate request"""
+        digest = hashlib.md5()
+        digest.update(body.get('prompt', '').encode())
+        for image in body.get('images') or []:
+            digest.update(image.encode() if isinstance(image, str) else image)
+        words = [f"token{i}" for i in range(max(self.tokens - 1, 0))]
+        return ' '.join([f"[{digest.hexdigest()[:12]}]"] + words)
+    
+    def _handler_class(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def setup(self):
+                super().setup()
+                server._count('connections')
+            
+            def handle(self):
+                try:
+                    super().handle()
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client closed the connection (timeout or cancelled stream)
+                    pass
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def _send_json(self, payload: Dict, status: int = 200):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def _read_body(self) -> Dict:
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+            
+            def do_GET(self):
+                server._count('requests')
+                if self.path == "/api/tags":
+                    server._count('tags_requests')
+                    self._send_json({'models': [{'name': server.model_name, 'digest': 'fake0digest'}]})
+                else:
+                    self._send_json({'error': 'not found'}, 404)
+            
+            def do_POST(self):
+                server._count('requests')
+                body = self._read_body()
+                
+                if self.path == "/api/pull":
+                    self._send_json({'status': 'success'})
+                elif self.path == "/api/generate":
+                    server._count('generate_requests')
+                    try:
+                        self._generate(body)
+                    except (BrokenPipeError, ConnectionResetError):
+                        # Client gave up (timeout) before the answer was ready
+                        self.close_connection = True
+                else:
+                    self._send_json({'error': 'not found'}, 404)
+            
+            def _generate(self, body: Dict):
+                if body.get('model') != server.model_name:
+                    self._send_json({'error': f"model '{body.get('model')}' not found"}, 404)
+                    return
+                
+                with server._slots:
+                    server._count('active')
+                    try:
+                        text = server.answer(body)
+                        num_predict = (body.get('options') or {}).get('num_predict')
+                        done_reason = 'stop'
+                        if num_predict and num_predict < len(text.split()):
+                            text = ' '.join(text.split()[:num_predict])
+                            done_reason = 'length'
+                        if body.get('stream', True):
+                            self._stream(text, done_reason)
+                        else:
+                            stalled = server.stall_after is not None and server.stall_after < len(text.split())
+                            time.sleep(server.generation_time(len(text.split()))
+                                       + (server.stall_seconds if stalled else 0))
+                            self._send_json({
+                                'model': server.model_name,
+                                'response': text,
+                                'done': True,
+                                'done_reason': done_reason,
+                                'eval_count': len(text.split()),
+                                'eval_duration': int(server.generation_time(len(text.split())) * 1e9)
+                            })
+                    finally:
+                        server._count('active', -1)
+            
+            def _stream(self, text: str, done_reason: str = 'stop'):
+                """NDJSON token stream over chunked transfer encoding"""
+                words = text.split()
+                delay = server.latency / max(server.tokens, 1)
+                
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                
+                def chunk(payload: Dict):
+                    data = json.dumps(payload).encode() + b"\n"
+                    self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                    self.wfile.flush()
+                
+                for i, word in enumerate(words):
+                    time.sleep(delay)
+                    if i == server.stall_after:
+                        time.sleep(server.stall_seconds)
+                    chunk({
+                        'model': server.model_name,
+                        'response': word if i == 0 else f" {word}",
+                        'done': False
+                    })
+                chunk({
+                    'model': server.model_name,
+                    'response': '',
+                    'done': True,
+                    'done_reason': done_reason,
+                    'eval_count': len(words),
+                    'eval_duration': int(server.generation_time(len(words)) * 1e9)
+                })
+                self.wfile.write(b"0\r\n\r\n")
+        
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--model', default='fake-vlm:latest')
+    parser.add_argument('--latency', type=float, default=2.0)
+    parser.add_argument('--parallel', type=int, default=1)
+    parser.add_argument('--tokens', type=int, default=200)
+    args = parser.parse_args()
+    
+    server = FakeOllamaServer(
+        model_name=args.model,
+        latency=args.latency,
+        parallel=args.parallel,
+        tokens=args.tokens,
+        host=args.host,
+        port=args.port
+    ).start()
+    print(f"Fake Ollama serving '{args.model}' at {server.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
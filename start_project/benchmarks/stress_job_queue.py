@@ -0,0 +1,199 @@
+"""
+Multi-process stress test for the DatabaseManager job queue
+
+Worker processes share one database file and pull files with
+claim_jobs(). Workers randomly fail jobs (retried with backoff), stall
+past their lease without heartbeats (the file is reclaimed and their
+late complete_job() is rejected) or crash with os._exit() while holding
+leases (the supervisor starts a replacement and the leases expire).
+At the end every file must be completed or failed exactly once.
+
+Usage:
+    python -m start_project.benchmarks.stress_job_queue --files 2000 --workers 8
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+
+from ..core.database import DatabaseManager
+
+
+def worker(db_path: str, log_dir: str, worker_id: str, args_dict: dict, seed: int):
+    """Claim and process jobs until the queue is empty"""
+    rng = random.Random(seed)
+    db = DatabaseManager(db_path, inline_blobs=True)
+    log_path = os.path.join(log_dir, f"{worker_id}.log")
+    
+    with open(log_path, 'a', buffering=1) as log:
+        while True:
+            jobs = db.claim_jobs(
+                worker_id,
+                limit=args_dict['batch'],
+                lease_seconds=args_dict['lease'],
+                max_attempts=args_dict['max_attempts']
+            )
+            if not jobs:
+                open_jobs = db.connection().execute(
+                    "SELECT count(*) FROM processed_files WHERE status IN ('pending', 'processing')"
+                ).fetchone()[0]
+                if open_jobs == 0:
+                    break
+                time.sleep(0.02)
+                continue
+            
+            for job in jobs:
+                file_hash = job['file_hash']
+                roll = rng.random()
+                
+                if roll < args_dict['crash_rate']:
+                    # Die holding every lease of this batch
+                    os._exit(3)
+                
+                if roll < args_dict['crash_rate'] + args_dict['stall_rate']:
+                    # No heartbeat: the lease runs out while "working"
+                    time.sleep(args_dict['lease'] * 1.5)
+                    if not db.complete_job(file_hash, worker_id):
+                        log.write(f"lost {file_hash}\n")
+                        continue
+                    log.write(f"done {file_hash}\n")
+                    continue
+                
+                with db.hold_lease(file_hash, worker_id, args_dict['lease']) as lost:
+                    time.sleep(rng.uniform(0, args_dict['work_ms'] / 1000))
+                
+                if lost.is_set():
+                    log.write(f"lost {file_hash}\n")
+                elif rng.random() < args_dict['fail_rate']:
+                    db.fail_job(
+                        file_hash, worker_id, "simulated failure",
+                        max_attempts=args_dict['max_attempts'],
+                        backoff_base=0.05, backoff_max=0.5
+                    )
+                    log.write(f"fail {file_hash}\n")
+                elif db.complete_job(file_hash, worker_id):
+                    log.write(f"done {file_hash}\n")
+                else:
+                    log.write(f"lost {file_hash}\n")
+    
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--batch', type=int, default=4)
+    parser.add_argument('--lease', type=float, default=0.5, help='Lease seconds')
+    parser.add_argument('--work-ms', type=float, default=10)
+    parser.add_argument('--fail-rate', type=float, default=0.05)
+    parser.add_argument('--stall-rate', type=float, default=0.002)
+    parser.add_argument('--crash-rate', type=float, default=0.002)
+    parser.add_argument('--max-attempts', type=int, default=3)
+    args = parser.parse_args()
+    args_dict = {
+        'batch': args.batch, 'lease': args.lease, 'work_ms': args.work_ms,
+        'fail_rate': args.fail_rate, 'stall_rate': args.stall_rate,
+        'crash_rate': args.crash_rate, 'max_attempts': args.max_attempts
+    }
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'queue.db')
+        log_dir = os.path.join(tmp, 'logs')
+        os.makedirs(log_dir)
+        sample = os.path.join(tmp, 'sample.txt')
+        with open(sample, 'wb') as f:
+            f.write(b"x")
+        
+        db = DatabaseManager(db_path, inline_blobs=True)
+        with db.transaction():
+            for i in range(args.files):
+                db.insert_file(f"hash_{i:06d}", sample, "sample.txt", ".txt", 1, file_blob=b"x")
+        db.close()
+        
+        # Supervisor: keep `workers` processes alive until the queue drains
+        start = time.perf_counter()
+        seq = 0
+        crashes = 0
+        running = []
+        while True:
+            alive = []
+            for proc in running:
+                if proc.is_alive():
+                    alive.append(proc)
+                elif proc.exitcode != 0:
+                    crashes += 1
+            running = alive
+            
+            db = DatabaseManager(db_path, inline_blobs=True)
+            open_jobs = db.connection().execute(
+                "SELECT count(*) FROM processed_files WHERE status IN ('pending', 'processing')"
+            ).fetchone()[0]
+            db.close()
+            if open_jobs == 0 and not running:
+                break
+            
+            while open_jobs and len(running) < args.workers:
+                seq += 1
+                proc = multiprocessing.Process(
+                    target=worker,
+                    args=(db_path, log_dir, f"w{seq:03d}", args_dict, seq)
+                )
+                proc.start()
+                running.append(proc)
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - start
+        
+        events = Counter()
+        completions = Counter()
+        for name in os.listdir(log_dir):
+            with open(os.path.join(log_dir, name)) as f:
+                for line in f:
+                    event, file_hash = line.split()
+                    events[event] += 1
+                    if event == 'done':
+                        completions[file_hash] += 1
+        
+        db = DatabaseManager(db_path, inline_blobs=True)
+        conn = db.connection()
+        status_counts = dict(conn.execute(
+            "SELECT status, count(*) FROM processed_files GROUP BY status"
+        ).fetchall())
+        retried = conn.execute(
+            "SELECT count(*) FROM processed_files WHERE attempts > 1"
+        ).fetchone()[0]
+        completed_hashes = {row[0] for row in conn.execute(
+            "SELECT file_hash FROM processed_files WHERE status = 'completed'"
+        )}
+        db.close()
+    
+    duplicates = sum(1 for n in completions.values() if n > 1)
+    mismatched = len(completed_hashes ^ set(completions))
+    
+    print(f"{'=' * 60}")
+    print(f"Job queue stress test ({args.files:,} files, {args.workers} processes)")
+    print(f"{'=' * 60}")
+    print(f"Elapsed:                 {elapsed:.2f}s ({args.files / elapsed:,.0f} files/sec)")
+    print(f"Worker processes used:   {seq} ({crashes} crashed)")
+    print(f"Final status:            {status_counts}")
+    print(f"Files retried/reclaimed: {retried}")
+    print(f"Events:                  {dict(events)}")
+    print(f"Duplicate completions:   {duplicates}")
+    print(f"Completed rows without a logged completion (or vice versa): {mismatched}")
+    
+    ok = (
+        duplicates == 0
+        and mismatched == 0
+        and sum(status_counts.values()) == args.files
+        and set(status_counts) <= {'completed', 'failed'}
+    )
+    print("PASS" if ok else "FAIL")
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
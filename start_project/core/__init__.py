@@ -4,10 +4,18 @@ Core module for document processing
 
 from .document_processor import DocumentProcessor
 from .database import DatabaseManager
+from .blob_store import BlobStore, FileSystemBlobStore
+from .pipeline import Pipeline, Stage
+from .ingestion import IngestionPipeline
 
 __all__ = [
     'DocumentProcessor',
-    'DatabaseManager'
+    'DatabaseManager',
+    'BlobStore',
+    'FileSystemBlobStore',
+    'Pipeline',
+    'Stage',
+    'IngestionPipeline'
 ]
 
 __version__ = '1.0.0'
\ No newline at end of file
@@ -0,0 +1,315 @@
+"""
+Content-addressed blob stores for original file content
+Keeps large binaries out of the SQLite database
+"""
+
+import os
+import mmap
+import hashlib
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Iterable, Optional, Tuple
+
+
+class BlobStore(ABC):
+    """
+    Abstract content-addressed blob store
+    
+    Blobs are keyed by the file hash already used as primary key in
+    processed_files. The database only keeps the reference returned by
+    put_file() / put_bytes().
+    """
+    
+    @abstractmethod
+    def put_file(self, file_hash: str, src_path: str) -> str:
+        """
+        Store a file's content without loading it into memory
+        
+        Args:
+            file_hash: Hash of the file content
+            src_path: Path to the source file
+        
+        Returns:
+            str: Blob reference to record in the database
+        """
+        pass
+    
+    @abstractmethod
+    def put_bytes(self, file_hash: str, data: bytes) -> str:
+        """
+        Store in-memory content
+        
+        Args:
+            file_hash: Hash of the content
+            data: Binary content (any bytes-like object)
+        
+        Returns:
+            str: Blob reference to record in the database
+        """
+        pass
+    
+    @abstractmethod
+    def open(self, file_hash: str) -> BinaryIO:
+        """
+        Open a stored blob for reading
+        
+        Args:
+            file_hash: Hash of the blob
+        
+        Returns:
+            file object: Binary stream (caller closes)
+        """
+        pass
+    
+    @abstractmethod
+    def exists(self, file_hash: str) -> bool:
+        """Check whether a blob is stored"""
+        pass
+    
+    @abstractmethod
+    def delete(self, file_hash: str) -> bool:
+        """
+        Delete a stored blob
+        
+        Returns:
+            bool: True if a blob was removed
+        """
+        pass
+    
+    def put_chunks(self, file_hash: str, chunks: Iterable[bytes]) -> str:
+        """
+        Store content arriving in pieces without holding it in memory
+        
+        The default implementation spools the pieces to a temporary file
+        and calls put_file(); file-backed stores write them directly.
+        
+        Args:
+            file_hash: Hash of the content
+            chunks: Consecutive pieces of the content
+        
+        Returns:
+            str: Blob reference to record in the database
+        """
+        with tempfile.NamedTemporaryFile(suffix='.tmp') as spool:
+            for chunk in chunks:
+                spool.write(chunk)
+            spool.flush()
+            return self.put_file(file_hash, spool.name)
+    
+    def put_file_hashed(
+        self,
+        src_path: str,
+        algorithm: str = 'md5'
+    ) -> Tuple[str, str, bool]:
+        """
+        Hash a file and store it when the hash is not yet known
+        
+        The default implementation reads the file twice (hash, then copy);
+        stores that can write before knowing the key override it with a
+        single pass.
+        
+        Args:
+            src_path: Path to the source file
+            algorithm: hashlib algorithm name
+        
+        Returns:
+            tuple: (file_hash, blob reference, True if the blob was created)
+        """
+        hasher = hashlib.new(algorithm)
+        with open(src_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(chunk)
+        
+        file_hash = hasher.hexdigest()
+        created = not self.exists(file_hash)
+        return file_hash, self.put_file(file_hash, src_path), created
+    
+    def get_path(self, file_hash: str) -> Optional[str]:
+        """
+        Get a local filesystem path for the blob
+        
+        Returns:
+            str or None: Path, or None if the store is not file-backed
+        """
+        return None
+    
+    def get_bytes(self, file_hash: str) -> Optional[bytes]:
+        """
+        Read a whole blob into memory
+        
+        Returns:
+            bytes or None: Blob content
+        """
+        if not self.exists(file_hash):
+            return None
+        
+        with self.open(file_hash) as f:
+            return f.read()
+    
+    def get_mmap(self, file_hash: str) -> Optional[mmap.mmap]:
+        """
+        Memory-map a blob read-only
+        
+        Pages are loaded lazily by the OS, so large files cost no heap
+        memory. The caller must close() the returned map.
+        
+        Returns:
+            mmap.mmap or None: Read-only view, None if unavailable
+        """
+        path = self.get_path(file_hash)
+        if not path or not os.path.exists(path) or os.path.getsize(path) == 0:
+            return None
+        
+        with open(path, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class FileSystemBlobStore(BlobStore):
+    """
+    Sharded on-disk blob store
+    
+    Layout: <root>/ab/cd/abcd1234... (first two byte pairs of the hash
+    as directories), which keeps every directory small even for millions
+    of files. Writes go to a temporary file and are renamed into place,
+    so readers never see partial blobs.
+    """
+    
+    def __init__(
+        self,
+        root_dir: str,
+        shard_levels: int = 2,
+        shard_width: int = 2,
+        buffer_size: int = 1024 * 1024
+    ):
+        """
+        Initialize filesystem blob store
+        
+        Args:
+            root_dir: Directory holding all blobs
+            shard_levels: Number of nested shard directories
+            shard_width: Hash characters per shard directory
+            buffer_size: Copy buffer size in bytes
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.shard_levels = shard_levels
+        self.shard_width = shard_width
+        self.buffer_size = buffer_size
+        
+        os.makedirs(self.root_dir, exist_ok=True)
+    
+    def ref(self, file_hash: str) -> str:
+        """
+        Get the relative reference of a blob (e.g. 'ab/cd/abcd...')
+        
+        Args:
+            file_hash: Hash of the blob
+        
+        Returns:
+            str: Root-relative, '/'-separated reference
+        """
+        if not file_hash or any(sep in file_hash for sep in ('/', '\\', '.')):
+            raise ValueError(f"Invalid file hash: {file_hash!r}")
+        
+        width = self.shard_width
+        shards = [
+            file_hash[i * width:(i + 1) * width]
+            for i in range(self.shard_levels)
+        ]
+        return '/'.join(shards + [file_hash])
+    
+    def get_path(self, file_hash: str) -> Optional[str]:
+        return os.path.join(self.root_dir, *self.ref(file_hash).split('/'))
+    
+    def exists(self, file_hash: str) -> bool:
+        return os.path.exists(self.get_path(file_hash))
+    
+    def put_file(self, file_hash: str, src_path: str) -> str:
+        if self.exists(file_hash):
+            return self.ref(file_hash)
+        
+        with open(src_path, 'rb') as src:
+            self._write_atomic(
+                file_hash,
+                lambda dst: shutil.copyfileobj(src, dst, self.buffer_size)
+            )
+        return self.ref(file_hash)
+    
+    def put_bytes(self, file_hash: str, data: bytes) -> str:
+        if self.exists(file_hash):
+            return self.ref(file_hash)
+        
+        self._write_atomic(file_hash, lambda dst: dst.write(data))
+        return self.ref(file_hash)
+    
+    def put_chunks(self, file_hash: str, chunks: Iterable[bytes]) -> str:
+        if self.exists(file_hash):
+            return self.ref(file_hash)
+        
+        def write(dst):
+            for chunk in chunks:
+                dst.write(chunk)
+        
+        self._write_atomic(file_hash, write)
+        return self.ref(file_hash)
+    
+    def put_file_hashed(
+        self,
+        src_path: str,
+        algorithm: str = 'md5'
+    ) -> Tuple[str, str, bool]:
+        # Copy into <root>/tmp while hashing, then rename to the hash path
+        hasher = hashlib.new(algorithm)
+        temp_dir = os.path.join(self.root_dir, 'tmp')
+        os.makedirs(temp_dir, exist_ok=True)
+        
+        fd, temp_path = tempfile.mkstemp(dir=temp_dir, suffix='.tmp')
+        try:
+            with open(src_path, 'rb') as src, os.fdopen(fd, 'wb') as dst:
+                for chunk in iter(lambda: src.read(self.buffer_size), b""):
+                    hasher.update(chunk)
+                    dst.write(chunk)
+            
+            file_hash = hasher.hexdigest()
+            path = self.get_path(file_hash)
+            if os.path.exists(path):
+                os.remove(temp_path)
+                return file_hash, self.ref(file_hash), False
+            
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(temp_path, path)
+            return file_hash, self.ref(file_hash), True
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    def open(self, file_hash: str) -> BinaryIO:
+        return open(self.get_path(file_hash), 'rb')
+    
+    def delete(self, file_hash: str) -> bool:
+        path = self.get_path(file_hash)
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+    
+    def _write_atomic(self, file_hash: str, write):
+        """Write via a temp file in the target directory, then rename"""
+        path = self.get_path(file_hash)
+        target_dir = os.path.dirname(path)
+        os.makedirs(target_dir, exist_ok=True)
+        
+        fd, temp_path = tempfile.mkstemp(dir=target_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as dst:
+                write(dst)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    def __repr__(self) -> str:
+        return f"<FileSystemBlobStore(root_dir='{self.root_dir}')>"
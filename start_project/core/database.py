@@ -3,116 +3,572 @@ Database manager for storing file metadata and blobs
 """
 
 import sqlite3
+import hashlib
 import json
-from typing import Dict, List, Optional, Tuple
+import re
+import threading
+from contextlib import contextmanager
+from itertools import islice
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
+import mmap
 import os
+import time
+
+from .blob_store import BlobStore, FileSystemBlobStore
+
+# Incremental blob I/O needs Python 3.11+
+BLOBOPEN_AVAILABLE = hasattr(sqlite3.Connection, 'blobopen')
+
+# Query terms for full-text search (word characters, including kana/kanji)
+_FTS_TERM = re.compile(r'\w+')
+
+# UPDATE ... RETURNING needs SQLite 3.35+
+RETURNING_AVAILABLE = sqlite3.sqlite_version_info >= (3, 35, 0)
 
 
 class DatabaseManager:
     """
     Manages SQLite database operations for document storage and metadata
+    
+    Connections are pooled per thread: every thread reuses one long-lived,
+    pragma-configured connection instead of reconnecting for each statement.
+    Group many writes into a single commit with transaction().
+    
+    File content is kept in a content-addressed BlobStore (a sharded
+    directory next to the database by default); processed_files only
+    stores the reference in blob_ref. With inline_blobs=True the content
+    goes to the file_contents table and is streamed in and out with
+    incremental blob I/O.
     """
     
-    def __init__(self, db_path: str = "document_metadata.db"):
+    JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+    SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+    FTS_TOKENIZERS = ('trigram', 'unicode61')
+    
+    # FTS5 table -> (indexed table, rowid column, text column)
+    FTS_TABLES = {
+        'chunks_fts': ('content_chunks', 'rowid', 'chunk_text'),
+        'extracted_fts': ('extracted_content', 'id', 'content_text')
+    }
+    
+    # Rows an OR query may rank: bm25() runs for every matching row, so the
+    # trigrams of common words (in most rows, idf near 0) are dropped once
+    # the postings of the rarer ones exceed this
+    FTS_RANK_BUDGET = 5000
+    
+    # Batches smaller than this skip the FTS staging table: for a single
+    # row the temp table round trip costs more than the segment it saves
+    FTS_STAGING_MIN_ROWS = 2
+    
+    # Columns written by the extracted content bulk inserts
+    EXTRACTED_CONTENT_COLUMNS = (
+        'file_hash', 'content_type', 'content_text', 'content_json',
+        'extractor_name', 'extractor_version'
+    )
+    
+    def __init__(
+        self,
+        db_path: str = "document_metadata.db",
+        journal_mode: str = "WAL",
+        synchronous: str = "NORMAL",
+        cache_size: int = -64000,
+        mmap_size: int = 256 * 1024 * 1024,
+        busy_timeout: float = 30.0,
+        blob_store: Optional[BlobStore] = None,
+        inline_blobs: bool = False,
+        blob_chunk_size: int = 1024 * 1024,
+        fts_tokenizer: str = "trigram"
+    ):
         """
         Initialize database manager
         
         Args:
             db_path: Path to SQLite database file
+            journal_mode: SQLite journal mode ('WAL', 'DELETE', ...)
+            synchronous: SQLite synchronous level ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+            cache_size: Page cache size (negative = KiB, positive = pages)
+            mmap_size: Bytes of the database file to memory-map (0 disables)
+            busy_timeout: Seconds to wait on a locked database before failing
+            blob_store: Store for file content (default: FileSystemBlobStore
+                in '<db name>_blobs' next to the database)
+            inline_blobs: Keep file content in the file_blob column instead
+                of a blob store (legacy layout)
+            blob_chunk_size: Bytes per read/write when streaming blobs
+            fts_tokenizer: Tokenizer of new full-text indexes: 'trigram'
+                (substring matching, works for Japanese) or 'unicode61'
+                (space-separated words)
         """
+        journal_mode = journal_mode.upper()
+        synchronous = synchronous.upper()
+        if journal_mode not in self.JOURNAL_MODES:
+            raise ValueError(f"Unsupported journal_mode: {journal_mode}")
+        if synchronous not in self.SYNCHRONOUS_MODES:
+            raise ValueError(f"Unsupported synchronous mode: {synchronous}")
+        if fts_tokenizer not in self.FTS_TOKENIZERS:
+            raise ValueError(f"Unsupported fts_tokenizer: {fts_tokenizer}")
+        
         self.db_path = db_path
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size = int(cache_size)
+        self.mmap_size = int(mmap_size)
+        self.busy_timeout = busy_timeout
+        self.blob_chunk_size = blob_chunk_size
+        self.fts_tokenizer = fts_tokenizer
+        self.fts_available = False
+        self._fts_trigram: Dict[str, bool] = {}
+        
+        if inline_blobs:
+            self.blob_store = None
+        elif blob_store is not None:
+            self.blob_store = blob_store
+        else:
+            blob_dir = os.path.splitext(os.path.abspath(db_path))[0] + "_blobs"
+            self.blob_store = FileSystemBlobStore(blob_dir)
+        
+        # Thread-local connection pool
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._pid = os.getpid()
+        
+        # Called with the file hash after its chunks were deleted
+        self._delete_listeners: List[Callable[[str], None]] = []
+        
         self.init_database()
     
     def init_database(self):
         """Initialize database tables and indexes"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Table for storing processed files with blobs
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS processed_files (
-                file_hash TEXT PRIMARY KEY,
-                file_path TEXT NOT NULL,
-                file_name TEXT NOT NULL,
-                file_extension TEXT NOT NULL,
-                file_size INTEGER NOT NULL,
-                file_blob BLOB NOT NULL,
-                processed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_modified TIMESTAMP,
-                model_used TEXT,
-                extractor_used TEXT,
-                use_unstructured BOOLEAN,
-                use_docling BOOLEAN,
-                status TEXT DEFAULT 'pending',
-                chunk_count INTEGER DEFAULT 0,
-                error_message TEXT,
-                metadata_json TEXT
-            )
-        ''')
-        
-        # Table for storing extracted content
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS extracted_content (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                file_hash TEXT NOT NULL,
-                content_type TEXT NOT NULL,
-                content_text TEXT,
-                content_json TEXT,
-                extraction_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                extractor_name TEXT,
-                extractor_version TEXT,
-                FOREIGN KEY (file_hash) REFERENCES processed_files(file_hash)
-            )
-        ''')
-        
-        # Table for storing chunks
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS content_chunks (
-                chunk_id TEXT PRIMARY KEY,
-                file_hash TEXT NOT NULL,
-                chunk_index INTEGER NOT NULL,
-                chunk_text TEXT NOT NULL,
-                chunk_size INTEGER NOT NULL,
-                chunk_metadata TEXT,
-                embedding_vector BLOB,
-                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (file_hash) REFERENCES processed_files(file_hash)
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            
+            # Table for storing processed files with blobs
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS processed_files (
+                    file_hash TEXT PRIMARY KEY,
+                    file_path TEXT NOT NULL,
+                    file_name TEXT NOT NULL,
+                    file_extension TEXT NOT NULL,
+                    file_size INTEGER NOT NULL,
+                    file_blob BLOB NOT NULL,
+                    blob_ref TEXT,
+                    processed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_modified TIMESTAMP,
+                    model_used TEXT,
+                    extractor_used TEXT,
+                    use_unstructured BOOLEAN,
+                    use_docling BOOLEAN,
+                    status TEXT DEFAULT 'pending',
+                    chunk_count INTEGER DEFAULT 0,
+                    error_message TEXT,
+                    metadata_json TEXT,
+                    worker_id TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL DEFAULT 0
+                )
+            ''')
+            
+            # Older databases lack the blob store and job queue columns
+            columns = {
+                row[1] for row in cursor.execute('PRAGMA table_info(processed_files)')
+            }
+            added_columns = {
+                'blob_ref': 'TEXT',
+                'worker_id': 'TEXT',
+                'lease_expires': 'REAL',
+                'attempts': 'INTEGER NOT NULL DEFAULT 0',
+                'next_attempt_at': 'REAL NOT NULL DEFAULT 0'
+            }
+            for column, definition in added_columns.items():
+                if column not in columns:
+                    cursor.execute(f'ALTER TABLE processed_files ADD COLUMN {column} {definition}')
+            
+            # Inline file content (inline_blobs=True). content must stay the
+            # last column: only a trailing zeroblob() is reserved without
+            # being materialized in memory, which streaming writes rely on.
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS file_contents (
+                    file_hash TEXT PRIMARY KEY,
+                    content BLOB NOT NULL,
+                    FOREIGN KEY (file_hash) REFERENCES processed_files(file_hash)
+                )
+            ''')
+            
+            # Stat signature of every stored path, so unchanged files can be
+            # skipped on re-scans without reading them
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS file_manifest (
+                    file_path TEXT PRIMARY KEY,
+                    file_size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    inode INTEGER NOT NULL,
+                    file_hash TEXT NOT NULL,
+                    checked_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Table for storing extracted content
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS extracted_content (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_hash TEXT NOT NULL,
+                    content_type TEXT NOT NULL,
+                    content_text TEXT,
+                    content_json TEXT,
+                    extraction_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    extractor_name TEXT,
+                    extractor_version TEXT,
+                    page_number INTEGER,
+                    config_fingerprint TEXT,
+                    FOREIGN KEY (file_hash) REFERENCES processed_files(file_hash)
+                )
+            ''')
+            
+            # Page checkpoints of iter_pages_checkpointed() are rows with
+            # content_type 'page'; older databases lack their columns
+            columns = {
+                row[1] for row in cursor.execute('PRAGMA table_info(extracted_content)')
+            }
+            for column in ('page_number INTEGER', 'config_fingerprint TEXT'):
+                if column.split()[0] not in columns:
+                    cursor.execute(f'ALTER TABLE extracted_content ADD COLUMN {column}')
+            
+            # Table for storing chunks
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS content_chunks (
+                    chunk_id TEXT PRIMARY KEY,
+                    file_hash TEXT NOT NULL,
+                    chunk_index INTEGER NOT NULL,
+                    chunk_text TEXT NOT NULL,
+                    chunk_size INTEGER NOT NULL,
+                    chunk_metadata TEXT,
+                    embedding_vector BLOB,
+                    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    text_hash TEXT,
+                    embedding_model TEXT,
+                    embedding_dim INTEGER,
+                    embedding_dtype TEXT,
+                    embedding_scale REAL,
+                    FOREIGN KEY (file_hash) REFERENCES processed_files(file_hash)
+                )
+            ''')
+            
+            # Embedding layout (see processors.embedding_generator) and the
+            # text hash used to reuse vectors of identical chunk texts
+            columns = {
+                row[1] for row in cursor.execute('PRAGMA table_info(content_chunks)')
+            }
+            added_columns = {
+                'text_hash': 'TEXT',
+                'embedding_model': 'TEXT',
+                'embedding_dim': 'INTEGER',
+                'embedding_dtype': 'TEXT',
+                'embedding_scale': 'REAL'
+            }
+            for column, definition in added_columns.items():
+                if column not in columns:
+                    cursor.execute(f'ALTER TABLE content_chunks ADD COLUMN {column} {definition}')
+            
+            # Complete standardized extractor output per file content and
+            # extractor configuration, so re-runs skip the extractor (kept
+            # by delete_file(); see invalidate_cached_extractions())
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS extraction_cache (
+                    file_hash TEXT NOT NULL,
+                    extractor_name TEXT NOT NULL,
+                    extractor_version TEXT NOT NULL,
+                    config_fingerprint TEXT NOT NULL,
+                    result_json TEXT NOT NULL,
+                    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (file_hash, extractor_name, extractor_version, config_fingerprint)
+                )
+            ''')
+            
+            # VLM answers keyed by model, prompt, image and options, so
+            # re-runs do not send identical requests to the model again
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS vlm_responses (
+                    cache_key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    model_digest TEXT,
+                    prompt_hash TEXT NOT NULL,
+                    image_hash TEXT NOT NULL,
+                    options_json TEXT,
+                    response TEXT NOT NULL,
+                    tokens INTEGER DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL,
+                    hits INTEGER DEFAULT 0
+                )
+            ''')
+            
+            # Create indexes for faster lookups
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_file_path 
+                ON processed_files(file_path)
+            ''')
+            
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_file_hash 
+                ON processed_files(file_hash)
+            ''')
+            
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_status 
+                ON processed_files(status)
+            ''')
+            
+            # Job queue: claim_jobs() scans by status and due time
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_status_next_attempt
+                ON processed_files(status, next_attempt_at)
+            ''')
+            
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_extracted_file_hash 
+                ON extracted_content(file_hash)
+            ''')
+            
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_extracted_pages
+                ON extracted_content(file_hash, extractor_name, page_number)
+                WHERE content_type = 'page'
+            ''')
+            
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_chunks_file_hash 
+                ON content_chunks(file_hash)
+            ''')
+            
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_chunks_text_hash
+                ON content_chunks(text_hash, embedding_model)
+            ''')
+            
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_manifest_file_hash
+                ON file_manifest(file_hash)
+            ''')
+            
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_vlm_responses_last_used
+                ON vlm_responses(last_used_at)
+            ''')
+    
+        self.fts_available = self._init_fts()
+    
+    def _init_fts(self) -> bool:
+        """
+        Create the FTS5 indexes of chunks and extracted content
+        
+        Each index is an external-content FTS5 table over a view of the
+        indexed table (the text is stored once), kept in sync by
+        insert/delete/update triggers, plus an fts5vocab table used to
+        expand query words shorter than a trigram. Trigram indexes see the
+        text without whitespace, so OCR output that puts spaces between
+        Japanese words ("機 密 区 域") still matches "機密区域". Indexes
+        created for a database that already has rows are filled with
+        'rebuild'.
+        
+        Returns:
+            bool: False if this SQLite build lacks FTS5
+        """
+        try:
+            with self.transaction() as conn:
+                existing = dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table'"))
+                self._fts_trigram = {}
+                for fts, (table, rowid, column) in self.FTS_TABLES.items():
+                    created = fts not in existing
+                    if created:
+                        trigram = self.fts_tokenizer == 'trigram'
+                    else:
+                        trigram = 'trigram' in existing[fts].lower()
+                    self._fts_trigram[fts] = trigram
+                    
+                    conn.execute(f'''
+                        CREATE VIEW IF NOT EXISTS {fts}_source AS
+                        SELECT {rowid} AS source_rowid, {self._fts_text(column, trigram)} AS {column}
+                        FROM {table}
+                    ''')
+                    if created:
+                        tokenizer = 'trigram' if trigram else 'unicode61'
+                        conn.execute(f'''
+                            CREATE VIRTUAL TABLE {fts} USING fts5(
+                                {column},
+                                content='{fts}_source',
+                                content_rowid='source_rowid',
+                                tokenize='{tokenizer}'
+                            )
+                        ''')
+                        conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+                    
+                    conn.execute(f'''
+                        CREATE VIRTUAL TABLE IF NOT EXISTS {fts}_vocab
+                        USING fts5vocab({fts}, 'row')
+                    ''')
+                    new_text = self._fts_text(f'new.{column}', trigram)
+                    old_text = self._fts_text(f'old.{column}', trigram)
+                    conn.execute(f'''
+                        CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN
+                            INSERT INTO {fts}(rowid, {column}) VALUES (new.{rowid}, {new_text});
+                        END
+                    ''')
+                    conn.execute(f'''
+                        CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN
+                            INSERT INTO {fts}({fts}, rowid, {column})
+                            VALUES ('delete', old.{rowid}, {old_text});
+                        END
+                    ''')
+                    conn.execute(f'''
+                        CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {column} ON {table} BEGIN
+                            INSERT INTO {fts}({fts}, rowid, {column})
+                            VALUES ('delete', old.{rowid}, {old_text});
+                            INSERT INTO {fts}(rowid, {column}) VALUES (new.{rowid}, {new_text});
+                        END
+                    ''')
+            return True
+        
+        except sqlite3.OperationalError as e:
+            print(f"Error creating full-text indexes (FTS5 unavailable?): {e}")
+            return False
+    
+    @staticmethod
+    def _fts_text(column: str, trigram: bool) -> str:
+        """SQL expression of the text an FTS index sees"""
+        if not trigram:
+            return column
+        # Space, tab, newline, carriage return, ideographic space
+        for code in (32, 9, 10, 13, 12288):
+            column = f"replace({column}, char({code}), '')"
+        return column
+    
+    def _configure_connection(self, conn: sqlite3.Connection):
+        """Apply journal and performance pragmas to a new connection"""
+        conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA cache_size = {self.cache_size}")
+        conn.execute(f"PRAGMA mmap_size = {self.mmap_size}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        # INSERT OR REPLACE must fire the delete triggers that keep the
+        # full-text indexes in sync
+        conn.execute("PRAGMA recursive_triggers = ON")
+    
+    def get_connection(self) -> sqlite3.Connection:
+        """
+        Get a new, dedicated database connection
+        
+        The caller owns the connection and must close it. Use connection()
+        or transaction() for the pooled connection of the current thread.
+        
+        Returns:
+            sqlite3.Connection: Configured connection
+        """
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout)
+        self._configure_connection(conn)
+        return conn
+    
+    def connection(self) -> sqlite3.Connection:
+        """
+        Get the pooled connection of the current thread
+        
+        The connection runs in autocommit mode (explicit transactions are
+        opened by transaction()) and must not be closed by the caller.
+        
+        Returns:
+            sqlite3.Connection: Thread-local connection
+        """
+        # Connections must never cross a fork; start a fresh pool in children
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._local = threading.local()
+            self._connections = []
+            self._connections_lock = threading.Lock()
+        
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.busy_timeout,
+                isolation_level=None,
+                check_same_thread=False
             )
-        ''')
+            self._configure_connection(conn)
+            self._local.conn = conn
+            self._local.depth = 0
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    @contextmanager
+    def transaction(self, immediate: bool = True) -> Iterator[sqlite3.Connection]:
+        """
+        Group several statements into one atomic commit
         
-        # Create indexes for faster lookups
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_file_path 
-            ON processed_files(file_path)
-        ''')
+        Nested calls become savepoints of the outermost transaction, so the
+        per-row methods can be called inside a caller's transaction and are
+        only committed once the outer block exits.
         
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_file_hash 
-            ON processed_files(file_hash)
-        ''')
+        Args:
+            immediate: Take the write lock up front (BEGIN IMMEDIATE)
+            
+        Yields:
+            sqlite3.Connection: Pooled connection of the current thread
+        
+        Example:
+            with db.transaction():
+                for chunk in chunks:
+                    db.insert_chunk(**chunk)
+        """
+        conn = self.connection()
+        depth = self._local.depth
+        savepoint = f"sp_{depth}"
         
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_status 
-            ON processed_files(status)
-        ''')
+        if depth == 0:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        else:
+            conn.execute(f"SAVEPOINT {savepoint}")
+        self._local.depth = depth + 1
         
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_extracted_file_hash 
-            ON extracted_content(file_hash)
-        ''')
+        try:
+            yield conn
+            # Inside the try: a failed COMMIT (SQLITE_BUSY, disk full) must
+            # not leave the pooled connection in an open transaction
+            if depth == 0:
+                conn.execute("COMMIT")
+            else:
+                conn.execute(f"RELEASE {savepoint}")
+        except BaseException:
+            # SQLite may already have rolled back (e.g. on SQLITE_FULL)
+            if conn.in_transaction:
+                if depth == 0:
+                    conn.execute("ROLLBACK")
+                else:
+                    conn.execute(f"ROLLBACK TO {savepoint}")
+                    conn.execute(f"RELEASE {savepoint}")
+            raise
+        finally:
+            self._local.depth = depth
+    
+    def close(self):
+        """Close all pooled connections"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
         
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_chunks_file_hash 
-            ON content_chunks(file_hash)
-        ''')
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception as e:
+                print(f"Error closing connection: {e}")
         
-        conn.commit()
-        conn.close()
+        self._local = threading.local()
     
-    def get_connection(self) -> sqlite3.Connection:
-        """Get database connection"""
-        return sqlite3.connect(self.db_path)
+    def __enter__(self) -> 'DatabaseManager':
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
     
     def insert_file(
         self,
@@ -121,7 +577,7 @@ class DatabaseManager:
         file_name: str,
         file_extension: str,
         file_size: int,
-        file_blob: bytes,
+        file_blob: Optional[bytes] = None,
         model_used: Optional[str] = None,
         extractor_used: Optional[str] = None,
         use_unstructured: bool = False,
@@ -138,7 +594,9 @@ class DatabaseManager:
             file_name: Name of file
             file_extension: File extension
             file_size: Size in bytes
-            file_blob: Binary file content
+            file_blob: Binary file content. If None, the content is
+                streamed from file_path in blob_chunk_size pieces (into the
+                blob store, or into file_contents via blobopen)
             model_used: VLM model name if used
             extractor_used: Extractor name used
             use_unstructured: Whether unstructured.io was used
@@ -149,32 +607,91 @@ class DatabaseManager:
         Returns:
             bool: True if successful
         """
+        blob_created = False
+        source = None
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
+            # Content goes to the blob store; the row only keeps a reference
+            blob_ref = None
+            if self.blob_store is not None:
+                blob_created = not self.blob_store.exists(file_hash)
+                if file_blob is not None:
+                    blob_ref = self.blob_store.put_bytes(file_hash, file_blob)
+                else:
+                    blob_ref = self.blob_store.put_file(file_hash, file_path)
+            elif file_blob is None:
+                source = open(file_path, 'rb')
+                source_size = os.fstat(source.fileno()).st_size
+                if not BLOBOPEN_AVAILABLE:
+                    file_blob = source.read()
             
-            metadata_json = json.dumps(metadata) if metadata else None
-            last_modified = datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO processed_files 
-                (file_hash, file_path, file_name, file_extension, file_size, 
-                 file_blob, last_modified, model_used, extractor_used, 
-                 use_unstructured, use_docling, status, metadata_json)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                file_hash, file_path, file_name, file_extension, file_size,
-                file_blob, last_modified, model_used, extractor_used,
-                use_unstructured, use_docling, status, metadata_json
-            ))
-            
-            conn.commit()
-            conn.close()
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                
+                metadata_json = json.dumps(metadata) if metadata else None
+                last_modified = datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
+                
+                cursor.execute('''
+                    INSERT OR REPLACE INTO processed_files
+                    (file_hash, file_path, file_name, file_extension, file_size,
+                     file_blob, blob_ref, last_modified, model_used, extractor_used,
+                     use_unstructured, use_docling, status, metadata_json)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    file_hash, file_path, file_name, file_extension, file_size,
+                    b'', blob_ref, last_modified, model_used, extractor_used,
+                    use_unstructured, use_docling, status, metadata_json
+                ))
+                
+                if blob_ref is not None:
+                    cursor.execute('DELETE FROM file_contents WHERE file_hash = ?', (file_hash,))
+                elif file_blob is not None:
+                    cursor.execute('''
+                        INSERT OR REPLACE INTO file_contents (file_hash, content)
+                        VALUES (?, ?)
+                    ''', (file_hash, file_blob))
+                else:
+                    # Reserve the space, then fill it without holding the file in memory
+                    cursor.execute('''
+                        INSERT OR REPLACE INTO file_contents (file_hash, content)
+                        VALUES (?, zeroblob(?))
+                    ''', (file_hash, source_size))
+                    self._write_blob_stream(conn, cursor.lastrowid, source, source_size)
             return True
         
         except Exception as e:
+            if blob_created:
+                self.blob_store.delete(file_hash)
             print(f"Error inserting file: {e}")
             return False
+        
+        finally:
+            if source is not None:
+                source.close()
+    
+    def _write_blob_stream(
+        self,
+        conn: sqlite3.Connection,
+        rowid: int,
+        source: BinaryIO,
+        size: int
+    ):
+        """
+        Copy a file into a reserved file_contents.content in chunks
+        
+        Args:
+            conn: Connection holding the open write transaction
+            rowid: Row whose content was reserved with zeroblob(size)
+            source: Binary stream positioned at the start of the content
+            size: Exact number of bytes to copy
+        """
+        with conn.blobopen('file_contents', 'content', rowid) as blob:
+            remaining = size
+            while remaining > 0:
+                chunk = source.read(min(self.blob_chunk_size, remaining))
+                if not chunk:
+                    raise IOError("File shrank while it was being stored")
+                blob.write(chunk)
+                remaining -= len(chunk)
     
     def get_file_by_hash(self, file_hash: str) -> Optional[Dict]:
         """
@@ -187,19 +704,19 @@ class DatabaseManager:
             dict or None: File record
         """
         try:
-            conn = self.get_connection()
+            conn = self.connection()
             cursor = conn.cursor()
             
             cursor.execute('''
                 SELECT file_hash, file_path, file_name, file_extension, 
                        file_size, processed_date, last_modified, model_used, 
-                       extractor_used, status, chunk_count, metadata_json
+                       extractor_used, status, chunk_count, metadata_json,
+                       blob_ref
                 FROM processed_files
                 WHERE file_hash = ?
             ''', (file_hash,))
             
             result = cursor.fetchone()
-            conn.close()
             
             if result:
                 return {
@@ -214,7 +731,8 @@ class DatabaseManager:
                     'extractor_used': result[8],
                     'status': result[9],
                     'chunk_count': result[10],
-                    'metadata': json.loads(result[11]) if result[11] else None
+                    'metadata': json.loads(result[11]) if result[11] else None,
+                    'blob_ref': result[12]
                 }
             return None
         
@@ -233,218 +751,1397 @@ class DatabaseManager:
             bytes or None: File binary content
         """
         try:
-            conn = self.get_connection()
+            conn = self.connection()
             cursor = conn.cursor()
             
             cursor.execute('''
-                SELECT file_blob FROM processed_files
-                WHERE file_hash = ?
+                SELECT p.blob_ref, p.file_blob, c.content
+                FROM processed_files p
+                LEFT JOIN file_contents c ON c.file_hash = p.file_hash
+                WHERE p.file_hash = ?
             ''', (file_hash,))
             
             result = cursor.fetchone()
-            conn.close()
+            if not result:
+                return None
             
-            return result[0] if result else None
+            blob_ref, file_blob, content = result
+            if blob_ref:
+                return self._require_blob_store().get_bytes(file_hash)
+            # Rows written before file_contents existed keep file_blob
+            return content if content is not None else file_blob
         
         except Exception as e:
             print(f"Error getting blob: {e}")
             return None
     
-    def update_file_status(
+    def iter_file_blob(
         self,
         file_hash: str,
-        status: str,
-        error_message: Optional[str] = None,
-        chunk_count: Optional[int] = None
-    ) -> bool:
+        chunk_size: Optional[int] = None
+    ) -> Iterator[bytes]:
         """
-        Update file processing status
+        Stream file content in chunks without loading it as a whole
+        
+        Inline content is read through an incremental blob handle; content
+        in the blob store is read from its file. Consume the iterator
+        before modifying the same row.
         
         Args:
             file_hash: MD5 hash of file
-            status: New status
-            error_message: Error message if failed
-            chunk_count: Number of chunks created
+            chunk_size: Bytes per chunk (default: blob_chunk_size)
             
-        Returns:
-            bool: True if successful
+        Yields:
+            bytes: Consecutive pieces of the file content
         """
-        try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            if chunk_count is not None:
-                cursor.execute('''
-                    UPDATE processed_files
-                    SET status = ?, error_message = ?, chunk_count = ?
-                    WHERE file_hash = ?
-                ''', (status, error_message, chunk_count, file_hash))
-            else:
-                cursor.execute('''
-                    UPDATE processed_files
-                    SET status = ?, error_message = ?
-                    WHERE file_hash = ?
-                ''', (status, error_message, file_hash))
-            
-            conn.commit()
-            conn.close()
-            return True
+        chunk_size = chunk_size or self.blob_chunk_size
+        conn = self.connection()
+        row = conn.execute('''
+            SELECT p.rowid, p.blob_ref, c.rowid
+            FROM processed_files p
+            LEFT JOIN file_contents c ON c.file_hash = p.file_hash
+            WHERE p.file_hash = ?
+        ''', (file_hash,)).fetchone()
+        if not row:
+            return
         
-        except Exception as e:
-            print(f"Error updating status: {e}")
-            return False
+        file_rowid, blob_ref, content_rowid = row
+        if blob_ref:
+            with self._require_blob_store().open(file_hash) as f:
+                for chunk in iter(lambda: f.read(chunk_size), b""):
+                    yield chunk
+        elif BLOBOPEN_AVAILABLE:
+            if content_rowid is not None:
+                handle = conn.blobopen('file_contents', 'content', content_rowid, readonly=True)
+            else:
+                handle = conn.blobopen('processed_files', 'file_blob', file_rowid, readonly=True)
+            with handle as blob:
+                for chunk in iter(lambda: blob.read(chunk_size), b""):
+                    yield chunk
+        else:
+            file_blob = self.get_file_blob(file_hash) or b""
+            for start in range(0, len(file_blob), chunk_size):
+                yield file_blob[start:start + chunk_size]
     
-    def insert_extracted_content(
-        self,
-        file_hash: str,
-        content_type: str,
-        content_text: Optional[str] = None,
-        content_json: Optional[Dict] = None,
-        extractor_name: Optional[str] = None,
-        extractor_version: Optional[str] = None
-    ) -> bool:
+    def copy_file_blob(self, file_hash: str, dst) -> Optional[int]:
         """
-        Insert extracted content
+        Stream file content into a writable file object or socket
         
         Args:
             file_hash: MD5 hash of file
-            content_type: Type of content (text, table, image, etc.)
-            content_text: Plain text content
-            content_json: Structured content as dict
-            extractor_name: Name of extractor used
-            extractor_version: Version of extractor
+            dst: Object with write() (file, BytesIO, ...) or sendall()
+                (socket)
             
         Returns:
-            bool: True if successful
+            int or None: Bytes written, None on failure
+        
+        Example:
+            with open('restored.pdf', 'wb') as f:
+                db.copy_file_blob('abc123', f)
         """
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            content_json_str = json.dumps(content_json) if content_json else None
-            
-            cursor.execute('''
-                INSERT INTO extracted_content
-                (file_hash, content_type, content_text, content_json, 
-                 extractor_name, extractor_version)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                file_hash, content_type, content_text, content_json_str,
-                extractor_name, extractor_version
-            ))
-            
-            conn.commit()
-            conn.close()
-            return True
+            write = getattr(dst, 'write', None) or dst.sendall
+            written = 0
+            for chunk in self.iter_file_blob(file_hash):
+                write(chunk)
+                written += len(chunk)
+            return written
         
         except Exception as e:
-            print(f"Error inserting extracted content: {e}")
-            return False
+            print(f"Error copying blob: {e}")
+            return None
     
-    def get_extracted_content(self, file_hash: str) -> List[Dict]:
+    def get_file_blob_path(self, file_hash: str) -> Optional[str]:
         """
-        Get all extracted content for a file
+        Get a filesystem path to the stored file content (no copy)
         
         Args:
             file_hash: MD5 hash of file
             
         Returns:
-            list: List of extracted content records
+            str or None: Path inside the blob store, None if the content is
+                stored inline or the store is not file-backed
         """
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT id, content_type, content_text, content_json, 
-                       extraction_date, extractor_name, extractor_version
-                FROM extracted_content
-                WHERE file_hash = ?
-                ORDER BY id
-            ''', (file_hash,))
-            
-            results = cursor.fetchall()
-            conn.close()
-            
-            content_list = []
-            for row in results:
-                content_list.append({
-                    'id': row[0],
-                    'content_type': row[1],
-                    'content_text': row[2],
-                    'content_json': json.loads(row[3]) if row[3] else None,
-                    'extraction_date': row[4],
-                    'extractor_name': row[5],
-                    'extractor_version': row[6]
-                })
+            if self.blob_store is None or not self._has_blob_ref(file_hash):
+                return None
             
-            return content_list
+            path = self.blob_store.get_path(file_hash)
+            return path if path and os.path.exists(path) else None
         
         except Exception as e:
-            print(f"Error getting extracted content: {e}")
-            return []
+            print(f"Error getting blob path: {e}")
+            return None
     
-    def insert_chunk(
-        self,
-        chunk_id: str,
-        file_hash: str,
-        chunk_index: int,
-        chunk_text: str,
-        chunk_metadata: Optional[Dict] = None,
-        embedding_vector: Optional[bytes] = None
-    ) -> bool:
+    def get_file_blob_mmap(self, file_hash: str) -> Optional[mmap.mmap]:
         """
-        Insert content chunk
+        Get a read-only memory-mapped view of the stored file content
         
         Args:
-            chunk_id: Unique chunk identifier
-            file_hash: MD5 hash of source file
-            chunk_index: Index of chunk in sequence
-            chunk_text: Text content of chunk
-            chunk_metadata: Additional metadata as dict
-            embedding_vector: Embedding vector as bytes
+            file_hash: MD5 hash of file
             
         Returns:
-            bool: True if successful
+            mmap.mmap or None: View that the caller must close(), None if
+                the content is stored inline
         """
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            chunk_size = len(chunk_text)
-            metadata_json = json.dumps(chunk_metadata) if chunk_metadata else None
+            if self.blob_store is None or not self._has_blob_ref(file_hash):
+                return None
             
-            cursor.execute('''
-                INSERT OR REPLACE INTO content_chunks
-                (chunk_id, file_hash, chunk_index, chunk_text, chunk_size,
-                 chunk_metadata, embedding_vector)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                chunk_id, file_hash, chunk_index, chunk_text, chunk_size,
-                metadata_json, embedding_vector
-            ))
-            
-            conn.commit()
-            conn.close()
-            return True
+            return self.blob_store.get_mmap(file_hash)
         
         except Exception as e:
-            print(f"Error inserting chunk: {e}")
-            return False
+            print(f"Error mapping blob: {e}")
+            return None
     
-    def get_chunks_by_file(self, file_hash: str) -> List[Dict]:
+    def _has_blob_ref(self, file_hash: str) -> bool:
+        """Check whether a file's content lives in the blob store"""
+        row = self.connection().execute(
+            'SELECT blob_ref FROM processed_files WHERE file_hash = ?',
+            (file_hash,)
+        ).fetchone()
+        return bool(row and row[0])
+    
+    def _require_blob_store(self) -> BlobStore:
+        """Get the blob store or fail for externally stored rows"""
+        if self.blob_store is None:
+            raise RuntimeError(
+                "File content is in an external blob store but DatabaseManager "
+                "was created with inline_blobs=True"
+            )
+        return self.blob_store
+    
+    def migrate_inline_blobs(self, batch_size: int = 50, vacuum: bool = False) -> Dict:
         """
-        Get all chunks for a file
+        Move file content stored in the database into the blob store
+        
+        Each batch is committed separately, so an interrupted migration can
+        simply be re-run.
         
         Args:
-            file_hash: MD5 hash of file
+            batch_size: Files moved per transaction
+            vacuum: Run VACUUM afterwards to give the freed pages back to
+                the filesystem
             
         Returns:
-            list: List of chunk records
+            dict: {
+                'migrated': int,
+                'bytes_moved': int,
+                'failed': list of {'file_hash', 'error'},
+                'vacuumed': bool
+            }
+        """
+        store = self._require_blob_store()
+        migrated = 0
+        bytes_moved = 0
+        failed = []
+        
+        # Only the (small) hash list is loaded up front; length() does not
+        # read the blobs
+        hashes = self.connection().execute('''
+            SELECT p.file_hash, coalesce(
+                (SELECT length(c.content) FROM file_contents c WHERE c.file_hash = p.file_hash),
+                length(p.file_blob)
+            )
+            FROM processed_files p
+            WHERE p.blob_ref IS NULL AND (
+                length(p.file_blob) > 0 OR
+                EXISTS (SELECT 1 FROM file_contents c WHERE c.file_hash = p.file_hash)
+            )
+        ''').fetchall()
+        
+        for start in range(0, len(hashes), batch_size):
+            with self.transaction() as conn:
+                for file_hash, size in hashes[start:start + batch_size]:
+                    try:
+                        # Streamed, so memory stays at one chunk per file
+                        blob_ref = store.put_chunks(file_hash, self.iter_file_blob(file_hash))
+                        conn.execute('''
+                            UPDATE processed_files
+                            SET blob_ref = ?, file_blob = zeroblob(0)
+                            WHERE file_hash = ?
+                        ''', (blob_ref, file_hash))
+                        conn.execute(
+                            'DELETE FROM file_contents WHERE file_hash = ?',
+                            (file_hash,)
+                        )
+                        migrated += 1
+                        bytes_moved += size or 0
+                    except Exception as e:
+                        failed.append({'file_hash': file_hash, 'error': str(e)})
+        
+        if vacuum and migrated:
+            self.connection().execute('VACUUM')
+            # VACUUM may renumber content_chunks rowids
+            self.rebuild_fts()
+        
+        return {
+            'migrated': migrated,
+            'bytes_moved': bytes_moved,
+            'failed': failed,
+            'vacuumed': bool(vacuum and migrated)
+        }
+    
+    def get_manifest(self) -> Dict[str, Tuple[int, int, int, str]]:
+        """
+        Load the stat manifest of all stored files
+        
+        Entries whose file_hash is no longer in processed_files are left
+        out, so a hit always refers to stored content.
+        
+        Returns:
+            dict: {absolute path: (file_size, mtime_ns, inode, file_hash)}
         """
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
+            conn = self.connection()
+            cursor = conn.execute('''
+                SELECT m.file_path, m.file_size, m.mtime_ns, m.inode, m.file_hash
+                FROM file_manifest m
+                JOIN processed_files p ON p.file_hash = m.file_hash
+            ''')
+            return {row[0]: tuple(row[1:]) for row in cursor}
+        
+        except Exception as e:
+            print(f"Error loading manifest: {e}")
+            return {}
+    
+    def get_manifest_entry(self, file_path: str) -> Optional[Dict]:
+        """
+        Get the stat manifest entry of one path
+        
+        Args:
+            file_path: Absolute path of the file
+            
+        Returns:
+            dict or None: {'file_size', 'mtime_ns', 'inode', 'file_hash'}
+        """
+        try:
+            row = self.connection().execute('''
+                SELECT file_size, mtime_ns, inode, file_hash
+                FROM file_manifest WHERE file_path = ?
+            ''', (file_path,)).fetchone()
+            if not row:
+                return None
+            
+            return {
+                'file_size': row[0],
+                'mtime_ns': row[1],
+                'inode': row[2],
+                'file_hash': row[3]
+            }
+        
+        except Exception as e:
+            print(f"Error getting manifest entry: {e}")
+            return None
+    
+    def upsert_manifest_bulk(
+        self,
+        entries: Iterable[Dict],
+        batch_size: int = 1000
+    ) -> List[int]:
+        """
+        Record the stat signature under which files were last hashed
+        
+        Args:
+            entries: Iterable of dicts with file_path (absolute),
+                file_size, mtime_ns, inode and file_hash
+            batch_size: Rows per executemany() call
+            
+        Returns:
+            list: Rows written per batch (empty on failure)
+        """
+        rows = (
+            (e['file_path'], e['file_size'], e['mtime_ns'], e['inode'], e['file_hash'])
+            for e in entries
+        )
+        
+        try:
+            return self._executemany_batched('''
+                INSERT OR REPLACE INTO file_manifest
+                (file_path, file_size, mtime_ns, inode, file_hash)
+                VALUES (?, ?, ?, ?, ?)
+            ''', rows, batch_size)
+        
+        except Exception as e:
+            print(f"Error updating manifest: {e}")
+            return []
+    
+    def update_file_status(
+        self,
+        file_hash: str,
+        status: str,
+        error_message: Optional[str] = None,
+        chunk_count: Optional[int] = None
+    ) -> bool:
+        """
+        Update file processing status
+        
+        Args:
+            file_hash: MD5 hash of file
+            status: New status
+            error_message: Error message if failed
+            chunk_count: Number of chunks created
+            
+        Returns:
+            bool: True if successful
+        """
+        try:
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                
+                if chunk_count is not None:
+                    cursor.execute('''
+                        UPDATE processed_files
+                        SET status = ?, error_message = ?, chunk_count = ?
+                        WHERE file_hash = ?
+                    ''', (status, error_message, chunk_count, file_hash))
+                else:
+                    cursor.execute('''
+                        UPDATE processed_files
+                        SET status = ?, error_message = ?
+                        WHERE file_hash = ?
+                    ''', (status, error_message, file_hash))
+            return True
+        
+        except Exception as e:
+            print(f"Error updating status: {e}")
+            return False
+    
+    def insert_extracted_content(
+        self,
+        file_hash: str,
+        content_type: str,
+        content_text: Optional[str] = None,
+        content_json: Optional[Dict] = None,
+        extractor_name: Optional[str] = None,
+        extractor_version: Optional[str] = None
+    ) -> bool:
+        """
+        Insert extracted content
+        
+        Args:
+            file_hash: MD5 hash of file
+            content_type: Type of content (text, table, image, etc.)
+            content_text: Plain text content
+            content_json: Structured content as dict
+            extractor_name: Name of extractor used
+            extractor_version: Version of extractor
+            
+        Returns:
+            bool: True if successful
+        """
+        counts = self.insert_extracted_content_bulk([{
+            'file_hash': file_hash,
+            'content_type': content_type,
+            'content_text': content_text,
+            'content_json': content_json,
+            'extractor_name': extractor_name,
+            'extractor_version': extractor_version
+        }])
+        return bool(counts)
+    
+    def insert_extracted_content_bulk(
+        self,
+        contents: Iterable[Dict],
+        batch_size: int = 1000
+    ) -> List[int]:
+        """
+        Insert many extracted content rows in a single transaction
+        
+        Rows are consumed lazily and written with executemany() in batches,
+        so a generator is never materialised in full.
+        
+        Args:
+            contents: Iterable of dicts with the insert_extracted_content()
+                keyword arguments (file_hash and content_type required)
+            batch_size: Rows per executemany() call
+        
+        Returns:
+            list: Rows inserted per batch (empty if the insert failed and
+                was rolled back)
+        """
+        try:
+            return self._insert_batched(
+                'extracted_content', self.EXTRACTED_CONTENT_COLUMNS,
+                self._extracted_content_rows(contents), batch_size
+            )
+        
+        except Exception as e:
+            print(f"Error inserting extracted content: {e}")
+            return []
+    
+    def replace_extracted_content(
+        self,
+        file_hash: str,
+        contents: Iterable[Dict],
+        batch_size: int = 1000
+    ) -> List[int]:
+        """
+        Replace the extracted content rows of a file in one transaction
+        
+        The file's earlier rows are deleted before the new ones are
+        written, so extracting a file again does not duplicate its text,
+        tables or images. Page checkpoints (content_type 'page') are kept;
+        clear_page_checkpoints() removes them.
+        
+        Args:
+            file_hash: MD5 hash of file
+            contents: Iterable of dicts as for insert_extracted_content_bulk()
+            batch_size: Rows per executemany() call
+        
+        Returns:
+            list: Rows inserted per batch (empty if the write failed and
+                was rolled back, leaving the earlier rows in place)
+        """
+        try:
+            with self.transaction() as conn:
+                conn.execute(
+                    "DELETE FROM extracted_content WHERE file_hash = ? AND content_type != 'page'",
+                    (file_hash,)
+                )
+                return self._insert_batched(
+                    'extracted_content', self.EXTRACTED_CONTENT_COLUMNS,
+                    self._extracted_content_rows(contents), batch_size
+                )
+        
+        except Exception as e:
+            print(f"Error replacing extracted content: {e}")
+            return []
+    
+    @staticmethod
+    def _extracted_content_rows(contents: Iterable[Dict]) -> Iterator[Tuple]:
+        """Row tuples of EXTRACTED_CONTENT_COLUMNS from content dicts"""
+        for content in contents:
+            content_json = content.get('content_json')
+            yield (
+                content['file_hash'],
+                content['content_type'],
+                content.get('content_text'),
+                json.dumps(content_json) if content_json else None,
+                content.get('extractor_name'),
+                content.get('extractor_version')
+            )
+    
+    def get_extracted_content(self, file_hash: str) -> List[Dict]:
+        """
+        Get all extracted content for a file
+        
+        Args:
+            file_hash: MD5 hash of file
+            
+        Returns:
+            list: List of extracted content records
+        """
+        try:
+            conn = self.connection()
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT id, content_type, content_text, content_json, 
+                       extraction_date, extractor_name, extractor_version,
+                       page_number
+                FROM extracted_content
+                WHERE file_hash = ?
+                ORDER BY id
+            ''', (file_hash,))
+            
+            results = cursor.fetchall()
+            
+            content_list = []
+            for row in results:
+                content_list.append({
+                    'id': row[0],
+                    'content_type': row[1],
+                    'content_text': row[2],
+                    'content_json': json.loads(row[3]) if row[3] else None,
+                    'extraction_date': row[4],
+                    'extractor_name': row[5],
+                    'extractor_version': row[6],
+                    'page_number': row[7]
+                })
+            
+            return content_list
+        
+        except Exception as e:
+            print(f"Error getting extracted content: {e}")
+            return []
+    
+    def put_page_checkpoint(
+        self,
+        file_hash: str,
+        extractor_name: str,
+        extractor_version: str,
+        config_fingerprint: str,
+        page: Dict
+    ) -> bool:
+        """
+        Store one extracted page (BaseExtractor.iter_pages() output)
+        
+        The page is kept in extracted_content with content_type 'page'
+        and replaces an earlier checkpoint of the same page, extractor
+        and configuration.
+        
+        Args:
+            file_hash: MD5 hash of file
+            extractor_name: Name of extractor
+            extractor_version: Version of extractor
+            config_fingerprint: BaseExtractor.config_fingerprint()
+            page: Standardized page result with page_number set
+            
+        Returns:
+            bool: True if successful
+        """
+        try:
+            page_json = json.dumps(page, default=str)
+            with self.transaction() as conn:
+                conn.execute('''
+                    DELETE FROM extracted_content
+                    WHERE file_hash = ? AND content_type = 'page' AND extractor_name = ?
+                      AND page_number = ?
+                      AND (extractor_version != ? OR config_fingerprint = ?)
+                ''', (file_hash, extractor_name, page['page_number'], extractor_version, config_fingerprint))
+                conn.execute('''
+                    INSERT INTO extracted_content
+                    (file_hash, content_type, content_text, content_json,
+                     extractor_name, extractor_version, page_number, config_fingerprint)
+                    VALUES (?, 'page', ?, ?, ?, ?, ?, ?)
+                ''', (
+                    file_hash, page.get('text'), page_json,
+                    extractor_name, extractor_version, page['page_number'], config_fingerprint
+                ))
+            return True
+        
+        except Exception as e:
+            print(f"Error writing page checkpoint: {e}")
+            return False
+    
+    def get_page_checkpoints(
+        self,
+        file_hash: str,
+        extractor_name: str,
+        extractor_version: str,
+        config_fingerprint: str
+    ) -> Dict[int, Dict]:
+        """
+        Get the pages of a file already extracted by put_page_checkpoint()
+        
+        Args:
+            file_hash: MD5 hash of file
+            extractor_name: Name of extractor
+            extractor_version: Version of extractor
+            config_fingerprint: BaseExtractor.config_fingerprint()
+            
+        Returns:
+            dict: page_number -> standardized page result
+        """
+        try:
+            rows = self.connection().execute('''
+                SELECT page_number, content_json FROM extracted_content
+                WHERE file_hash = ? AND content_type = 'page' AND extractor_name = ?
+                  AND extractor_version = ? AND config_fingerprint = ?
+                ORDER BY page_number
+            ''', (file_hash, extractor_name, extractor_version, config_fingerprint)).fetchall()
+            return {page_number: json.loads(page_json) for page_number, page_json in rows}
+        
+        except Exception as e:
+            print(f"Error reading page checkpoints: {e}")
+            return {}
+    
+    def clear_page_checkpoints(
+        self,
+        file_hash: str,
+        extractor_name: Optional[str] = None
+    ) -> int:
+        """
+        Remove the page checkpoints of a file
+        
+        Args:
+            file_hash: MD5 hash of file
+            extractor_name: Only this extractor (default: all extractors)
+            
+        Returns:
+            int: Number of pages removed
+        """
+        try:
+            with self.transaction() as conn:
+                cursor = conn.execute('''
+                    DELETE FROM extracted_content
+                    WHERE file_hash = ? AND content_type = 'page'
+                      AND (? IS NULL OR extractor_name = ?)
+                ''', (file_hash, extractor_name, extractor_name))
+                return cursor.rowcount
+        
+        except Exception as e:
+            print(f"Error clearing page checkpoints: {e}")
+            return 0
+    
+    def get_cached_extraction(
+        self,
+        file_hash: str,
+        extractor_name: str,
+        extractor_version: str,
+        config_fingerprint: str
+    ) -> Optional[Dict]:
+        """
+        Get the stored output of an earlier extraction
+        
+        Args:
+            file_hash: MD5 hash of file
+            extractor_name: Name of extractor
+            extractor_version: Version of extractor
+            config_fingerprint: BaseExtractor.config_fingerprint()
+            
+        Returns:
+            dict or None: Standardized extraction result
+        """
+        try:
+            row = self.connection().execute('''
+                SELECT result_json FROM extraction_cache
+                WHERE file_hash = ? AND extractor_name = ?
+                  AND extractor_version = ? AND config_fingerprint = ?
+            ''', (file_hash, extractor_name, extractor_version, config_fingerprint)).fetchone()
+            return json.loads(row[0]) if row else None
+        
+        except Exception as e:
+            print(f"Error reading extraction cache: {e}")
+            return None
+    
+    def put_cached_extraction(
+        self,
+        file_hash: str,
+        extractor_name: str,
+        extractor_version: str,
+        config_fingerprint: str,
+        result: Dict
+    ) -> bool:
+        """
+        Store the output of an extraction
+        
+        Entries of the same file and extractor from other extractor
+        versions are removed; entries for other configurations are kept.
+        
+        Args:
+            file_hash: MD5 hash of file
+            extractor_name: Name of extractor
+            extractor_version: Version of extractor
+            config_fingerprint: BaseExtractor.config_fingerprint()
+            result: Standardized extraction result
+            
+        Returns:
+            bool: True if successful
+        """
+        try:
+            result_json = json.dumps(result, default=str)
+            with self.transaction() as conn:
+                conn.execute('''
+                    DELETE FROM extraction_cache
+                    WHERE file_hash = ? AND extractor_name = ? AND extractor_version != ?
+                ''', (file_hash, extractor_name, extractor_version))
+                conn.execute('''
+                    INSERT OR REPLACE INTO extraction_cache
+                    (file_hash, extractor_name, extractor_version, config_fingerprint, result_json)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (file_hash, extractor_name, extractor_version, config_fingerprint, result_json))
+            return True
+        
+        except Exception as e:
+            print(f"Error writing extraction cache: {e}")
+            return False
+    
+    def invalidate_cached_extractions(
+        self,
+        file_hash: Optional[str] = None,
+        extractor_name: Optional[str] = None
+    ) -> int:
+        """
+        Remove cached extraction output
+        
+        Args:
+            file_hash: Only this file (default: all files)
+            extractor_name: Only this extractor (default: all extractors)
+            
+        Returns:
+            int: Number of entries removed
+        """
+        try:
+            with self.transaction() as conn:
+                cursor = conn.execute('''
+                    DELETE FROM extraction_cache
+                    WHERE (? IS NULL OR file_hash = ?) AND (? IS NULL OR extractor_name = ?)
+                ''', (file_hash, file_hash, extractor_name, extractor_name))
+                return cursor.rowcount
+        
+        except Exception as e:
+            print(f"Error invalidating extraction cache: {e}")
+            return 0
+    
+    def insert_chunk(
+        self,
+        chunk_id: str,
+        file_hash: str,
+        chunk_index: int,
+        chunk_text: str,
+        chunk_metadata: Optional[Dict] = None,
+        embedding_vector: Optional[bytes] = None
+    ) -> bool:
+        """
+        Insert content chunk
+        
+        Args:
+            chunk_id: Unique chunk identifier
+            file_hash: MD5 hash of source file
+            chunk_index: Index of chunk in sequence
+            chunk_text: Text content of chunk
+            chunk_metadata: Additional metadata as dict
+            embedding_vector: Embedding vector as bytes
+            
+        Returns:
+            bool: True if successful
+        """
+        counts = self.insert_chunks_bulk([{
+            'chunk_id': chunk_id,
+            'file_hash': file_hash,
+            'chunk_index': chunk_index,
+            'chunk_text': chunk_text,
+            'chunk_metadata': chunk_metadata,
+            'embedding_vector': embedding_vector
+        }])
+        return bool(counts)
+    
+    def insert_chunks_bulk(
+        self,
+        chunks: Iterable[Dict],
+        batch_size: int = 1000
+    ) -> List[int]:
+        """
+        Insert many chunks in a single transaction
+        
+        Chunks are consumed lazily and written with executemany() in batches,
+        so a generator is never materialised in full.
+        
+        Args:
+            chunks: Iterable of dicts with the insert_chunk() keyword
+                arguments (chunk_id, file_hash, chunk_index and chunk_text
+                required)
+            batch_size: Rows per executemany() call
+        
+        Returns:
+            list: Rows inserted per batch (empty if the insert failed and
+                was rolled back)
+        
+        Example:
+            counts = db.insert_chunks_bulk(
+                {'chunk_id': f"{file_hash}_{i}", 'file_hash': file_hash,
+                 'chunk_index': i, 'chunk_text': text}
+                for i, text in enumerate(texts)
+            )
+        """
+        def rows():
+            for chunk in chunks:
+                chunk_text = chunk['chunk_text']
+                chunk_metadata = chunk.get('chunk_metadata')
+                yield (
+                    chunk['chunk_id'],
+                    chunk['file_hash'],
+                    chunk['chunk_index'],
+                    chunk_text,
+                    len(chunk_text),
+                    json.dumps(chunk_metadata) if chunk_metadata else None,
+                    chunk.get('embedding_vector'),
+                    self.text_hash(chunk_text)
+                )
+        
+        try:
+            return self._insert_batched('content_chunks', (
+                'chunk_id', 'file_hash', 'chunk_index', 'chunk_text', 'chunk_size',
+                'chunk_metadata', 'embedding_vector', 'text_hash'
+            ), rows(), batch_size, replace=True)
+        
+        except Exception as e:
+            print(f"Error inserting chunks: {e}")
+            return []
+    
+    @staticmethod
+    def text_hash(text: str) -> str:
+        """Hash of a chunk text (content_chunks.text_hash)"""
+        return hashlib.md5(text.encode('utf-8')).hexdigest()
+    
+    def iter_chunks_to_embed(
+        self,
+        embedding_model: str,
+        embedding_dtype: str,
+        file_hash: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> Iterator[List[Dict]]:
+        """
+        Yield batches of chunks without an embedding of this model/dtype
+        
+        Batches are read by rowid, so rows updated between batches are
+        not returned again.
+        
+        Args:
+            embedding_model: Model name
+            embedding_dtype: Stored precision ('float32', 'float16', 'int8')
+            file_hash: Only chunks of this file (default: all files)
+            batch_size: Chunks per batch
+            
+        Yields:
+            list: Dicts with rowid, chunk_id, chunk_text and text_hash
+        """
+        last_rowid = 0
+        while True:
+            rows = self.connection().execute('''
+                SELECT rowid, chunk_id, chunk_text, text_hash
+                FROM content_chunks
+                WHERE rowid > ? AND (? IS NULL OR file_hash = ?)
+                  AND (embedding_vector IS NULL OR embedding_model IS NOT ?
+                       OR embedding_dtype IS NOT ?)
+                ORDER BY rowid
+                LIMIT ?
+            ''', (last_rowid, file_hash, file_hash, embedding_model, embedding_dtype, batch_size)).fetchall()
+            if not rows:
+                return
+            
+            last_rowid = rows[-1][0]
+            yield [
+                {
+                    'rowid': row[0],
+                    'chunk_id': row[1],
+                    'chunk_text': row[2],
+                    'text_hash': row[3] or self.text_hash(row[2])
+                }
+                for row in rows
+            ]
+    
+    def get_embeddings_by_text_hash(
+        self,
+        text_hashes: Iterable[str],
+        embedding_model: str,
+        embedding_dtype: str
+    ) -> Dict[str, Tuple[bytes, int, Optional[float]]]:
+        """
+        Find stored embeddings of identical chunk texts
+        
+        Args:
+            text_hashes: content_chunks.text_hash values
+            embedding_model: Model name
+            embedding_dtype: Stored precision
+            
+        Returns:
+            dict: text_hash -> (embedding bytes, dimension, int8 scale)
+        """
+        found = {}
+        text_hashes = list(dict.fromkeys(text_hashes))
+        try:
+            conn = self.connection()
+            # Stay below SQLite's host parameter limit
+            for start in range(0, len(text_hashes), 500):
+                batch = text_hashes[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                for row in conn.execute(f'''
+                    SELECT text_hash, embedding_vector, embedding_dim, embedding_scale
+                    FROM content_chunks
+                    WHERE text_hash IN ({placeholders})
+                      AND embedding_model = ? AND embedding_dtype = ?
+                      AND embedding_vector IS NOT NULL
+                ''', (*batch, embedding_model, embedding_dtype)):
+                    found.setdefault(row[0], (row[1], row[2], row[3]))
+            return found
+        
+        except Exception as e:
+            print(f"Error reading embeddings: {e}")
+            return {}
+    
+    def update_chunk_embeddings_bulk(
+        self,
+        embeddings: Iterable[Dict],
+        batch_size: int = 1000
+    ) -> List[int]:
+        """
+        Store embeddings of existing chunks in a single transaction
+        
+        Args:
+            embeddings: Dicts with chunk_id, embedding_vector (bytes),
+                embedding_model, embedding_dim, embedding_dtype,
+                embedding_scale (int8 only) and text_hash (optional, filled
+                in for chunks stored before text hashes existed)
+            batch_size: Rows per executemany() call
+            
+        Returns:
+            list: Rows written per batch (empty if the update failed and
+                was rolled back)
+        """
+        def rows():
+            for embedding in embeddings:
+                yield (
+                    embedding['embedding_vector'],
+                    embedding['embedding_model'],
+                    embedding['embedding_dim'],
+                    embedding['embedding_dtype'],
+                    embedding.get('embedding_scale'),
+                    embedding.get('text_hash'),
+                    embedding['chunk_id']
+                )
+        
+        try:
+            return self._executemany_batched('''
+                UPDATE content_chunks
+                SET embedding_vector = ?, embedding_model = ?, embedding_dim = ?,
+                    embedding_dtype = ?, embedding_scale = ?,
+                    text_hash = COALESCE(text_hash, ?)
+                WHERE chunk_id = ?
+            ''', rows(), batch_size)
+        
+        except Exception as e:
+            print(f"Error updating embeddings: {e}")
+            return []
+    
+    def iter_chunk_embeddings(
+        self,
+        embedding_model: Optional[str] = None,
+        file_hash: Optional[str] = None,
+        chunk_ids: Optional[Iterable[str]] = None,
+        include_vectors: bool = True,
+        batch_size: int = 1000
+    ) -> Iterator[List[Dict]]:
+        """
+        Yield batches of chunks that have an embedding
+        
+        Args:
+            embedding_model: Only embeddings of this model (default: any)
+            file_hash: Only chunks of this file (default: all files)
+            chunk_ids: Only these chunks (default: all chunks)
+            include_vectors: Read the embedding bytes (False: ids only)
+            batch_size: Chunks per batch
+            
+        Yields:
+            list: Dicts with chunk_id, file_hash, text_hash,
+                embedding_model, embedding_dim, embedding_dtype,
+                embedding_scale and (with include_vectors) embedding_vector
+        """
+        vector = 'embedding_vector' if include_vectors else 'NULL'
+        select = f'''
+            SELECT rowid, chunk_id, file_hash, text_hash, embedding_model,
+                   embedding_dim, embedding_dtype, embedding_scale, {vector}
+            FROM content_chunks
+            WHERE embedding_vector IS NOT NULL
+              AND (? IS NULL OR embedding_model = ?)
+              AND (? IS NULL OR file_hash = ?)
+        '''
+        filters = (embedding_model, embedding_model, file_hash, file_hash)
+        
+        def batches():
+            conn = self.connection()
+            if chunk_ids is not None:
+                ids = list(chunk_ids)
+                # Stay below SQLite's host parameter limit
+                step = min(batch_size, 500)
+                for start in range(0, len(ids), step):
+                    batch = ids[start:start + step]
+                    placeholders = ','.join('?' * len(batch))
+                    rows = conn.execute(
+                        f"{select} AND chunk_id IN ({placeholders}) ORDER BY rowid",
+                        (*filters, *batch)
+                    ).fetchall()
+                    if rows:
+                        yield rows
+                return
+            
+            last_rowid = 0
+            while True:
+                rows = conn.execute(
+                    f"{select} AND rowid > ? ORDER BY rowid LIMIT ?",
+                    (*filters, last_rowid, batch_size)
+                ).fetchall()
+                if not rows:
+                    return
+                last_rowid = rows[-1][0]
+                yield rows
+        
+        for rows in batches():
+            yield [
+                {
+                    'chunk_id': row[1],
+                    'file_hash': row[2],
+                    'text_hash': row[3],
+                    'embedding_model': row[4],
+                    'embedding_dim': row[5],
+                    'embedding_dtype': row[6] or 'float32',
+                    'embedding_scale': row[7],
+                    'embedding_vector': row[8]
+                }
+                for row in rows
+            ]
+    
+    def search_chunks(
+        self,
+        query: str,
+        k: int = 10,
+        file_hash: Optional[str] = None,
+        match_all: bool = False
+    ) -> List[Dict]:
+        """
+        Keyword search over chunk texts, ranked by BM25
+        
+        With the trigram tokenizer a query matches wherever it occurs as a
+        substring (whitespace ignored), so Japanese text needs no word
+        segmentation. The query is split into trigrams and OR-ed
+        (match_all=False: chunks sharing more and rarer trigrams rank
+        higher), or each word must occur as a substring (match_all=True).
+        Words shorter than three characters are expanded to the indexed
+        trigrams starting with them.
+        
+        Args:
+            query: Search text
+            k: Results to return
+            file_hash: Only chunks of this file
+            match_all: Require every query word
+        
+        Returns:
+            list: Dicts with chunk_id, file_hash, chunk_index, chunk_text,
+                chunk_metadata and score (higher is better), best first
+        """
+        rows = self._fts_search('chunks_fts', query, k, match_all, '''
+            SELECT c.chunk_id, c.file_hash, c.chunk_index, c.chunk_text,
+                   c.chunk_metadata, -f.rank
+            FROM chunks_fts f JOIN content_chunks c ON c.rowid = f.rowid
+            WHERE chunks_fts MATCH ? AND (? IS NULL OR c.file_hash = ?)
+            ORDER BY f.rank
+            LIMIT ?
+        ''', (file_hash, file_hash))
+        return [
+            {
+                'chunk_id': row[0],
+                'file_hash': row[1],
+                'chunk_index': row[2],
+                'chunk_text': row[3],
+                'chunk_metadata': json.loads(row[4]) if row[4] else None,
+                'score': row[5]
+            }
+            for row in rows
+        ]
+    
+    def search_extracted_content(
+        self,
+        query: str,
+        k: int = 10,
+        file_hash: Optional[str] = None,
+        content_type: Optional[str] = None,
+        match_all: bool = False
+    ) -> List[Dict]:
+        """
+        Keyword search over extracted_content, ranked by BM25
+        
+        Args:
+            query: Search text (see search_chunks())
+            k: Results to return
+            file_hash: Only content of this file
+            content_type: Only this content type ('text', 'table', 'page', ...)
+            match_all: Require every query word
+        
+        Returns:
+            list: Dicts with id, file_hash, content_type, content_text,
+                page_number and score (higher is better), best first
+        """
+        rows = self._fts_search('extracted_fts', query, k, match_all, '''
+            SELECT e.id, e.file_hash, e.content_type, e.content_text,
+                   e.page_number, -f.rank
+            FROM extracted_fts f JOIN extracted_content e ON e.id = f.rowid
+            WHERE extracted_fts MATCH ? AND (? IS NULL OR e.file_hash = ?)
+              AND (? IS NULL OR e.content_type = ?)
+            ORDER BY f.rank
+            LIMIT ?
+        ''', (file_hash, file_hash, content_type, content_type))
+        return [
+            {
+                'id': row[0],
+                'file_hash': row[1],
+                'content_type': row[2],
+                'content_text': row[3],
+                'page_number': row[4],
+                'score': row[5]
+            }
+            for row in rows
+        ]
+    
+    def rebuild_fts(self) -> bool:
+        """
+        Rebuild the full-text indexes from their tables
+        
+        Returns:
+            bool: True if successful
+        """
+        if not self.fts_available:
+            return False
+        try:
+            with self.transaction() as conn:
+                for fts in self.FTS_TABLES:
+                    conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+            return True
+        
+        except Exception as e:
+            print(f"Error rebuilding full-text indexes: {e}")
+            return False
+    
+    def _fts_search(
+        self,
+        fts: str,
+        query: str,
+        k: int,
+        match_all: bool,
+        sql: str,
+        filters: Tuple
+    ) -> List[Tuple]:
+        """Run a MATCH query built from free text; [] if nothing can match"""
+        if not self.fts_available:
+            return []
+        try:
+            expression = self._fts_expression(fts, query, match_all)
+            if expression is None:
+                return []
+            return self.connection().execute(sql, (expression, *filters, k)).fetchall()
+        
+        except Exception as e:
+            print(f"Error searching {fts}: {e}")
+            return []
+    
+    def _fts_expression(self, fts: str, query: str, match_all: bool) -> Optional[str]:
+        """
+        Translate free text into an FTS5 MATCH expression
+        
+        Args:
+            fts: FTS5 table
+            query: Search text
+            match_all: AND the words instead of OR-ing them
+        
+        Returns:
+            str: MATCH expression, or None if no row can match
+        """
+        def quote(term: str) -> str:
+            return '"' + term.replace('"', '""') + '"'
+        
+        def expand(word: str) -> Optional[str]:
+            # Trigram indexes cannot match shorter strings directly; use
+            # the most common indexed trigrams that start with the word
+            prefix = word.lower()
+            trigrams = [row[0] for row in self.connection().execute(f'''
+                SELECT term FROM {fts}_vocab
+                WHERE term >= ? AND term < ?
+                ORDER BY doc DESC
+                LIMIT 32
+            ''', (prefix, prefix + '\U0010ffff'))]
+            if not trigrams:
+                return None
+            return '(' + ' OR '.join(quote(trigram) for trigram in trigrams) + ')'
+        
+        words = _FTS_TERM.findall(query)
+        groups = []
+        if not self._fts_trigram.get(fts):
+            groups = [quote(word) for word in words]
+        elif match_all:
+            for word in words:
+                group = quote(word) if len(word) >= 3 else expand(word)
+                if group is None:
+                    return None
+                groups.append(group)
+        else:
+            # The index ignores whitespace, so trigrams may span words
+            text = ''.join(words)
+            if len(text) >= 3:
+                trigrams = self._fts_rarest(fts, [text[i:i + 3].lower() for i in range(len(text) - 2)])
+                groups = [quote(trigram) for trigram in trigrams]
+            elif text:
+                groups = [group for group in (expand(text),) if group]
+        
+        groups = list(dict.fromkeys(groups))
+        if not groups:
+            return None
+        return (' AND ' if match_all else ' OR ').join(groups)
+    
+    def _fts_rarest(self, fts: str, trigrams: List[str]) -> List[str]:
+        """
+        Indexed trigrams of a query, rarest first, within FTS_RANK_BUDGET
+        
+        Args:
+            fts: FTS5 table
+            trigrams: Lowercased query trigrams
+        
+        Returns:
+            list: Trigrams to OR (the rarest one is always kept)
+        """
+        trigrams = list(dict.fromkeys(trigrams))
+        docs = {}
+        for start in range(0, len(trigrams), 500):
+            batch = trigrams[start:start + 500]
+            placeholders = ','.join('?' * len(batch))
+            docs.update(self.connection().execute(
+                f"SELECT term, doc FROM {fts}_vocab WHERE term IN ({placeholders})", batch
+            ).fetchall())
+        
+        kept = []
+        postings = 0
+        for trigram in sorted(docs, key=docs.get):
+            postings += docs[trigram]
+            if kept and postings > self.FTS_RANK_BUDGET:
+                break
+            kept.append(trigram)
+        return kept
+    
+    def delete_chunks(self, file_hash: str) -> int:
+        """
+        Delete all chunks of a file (before re-chunking it)
+        
+        Args:
+            file_hash: MD5 hash of file
+            
+        Returns:
+            int: Number of chunks removed
+        """
+        try:
+            with self.transaction() as conn:
+                cursor = conn.execute('DELETE FROM content_chunks WHERE file_hash = ?', (file_hash,))
+                removed = cursor.rowcount
+            
+            if removed:
+                self._notify_delete(file_hash)
+            return removed
+        
+        except Exception as e:
+            print(f"Error deleting chunks: {e}")
+            return 0
+    
+    def add_delete_listener(self, listener: Callable[[str], None]):
+        """
+        Register a callback for deleted chunks
+        
+        The listener is called with the file hash after delete_chunks() or
+        delete_file() committed, e.g. VectorIndex.remove_file.
+        
+        Args:
+            listener: Callable taking a file hash
+        """
+        if listener not in self._delete_listeners:
+            self._delete_listeners.append(listener)
+    
+    def remove_delete_listener(self, listener: Callable[[str], None]):
+        """Unregister a callback added with add_delete_listener()"""
+        if listener in self._delete_listeners:
+            self._delete_listeners.remove(listener)
+    
+    def _notify_delete(self, file_hash: str):
+        """Call the delete listeners; a failing listener does not undo the delete"""
+        for listener in list(self._delete_listeners):
+            try:
+                listener(file_hash)
+            except Exception as e:
+                print(f"Error in delete listener: {e}")
+    
+    def _insert_batched(
+        self,
+        table: str,
+        columns: Tuple[str, ...],
+        rows: Iterable[Tuple],
+        batch_size: int,
+        replace: bool = False
+    ) -> List[int]:
+        """
+        Insert rows into a table with full-text triggers, batch by batch
+        
+        FTS5 flushes its pending index data at the end of every statement,
+        so executemany() straight into the table writes one index segment
+        per row. Batches of FTS_STAGING_MIN_ROWS rows or more are collected
+        in a temporary staging table instead and moved with one INSERT ...
+        SELECT; smaller ones (single-row inserts) go straight into the
+        table, and the staging table is only created once a batch needs it.
+        
+        Args:
+            table: Target table
+            columns: Columns of each row tuple
+            rows: Iterable of row tuples
+            batch_size: Rows per INSERT ... SELECT
+            replace: INSERT OR REPLACE
+        
+        Returns:
+            list: Rows written per batch
+        """
+        column_list = ', '.join(columns)
+        staging = f"{table}_staging"
+        placeholders = ', '.join('?' * len(columns))
+        insert = f"INSERT {'OR REPLACE ' if replace else ''}INTO main.{table} ({column_list})"
+        staged = False
+        counts = []
+        rows = iter(rows)
+        
+        with self.transaction() as conn:
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                if len(batch) < self.FTS_STAGING_MIN_ROWS:
+                    conn.executemany(f"{insert} VALUES ({placeholders})", batch)
+                    counts.append(len(batch))
+                    continue
+                if not staged:
+                    conn.execute(f'''
+                        CREATE TEMP TABLE IF NOT EXISTS {staging} AS
+                        SELECT {column_list} FROM main.{table} WHERE 0
+                    ''')
+                    conn.execute(f"DELETE FROM temp.{staging}")
+                    staged = True
+                conn.executemany(f"INSERT INTO temp.{staging} ({column_list}) VALUES ({placeholders})", batch)
+                conn.execute(f"{insert} SELECT {column_list} FROM temp.{staging} ORDER BY rowid")
+                conn.execute(f"DELETE FROM temp.{staging}")
+                counts.append(len(batch))
+        
+        return counts
+    
+    def _executemany_batched(
+        self,
+        sql: str,
+        rows: Iterable[Tuple],
+        batch_size: int
+    ) -> List[int]:
+        """
+        Run executemany() over an iterable in fixed-size batches
+        
+        All batches share one transaction: either every row is committed
+        or none is.
+        
+        Args:
+            sql: Parameterised statement
+            rows: Iterable of parameter tuples
+            batch_size: Rows per executemany() call
+        
+        Returns:
+            list: Rows written per batch
+        """
+        counts = []
+        rows = iter(rows)
+        
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                cursor.executemany(sql, batch)
+                counts.append(len(batch))
+        
+        return counts
+    
+    def get_chunks_by_file(self, file_hash: str) -> List[Dict]:
+        """
+        Get all chunks for a file
+        
+        Args:
+            file_hash: MD5 hash of file
+            
+        Returns:
+            list: List of chunk records
+        """
+        try:
+            conn = self.connection()
+            cursor = conn.cursor()
             
             cursor.execute('''
                 SELECT chunk_id, chunk_index, chunk_text, chunk_size,
@@ -455,7 +2152,6 @@ class DatabaseManager:
             ''', (file_hash,))
             
             results = cursor.fetchall()
-            conn.close()
             
             chunks = []
             for row in results:
@@ -474,6 +2170,46 @@ class DatabaseManager:
             print(f"Error getting chunks: {e}")
             return []
     
+    def get_chunks_by_ids(self, chunk_ids: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Get chunks by id, e.g. to materialise search results
+        
+        Args:
+            chunk_ids: Chunk ids
+        
+        Returns:
+            dict: chunk_id -> chunk record (missing ids are left out)
+        """
+        try:
+            conn = self.connection()
+            ids = list(dict.fromkeys(chunk_ids))
+            chunks = {}
+            # Stay below SQLite's host parameter limit
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                for row in conn.execute(f'''
+                    SELECT chunk_id, file_hash, chunk_index, chunk_text,
+                           chunk_size, chunk_metadata, created_date
+                    FROM content_chunks
+                    WHERE chunk_id IN ({placeholders})
+                ''', batch):
+                    chunks[row[0]] = {
+                        'chunk_id': row[0],
+                        'file_hash': row[1],
+                        'chunk_index': row[2],
+                        'chunk_text': row[3],
+                        'chunk_size': row[4],
+                        'chunk_metadata': json.loads(row[5]) if row[5] else None,
+                        'created_date': row[6]
+                    }
+            
+            return chunks
+        
+        except Exception as e:
+            print(f"Error getting chunks: {e}")
+            return {}
+    
     def get_all_files_by_status(self, status: str) -> List[Dict]:
         """
         Get all files with specific status
@@ -485,7 +2221,7 @@ class DatabaseManager:
             list: List of file records
         """
         try:
-            conn = self.get_connection()
+            conn = self.connection()
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -496,7 +2232,6 @@ class DatabaseManager:
             ''', (status,))
             
             results = cursor.fetchall()
-            conn.close()
             
             files = []
             for row in results:
@@ -513,6 +2248,484 @@ class DatabaseManager:
             print(f"Error getting files by status: {e}")
             return []
     
+    def claim_jobs(
+        self,
+        worker_id: str,
+        limit: int = 1,
+        lease_seconds: float = 300.0,
+        max_attempts: int = 3
+    ) -> List[Dict]:
+        """
+        Atomically claim pending files for one worker
+        
+        Claims 'pending' files whose retry backoff has elapsed, plus
+        'processing' files whose lease expired (crashed or stalled
+        workers) or that have no lease at all (set to 'processing' with
+        update_file_status(), which cannot be renewed). Expired files
+        that already used max_attempts are marked 'failed' instead. The
+        claim runs in a BEGIN IMMEDIATE transaction, so concurrent
+        workers - threads, processes or machines sharing the database
+        file - never receive the same file.
+        
+        Args:
+            worker_id: Unique id of the claiming worker
+            limit: Maximum number of files to claim
+            lease_seconds: Lease duration; renew it with heartbeat()
+            max_attempts: Attempts after which an expired lease fails the file
+            
+        Returns:
+            list: Claimed files as {'file_hash', 'file_path', 'file_name',
+                'file_extension', 'attempts', 'lease_expires'}
+        """
+        try:
+            now = time.time()
+            lease_expires = now + lease_seconds
+            
+            with self.transaction() as conn:
+                conn.execute('''
+                    UPDATE processed_files
+                    SET status = 'failed', worker_id = NULL, lease_expires = NULL,
+                        error_message = 'Lease expired after ' || attempts || ' attempts'
+                    WHERE status = 'processing' AND attempts >= ?
+                      AND (lease_expires IS NULL OR lease_expires < ?)
+                ''', (max_attempts, now))
+                
+                candidates = '''
+                    SELECT file_hash FROM processed_files
+                    WHERE (status = 'pending' AND next_attempt_at <= ?)
+                       OR (status = 'processing' AND (lease_expires IS NULL OR lease_expires < ?))
+                    ORDER BY next_attempt_at, processed_date
+                    LIMIT ?
+                '''
+                
+                if RETURNING_AVAILABLE:
+                    rows = conn.execute(f'''
+                        UPDATE processed_files
+                        SET status = 'processing', worker_id = ?, lease_expires = ?,
+                            attempts = attempts + 1
+                        WHERE file_hash IN ({candidates})
+                        RETURNING file_hash, file_path, file_name, file_extension, attempts
+                    ''', (worker_id, lease_expires, now, now, limit)).fetchall()
+                else:
+                    # The write lock is already held, so select-then-update is atomic
+                    hashes = [row[0] for row in conn.execute(candidates, (now, now, limit))]
+                    conn.executemany('''
+                        UPDATE processed_files
+                        SET status = 'processing', worker_id = ?, lease_expires = ?,
+                            attempts = attempts + 1
+                        WHERE file_hash = ?
+                    ''', [(worker_id, lease_expires, file_hash) for file_hash in hashes])
+                    rows = [conn.execute('''
+                        SELECT file_hash, file_path, file_name, file_extension, attempts
+                        FROM processed_files WHERE file_hash = ?
+                    ''', (file_hash,)).fetchone() for file_hash in hashes]
+            
+            return [{
+                'file_hash': row[0],
+                'file_path': row[1],
+                'file_name': row[2],
+                'file_extension': row[3],
+                'attempts': row[4],
+                'lease_expires': lease_expires
+            } for row in rows]
+        
+        except Exception as e:
+            print(f"Error claiming jobs: {e}")
+            return []
+    
+    def heartbeat(self, file_hash: str, worker_id: str, lease_seconds: float = 300.0) -> bool:
+        """
+        Extend the lease on a claimed file
+        
+        Args:
+            file_hash: MD5 hash of file
+            worker_id: Worker holding the lease
+            lease_seconds: New lease duration from now
+            
+        Returns:
+            bool: True if the lease is still held (False means it expired
+                and the file may have been claimed by another worker)
+        """
+        try:
+            with self.transaction() as conn:
+                cursor = conn.execute('''
+                    UPDATE processed_files SET lease_expires = ?
+                    WHERE file_hash = ? AND worker_id = ? AND status = 'processing'
+                ''', (time.time() + lease_seconds, file_hash, worker_id))
+                return cursor.rowcount == 1
+        
+        except Exception as e:
+            print(f"Error renewing lease: {e}")
+            return False
+    
+    def claim_file(
+        self,
+        file_hash: str,
+        worker_id: str,
+        statuses: Tuple[str, ...] = ('pending',),
+        lease_seconds: float = 300.0
+    ) -> bool:
+        """
+        Atomically claim one known file for a worker
+        
+        Used by IngestionPipeline, which discovers files itself instead of
+        pulling them with claim_jobs(). The file is claimed if its status is
+        in statuses ('pending' only once its retry backoff has elapsed) or
+        it is 'processing' with an expired or missing lease.
+        
+        Args:
+            file_hash: MD5 hash of file
+            worker_id: Unique id of the claiming worker
+            statuses: Statuses that may be claimed
+            lease_seconds: Lease duration; renew it with renew_leases()
+        
+        Returns:
+            bool: True if this worker now holds the lease
+        """
+        try:
+            now = time.time()
+            placeholders = ','.join('?' * len(statuses))
+            with self.transaction() as conn:
+                cursor = conn.execute(f'''
+                    UPDATE processed_files
+                    SET status = 'processing', worker_id = ?, lease_expires = ?,
+                        attempts = attempts + 1
+                    WHERE file_hash = ? AND (
+                        (status IN ({placeholders}) AND (status != 'pending' OR next_attempt_at <= ?))
+                        OR (status = 'processing' AND (lease_expires IS NULL OR lease_expires < ?))
+                    )
+                ''', (worker_id, now + lease_seconds, file_hash, *statuses, now, now))
+                return cursor.rowcount == 1
+        
+        except Exception as e:
+            print(f"Error claiming file: {e}")
+            return False
+    
+    def renew_leases(self, worker_id: str, lease_seconds: float = 300.0) -> int:
+        """
+        Extend every lease a worker holds in one statement
+        
+        Args:
+            worker_id: Worker holding the leases
+            lease_seconds: New lease duration from now
+        
+        Returns:
+            int: Number of leases renewed
+        """
+        try:
+            with self.transaction() as conn:
+                cursor = conn.execute('''
+                    UPDATE processed_files SET lease_expires = ?
+                    WHERE worker_id = ? AND status = 'processing'
+                ''', (time.time() + lease_seconds, worker_id))
+                return cursor.rowcount
+        
+        except Exception as e:
+            print(f"Error renewing leases: {e}")
+            return 0
+    
+    @contextmanager
+    def hold_lease(
+        self,
+        file_hash: str,
+        worker_id: str,
+        lease_seconds: float = 300.0,
+        interval: Optional[float] = None
+    ) -> Iterator[threading.Event]:
+        """
+        Renew a lease from a background thread while work is in progress
+        
+        Args:
+            file_hash: MD5 hash of the claimed file
+            worker_id: Worker holding the lease
+            lease_seconds: Lease duration renewed on every heartbeat
+            interval: Seconds between heartbeats (default: lease_seconds / 3)
+            
+        Yields:
+            threading.Event: Set when the lease was lost
+        
+        Example:
+            with db.hold_lease(job['file_hash'], worker_id) as lost:
+                result = extractor.extract(job['file_path'])
+            if not lost.is_set():
+                db.complete_job(job['file_hash'], worker_id)
+        """
+        lost = threading.Event()
+        done = threading.Event()
+        interval = interval or lease_seconds / 3
+        
+        def renew():
+            while not done.wait(interval):
+                if not self.heartbeat(file_hash, worker_id, lease_seconds):
+                    lost.set()
+                    return
+        
+        thread = threading.Thread(target=renew, name=f"lease-{file_hash[:8]}", daemon=True)
+        thread.start()
+        try:
+            yield lost
+        finally:
+            done.set()
+            thread.join()
+    
+    def complete_job(
+        self,
+        file_hash: str,
+        worker_id: str,
+        chunk_count: Optional[int] = None
+    ) -> bool:
+        """
+        Mark a claimed file as completed and release the lease
+        
+        Args:
+            file_hash: MD5 hash of file
+            worker_id: Worker holding the lease
+            chunk_count: Number of chunks created
+            
+        Returns:
+            bool: True if this worker still held the lease
+        """
+        try:
+            with self.transaction() as conn:
+                cursor = conn.execute('''
+                    UPDATE processed_files
+                    SET status = 'completed', worker_id = NULL, lease_expires = NULL,
+                        error_message = NULL, chunk_count = coalesce(?, chunk_count)
+                    WHERE file_hash = ? AND worker_id = ? AND status = 'processing'
+                ''', (chunk_count, file_hash, worker_id))
+                return cursor.rowcount == 1
+        
+        except Exception as e:
+            print(f"Error completing job: {e}")
+            return False
+    
+    def fail_job(
+        self,
+        file_hash: str,
+        worker_id: str,
+        error_message: str,
+        retry: bool = True,
+        max_attempts: int = 3,
+        backoff_base: float = 30.0,
+        backoff_max: float = 3600.0
+    ) -> bool:
+        """
+        Release a claimed file after a failure
+        
+        While attempts remain the file goes back to 'pending' and becomes
+        claimable again after an exponential backoff
+        (backoff_base * 2 ** (attempts - 1), capped at backoff_max);
+        otherwise it is marked 'failed'.
+        
+        Args:
+            file_hash: MD5 hash of file
+            worker_id: Worker holding the lease
+            error_message: Error to record
+            retry: Allow another attempt
+            max_attempts: Total attempts allowed
+            backoff_base: Delay in seconds after the first failure
+            backoff_max: Upper bound for the delay
+            
+        Returns:
+            bool: True if this worker still held the lease
+        """
+        try:
+            with self.transaction() as conn:
+                row = conn.execute('''
+                    SELECT attempts FROM processed_files
+                    WHERE file_hash = ? AND worker_id = ? AND status = 'processing'
+                ''', (file_hash, worker_id)).fetchone()
+                if not row:
+                    return False
+                
+                attempts = row[0]
+                if retry and attempts < max_attempts:
+                    delay = min(backoff_base * 2 ** max(attempts - 1, 0), backoff_max)
+                    status, next_attempt_at = 'pending', time.time() + delay
+                else:
+                    status, next_attempt_at = 'failed', 0
+                
+                conn.execute('''
+                    UPDATE processed_files
+                    SET status = ?, worker_id = NULL, lease_expires = NULL,
+                        error_message = ?, next_attempt_at = ?
+                    WHERE file_hash = ?
+                ''', (status, error_message, next_attempt_at, file_hash))
+                return True
+        
+        except Exception as e:
+            print(f"Error failing job: {e}")
+            return False
+    
+    def requeue_failed(self, reset_attempts: bool = True) -> int:
+        """
+        Put all 'failed' files back into the queue
+        
+        Args:
+            reset_attempts: Start counting attempts from zero again
+            
+        Returns:
+            int: Number of files re-queued
+        """
+        try:
+            with self.transaction() as conn:
+                cursor = conn.execute('''
+                    UPDATE processed_files
+                    SET status = 'pending', next_attempt_at = 0,
+                        attempts = CASE WHEN ? THEN 0 ELSE attempts END
+                    WHERE status = 'failed'
+                ''', (reset_attempts,))
+                return cursor.rowcount
+        
+        except Exception as e:
+            print(f"Error re-queueing files: {e}")
+            return 0
+    
+    def get_vlm_response(
+        self,
+        cache_key: str,
+        max_age_seconds: Optional[float] = None
+    ) -> Optional[Dict]:
+        """
+        Look up a cached VLM response and mark it as used
+        
+        Args:
+            cache_key: Key computed by VLMResponseCache
+            max_age_seconds: Ignore entries older than this
+            
+        Returns:
+            dict or None: {'response', 'tokens', 'model', 'model_digest', 'created_at'}
+        """
+        try:
+            conn = self.connection()
+            row = conn.execute('''
+                SELECT response, tokens, model, model_digest, created_at
+                FROM vlm_responses WHERE cache_key = ?
+            ''', (cache_key,)).fetchone()
+            if not row:
+                return None
+            
+            now = time.time()
+            if max_age_seconds is not None and now - row[4] > max_age_seconds:
+                return None
+            
+            conn.execute('''
+                UPDATE vlm_responses SET last_used_at = ?, hits = hits + 1
+                WHERE cache_key = ?
+            ''', (now, cache_key))
+            
+            return {
+                'response': row[0],
+                'tokens': row[1],
+                'model': row[2],
+                'model_digest': row[3],
+                'created_at': row[4]
+            }
+        
+        except Exception as e:
+            print(f"Error reading VLM response cache: {e}")
+            return None
+    
+    def put_vlm_response(
+        self,
+        cache_key: str,
+        model: str,
+        model_digest: str,
+        prompt_hash: str,
+        image_hash: str,
+        options: Dict,
+        response: str,
+        tokens: int = 0
+    ) -> bool:
+        """
+        Store (or replace) a VLM response
+        
+        Args:
+            cache_key: Key computed by VLMResponseCache
+            model: Model name
+            model_digest: Model digest reported by Ollama
+            prompt_hash: SHA-256 of the prompt
+            image_hash: SHA-256 of the image
+            options: Generation options
+            response: Model answer
+            tokens: Tokens generated
+            
+        Returns:
+            bool: True if successful
+        """
+        try:
+            now = time.time()
+            with self.transaction() as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO vlm_responses
+                    (cache_key, model, model_digest, prompt_hash, image_hash,
+                     options_json, response, tokens, created_at, last_used_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    cache_key, model, model_digest, prompt_hash, image_hash,
+                    json.dumps(options, sort_keys=True), response, tokens, now, now
+                ))
+            return True
+        
+        except Exception as e:
+            print(f"Error writing VLM response cache: {e}")
+            return False
+    
+    def prune_vlm_responses(
+        self,
+        max_age_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None
+    ) -> int:
+        """
+        Evict cached VLM responses
+        
+        Args:
+            max_age_seconds: Delete entries created longer ago than this
+            max_entries: Keep at most this many entries (least recently
+                used are deleted first)
+            
+        Returns:
+            int: Number of entries deleted
+        """
+        deleted = 0
+        try:
+            with self.transaction() as conn:
+                if max_age_seconds is not None:
+                    cursor = conn.execute(
+                        'DELETE FROM vlm_responses WHERE created_at < ?',
+                        (time.time() - max_age_seconds,)
+                    )
+                    deleted += cursor.rowcount
+                
+                if max_entries is not None:
+                    cursor = conn.execute('''
+                        DELETE FROM vlm_responses WHERE cache_key IN (
+                            SELECT cache_key FROM vlm_responses
+                            ORDER BY last_used_at DESC
+                            LIMIT -1 OFFSET ?
+                        )
+                    ''', (max_entries,))
+                    deleted += cursor.rowcount
+            return deleted
+        
+        except Exception as e:
+            print(f"Error pruning VLM response cache: {e}")
+            return 0
+    
+    def count_vlm_responses(self) -> int:
+        """
+        Count cached VLM responses
+        
+        Returns:
+            int: Number of entries
+        """
+        try:
+            return self.connection().execute('SELECT COUNT(*) FROM vlm_responses').fetchone()[0]
+        
+        except Exception as e:
+            print(f"Error counting VLM responses: {e}")
+            return 0
+    
     def get_statistics(self) -> Dict:
         """
         Get database statistics
@@ -521,7 +2734,7 @@ class DatabaseManager:
             dict: Statistics about stored files
         """
         try:
-            conn = self.get_connection()
+            conn = self.connection()
             cursor = conn.cursor()
             
             # Total files
@@ -544,8 +2757,6 @@ class DatabaseManager:
             cursor.execute('SELECT COUNT(*) FROM content_chunks')
             total_chunks = cursor.fetchone()[0]
             
-            conn.close()
-            
             return {
                 'total_files': total_files,
                 'status_counts': status_counts,
@@ -569,20 +2780,25 @@ class DatabaseManager:
             bool: True if successful
         """
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            # Delete chunks
-            cursor.execute('DELETE FROM content_chunks WHERE file_hash = ?', (file_hash,))
-            
-            # Delete extracted content
-            cursor.execute('DELETE FROM extracted_content WHERE file_hash = ?', (file_hash,))
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                
+                # Delete chunks
+                cursor.execute('DELETE FROM content_chunks WHERE file_hash = ?', (file_hash,))
+                
+                # Delete extracted content
+                cursor.execute('DELETE FROM extracted_content WHERE file_hash = ?', (file_hash,))
+                
+                # Delete manifest entries, inline content and file record
+                cursor.execute('DELETE FROM file_manifest WHERE file_hash = ?', (file_hash,))
+                cursor.execute('DELETE FROM file_contents WHERE file_hash = ?', (file_hash,))
+                cursor.execute('DELETE FROM processed_files WHERE file_hash = ?', (file_hash,))
             
-            # Delete file record
-            cursor.execute('DELETE FROM processed_files WHERE file_hash = ?', (file_hash,))
+            # Delete stored content once the row is gone
+            if self.blob_store is not None:
+                self.blob_store.delete(file_hash)
             
-            conn.commit()
-            conn.close()
+            self._notify_delete(file_hash)
             return True
         
         except Exception as e:
@@ -4,10 +4,13 @@ Handles file/folder scanning, validation, blob storage, and metadata tracking
 """
 
 import os
-from typing import List, Dict, Optional
+import mmap
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from datetime import datetime
 
 from .database import DatabaseManager
+from .blob_store import FileSystemBlobStore
 from ..utils import FileUtils
 
 
@@ -36,7 +39,11 @@ class DocumentProcessor:
         model_name: str = "qwen2.5vl:3b-q4_K_M",
         allowed_extensions: List[str] = None,
         max_file_size_mb: int = 100,
-        db_path: str = "document_metadata.db"
+        db_path: str = "document_metadata.db",
+        blob_store_dir: Optional[str] = None,
+        inline_blobs: bool = False,
+        hash_workers: Optional[int] = None,
+        use_manifest: bool = True
     ):
         """
         Initialize DocumentProcessor
@@ -49,6 +56,13 @@ class DocumentProcessor:
             allowed_extensions: List of allowed file extensions
             max_file_size_mb: Maximum file size in MB
             db_path: Path to SQLite database
+            blob_store_dir: Directory for stored file content
+                (default: '<db name>_blobs' next to the database)
+            inline_blobs: Store file content inside the database instead
+            hash_workers: Threads hashing/storing changed files
+                (default: ThreadPoolExecutor default)
+            use_manifest: Skip files whose (size, mtime, inode) match the
+                last run without reading them
         """
         self.file_path = file_path
         self.use_unstructured = use_unstructured
@@ -57,9 +71,15 @@ class DocumentProcessor:
         self.allowed_extensions = allowed_extensions or ['.pdf', '.txt', '.docx', '.doc']
         self.max_file_size_mb = max_file_size_mb
         self.db_path = db_path
+        self.hash_workers = hash_workers
+        self.use_manifest = use_manifest
         
         # Initialize database
-        self.db = DatabaseManager(db_path)
+        self.db = DatabaseManager(
+            db_path,
+            blob_store=FileSystemBlobStore(blob_store_dir) if blob_store_dir else None,
+            inline_blobs=inline_blobs
+        )
     
     def check_if_processed(self, file_path: str) -> Dict:
         """
@@ -76,8 +96,18 @@ class DocumentProcessor:
             }
         """
         try:
-            # Use FileUtils for hashing
-            file_hash = FileUtils.get_file_hash(file_path)
+            # An unchanged stat signature means the recorded hash still holds
+            signature = self._stat_signature(file_path)
+            entry = None
+            if self.use_manifest:
+                entry = self.db.get_manifest_entry(os.path.abspath(file_path))
+            
+            if entry and (entry['file_size'], entry['mtime_ns'], entry['inode']) == signature:
+                file_hash = entry['file_hash']
+            else:
+                # Use FileUtils for hashing
+                file_hash = FileUtils.get_file_hash(file_path)
+            
             if not file_hash:
                 return {
                     'processed': False,
@@ -90,6 +120,10 @@ class DocumentProcessor:
             file_record = self.db.get_file_by_hash(file_hash)
             
             if file_record:
+                if self.use_manifest and not entry:
+                    self.db.upsert_manifest_bulk([
+                        self._manifest_entry(file_path, signature, file_hash)
+                    ])
                 return {
                     'processed': True,
                     'file_hash': file_hash,
@@ -110,6 +144,27 @@ class DocumentProcessor:
                 'error': str(e)
             }
     
+    @staticmethod
+    def _stat_signature(file_path: str) -> Tuple[int, int, int]:
+        """Get the (size, mtime_ns, inode) used to detect changed files"""
+        st = os.stat(file_path)
+        return st.st_size, st.st_mtime_ns, st.st_ino
+    
+    @staticmethod
+    def _manifest_entry(
+        file_path: str,
+        signature: Tuple[int, int, int],
+        file_hash: str
+    ) -> Dict:
+        """Build a file_manifest row for DatabaseManager.upsert_manifest_bulk"""
+        return {
+            'file_path': os.path.abspath(file_path),
+            'file_size': signature[0],
+            'mtime_ns': signature[1],
+            'inode': signature[2],
+            'file_hash': file_hash
+        }
+    
     def is_file_or_folder(self, path: str) -> Dict:
         """
         Determine if path is file, folder, or invalid
@@ -150,10 +205,85 @@ class DocumentProcessor:
                 'error': 'Path does not exist'
             }
     
+    def iter_files(
+        self,
+        folder_path: str,
+        summary: Optional[Dict] = None
+    ) -> Iterator[Dict]:
+        """
+        Stream validated file records from a folder tree
+        
+        Files are yielded while the walk is still running, so hashing and
+        storage can start immediately. The stat result cached by the walker
+        is reused for validation and change detection.
+        
+        Args:
+            folder_path: Path to folder
+            summary: Optional dict updated in place as files are found:
+                {'root', 'total_files', 'total_size', 'valid_files',
+                 'errors'}
+            
+        Yields:
+            dict: {
+                'path': str,
+                'name': str,
+                'extension': str,
+                'size': int,
+                'modified': str,
+                'signature': (size, mtime_ns, inode),
+                'valid': bool,
+                'reason': str
+            }
+        """
+        if summary is None:
+            summary = {}
+        summary.update({
+            'root': folder_path,
+            'total_files': 0,
+            'total_size': 0,
+            'valid_files': 0,
+            'errors': []
+        })
+        
+        def on_error(path: str, error: OSError):
+            summary['errors'].append({'path': path, 'error': str(error)})
+        
+        for file_path, file_stat in FileUtils.scan_files(
+            folder_path,
+            extensions=self.allowed_extensions,
+            on_error=on_error
+        ):
+            record = self._file_record(file_path, file_stat)
+            summary['total_files'] += 1
+            summary['total_size'] += record['size']
+            summary['valid_files'] += record['valid']
+            yield record
+    
+    def _file_record(self, file_path: str, file_stat: os.stat_result) -> Dict:
+        """Build a validated file record from a stat result"""
+        is_valid, reason = FileUtils.validate_stat(
+            file_path,
+            file_stat,
+            allowed_extensions=self.allowed_extensions,
+            max_size_mb=self.max_file_size_mb,
+            min_size_bytes=1
+        )
+        
+        return {
+            'path': file_path,
+            'name': os.path.basename(file_path),
+            'extension': os.path.splitext(file_path)[1].lower(),
+            'size': file_stat.st_size,
+            'modified': datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
+            'signature': (file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino),
+            'valid': is_valid,
+            'reason': reason
+        }
+    
     def get_all_files_recursive(self, folder_path: str) -> Dict:
         """
         Recursively get all files from folder with nested structure
-        Uses FileUtils for file operations
+        Built from iter_files(); folders without matching files are omitted
         
         Args:
             folder_path: Path to folder
@@ -167,73 +297,47 @@ class DocumentProcessor:
                 'structure': dict (nested tree structure)
             }
         """
-        def build_tree(path: str) -> Dict:
-            """Helper function to build nested tree structure"""
-            tree = {
+        def new_node(path: str) -> Dict:
+            return {
                 'path': path,
                 'name': os.path.basename(path),
                 'type': 'folder',
                 'files': [],
                 'subfolders': []
             }
-            
-            try:
-                # Get files in current directory using FileUtils
-                files_in_dir = FileUtils.list_files(
-                    path,
-                    extensions=self.allowed_extensions,
-                    recursive=False  # Only current directory
-                )
-                
-                # Get file info using FileUtils
-                for file_path in files_in_dir:
-                    file_info = FileUtils.get_file_info(file_path)
-                    if 'error' not in file_info:
-                        tree['files'].append({
-                            'path': file_path,
-                            'name': file_info['name'],
-                            'extension': file_info['extension'],
-                            'size': file_info['size'],
-                            'modified': file_info['modified']
-                        })
-                
-                # Handle subdirectories recursively
-                for item in os.listdir(path):
-                    item_path = os.path.join(path, item)
-                    if os.path.isdir(item_path):
-                        tree['subfolders'].append(build_tree(item_path))
-            
-            except PermissionError:
-                tree['error'] = 'Permission denied'
-            except Exception as e:
-                tree['error'] = str(e)
-            
-            return tree
         
-        # Build the tree structure
-        structure = build_tree(folder_path)
-        
-        # Calculate totals
-        def count_files_and_size(node: Dict):
-            """Helper to count total files and size"""
-            file_count = len(node.get('files', []))
-            total_size = sum(f['size'] for f in node.get('files', []))
-            
-            for subfolder in node.get('subfolders', []):
-                sub_count, sub_size = count_files_and_size(subfolder)
-                file_count += sub_count
-                total_size += sub_size
-            
-            return file_count, total_size
-        
-        total_files, total_size = count_files_and_size(structure)
+        root = os.path.normpath(folder_path)
+        nodes = {root: new_node(folder_path)}
+        
+        def get_node(path: str) -> Dict:
+            """Find or create the node of a folder and its parents"""
+            path = os.path.normpath(path)
+            if path not in nodes:
+                nodes[path] = new_node(path)
+                get_node(os.path.dirname(path))['subfolders'].append(nodes[path])
+            return nodes[path]
+        
+        summary = {}
+        for record in self.iter_files(folder_path, summary):
+            get_node(os.path.dirname(record['path']))['files'].append({
+                'path': record['path'],
+                'name': record['name'],
+                'extension': record['extension'],
+                'size': record['size'],
+                'modified': record['modified']
+            })
+        
+        for error in summary['errors']:
+            node = nodes.get(os.path.normpath(error['path']))
+            if node is not None:
+                node['error'] = error['error']
         
         return {
             'root': folder_path,
-            'total_files': total_files,
-            'total_size': total_size,
-            'total_size_mb': round(total_size / (1024 * 1024), 2),
-            'structure': structure
+            'total_files': summary['total_files'],
+            'total_size': summary['total_size'],
+            'total_size_mb': round(summary['total_size'] / (1024 * 1024), 2),
+            'structure': nodes[root]
         }
     
     def store_file_as_blob(
@@ -259,19 +363,12 @@ class DocumentProcessor:
                 'message': str
             }
         """
+        blob_created = False
         try:
-            # Read file using FileUtils
-            file_blob = FileUtils.read_file_binary(file_path)
-            if not file_blob:
-                return {
-                    'success': False,
-                    'file_path': file_path,
-                    'error': 'Failed to read file',
-                    'message': 'Could not read file as binary'
-                }
-            
-            # Generate hash using FileUtils if not provided
-            if not file_hash:
+            # Without a hash, a blob store hashes and copies in one read
+            if not file_hash and self.db.blob_store is not None:
+                file_hash, _, blob_created = self.db.blob_store.put_file_hashed(file_path)
+            elif not file_hash:
                 file_hash = FileUtils.get_file_hash(file_path)
             
             if not file_hash:
@@ -285,6 +382,7 @@ class DocumentProcessor:
             # Get file info using FileUtils
             file_info = FileUtils.get_file_info(file_path)
             if 'error' in file_info:
+                self._discard_blob(file_hash, blob_created)
                 return {
                     'success': False,
                     'file_path': file_path,
@@ -296,14 +394,14 @@ class DocumentProcessor:
             file_extension = file_info['extension']
             file_size = file_info['size']
             
-            # Store in database
+            # Store in database (content is streamed from file_path, never
+            # loaded into memory as a whole)
             success = self.db.insert_file(
                 file_hash=file_hash,
                 file_path=file_path,
                 file_name=file_name,
                 file_extension=file_extension,
                 file_size=file_size,
-                file_blob=file_blob,
                 model_used=self.model_name,
                 use_unstructured=self.use_unstructured,
                 use_docling=self.use_docling,
@@ -321,6 +419,7 @@ class DocumentProcessor:
                     'message': 'File stored successfully'
                 }
             else:
+                self._discard_blob(file_hash, blob_created)
                 return {
                     'success': False,
                     'file_path': file_path,
@@ -329,6 +428,7 @@ class DocumentProcessor:
                 }
         
         except Exception as e:
+            self._discard_blob(file_hash, blob_created)
             return {
                 'success': False,
                 'file_path': file_path,
@@ -336,16 +436,116 @@ class DocumentProcessor:
                 'message': f'Failed to store file: {str(e)}'
             }
     
-    def get_file_from_blob(self, file_hash: str) -> Optional[bytes]:
+    def _discard_blob(self, file_hash: Optional[str], blob_created: bool):
+        """Remove a blob created for a file whose database insert failed"""
+        if blob_created and file_hash:
+            self.db.blob_store.delete(file_hash)
+    
+    def hash_and_store(self, file_path: str, status: str = 'pending') -> Dict:
+        """
+        Hash a file and store it unless its content is already known
+        
+        With a blob store the file is read once: hashing and copying into
+        the store happen in the same pass, and the copy is dropped again if
+        the content turns out to be stored already. Safe to call from
+        worker threads.
+        
+        Args:
+            file_path: Path to file
+            status: Processing status for newly stored files
+            
+        Returns:
+            dict: {
+                'state': 'processed' | 'stored' | 'failed',
+                'file_hash': str or None,
+                'metadata': dict or None (existing record),
+                'result': dict or None (store_file_as_blob result)
+            }
+        """
+        blob_created = False
+        try:
+            if self.db.blob_store is not None:
+                file_hash, _, blob_created = self.db.blob_store.put_file_hashed(file_path)
+            else:
+                file_hash = FileUtils.get_file_hash(file_path)
+        
+        except Exception as e:
+            file_hash = None
+            print(f"Error hashing file {file_path}: {e}")
+        
+        if not file_hash:
+            return {
+                'state': 'failed',
+                'file_hash': None,
+                'metadata': None,
+                'result': {
+                    'success': False,
+                    'file_path': file_path,
+                    'error': 'Failed to generate file hash',
+                    'message': 'File hash generation failed'
+                }
+            }
+        
+        file_record = self.db.get_file_by_hash(file_hash)
+        if file_record:
+            return {
+                'state': 'processed',
+                'file_hash': file_hash,
+                'metadata': file_record,
+                'result': None
+            }
+        
+        result = self.store_file_as_blob(file_path, file_hash=file_hash, status=status)
+        if not result['success']:
+            self._discard_blob(file_hash, blob_created)
+        
+        return {
+            'state': 'stored' if result['success'] else 'failed',
+            'file_hash': file_hash,
+            'metadata': None,
+            'result': result
+        }
+    
+    def get_file_from_blob(
+        self,
+        file_hash: str,
+        mode: str = 'bytes',
+        dst=None
+    ) -> Optional[Union[bytes, str, mmap.mmap, int]]:
         """
-        Retrieve file blob from database
+        Retrieve stored file content
         
         Args:
             file_hash: Hash of the file
+            mode: 'bytes' for an in-memory copy, 'path' for the blob store
+                path (no copy), 'mmap' for a read-only memory-mapped view
+                (caller closes it). 'path' and 'mmap' fall back to bytes
+                for content stored inline in the database.
+            dst: Writable file object or socket. If given, the content is
+                streamed into it in chunks and mode is ignored.
             
         Returns:
-            bytes or None: File content
+            bytes, str, mmap, int or None: File content, a handle to it,
+                or the number of bytes streamed into dst
+        
+        Example:
+            path = processor.get_file_from_blob(file_hash, mode='path')
+            result = extractor.extract_from_blob(path, '.pdf')
         """
+        if dst is not None:
+            return self.db.copy_file_blob(file_hash, dst)
+        
+        if mode == 'path':
+            path = self.db.get_file_blob_path(file_hash)
+            if path:
+                return path
+        elif mode == 'mmap':
+            view = self.db.get_file_blob_mmap(file_hash)
+            if view is not None:
+                return view
+        elif mode != 'bytes':
+            raise ValueError(f"Unsupported mode: {mode}")
+        
         return self.db.get_file_blob(file_hash)
     
     def process(self) -> Dict:
@@ -384,96 +584,110 @@ class DocumentProcessor:
                 'path_info': path_info
             }
         
-        # Step 2: Collect files to process
+        # Step 2: Stream files from the walker; validation, the manifest
+        # check and hashing all start while the scan is still running
+        print(f"\nStep 2: Scanning, validating and checking files...")
         files_to_process = []
+        valid_files = []
+        invalid_files = []
+        processed_files = []
+        unprocessed_files = []
+        stored_files = []
+        failed_files = []
+        manifest_updates = []
+        scan_summary = {}
+        manifest = self.db.get_manifest() if self.use_manifest else {}
         
         if path_info['type'] == 'folder':
-            print(f"\nStep 2: Scanning folder recursively...")
-            folder_structure = self.get_all_files_recursive(self.file_path)
-            print(f"  Total files found: {folder_structure['total_files']}")
-            print(f"  Total size: {folder_structure['total_size_mb']} MB")
-            
-            # Flatten structure to get all file paths
-            def extract_files(node: Dict, file_list: List):
-                for file_info in node.get('files', []):
-                    file_list.append(file_info['path'])
-                for subfolder in node.get('subfolders', []):
-                    extract_files(subfolder, file_list)
-            
-            extract_files(folder_structure['structure'], files_to_process)
+            records = self.iter_files(self.file_path, scan_summary)
         else:
-            # Single file
-            files_to_process = [self.file_path]
-            print(f"\nStep 2: Processing single file")
-        
-        # Step 3: Validate file types using FileUtils
-        print(f"\nStep 3: Validating files...")
-        valid_files = []
-        invalid_files = []
+            try:
+                records = [self._file_record(self.file_path, os.stat(self.file_path))]
+            except OSError as e:
+                records = []
+                invalid_files.append({'path': self.file_path, 'reason': str(e)})
         
-        for file_path in files_to_process:
-            # Use FileUtils for comprehensive validation
-            is_valid, reason = FileUtils.validate_file(
-                file_path,
-                allowed_extensions=self.allowed_extensions,
-                max_size_mb=self.max_file_size_mb,
-                min_size_bytes=1
-            )
+        with ThreadPoolExecutor(max_workers=self.hash_workers) as executor:
+            futures = {}
             
-            if is_valid:
+            for record in records:
+                file_path = record['path']
+                files_to_process.append(file_path)
+                
+                if not record['valid']:
+                    invalid_files.append({
+                        'path': file_path,
+                        'reason': record['reason']
+                    })
+                    print(f"  ✗ Invalid: {record['name']} - {record['reason']}")
+                    continue
+                
                 valid_files.append(file_path)
-            else:
-                invalid_files.append({
-                    'path': file_path,
-                    'reason': reason
-                })
-                print(f"  ✗ Invalid: {os.path.basename(file_path)} - {reason}")
-        
-        print(f"  Valid files: {len(valid_files)}")
-        print(f"  Invalid files: {len(invalid_files)}")
-        
-        # Step 4: Check which files are already processed
-        print(f"\nStep 4: Checking processed status...")
-        processed_files = []
-        unprocessed_files = []
-        
-        for file_path in valid_files:
-            check_result = self.check_if_processed(file_path)
+                entry = manifest.get(os.path.abspath(file_path))
+                
+                # Unchanged (size, mtime, inode): skip without reading
+                if entry and entry[:3] == record['signature']:
+                    processed_files.append({
+                        'path': file_path,
+                        'hash': entry[3],
+                        'metadata': self.db.get_file_by_hash(entry[3])
+                    })
+                    print(f"  ✓ Already processed: {record['name']}")
+                else:
+                    future = executor.submit(self.hash_and_store, file_path, 'pending')
+                    futures[future] = (file_path, record['signature'])
             
-            if check_result['processed']:
-                processed_files.append({
-                    'path': file_path,
-                    'hash': check_result['file_hash'],
-                    'metadata': check_result['metadata']
-                })
-                print(f"  ✓ Already processed: {os.path.basename(file_path)}")
-            else:
-                unprocessed_files.append({
-                    'path': file_path,
-                    'hash': check_result['file_hash']
-                })
+            if path_info['type'] == 'folder':
+                print(f"  Total files found: {scan_summary['total_files']}")
+                print(f"  Total size: {round(scan_summary['total_size'] / (1024 * 1024), 2)} MB")
+                for error in scan_summary['errors']:
+                    print(f"  ✗ Unreadable: {error['path']} - {error['error']}")
+            print(f"  Valid files: {len(valid_files)}")
+            print(f"  Invalid files: {len(invalid_files)}")
+            print(f"  Unchanged since last run: {len(processed_files)}")
+            print(f"  New or changed: {len(futures)}")
+            
+            # Step 3: Collect hashing/storage results (new content is
+            # hashed and stored in the same read)
+            print(f"\nStep 3: Hashing and storing files...")
+            for future in as_completed(futures):
+                file_path, signature = futures[future]
+                outcome = future.result()
+                
+                if outcome['state'] == 'failed':
+                    if outcome['file_hash']:
+                        unprocessed_files.append({
+                            'path': file_path,
+                            'hash': outcome['file_hash']
+                        })
+                    failed_files.append(outcome['result'])
+                    print(f"  ✗ Failed: {os.path.basename(file_path)} - {outcome['result'].get('error')}")
+                    continue
+                
+                manifest_updates.append(
+                    self._manifest_entry(file_path, signature, outcome['file_hash'])
+                )
+                
+                if outcome['state'] == 'processed':
+                    processed_files.append({
+                        'path': file_path,
+                        'hash': outcome['file_hash'],
+                        'metadata': outcome['metadata']
+                    })
+                    print(f"  ✓ Already processed: {os.path.basename(file_path)}")
+                else:
+                    unprocessed_files.append({
+                        'path': file_path,
+                        'hash': outcome['file_hash']
+                    })
+                    stored_files.append(outcome['result'])
+                    print(f"  ✓ Stored: {os.path.basename(file_path)} ({outcome['result']['file_size_formatted']})")
+        
+        if self.use_manifest and manifest_updates:
+            self.db.upsert_manifest_bulk(manifest_updates)
         
         print(f"  Already processed: {len(processed_files)}")
-        print(f"  Need processing: {len(unprocessed_files)}")
-        
-        # Step 5: Store unprocessed files as blobs
-        print(f"\nStep 5: Storing files as blobs...")
-        stored_files = []
-        failed_files = []
-        
-        for file_info in unprocessed_files:
-            result = self.store_file_as_blob(
-                file_path=file_info['path'],
-                file_hash=file_info['hash'],
-                status='pending'
-            )
-            
-            if result['success']:
-                stored_files.append(result)
-                print(f"  ✓ Stored: {os.path.basename(file_info['path'])} ({result['file_size_formatted']})")
-            else:
-                failed_files.append(result)
-                print(f"  ✗ Failed: {os.path.basename(file_info['path'])} - {result.get('error')}")
+        print(f"  Newly stored: {len(stored_files)}")
         
         # Summary
         print(f"\n{'=' * 60}")
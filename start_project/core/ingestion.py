@@ -0,0 +1,444 @@
+"""
+Ingestion pipeline - scan, store, extract, chunk and embed as concurrent stages
+Built on the generic Pipeline engine
+"""
+
+import os
+import json
+import socket
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .database import DatabaseManager
+from .document_processor import DocumentProcessor
+from .pipeline import Pipeline, Stage
+
+
+# Extractor owned by each worker process of a process-based extract stage
+_worker_extractor = None
+
+
+def _init_worker_extractor(extractor_cls: type, extractor_kwargs: Dict, cache_db_path: Optional[str] = None):
+    """Process initializer: build (and warm up) the extractor once per worker process"""
+    global _worker_extractor
+    _worker_extractor = extractor_cls(**extractor_kwargs)
+    if cache_db_path and hasattr(_worker_extractor, 'set_result_cache'):
+        # Each process opens its own connection to the result cache
+        _worker_extractor.set_result_cache(DatabaseManager(cache_db_path))
+    if hasattr(_worker_extractor, 'warmup'):
+        _worker_extractor.warmup()
+
+
+def _extract_in_worker(task: Dict) -> Dict:
+    """Run the worker process's extractor on one task"""
+    return _run_extractor(_worker_extractor, task)
+
+
+def _run_extractor(extractor, task: Dict) -> Dict:
+    """Extract one task; exceptions become a failed result"""
+    try:
+        if getattr(extractor, 'result_cache', None) is not None:
+            result = extractor.extract_from_blob_cached(
+                task['source_path'], task['file_extension'], task['file_hash']
+            )
+        else:
+            result = extractor.extract_from_blob(task['source_path'], task['file_extension'])
+    except Exception as e:
+        result = {'success': False, 'error': str(e)}
+    return {**task, 'result': result}
+
+
+def _json_safe(value: Any) -> Any:
+    """Make extractor output JSON serialisable (numpy values, dates, ...)"""
+    return json.loads(json.dumps(value, default=str))
+
+
+class IngestionPipeline:
+    """
+    Runs a DocumentProcessor folder through all ingestion stages at once
+    
+    Stages (each with its own worker count, connected by bounded queues):
+    - hash: stat manifest check, then single-pass hash + blob storage
+      (threads)
+    - extract: Unstructured/Docling/VLM extraction (threads, or processes
+      for CPU-heavy extractors)
+    - save: writes extracted content and status (one writer thread)
+    - chunk: optional chunk_func(file_hash, text) -> list of chunk dicts
+    - embed: optional embed_func(file_hash, chunks)
+    
+    Files are extracted when they are new or still 'pending' from an
+    earlier run. Without an extractor only the hash stage runs, which is
+    equivalent to DocumentProcessor.process().
+    
+    Files to extract are claimed with DatabaseManager.claim_file(), so
+    pipelines and claim_jobs() workers sharing the database never process
+    the same file. The leases are renewed while the run lasts. A file
+    whose extract, save or chunk stage raises is marked 'failed'; files
+    still held when the run ends are failed too, and leases abandoned by
+    a crashed run expire and are claimed again by the next one.
+    
+    With use_result_cache, extractors consult the extraction_cache table
+    first, so re-ingesting a file with the same extractor version and
+    options (e.g. after delete_file() or with reprocess_failed) reuses the
+    stored output.
+    
+    Example:
+        processor = DocumentProcessor('docs/')
+        ingestion = IngestionPipeline(
+            processor,
+            extractor_cls=UnstructuredExtractor,
+            extractor_kwargs={'strategy': 'fast'},
+            extract_workers=4,
+            extract_executor='process'
+        )
+        stats = ingestion.run(report_interval=10)
+    """
+    
+    def __init__(
+        self,
+        processor: DocumentProcessor,
+        extractor=None,
+        extractor_cls: Optional[type] = None,
+        extractor_kwargs: Optional[Dict] = None,
+        chunk_func: Optional[Callable[[str, str], List[Dict]]] = None,
+        embed_func: Optional[Callable[[str, List[Dict]], Any]] = None,
+        hash_workers: int = 4,
+        extract_workers: int = 1,
+        extract_executor: str = 'thread',
+        chunk_workers: int = 1,
+        embed_workers: int = 1,
+        queue_size: int = 64,
+        reprocess_failed: bool = False,
+        use_result_cache: bool = True,
+        lease_seconds: float = 300.0,
+        worker_id: Optional[str] = None
+    ):
+        """
+        Initialize ingestion pipeline
+        
+        Args:
+            processor: DocumentProcessor providing the path, database and
+                validation settings
+            extractor: Extractor instance (thread executor only)
+            extractor_cls: Extractor class, instantiated once per worker
+                (required for extract_executor='process')
+            extractor_kwargs: Keyword arguments for extractor_cls
+            chunk_func: Splits extracted text into insert_chunk() dicts
+            embed_func: Embeds and stores the chunks of one file
+            hash_workers: Threads hashing and storing files
+            extract_workers: Extraction threads/processes
+            extract_executor: 'thread' or 'process'
+            chunk_workers: Chunking threads
+            embed_workers: Embedding threads
+            queue_size: Capacity of every inter-stage queue
+            reprocess_failed: Also extract files marked 'failed'
+            use_result_cache: Reuse cached extractor output from the
+                processor's database
+            lease_seconds: Lease on each claimed file, renewed every
+                lease_seconds / 3 during the run
+            worker_id: Lease owner (default: host, process and a random suffix)
+        """
+        if extract_executor == 'process' and extractor_cls is None:
+            raise ValueError("extract_executor='process' requires extractor_cls")
+        if extractor is None and extractor_cls is not None and extract_executor == 'thread':
+            extractor = extractor_cls(**(extractor_kwargs or {}))
+        
+        if use_result_cache and extractor is not None and hasattr(extractor, 'set_result_cache'):
+            extractor.set_result_cache(processor.db)
+        
+        self.processor = processor
+        self.db = processor.db
+        self.use_result_cache = use_result_cache
+        self.extractor = extractor
+        self.extractor_cls = extractor_cls
+        self.extractor_kwargs = extractor_kwargs or {}
+        self.chunk_func = chunk_func
+        self.embed_func = embed_func
+        self.hash_workers = hash_workers
+        self.extract_workers = extract_workers
+        self.extract_executor = extract_executor
+        self.chunk_workers = chunk_workers
+        self.embed_workers = embed_workers
+        self.queue_size = queue_size
+        self.extract_statuses = ('pending', 'failed') if reprocess_failed else ('pending',)
+        self.lease_seconds = lease_seconds
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        
+        self.manifest = {}
+        self.scan_summary = {}
+        self.invalid_files = []
+        self._manifest_updates = []
+        self._claimed = set()
+        self._lock = threading.Lock()
+        self.pipeline = None
+    
+    @property
+    def extracts(self) -> bool:
+        """Whether an extraction stage is configured"""
+        return self.extractor is not None or self.extractor_cls is not None
+    
+    def build(self) -> Pipeline:
+        """
+        Assemble the stages for the current configuration
+        
+        Returns:
+            Pipeline: Ready-to-run pipeline
+        """
+        stages = [Stage('hash', self._hash_stage, workers=self.hash_workers, queue_size=self.queue_size)]
+        
+        if self.extracts:
+            if self.extract_executor == 'process':
+                stages.append(Stage(
+                    'extract',
+                    _extract_in_worker,
+                    workers=self.extract_workers,
+                    executor='process',
+                    queue_size=self.queue_size,
+                    initializer=_init_worker_extractor,
+                    initargs=(
+                        self.extractor_cls,
+                        self.extractor_kwargs,
+                        self.db.db_path if self.use_result_cache else None
+                    )
+                ))
+            else:
+                stages.append(Stage(
+                    'extract',
+                    self._guarded(self._extract_stage),
+                    workers=self.extract_workers,
+                    queue_size=self.queue_size
+                ))
+            stages.append(Stage('save', self._guarded(self._save_stage), workers=1, queue_size=self.queue_size))
+            
+            if self.chunk_func is not None:
+                stages.append(Stage(
+                    'chunk',
+                    self._guarded(self._chunk_stage),
+                    workers=self.chunk_workers,
+                    queue_size=self.queue_size
+                ))
+                if self.embed_func is not None:
+                    stages.append(Stage(
+                        'embed',
+                        self._embed_stage,
+                        workers=self.embed_workers,
+                        queue_size=self.queue_size
+                    ))
+        
+        return Pipeline(stages, name='ingestion')
+    
+    def run(self, report_interval: Optional[float] = None) -> Dict:
+        """
+        Ingest everything under the processor's path
+        
+        Args:
+            report_interval: Print per-stage progress every N seconds
+        
+        Returns:
+            dict: Pipeline.get_stats() plus 'scan': {
+                'total_files', 'total_size', 'invalid_files', 'errors'
+            }
+        """
+        path_info = self.processor.is_file_or_folder(self.processor.file_path)
+        if path_info['type'] == 'invalid':
+            return {'success': False, 'message': 'Invalid path', 'path_info': path_info}
+        
+        self.manifest = self.db.get_manifest() if self.processor.use_manifest else {}
+        self.scan_summary = {}
+        self.invalid_files = []
+        self._manifest_updates = []
+        self._claimed = set()
+        self.pipeline = self.build()
+        
+        with self._renewing_leases():
+            stats = self.pipeline.run(self._source(path_info['type']), report_interval=report_interval)
+        
+        # Files whose item was lost (e.g. a crashed extractor process)
+        for file_hash in list(self._claimed):
+            self._fail(file_hash, 'Ingestion run ended before the file was processed')
+        
+        if self.processor.use_manifest and self._manifest_updates:
+            self.db.upsert_manifest_bulk(self._manifest_updates)
+        
+        stats['success'] = True
+        stats['scan'] = {
+            'total_files': self.scan_summary.get('total_files', 0),
+            'total_size': self.scan_summary.get('total_size', 0),
+            'invalid_files': self.invalid_files,
+            'errors': self.scan_summary.get('errors', [])
+        }
+        return stats
+    
+    def _source(self, path_type: str) -> Iterator[Dict]:
+        """Valid file records from the walker (or the single file)"""
+        if path_type == 'folder':
+            records = self.processor.iter_files(self.processor.file_path, self.scan_summary)
+        else:
+            file_path = self.processor.file_path
+            record = self.processor._file_record(file_path, os.stat(file_path))
+            self.scan_summary.update({'total_files': 1, 'total_size': record['size'], 'errors': []})
+            records = [record]
+        
+        for record in records:
+            if record['valid']:
+                yield record
+            else:
+                self.invalid_files.append({'path': record['path'], 'reason': record['reason']})
+    
+    def _hash_stage(self, record: Dict) -> Optional[Dict]:
+        """Skip unchanged files, store new ones, emit files to extract"""
+        file_path = record['path']
+        entry = self.manifest.get(os.path.abspath(file_path))
+        
+        if entry and entry[:3] == record['signature']:
+            file_hash = entry[3]
+            status = (self.db.get_file_by_hash(file_hash) or {}).get('status')
+        else:
+            outcome = self.processor.hash_and_store(file_path, 'pending')
+            if outcome['state'] == 'failed':
+                raise RuntimeError(outcome['result'].get('error'))
+            
+            file_hash = outcome['file_hash']
+            with self._lock:
+                self._manifest_updates.append(
+                    self.processor._manifest_entry(file_path, record['signature'], file_hash)
+                )
+            status = 'pending' if outcome['state'] == 'stored' else outcome['metadata']['status']
+        
+        # 'processing' files are claimable once their lease expired
+        if not self.extracts or status not in self.extract_statuses + ('processing',):
+            return None
+        if not self.db.claim_file(file_hash, self.worker_id, self.extract_statuses, self.lease_seconds):
+            return None
+        
+        with self._lock:
+            self._claimed.add(file_hash)
+        return {
+            'file_hash': file_hash,
+            'path': file_path,
+            'source_path': self.db.get_file_blob_path(file_hash) or file_path,
+            'file_extension': record['extension']
+        }
+    
+    def _extract_stage(self, task: Dict) -> Dict:
+        """Extract with the shared extractor instance (thread executor)"""
+        return _run_extractor(self.extractor, task)
+    
+    def _save_stage(self, item: Dict) -> Optional[Dict]:
+        """Persist extraction output and update the file status"""
+        file_hash, result = item['file_hash'], item['result']
+        
+        if not result.get('success'):
+            self._fail(file_hash, result.get('error'))
+            return None
+        
+        # Replaces the rows of an earlier (failed or reprocessed) extraction
+        if not self.db.replace_extracted_content(file_hash, self._content_rows(file_hash, result)):
+            raise RuntimeError(f"Failed to store extracted content for {file_hash}")
+        
+        if self.chunk_func is None:
+            self._complete(file_hash)
+            return None
+        
+        return {'file_hash': file_hash, 'text': result.get('text', '')}
+    
+    def _chunk_stage(self, item: Dict) -> Optional[Dict]:
+        """Chunk extracted text and store the chunks"""
+        file_hash = item['file_hash']
+        chunks = self.chunk_func(file_hash, item['text']) or []
+        
+        # Drop chunks of an earlier extraction, which may have had more;
+        # this also removes their vectors from an attached VectorIndex
+        self.db.delete_chunks(file_hash)
+        if chunks and not self.db.insert_chunks_bulk(chunks):
+            raise RuntimeError(f"Failed to store chunks for {file_hash}")
+        
+        self._complete(file_hash, chunk_count=len(chunks))
+        
+        if self.embed_func is None or not chunks:
+            return None
+        return {'file_hash': file_hash, 'chunks': chunks}
+    
+    def _embed_stage(self, item: Dict) -> None:
+        """Hand one file's chunks to the embedding function"""
+        file_hash = item['file_hash']
+        try:
+            result = self.embed_func(file_hash, item['chunks'])
+            if isinstance(result, dict) and result.get('success') is False:
+                raise RuntimeError(f"Embedding {file_hash} failed: {result.get('error')}")
+        except Exception as e:
+            # The file was completed by the chunk stage; mark it failed so
+            # reprocess_failed picks it up again
+            self.db.update_file_status(file_hash, 'failed', error_message=str(e))
+            raise
+    
+    def _guarded(self, func: Callable[[Dict], Any]) -> Callable[[Dict], Any]:
+        """Wrap a stage so that an exception also marks its file 'failed'"""
+        def stage(item: Dict) -> Any:
+            try:
+                return func(item)
+            except Exception as e:
+                self._fail(item['file_hash'], str(e))
+                raise
+        return stage
+    
+    def _complete(self, file_hash: str, chunk_count: Optional[int] = None):
+        """Mark a claimed file 'completed' and release its lease"""
+        with self._lock:
+            self._claimed.discard(file_hash)
+        if not self.db.complete_job(file_hash, self.worker_id, chunk_count=chunk_count):
+            raise RuntimeError(f"Lease on {file_hash} was lost before completion")
+    
+    def _fail(self, file_hash: str, error: Optional[str]):
+        """Mark a claimed file 'failed' (no automatic retry) and release its lease"""
+        with self._lock:
+            if file_hash not in self._claimed:
+                return
+            self._claimed.discard(file_hash)
+        self.db.fail_job(file_hash, self.worker_id, error or 'Unknown error', retry=False)
+    
+    @contextmanager
+    def _renewing_leases(self):
+        """Renew this run's leases from a background thread"""
+        done = threading.Event()
+        
+        def renew():
+            while not done.wait(self.lease_seconds / 3):
+                self.db.renew_leases(self.worker_id, self.lease_seconds)
+        
+        thread = threading.Thread(target=renew, name='ingestion-leases', daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+    
+    @staticmethod
+    def _content_rows(file_hash: str, result: Dict) -> List[Dict]:
+        """Map a standardized extraction result to extracted_content rows"""
+        common = {
+            'file_hash': file_hash,
+            'extractor_name': result.get('extractor'),
+            'extractor_version': result.get('extractor_version')
+        }
+        
+        rows = [{**common, 'content_type': 'text', 'content_text': result.get('text', '')}]
+        for table in result.get('tables', []):
+            rows.append({
+                **common,
+                'content_type': 'table',
+                'content_text': table.get('text'),
+                'content_json': _json_safe(table)
+            })
+        for image in result.get('images', []):
+            caption = image.get('text') or image.get('caption')
+            rows.append({
+                **common,
+                'content_type': 'image',
+                'content_text': str(caption) if caption else None,
+                'content_json': _json_safe(image)
+            })
+        return rows
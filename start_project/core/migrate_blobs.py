@@ -0,0 +1,45 @@
+"""
+Move inline file_blob content out of the database into a blob store
+
+Usage (from the repository root):
+    python -m start_project.core.migrate_blobs --db document_metadata.db
+    python -m start_project.core.migrate_blobs --db docs.db --blob-dir /data/blobs --vacuum
+"""
+
+import argparse
+import os
+
+from .blob_store import FileSystemBlobStore
+from .database import DatabaseManager
+from ..utils import FileUtils
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Move inline file blobs into a content-addressed blob store"
+    )
+    parser.add_argument('--db', default="document_metadata.db", help="SQLite database path")
+    parser.add_argument('--blob-dir', default=None, help="Blob store directory (default: '<db name>_blobs')")
+    parser.add_argument('--batch-size', type=int, default=50, help="Files moved per transaction")
+    parser.add_argument('--vacuum', action='store_true', help="VACUUM the database afterwards")
+    args = parser.parse_args()
+    
+    if not os.path.exists(args.db):
+        parser.error(f"Database not found: {args.db}")
+    
+    blob_store = FileSystemBlobStore(args.blob_dir) if args.blob_dir else None
+    size_before = os.path.getsize(args.db)
+    
+    with DatabaseManager(args.db, blob_store=blob_store) as db:
+        print(f"Blob store: {db.blob_store.root_dir}")
+        result = db.migrate_inline_blobs(batch_size=args.batch_size, vacuum=args.vacuum)
+    
+    print(f"Migrated: {result['migrated']} files ({FileUtils.format_size(result['bytes_moved'])})")
+    print(f"Failed: {len(result['failed'])}")
+    for failure in result['failed']:
+        print(f"  ✗ {failure['file_hash']}: {failure['error']}")
+    print(f"Database size: {FileUtils.format_size(size_before)} -> {FileUtils.format_size(os.path.getsize(args.db))}")
+
+
+if __name__ == "__main__":
+    main()
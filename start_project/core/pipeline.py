@@ -0,0 +1,388 @@
+"""
+Staged producer/consumer pipeline engine
+Stages run their own worker pools and are connected by bounded queues
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+# Sentinel passed down the queues when a stage has no more input
+_STOP = object()
+
+
+class Stage:
+    """
+    One step of a Pipeline
+    
+    func is called once per input item. Its return value is passed to the
+    next stage; None drops the item. With fan_out=True the return value
+    is an iterable and every element becomes a separate item (a list when
+    executor='process', since generators cannot be pickled).
+    
+    Thread stages suit I/O-bound work. Process stages run func in a
+    ProcessPoolExecutor with the same number of processes as workers; func,
+    its input and its output must be picklable, and initializer can load
+    heavy state (models, converters) once per process.
+    """
+    
+    EXECUTORS = ('thread', 'process')
+    
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Any], Any],
+        workers: int = 1,
+        executor: str = 'thread',
+        queue_size: int = 100,
+        fan_out: bool = False,
+        initializer: Optional[Callable] = None,
+        initargs: tuple = (),
+        max_errors: int = 100
+    ):
+        """
+        Initialize stage
+        
+        Args:
+            name: Stage name used in statistics
+            func: Function applied to every item
+            workers: Number of worker threads (or processes)
+            executor: 'thread' or 'process'
+            queue_size: Capacity of the input queue; producers block when
+                it is full (backpressure)
+            fan_out: Treat func's return value as several items
+            initializer: Called once in every worker process
+                (process stages only)
+            initargs: Arguments for initializer
+            max_errors: Number of error details kept for statistics
+        """
+        if executor not in self.EXECUTORS:
+            raise ValueError(f"Invalid executor: {executor}. Use one of {self.EXECUTORS}")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.executor = executor
+        self.queue_size = queue_size
+        self.fan_out = fan_out
+        self.initializer = initializer
+        self.initargs = initargs
+        self.max_errors = max_errors
+        self.reset_stats()
+    
+    def reset_stats(self):
+        """Clear the counters before a run"""
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.emitted = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.errors = []
+        self.input_queue = None
+    
+    def _record(self, busy: float, emitted: int = 0, error: Optional[Dict] = None):
+        with self._lock:
+            self.processed += 1
+            self.emitted += emitted
+            self.busy_seconds += busy
+            if error is not None:
+                self.failed += 1
+                if len(self.errors) < self.max_errors:
+                    self.errors.append(error)
+    
+    def _add_blocked(self, seconds: float):
+        with self._lock:
+            self.blocked_seconds += seconds
+    
+    def get_stats(self, elapsed: float) -> Dict:
+        """
+        Get stage counters
+        
+        Args:
+            elapsed: Wall-clock seconds of the run so far
+        
+        Returns:
+            dict: {
+                'name', 'executor', 'workers',
+                'processed': items consumed,
+                'emitted': items passed downstream,
+                'failed': items whose func raised,
+                'items_per_sec': processed / elapsed,
+                'busy_seconds': time spent inside func (all workers),
+                'utilization': busy_seconds / (workers * elapsed),
+                'blocked_seconds': time spent waiting on a full output
+                    queue (downstream is the bottleneck),
+                'queue_depth': items waiting in the input queue,
+                'errors': list of {'item', 'error'}
+            }
+        """
+        with self._lock:
+            return {
+                'name': self.name,
+                'executor': self.executor,
+                'workers': self.workers,
+                'processed': self.processed,
+                'emitted': self.emitted,
+                'failed': self.failed,
+                'items_per_sec': round(self.processed / elapsed, 2) if elapsed else 0.0,
+                'busy_seconds': round(self.busy_seconds, 3),
+                'utilization': round(self.busy_seconds / (self.workers * elapsed), 3) if elapsed else 0.0,
+                'blocked_seconds': round(self.blocked_seconds, 3),
+                'queue_depth': self.input_queue.qsize() if self.input_queue else 0,
+                'errors': list(self.errors)
+            }
+    
+    def __repr__(self) -> str:
+        return f"<Stage(name='{self.name}', executor='{self.executor}', workers={self.workers})>"
+
+
+class Pipeline:
+    """
+    Runs items from a source through a chain of stages
+    
+    Every stage reads from its own bounded queue and writes into the next
+    stage's queue, so all stages work concurrently and a slow stage
+    throttles everything upstream of it instead of letting queues grow
+    without limit. Outputs of the last stage are handed to on_result in
+    the calling thread.
+    
+    Example:
+        pipeline = Pipeline([
+            Stage('read', read_file, workers=8),
+            Stage('parse', parse, workers=4, executor='process'),
+            Stage('save', save, workers=1)
+        ])
+        stats = pipeline.run(paths, report_interval=10)
+    """
+    
+    def __init__(self, stages: List[Stage], name: str = "pipeline"):
+        """
+        Initialize pipeline
+        
+        Args:
+            stages: Stages in processing order
+            name: Pipeline name used in reports
+        """
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        
+        self.stages = stages
+        self.name = name
+        self._stop_event = threading.Event()
+        self._started = None
+        self._finished = None
+        self.source_count = 0
+        self.source_blocked_seconds = 0.0
+        self.source_error = None
+    
+    def stop(self):
+        """Stop feeding new items; items already queued are finished"""
+        self._stop_event.set()
+    
+    def run(
+        self,
+        source: Iterable,
+        on_result: Optional[Callable[[Any], None]] = None,
+        report_interval: Optional[float] = None
+    ) -> Dict:
+        """
+        Process every item of source and wait until all stages are done
+        
+        Args:
+            source: Iterable of input items (consumed lazily)
+            on_result: Called with every output of the last stage
+            report_interval: Print progress every N seconds
+        
+        Returns:
+            dict: Run statistics (see get_stats())
+        """
+        self._stop_event.clear()
+        self.source_count = 0
+        self.source_blocked_seconds = 0.0
+        self.source_error = None
+        for stage in self.stages:
+            stage.reset_stats()
+        
+        queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        for stage, stage_queue in zip(self.stages, queues):
+            stage.input_queue = stage_queue
+        queues.append(queue.Queue(maxsize=self.stages[-1].queue_size))
+        
+        pools = [
+            ProcessPoolExecutor(
+                max_workers=stage.workers,
+                initializer=stage.initializer,
+                initargs=stage.initargs
+            ) if stage.executor == 'process' else None
+            for stage in self.stages
+        ]
+        remaining = [stage.workers for stage in self.stages]
+        remaining_lock = threading.Lock()
+        
+        def finish_worker(index: int):
+            """The last worker of a stage closes the next queue"""
+            with remaining_lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            if last:
+                consumers = self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+                for _ in range(consumers):
+                    queues[index + 1].put(_STOP)
+        
+        def worker(index: int):
+            stage = self.stages[index]
+            in_queue, out_queue = queues[index], queues[index + 1]
+            pool = pools[index]
+            try:
+                while True:
+                    item = in_queue.get()
+                    if item is _STOP:
+                        break
+                    
+                    start = time.perf_counter()
+                    try:
+                        if pool is not None:
+                            result = pool.submit(stage.func, item).result()
+                        else:
+                            result = stage.func(item)
+                        outputs = result if stage.fan_out else [result]
+                        outputs = [output for output in (outputs or []) if output is not None]
+                    except Exception as e:
+                        stage._record(
+                            time.perf_counter() - start,
+                            error={'item': repr(item)[:200], 'error': str(e)}
+                        )
+                        continue
+                    
+                    stage._record(time.perf_counter() - start, emitted=len(outputs))
+                    for output in outputs:
+                        blocked = time.perf_counter()
+                        out_queue.put(output)
+                        stage._add_blocked(time.perf_counter() - blocked)
+            finally:
+                finish_worker(index)
+        
+        def feeder():
+            try:
+                for item in source:
+                    if self._stop_event.is_set():
+                        break
+                    blocked = time.perf_counter()
+                    queues[0].put(item)
+                    self.source_blocked_seconds += time.perf_counter() - blocked
+                    self.source_count += 1
+            except Exception as e:
+                self.source_error = str(e)
+                print(f"Error reading pipeline source: {e}")
+            finally:
+                for _ in range(self.stages[0].workers):
+                    queues[0].put(_STOP)
+        
+        self._started = time.perf_counter()
+        self._finished = None
+        threads = [threading.Thread(target=feeder, name=f"{self.name}-source", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=worker,
+                    args=(index,),
+                    name=f"{self.name}-{stage.name}-{n}",
+                    daemon=True
+                ))
+        for thread in threads:
+            thread.start()
+        
+        reporter = None
+        if report_interval:
+            reporter = threading.Thread(
+                target=self._report_loop,
+                args=(report_interval,),
+                name=f"{self.name}-report",
+                daemon=True
+            )
+            reporter.start()
+        
+        try:
+            while True:
+                output = queues[-1].get()
+                if output is _STOP:
+                    break
+                if on_result is not None:
+                    on_result(output)
+        except BaseException:
+            # Stop feeding and keep draining so the workers can exit
+            self.stop()
+            self._drain(queues[-1], threads)
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+            for pool in pools:
+                if pool is not None:
+                    pool.shutdown()
+            self._finished = time.perf_counter()
+        
+        return self.get_stats()
+    
+    @staticmethod
+    def _drain(out_queue: queue.Queue, threads: List[threading.Thread]):
+        """Discard remaining outputs until every worker has exited"""
+        while any(t.is_alive() for t in threads) or not out_queue.empty():
+            try:
+                out_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+    
+    def _report_loop(self, interval: float):
+        while self._finished is None and not self._stop_event.wait(interval):
+            if self._finished is None:
+                self.print_stats()
+    
+    def get_stats(self) -> Dict:
+        """
+        Get pipeline and per-stage statistics
+        
+        Returns:
+            dict: {
+                'name': str,
+                'elapsed_seconds': float,
+                'source': {'items', 'blocked_seconds', 'error'},
+                'stages': list of Stage.get_stats() dicts
+            }
+        """
+        if self._started is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._finished or time.perf_counter()) - self._started
+        
+        return {
+            'name': self.name,
+            'elapsed_seconds': round(elapsed, 3),
+            'source': {
+                'items': self.source_count,
+                'blocked_seconds': round(self.source_blocked_seconds, 3),
+                'error': self.source_error
+            },
+            'stages': [stage.get_stats(elapsed) for stage in self.stages]
+        }
+    
+    def print_stats(self):
+        """Print a one-line-per-stage progress table"""
+        stats = self.get_stats()
+        print(f"[{self.name}] {stats['elapsed_seconds']:.1f}s  source: {stats['source']['items']} items")
+        for stage in stats['stages']:
+            print(
+                f"  {stage['name']:<12} {stage['processed']:>8} done  "
+                f"{stage['failed']:>5} failed  {stage['items_per_sec']:>9.2f}/s  "
+                f"util {stage['utilization']:.0%}  queue {stage['queue_depth']}"
+            )
+    
+    def __repr__(self) -> str:
+        names = ' -> '.join(stage.name for stage in self.stages)
+        return f"<Pipeline(name='{self.name}', stages='{names}')>"
@@ -6,10 +6,20 @@ from .base_extractor import BaseExtractor
 from .unstructured_extractor import UnstructuredExtractor
 from .docling_extractor import DoclingExtractor
 from .vlm_processor import VLMProcessor
+from .ollama_client import OllamaClient
+from .image_encoder import PageImageEncoder
+from .response_cache import VLMResponseCache
+from .page_router import PageRouter
+from .hybrid_extractor import HybridExtractor
 
 __all__ = [
     'BaseExtractor',
     'UnstructuredExtractor',
     'DoclingExtractor',
-    'VLMProcessor'
+    'VLMProcessor',
+    'OllamaClient',
+    'PageImageEncoder',
+    'VLMResponseCache',
+    'PageRouter',
+    'HybridExtractor'
 ]
\ No newline at end of file
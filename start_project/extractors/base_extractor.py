@@ -3,10 +3,18 @@ Base extractor abstract class
 Defines interface that all extractors must implement
 """
 
+import hashlib
+import json
+import os
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from datetime import datetime
 
+try:
+    from ..utils import FileUtils
+except:
+    from utils import FileUtils
+
 
 class BaseExtractor(ABC):
     """
@@ -14,6 +22,17 @@ class BaseExtractor(ABC):
     
     All extractors (Unstructured, Docling, VLM) must inherit from this
     and implement the required methods
+    
+    With a result cache attached (set_result_cache()), extract_cached()
+    and extract_from_blob_cached() return the stored output of an earlier
+    run for the same file hash, extractor name, version and
+    config_fingerprint(). Changing the version or any option returned by
+    get_config() therefore invalidates the cached results.
+    
+    iter_pages() yields a document page by page as each page is done, so
+    consumers can start on page 1 while later pages are still being
+    extracted. iter_pages_checkpointed() stores every finished page in
+    extracted_content and skips pages stored by an interrupted run.
     """
     
     def __init__(self, name: str, version: str = "1.0.0"):
@@ -28,6 +47,9 @@ class BaseExtractor(ABC):
         self.version = version
         self.extraction_count = 0
         self.last_extraction_time = None
+        self.result_cache = None
+        self.cache_hits = 0
+        self.cache_misses = 0
     
     @abstractmethod
     def extract(self, file_path: str) -> Dict:
@@ -50,12 +72,13 @@ class BaseExtractor(ABC):
         pass
     
     @abstractmethod
-    def extract_from_blob(self, blob: bytes, file_extension: str) -> Dict:
+    def extract_from_blob(self, blob: Union[bytes, str], file_extension: str) -> Dict:
         """
         Extract content from binary data
         
         Args:
-            blob: Binary file content
+            blob: Binary file content, memory-mapped view or path to it
+                (e.g. from DatabaseManager.get_file_blob_path())
             file_extension: File extension (e.g., '.pdf')
             
         Returns:
@@ -63,6 +86,106 @@ class BaseExtractor(ABC):
         """
         pass
     
+    def iter_pages(self, file_path: str, pages: Optional[Iterable[int]] = None) -> Iterator[Dict]:
+        """
+        Extract a document page by page
+        
+        Pages are yielded in page order, each as soon as it is extracted.
+        A failure of the whole document (missing library, invalid file)
+        yields a single failed page with page_number None.
+        
+        The default runs extract() and splits metadata['pages_data'];
+        documents without page data are yielded as one page. Extractors
+        that can process pages separately override this.
+        
+        Args:
+            file_path: Path to file
+            pages: 1-based page numbers to extract (default: all)
+            
+        Yields:
+            dict: Standardized page result (see _standardize_page())
+        """
+        yield from self._split_pages(self.extract(file_path), pages)
+    
+    def count_pages(self, file_path: str) -> Optional[int]:
+        """
+        Number of pages iter_pages() yields for a file
+        
+        Args:
+            file_path: Path to file
+            
+        Returns:
+            int or None: Page count of PDFs (None if unknown)
+        """
+        if os.path.splitext(file_path)[1].lower() != '.pdf':
+            return None
+        return FileUtils.count_pdf_pages(file_path)
+    
+    def iter_pages_checkpointed(
+        self,
+        file_path: str,
+        db,
+        file_hash: Optional[str] = None,
+        pages: Optional[Iterable[int]] = None
+    ) -> Iterator[Dict]:
+        """
+        iter_pages() that resumes from the pages stored by earlier runs
+        
+        Every complete page is stored in extracted_content (see
+        DatabaseManager.put_page_checkpoint()) before it is yielded.
+        Pages already stored for this file, extractor version and
+        config_fingerprint() are yielded from the database with
+        metadata['checkpoint_hit'] set instead of being extracted again,
+        so a job interrupted at page 399 continues with page 400.
+        
+        Args:
+            file_path: Path to file
+            db: DatabaseManager holding extracted_content
+            file_hash: MD5 hash of the file (computed if not given)
+            pages: 1-based page numbers to extract (default: all)
+            
+        Yields:
+            dict: Standardized page result, in page order
+        """
+        if file_hash is None:
+            file_hash = FileUtils.get_file_hash(file_path)
+        fingerprint = self.config_fingerprint()
+        stored = db.get_page_checkpoints(file_hash, self.name, self.version, fingerprint)
+        
+        if pages is None:
+            total = self.count_pages(file_path)
+            wanted = list(range(1, total + 1)) if total is not None else None
+        else:
+            wanted = sorted(set(pages))
+        
+        if wanted is not None:
+            done = [page_number for page_number in wanted if page_number in stored]
+            missing = [page_number for page_number in wanted if page_number not in stored]
+        else:
+            # Unknown page count: extract everything, keep stored pages
+            done, missing = [], None
+        
+        def restored(page_number: int) -> Dict:
+            page = stored[page_number]
+            page.setdefault('metadata', {})['checkpoint_hit'] = True
+            return page
+        
+        extracted = iter(()) if missing == [] else self.iter_pages(file_path, missing)
+        for page in extracted:
+            page_number = page.get('page_number')
+            while done and page_number is not None and done[0] < page_number:
+                yield restored(done.pop(0))
+            
+            if page_number in stored and missing is None:
+                yield restored(page_number)
+                continue
+            if self._checkpointable_page(page):
+                db.put_page_checkpoint(file_hash, self.name, self.version, fingerprint, page)
+            yield page
+        
+        for page_number in done:
+            yield restored(page_number)
+    
     def get_info(self) -> Dict:
         """
         Get extractor information
@@ -74,9 +197,149 @@ class BaseExtractor(ABC):
             'name': self.name,
             'version': self.version,
             'extraction_count': self.extraction_count,
-            'last_extraction_time': self.last_extraction_time
+            'last_extraction_time': self.last_extraction_time,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses
         }
     
+    def get_config(self) -> Dict:
+        """
+        Options that change the extraction output
+        
+        Subclasses return every setting that affects the result, so a
+        change in configuration gets new cache entries.
+        
+        Returns:
+            dict: JSON serialisable configuration
+        """
+        return {}
+    
+    def config_fingerprint(self) -> str:
+        """
+        Short hash of get_config()
+        
+        Returns:
+            str: Hex digest
+        """
+        config = json.dumps(self.get_config(), sort_keys=True, default=str)
+        return hashlib.sha256(config.encode()).hexdigest()[:16]
+    
+    def set_result_cache(self, db) -> 'BaseExtractor':
+        """
+        Attach a result cache
+        
+        Args:
+            db: DatabaseManager holding the extraction_cache table
+                (None detaches the cache)
+            
+        Returns:
+            BaseExtractor: self
+        """
+        self.result_cache = db
+        return self
+    
+    def extract_cached(self, file_path: str, file_hash: Optional[str] = None) -> Dict:
+        """
+        extract() answered from the result cache when possible
+        
+        Args:
+            file_path: Path to file
+            file_hash: MD5 hash of the file (computed if not given)
+            
+        Returns:
+            dict: Extraction results; metadata['cache_hit'] is True when
+            the result came from the cache
+        """
+        if self.result_cache is None:
+            return self.extract(file_path)
+        if file_hash is None:
+            file_hash = FileUtils.get_file_hash(file_path)
+        return self._cached(file_hash, lambda: self.extract(file_path))
+    
+    def extract_from_blob_cached(
+        self,
+        blob: Union[bytes, str],
+        file_extension: str,
+        file_hash: Optional[str] = None
+    ) -> Dict:
+        """
+        extract_from_blob() answered from the result cache when possible
+        
+        Args:
+            blob: Binary file content, memory-mapped view or path to it
+            file_extension: File extension (e.g., '.pdf')
+            file_hash: MD5 hash of the content (computed if not given)
+            
+        Returns:
+            dict: Extraction results (same format as extract_cached())
+        """
+        if self.result_cache is None:
+            return self.extract_from_blob(blob, file_extension)
+        if file_hash is None:
+            if isinstance(blob, str):
+                file_hash = FileUtils.get_file_hash(blob)
+            else:
+                file_hash = hashlib.md5(blob).hexdigest()
+        return self._cached(file_hash, lambda: self.extract_from_blob(blob, file_extension))
+    
+    def _cached(self, file_hash: Optional[str], run: Callable[[], Dict]) -> Dict:
+        """Look up file_hash in the result cache, else run and store"""
+        if file_hash is None:
+            return run()
+        
+        fingerprint = self.config_fingerprint()
+        result = self.result_cache.get_cached_extraction(file_hash, self.name, self.version, fingerprint)
+        if result is not None:
+            self.cache_hits += 1
+            result.setdefault('metadata', {})['cache_hit'] = True
+            return result
+        
+        self.cache_misses += 1
+        result = run()
+        if self._cacheable_result(result):
+            self.result_cache.put_cached_extraction(file_hash, self.name, self.version, fingerprint, result)
+        return result
+    
+    def _cacheable_result(self, result: Dict) -> bool:
+        """Only complete, successful results are cached"""
+        metadata = result.get('metadata') or {}
+        return bool(result.get('success')) and not metadata.get('failed_pages') and not metadata.get('partial_pages')
+    
+    def _checkpointable_page(self, page: Dict) -> bool:
+        """Only complete, successful pages are checkpointed"""
+        metadata = page.get('metadata') or {}
+        return bool(page.get('success')) and page.get('page_number') is not None and not metadata.get('partial')
+    
+    def _extract_blob(
+        self,
+        blob: Union[bytes, str],
+        file_extension: str,
+        extract_stream: Callable[[BinaryIO, str, int], Dict]
+    ) -> Dict:
+        """
+        Route extract_from_blob() input to the path or the in-memory code path
+        
+        Paths (e.g. blob store entries) are passed to extract() without
+        copying; bytes and memory-mapped views are opened as a seekable
+        stream for the backend.
+        
+        Args:
+            blob: Binary file content, memory-mapped view or path to it
+            file_extension: File extension (e.g., '.pdf')
+            extract_stream: Called as extract_stream(stream, file_name,
+                file_size) with file_name 'document<extension>'
+        
+        Returns:
+            dict: Extraction results
+        """
+        if isinstance(blob, (str, os.PathLike)):
+            with FileUtils.blob_as_path(blob, suffix=file_extension) as path:
+                return self.extract(path)
+        
+        file_name = f"document{file_extension.lower()}"
+        with FileUtils.blob_as_stream(blob) as stream:
+            return extract_stream(stream, file_name, FileUtils.blob_size(blob))
+    
     def _increment_counter(self):
         """Increment extraction counter and update timestamp"""
         self.extraction_count += 1
@@ -117,6 +380,114 @@ class BaseExtractor(ABC):
             'error': error
         }
     
+    def _standardize_page(
+        self,
+        page_number: Optional[int],
+        success: bool,
+        text: str = "",
+        tables: List = None,
+        images: List = None,
+        metadata: Dict = None,
+        error: str = None
+    ) -> Dict:
+        """
+        Standardize one page of iter_pages() output
+        
+        Args:
+            page_number: 1-based page number (None for a failure of the
+                whole document)
+            success: Whether extraction of the page succeeded
+            text: Extracted text of the page
+            tables: Tables on the page
+            images: Images on the page
+            metadata: Additional metadata
+            error: Error message if failed
+            
+        Returns:
+            dict: Standardized extraction result with page_number
+        """
+        page = self._standardize_output(success, text, tables, images, metadata, error)
+        page['page_number'] = page_number
+        return page
+    
+    def _split_pages(self, result: Dict, pages: Optional[Iterable[int]] = None) -> Iterator[Dict]:
+        """
+        Split a complete extraction result into iter_pages() output
+        
+        Tables and images are assigned to the page in their page_number
+        or page key (or metadata); metadata['pages_data'] gives the page
+        texts. Results without page data become page 1.
+        
+        Args:
+            result: Standardized extraction result
+            pages: 1-based page numbers to keep (default: all)
+            
+        Yields:
+            dict: Standardized page result
+        """
+        if not result['success']:
+            yield self._standardize_page(None, False, metadata=result.get('metadata'), error=result.get('error'))
+            return
+        
+        wanted = set(pages) if pages is not None else None
+        metadata = result.get('metadata') or {}
+        pages_data = metadata.get('pages_data')
+        if not pages_data:
+            pages_data = [{'page_number': 1, 'text': result['text']}]
+        total_pages = metadata.get('total_pages') or len(pages_data)
+        
+        by_page = {page_data['page_number']: page_data for page_data in pages_data}
+        for page_number in metadata.get('failed_pages') or []:
+            by_page.setdefault(page_number, None)
+        
+        for page_number in sorted(by_page):
+            if wanted is not None and page_number not in wanted:
+                continue
+            page_data = by_page[page_number]
+            if page_data is None:
+                yield self._standardize_page(page_number, False, error=f"Extraction of page {page_number} failed")
+                continue
+            yield self._standardize_page(
+                page_number,
+                True,
+                text=page_data.get('text', ''),
+                tables=[t for t in result['tables'] if self._item_page(t, total_pages) == page_number],
+                images=[i for i in result['images'] if self._item_page(i, total_pages) == page_number],
+                metadata={k: v for k, v in page_data.items() if k not in ('page_number', 'text')}
+            )
+    
+    @staticmethod
+    def _item_page(item: Dict, total_pages: int) -> Optional[int]:
+        """Page of a table or image dict (page 1 for single-page results)"""
+        metadata = item.get('metadata') or {}
+        page = (
+            item.get('page_number') or item.get('page')
+            or metadata.get('page_number') or metadata.get('page')
+        )
+        if page is None and total_pages == 1:
+            return 1
+        return page
+    
+    @staticmethod
+    def _page_runs(page_numbers: Iterable[int], max_length: int) -> List[Tuple[int, int]]:
+        """
+        Group page numbers into runs of consecutive pages
+        
+        Args:
+            page_numbers: Sorted 1-based page numbers
+            max_length: Most pages per run
+            
+        Returns:
+            list: (first, last) page number per run
+        """
+        runs = []
+        for page_number in page_numbers:
+            if runs and runs[-1][1] == page_number - 1 and page_number - runs[-1][0] < max_length:
+                runs[-1] = (runs[-1][0], page_number)
+            else:
+                runs.append((page_number, page_number))
+        return runs
+    
     def validate_file(self, file_path: str) -> tuple:
         """
         Basic file validation
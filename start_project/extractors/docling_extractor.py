@@ -3,8 +3,8 @@ Docling extractor for document content extraction
 """
 
 import os
-import tempfile
-from typing import Dict, List, Optional
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from datetime import datetime
 
 # from .base_extractor import BaseExtractor
@@ -15,23 +15,43 @@ except:
     from base_extractor import BaseExtractor
 
 try:
-    from ..utils import FileUtils, Logger
+    from ..utils import Logger
 except:
-    from utils import FileUtils, Logger
+    from utils import Logger
 
 class DoclingExtractor(BaseExtractor):
     """
     Extract content using Docling library
     
     Docling specializes in document layout analysis
+    
+    Building a DocumentConverter pipeline loads the layout, table and OCR
+    models, which takes seconds. Converters are therefore created once per
+    configuration and shared by all extractors in the process; calls on a
+    shared converter are serialized.
+    
+    iter_pages() converts PDFs in runs of page_batch_size pages with
+    Docling's page_range, so the first pages are available long before
+    the whole document is converted.
     """
     
+    OCR_ENGINES = ('auto', 'rapidocr', 'easyocr', 'tesseract')
+    TABLE_MODES = ('accurate', 'fast')
+    
+    # {config key: (DocumentConverter, lock)}
+    _converters: Dict[Tuple, Tuple[object, threading.RLock]] = {}
+    _converters_lock = threading.Lock()
+    
     def __init__(
         self,
         extract_tables: bool = True,
         extract_images: bool = True,
         languages: List[str] = None,
-        logger: Optional[Logger] = None
+        logger: Optional[Logger] = None,
+        do_ocr: bool = True,
+        ocr_engine: str = 'auto',
+        table_mode: str = 'accurate',
+        page_batch_size: int = 4
     ):
         """
         Initialize DoclingExtractor
@@ -41,13 +61,31 @@ class DoclingExtractor(BaseExtractor):
             extract_images: Whether to extract images
             languages: List of languages (for OCR if needed)
             logger: Logger instance
+            do_ocr: Run OCR on bitmap content
+            ocr_engine: 'auto' (Docling's choice), 'rapidocr', 'easyocr'
+                or 'tesseract'; languages are passed to explicit engines
+                in that engine's notation
+            table_mode: TableFormer mode, 'accurate' or 'fast'
+            page_batch_size: Pages converted per Docling call in
+                iter_pages()
         """
         super().__init__(name="docling", version="1.0.0")
         
+        if ocr_engine not in self.OCR_ENGINES:
+            raise ValueError(f"Invalid OCR engine: {ocr_engine}. Use one of {self.OCR_ENGINES}")
+        if table_mode not in self.TABLE_MODES:
+            raise ValueError(f"Invalid table mode: {table_mode}. Use one of {self.TABLE_MODES}")
+        if page_batch_size < 1:
+            raise ValueError("page_batch_size must be at least 1")
+        
         self.extract_tables = extract_tables
         self.extract_images = extract_images
         self.languages = languages or ['eng']
         self.logger = logger or Logger.get_logger("DoclingExtractor")
+        self.do_ocr = do_ocr
+        self.ocr_engine = ocr_engine
+        self.table_mode = table_mode
+        self.page_batch_size = page_batch_size
         
         # Import docling library
         try:
@@ -58,6 +96,95 @@ class DoclingExtractor(BaseExtractor):
             self.logger.error("docling library not installed")
             self.available = False
     
+    @property
+    def config_key(self) -> Tuple:
+        """Key of the cached converter serving this configuration"""
+        languages = tuple(self.languages) if self.ocr_engine != 'auto' else ()
+        return (self.do_ocr, self.ocr_engine, languages, self.extract_tables, self.table_mode)
+    
+    def get_config(self) -> Dict:
+        """Options that change the extraction output (result cache key)"""
+        return {
+            'converter': list(self.config_key),
+            'extract_images': self.extract_images
+        }
+    
+    def _build_converter(self):
+        """Create a DocumentConverter for the current configuration"""
+        if self.config_key == (True, 'auto', (), True, 'accurate'):
+            # Docling's defaults
+            return self.DocumentConverter()
+        
+        from docling.datamodel.base_models import InputFormat
+        from docling.datamodel.pipeline_options import PdfPipelineOptions, TableFormerMode
+        from docling.document_converter import PdfFormatOption
+        
+        pipeline_options = PdfPipelineOptions()
+        pipeline_options.do_ocr = self.do_ocr
+        pipeline_options.do_table_structure = self.extract_tables
+        pipeline_options.table_structure_options.mode = (
+            TableFormerMode.FAST if self.table_mode == 'fast' else TableFormerMode.ACCURATE
+        )
+        
+        if self.do_ocr and self.ocr_engine != 'auto':
+            from docling.datamodel import pipeline_options as options_module
+            ocr_options_cls = {
+                'rapidocr': options_module.RapidOcrOptions,
+                'easyocr': options_module.EasyOcrOptions,
+                'tesseract': options_module.TesseractCliOcrOptions
+            }[self.ocr_engine]
+            pipeline_options.ocr_options = ocr_options_cls(lang=list(self.languages))
+        
+        return self.DocumentConverter(
+            format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)}
+        )
+    
+    def _get_converter(self) -> Tuple[object, threading.RLock]:
+        """Get (and create on first use) the shared converter and its lock"""
+        key = self.config_key
+        with self._converters_lock:
+            entry = self._converters.get(key)
+            if entry is None:
+                self.logger.info(f"Creating Docling converter for {key}")
+                entry = (self._build_converter(), threading.RLock())
+                self._converters[key] = entry
+            return entry
+    
+    def warmup(self) -> bool:
+        """
+        Create the converter and load its PDF pipeline models now
+        
+        Without warmup the first extract() pays the model loading time.
+        
+        Returns:
+            bool: True if the converter is ready
+        """
+        if not self.available:
+            return False
+        
+        try:
+            converter, lock = self._get_converter()
+            if hasattr(converter, 'initialize_pipeline'):
+                from docling.datamodel.base_models import InputFormat
+                with lock:
+                    converter.initialize_pipeline(InputFormat.PDF)
+            return True
+        
+        except Exception as e:
+            self.logger.error(f"Docling warmup failed: {str(e)}", exc_info=True)
+            return False
+    
+    def close(self):
+        """Drop the cached converter of this configuration and free its models"""
+        with self._converters_lock:
+            self._converters.pop(self.config_key, None)
+    
+    def __enter__(self) -> 'DoclingExtractor':
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
     def extract(self, file_path: str) -> Dict:
         """
         Extract content from file using Docling
@@ -94,84 +221,269 @@ class DoclingExtractor(BaseExtractor):
         try:
             self.logger.info(f"Extracting content from: {os.path.basename(file_path)}")
             
-            # Create converter
-            converter = self.DocumentConverter()
+            # Convert document with the shared converter
+            converter, lock = self._get_converter()
+            with lock:
+                result = converter.convert(file_path)
             
-            # Convert document
-            result = converter.convert(file_path)
+            return self._build_output(result, file_path, start_time)
+        
+        except Exception as e:
+            self.logger.error(f"Extraction failed: {str(e)}", exc_info=True)
+            return self._standardize_output(
+                success=False,
+                error=f"Extraction error: {str(e)}"
+            )
+    
+    def extract_many(self, file_paths: Iterable[str]) -> Iterator[Dict]:
+        """
+        Extract many files through one Docling convert_all() run
+        
+        Results are yielded in input order as soon as each document is
+        converted; a failing document yields a failed result without
+        stopping the batch. The shared converter stays locked until the
+        generator is exhausted or closed.
+        
+        Args:
+            file_paths: Paths to files
             
-            # Extract text content
-            full_text = result.document.export_to_markdown()
+        Yields:
+            dict: Extraction result per file (same format as extract(),
+                with metadata['file_path'] set)
+        """
+        checked = [(path, *self.validate_file(path)) for path in file_paths]
+        
+        if not self.available:
+            for file_path, _, _ in checked:
+                yield self._standardize_output(
+                    success=False,
+                    error="docling library not available",
+                    metadata={'file_path': file_path}
+                )
+            return
+        
+        converter, lock = self._get_converter()
+        with lock:
+            valid_paths = [path for path, is_valid, _ in checked if is_valid]
+            conversions = converter.convert_all(valid_paths, raises_on_error=False)
+            start_time = datetime.now()
             
-            # Extract tables
-            tables = []
-            if self.extract_tables and hasattr(result.document, 'tables'):
-                for i, table in enumerate(result.document.tables):
-                    tables.append({
-                        'index': i,
-                        'text': str(table),
-                        'data': table.export_to_dataframe().to_dict() if hasattr(table, 'export_to_dataframe') else {},
-                        'metadata': {
-                            'rows': getattr(table, 'num_rows', 0),
-                            'cols': getattr(table, 'num_cols', 0)
-                        }
-                    })
+            for file_path, is_valid, error_msg in checked:
+                if not is_valid:
+                    output = self._standardize_output(success=False, error=error_msg)
+                else:
+                    try:
+                        result = next(conversions)
+                        status = str(getattr(result.status, 'value', result.status))
+                        if status in ('failure', 'skipped'):
+                            errors = '; '.join(
+                                str(getattr(error, 'error_message', error))
+                                for error in getattr(result, 'errors', None) or []
+                            )
+                            output = self._standardize_output(
+                                success=False,
+                                error=f"Conversion {status}: {errors}" if errors else f"Conversion {status}"
+                            )
+                        else:
+                            output = self._build_output(result, file_path, start_time)
+                    except Exception as e:
+                        self.logger.error(f"Extraction failed: {str(e)}", exc_info=True)
+                        output = self._standardize_output(
+                            success=False,
+                            error=f"Extraction error: {str(e)}"
+                        )
+                    start_time = datetime.now()
+                
+                output['metadata']['file_path'] = file_path
+                yield output
+    
+    def _build_output(
+        self,
+        result,
+        file_path: str,
+        start_time: datetime,
+        file_size: Optional[int] = None
+    ) -> Dict:
+        """
+        Turn a Docling ConversionResult into the standardized output
+        
+        Args:
+            result: Docling ConversionResult
+            file_path: Converted file (or stream name)
+            start_time: When conversion of this document started
+            file_size: Size of in-memory content (default: size of file_path)
             
-            # Extract images
-            images = []
-            if self.extract_images and hasattr(result.document, 'pictures'):
-                for i, picture in enumerate(result.document.pictures):
-                    images.append({
-                        'index': i,
-                        'caption': getattr(picture, 'caption', ''),
-                        'metadata': {
-                            'page': getattr(picture, 'page', None)
-                        }
-                    })
+        Returns:
+            dict: Standardized extraction result
+        """
+        # Extract text content
+        full_text = result.document.export_to_markdown()
+        
+        tables = self._tables(result.document)
+        images = self._images(result.document)
+        
+        # Calculate duration
+        duration = (datetime.now() - start_time).total_seconds()
+        
+        # Increment counter
+        self._increment_counter()
+        
+        # Log success
+        self.logger.log_extraction(
+            file_name=os.path.basename(file_path),
+            extractor=self.name,
+            status="SUCCESS",
+            elements_count=len(tables) + len(images),
+            duration=duration
+        )
+        
+        return self._standardize_output(
+            success=True,
+            text=full_text,
+            tables=tables,
+            images=images,
+            metadata={
+                'table_count': len(tables),
+                'image_count': len(images),
+                'languages': self.languages,
+                'duration_seconds': duration,
+                'file_name': os.path.basename(file_path),
+                'file_size': file_size if file_size is not None else os.path.getsize(file_path)
+            }
+        )
+    
+    @staticmethod
+    def _page_of(item) -> Optional[int]:
+        """1-based page number of a Docling table or picture"""
+        prov = getattr(item, 'prov', None)
+        if prov:
+            return getattr(prov[0], 'page_no', None)
+        return getattr(item, 'page', None)
+    
+    def _tables(self, document, page_no: Optional[int] = None) -> List[Dict]:
+        """
+        Table dicts of a DoclingDocument
+        
+        Args:
+            document: DoclingDocument
+            page_no: Only tables on this 1-based page (default: all)
             
-            # Calculate duration
-            duration = (datetime.now() - start_time).total_seconds()
+        Returns:
+            list: Table dictionaries
+        """
+        tables = []
+        if self.extract_tables and hasattr(document, 'tables'):
+            for i, table in enumerate(document.tables):
+                page = self._page_of(table)
+                if page_no is not None and page != page_no:
+                    continue
+                tables.append({
+                    'index': i,
+                    'text': str(table),
+                    'data': table.export_to_dataframe().to_dict() if hasattr(table, 'export_to_dataframe') else {},
+                    'metadata': {
+                        'rows': getattr(table, 'num_rows', 0),
+                        'cols': getattr(table, 'num_cols', 0),
+                        'page': page
+                    }
+                })
+        return tables
+    
+    def _images(self, document, page_no: Optional[int] = None) -> List[Dict]:
+        """
+        Image dicts of a DoclingDocument
+        
+        Args:
+            document: DoclingDocument
+            page_no: Only pictures on this 1-based page (default: all)
             
-            # Increment counter
-            self._increment_counter()
+        Returns:
+            list: Image dictionaries
+        """
+        images = []
+        if self.extract_images and hasattr(document, 'pictures'):
+            for i, picture in enumerate(document.pictures):
+                page = self._page_of(picture)
+                if page_no is not None and page != page_no:
+                    continue
+                images.append({
+                    'index': i,
+                    'caption': getattr(picture, 'caption', ''),
+                    'metadata': {
+                        'page': page
+                    }
+                })
+        return images
+    
+    def iter_pages(self, file_path: str, pages: Optional[Iterable[int]] = None) -> Iterator[Dict]:
+        """
+        Extract a document page by page
+        
+        PDFs are converted in runs of up to page_batch_size consecutive
+        pages (Docling page_range); the pages of a run are yielded as soon
+        as it is converted. Other formats are converted whole and split
+        (see BaseExtractor.iter_pages()).
+        
+        Args:
+            file_path: Path to file
+            pages: 1-based page numbers to extract (default: all)
             
-            # Log success
-            self.logger.log_extraction(
-                file_name=os.path.basename(file_path),
-                extractor=self.name,
-                status="SUCCESS",
-                elements_count=len(tables) + len(images),
-                duration=duration
-            )
+        Yields:
+            dict: Standardized page result
+        """
+        if not self.available:
+            yield self._standardize_page(None, False, error="docling library not available")
+            return
+        
+        is_valid, error_msg = self.validate_file(file_path)
+        if not is_valid:
+            yield self._standardize_page(None, False, error=error_msg)
+            return
+        
+        total_pages = self.count_pages(file_path)
+        if total_pages is None:
+            yield from super().iter_pages(file_path, pages)
+            return
+        
+        wanted = range(1, total_pages + 1) if pages is None else sorted(n for n in set(pages) if 1 <= n <= total_pages)
+        self.logger.info(f"Extracting pages from: {os.path.basename(file_path)}")
+        converter, lock = self._get_converter()
+        
+        for first, last in self._page_runs(wanted, self.page_batch_size):
+            start_time = datetime.now()
+            try:
+                with lock:
+                    result = converter.convert(file_path, page_range=(first, last))
+                document = result.document
+            except Exception as e:
+                self.logger.error(f"Extraction of pages {first}-{last} failed: {str(e)}", exc_info=True)
+                for page_no in range(first, last + 1):
+                    yield self._standardize_page(page_no, False, error=f"Extraction error: {str(e)}")
+                continue
             
-            return self._standardize_output(
-                success=True,
-                text=full_text,
-                tables=tables,
-                images=images,
-                metadata={
-                    'table_count': len(tables),
-                    'image_count': len(images),
-                    'languages': self.languages,
-                    'duration_seconds': duration,
-                    'file_name': os.path.basename(file_path),
-                    'file_size': os.path.getsize(file_path)
-                }
-            )
+            duration = (datetime.now() - start_time).total_seconds()
+            for page_no in range(first, last + 1):
+                yield self._standardize_page(
+                    page_no,
+                    True,
+                    text=document.export_to_markdown(page_no=page_no),
+                    tables=self._tables(document, page_no),
+                    images=self._images(document, page_no),
+                    metadata={
+                        'total_pages': total_pages,
+                        'page_range': [first, last],
+                        'duration_seconds': duration / (last - first + 1)
+                    }
+                )
         
-        except Exception as e:
-            self.logger.error(f"Extraction failed: {str(e)}", exc_info=True)
-            return self._standardize_output(
-                success=False,
-                error=f"Extraction error: {str(e)}"
-            )
+        self._increment_counter()
     
-    def extract_from_blob(self, blob: bytes, file_extension: str) -> Dict:
+    def extract_from_blob(self, blob: Union[bytes, str], file_extension: str) -> Dict:
         """
         Extract content from binary data
         
         Args:
-            blob: Binary file content
+            blob: Binary file content, memory-mapped view or path to it
             file_extension: File extension (e.g., '.pdf')
             
         Returns:
@@ -184,23 +496,18 @@ class DoclingExtractor(BaseExtractor):
                 error="docling library not available"
             )
         
-        try:
-            # Create temporary file
-            temp_path = FileUtils.create_temp_file(blob, suffix=file_extension)
-            
-            if not temp_path:
-                return self._standardize_output(
-                    success=False,
-                    error="Failed to create temporary file"
-                )
-            
-            # Extract from temporary file
-            result = self.extract(temp_path)
+        def extract_stream(stream, file_name: str, file_size: int) -> Dict:
+            from docling.datamodel.base_models import DocumentStream
             
-            # Clean up
-            FileUtils.delete_file(temp_path)
+            start_time = datetime.now()
+            self.logger.info(f"Extracting content from: {file_name} (in memory)")
+            converter, lock = self._get_converter()
+            with lock:
+                result = converter.convert(DocumentStream(name=file_name, stream=stream))
+            return self._build_output(result, file_name, start_time, file_size=file_size)
             
-            return result
+        try:
+            return self._extract_blob(blob, file_extension, extract_stream)
         
         except Exception as e:
             self.logger.error(f"Extraction from blob failed: {str(e)}", exc_info=True)
@@ -219,7 +526,7 @@ class DoclingExtractor(BaseExtractor):
         Returns:
             list: List of table dictionaries
         """
-        result = self.extract(file_path)
+        result = self.extract_cached(file_path)
         
         if result['success']:
             return result['tables']
@@ -236,7 +543,7 @@ class DoclingExtractor(BaseExtractor):
         Returns:
             str: Extracted text
         """
-        result = self.extract(file_path)
+        result = self.extract_cached(file_path)
         
         if result['success']:
             return result['text']
@@ -0,0 +1,324 @@
+"""
+Hybrid PDF extractor
+Native text layer for born-digital pages, VLM only for pages that need it
+"""
+
+import os
+import time
+from typing import Dict, List, Optional, Union
+from datetime import datetime
+
+try:
+    from .base_extractor import BaseExtractor
+    from .page_router import PageRouter
+except:
+    from base_extractor import BaseExtractor
+    from page_router import PageRouter
+
+try:
+    from ..utils import Logger
+except:
+    from utils import Logger
+
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+
+class HybridExtractor(BaseExtractor):
+    """
+    Extract PDFs page by page with the cheapest sufficient method
+    
+    Every page is classified by PageRouter:
+    - 'text' pages use the PDF text layer (milliseconds per page)
+    - 'table' pages use the text layer plus PyMuPDF table extraction
+    - 'vlm' pages (scans, figures, diagrams) are sent to the VLM
+    
+    The page texts are merged in page order in the same
+    "=== Page N ===" layout as VLMProcessor. Without a usable VLM,
+    'vlm' pages fall back to their text layer and are reported as
+    'vlm_skipped'.
+    
+    Example:
+        extractor = HybridExtractor(vlm=VLMProcessor(max_concurrency=2))
+        result = extractor.extract("manual.pdf")
+        print(result['metadata']['routes'])  # {'text': 12, 'table': 2, 'vlm': 1}
+    """
+    
+    def __init__(
+        self,
+        vlm=None,
+        router: Optional[PageRouter] = None,
+        logger: Optional[Logger] = None
+    ):
+        """
+        Initialize hybrid extractor
+        
+        Args:
+            vlm: VLMProcessor for 'vlm' pages (None = text layer only)
+            router: PageRouter with the classification thresholds
+            logger: Logger instance
+        """
+        super().__init__(name="Hybrid", version="1.0.0")
+        
+        self.vlm = vlm
+        self.router = router or PageRouter()
+        self.logger = logger or Logger.get_logger("HybridExtractor")
+        
+        self.available = PYMUPDF_AVAILABLE
+        if not self.available:
+            self.logger.error("PyMuPDF not installed. Install with: pip install pymupdf")
+    
+    @property
+    def vlm_available(self) -> bool:
+        return self.vlm is not None and getattr(self.vlm, 'available', False)
+    
+    def get_config(self) -> Dict:
+        """Options that change the extraction output (result cache key)"""
+        return {
+            'router': {
+                'min_text_chars': self.router.min_text_chars,
+                'max_image_coverage': self.router.max_image_coverage,
+                'max_garbled_ratio': self.router.max_garbled_ratio,
+                'table_min_drawings': self.router.table_min_drawings,
+                'diagram_min_drawings': self.router.diagram_min_drawings
+            },
+            'vlm': self.vlm.get_config() if self.vlm_available else None
+        }
+    
+    def route(self, file_path: str) -> List[Dict]:
+        """
+        Classify the pages of a PDF without extracting them
+        
+        Args:
+            file_path: Path to PDF
+        
+        Returns:
+            list: PageRouter.classify() result per page
+        """
+        with fitz.open(file_path) as doc:
+            return self.router.route_document(doc)
+    
+    def extract(self, file_path: str) -> Dict:
+        """
+        Extract content from PDF
+        
+        Args:
+            file_path: Path to PDF
+        
+        Returns:
+            dict: Extraction results; metadata['routes'] holds the page
+            count per route and metadata['pages_data'] the route and
+            reason of every page
+        """
+        start_time = datetime.now()
+        
+        if not self.available:
+            return self._standardize_output(
+                success=False,
+                error="PyMuPDF not installed"
+            )
+        
+        is_valid, error_msg = self.validate_file(file_path)
+        if not is_valid:
+            return self._standardize_output(
+                success=False,
+                error=error_msg
+            )
+        
+        if os.path.splitext(file_path)[1].lower() != '.pdf':
+            return self._standardize_output(
+                success=False,
+                error=f"Unsupported file type: {os.path.splitext(file_path)[1]}"
+            )
+        
+        try:
+            self.logger.info(f"Extracting with page routing: {os.path.basename(file_path)}")
+            with fitz.open(file_path) as doc:
+                return self._extract_document(doc, file_path, os.path.getsize(file_path), start_time)
+        
+        except Exception as e:
+            self.logger.error(f"Hybrid extraction failed: {str(e)}", exc_info=True)
+            return self._standardize_output(
+                success=False,
+                error=f"Hybrid extraction error: {str(e)}"
+            )
+    
+    def _extract_document(self, doc, file_path: str, file_size: int, start_time: datetime) -> Dict:
+        """
+        Route, extract and merge the pages of an open PDF
+        
+        Args:
+            doc: Open PyMuPDF document
+            file_path: Path to PDF (name only for in-memory documents)
+            file_size: Size of the PDF in bytes
+            start_time: When extraction started
+        
+        Returns:
+            dict: Extraction results (see extract())
+        """
+        route_start = time.perf_counter()
+        decisions = self.router.route_document(doc)
+        route_seconds = time.perf_counter() - route_start
+        
+        vlm_pages = [d['page_number'] - 1 for d in decisions if d['route'] == 'vlm']
+        vlm_results = {}
+        vlm_seconds = 0.0
+        if vlm_pages and self.vlm_available:
+            self.logger.info(f"  Sending {len(vlm_pages)}/{len(decisions)} pages to VLM")
+            vlm_start = time.perf_counter()
+            vlm_results = dict(self.vlm.process_pages(file_path, vlm_pages, doc=doc))
+            vlm_seconds = time.perf_counter() - vlm_start
+        elif vlm_pages:
+            self.logger.warning(f"  VLM not available; using text layer for {len(vlm_pages)} pages")
+        
+        result = self._merge(file_path, file_size, decisions, vlm_results)
+        
+        metadata = result['metadata']
+        metadata['routing_seconds'] = round(route_seconds, 3)
+        metadata['vlm_seconds'] = round(vlm_seconds, 3)
+        vlm_done = metadata['routes']['vlm']
+        if vlm_done:
+            # Pages kept off the VLM at the measured per-page VLM cost
+            per_page = vlm_seconds / vlm_done
+            metadata['estimated_seconds_saved'] = round(
+                per_page * (len(decisions) - vlm_done) - route_seconds, 1
+            )
+        
+        duration = (datetime.now() - start_time).total_seconds()
+        metadata['duration_seconds'] = duration
+        
+        self._increment_counter()
+        
+        self.logger.info(
+            f"  Routes: " + ", ".join(f"{k}={v}" for k, v in metadata['routes'].items() if v)
+        )
+        self.logger.log_extraction(
+            file_name=os.path.basename(file_path),
+            extractor=self.name,
+            status="SUCCESS",
+            duration=duration
+        )
+        
+        return result
+    
+    def _merge(
+        self,
+        file_path: str,
+        file_size: int,
+        decisions: List[Dict],
+        vlm_results: Dict[int, Dict]
+    ) -> Dict:
+        """
+        Combine routed pages into the extraction output
+        
+        Args:
+            file_path: Path to PDF
+            file_size: Size of the PDF in bytes
+            decisions: PageRouter.classify() result per page
+            vlm_results: page_num -> VLM result for pages sent to the VLM
+        
+        Returns:
+            dict: Extraction results
+        """
+        all_text = []
+        all_pages_data = []
+        all_tables = []
+        failed_pages = []
+        routes = {'text': 0, 'table': 0, 'vlm': 0, 'vlm_skipped': 0}
+        
+        for decision in decisions:
+            page_num = decision['page_number'] - 1
+            route = decision['route']
+            page_text = decision['text'].strip()
+            tokens = 0
+            
+            if route == 'vlm':
+                vlm_result = vlm_results.get(page_num)
+                if vlm_result and vlm_result['success']:
+                    page_text = vlm_result['response']
+                    tokens = vlm_result.get('tokens', 0)
+                else:
+                    if vlm_result is not None:
+                        failed_pages.append(page_num + 1)
+                        self.logger.error(f"  VLM failed on page {page_num + 1}: {vlm_result.get('error')}")
+                    route = 'vlm_skipped'
+            
+            elif route == 'table':
+                for table in decision['tables']:
+                    all_tables.append(dict(table, index=len(all_tables)))
+            
+            routes[route] += 1
+            all_text.append(f"=== Page {page_num + 1} ===\n{page_text}\n")
+            all_pages_data.append({
+                'page_number': page_num + 1,
+                'route': route,
+                'reason': decision['reason'],
+                'text': page_text,
+                'tables': len(decision['tables']),
+                'tokens_used': tokens
+            })
+        
+        return self._standardize_output(
+            success=True,
+            text="\n\n".join(all_text),
+            tables=all_tables,
+            metadata={
+                'total_pages': len(decisions),
+                'pages_processed': len(all_pages_data),
+                'routes': routes,
+                'pages_data': all_pages_data,
+                'failed_pages': failed_pages,
+                'model': self.vlm.model_name if self.vlm_available else None,
+                'file_name': os.path.basename(file_path),
+                'file_size': file_size
+            }
+        )
+    
+    def extract_from_blob(self, blob: Union[bytes, str], file_extension: str) -> Dict:
+        """
+        Extract content from binary data
+        
+        Args:
+            blob: Binary file content, memory-mapped view or path to it
+            file_extension: File extension
+        
+        Returns:
+            dict: Extraction results
+        """
+        def extract_stream(stream, file_name: str, file_size: int) -> Dict:
+            if not self.available:
+                return self._standardize_output(
+                    success=False,
+                    error="PyMuPDF not installed"
+                )
+            if file_extension.lower() != '.pdf':
+                return self._standardize_output(
+                    success=False,
+                    error=f"Unsupported file type: {file_extension}"
+                )
+            
+            start_time = datetime.now()
+            self.logger.info(f"Extracting with page routing: {file_name} (in memory)")
+            with fitz.open(stream=stream, filetype='pdf') as doc:
+                return self._extract_document(doc, file_name, file_size, start_time)
+        
+        try:
+            return self._extract_blob(blob, file_extension, extract_stream)
+        
+        except Exception as e:
+            return self._standardize_output(
+                success=False,
+                error=f"Error processing blob: {str(e)}"
+            )
+    
+    def get_supported_formats(self) -> List[str]:
+        """
+        Get list of supported file formats
+        
+        Returns:
+            list: Supported file extensions
+        """
+        return ['.pdf']
@@ -0,0 +1,205 @@
+"""
+Page image encoder for VLM input
+Renders PDF pages straight to PNG/JPEG/WebP bytes with PyMuPDF
+"""
+
+import base64
+from io import BytesIO
+from typing import Dict, Optional, Union
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+
+class PageImageEncoder:
+    """
+    Render and encode PDF pages for a vision model
+    
+    PNG and JPEG are encoded by PyMuPDF directly from the pixmap
+    (pix.tobytes()), without a PIL image or intermediate buffers. WebP is
+    not supported by PyMuPDF and goes through PIL on a view of the pixmap
+    samples.
+    
+    Downscaling is done by rendering at a lower zoom, not by resizing the
+    rendered image: max_long_edge caps the longer side of the output in
+    pixels (set it to the model's native input resolution; larger images
+    only cost encode time, upload and vision tokens).
+    
+    Example:
+        encoder = PageImageEncoder(image_format='jpeg', quality=80, grayscale='auto', max_long_edge=1536)
+        vlm = VLMProcessor(image_encoder=encoder)
+    """
+    
+    FORMATS = ('png', 'jpeg', 'webp')
+    
+    PRESETS: Dict[str, Dict] = {
+        # Same pixels as the original PIL PNG path
+        'png': {'image_format': 'png'},
+        'jpeg': {'image_format': 'jpeg', 'quality': 85},
+        'jpeg-gray': {'image_format': 'jpeg', 'quality': 85, 'grayscale': 'auto'},
+        'jpeg-1536': {'image_format': 'jpeg', 'quality': 85, 'grayscale': 'auto', 'max_long_edge': 1536},
+        'webp': {'image_format': 'webp', 'quality': 80}
+    }
+    
+    def __init__(
+        self,
+        image_format: str = 'png',
+        quality: int = 85,
+        grayscale: Union[bool, str] = False,
+        max_long_edge: Optional[int] = None,
+        zoom: float = 2.0
+    ):
+        """
+        Initialize encoder
+        
+        Args:
+            image_format: 'png', 'jpeg' or 'webp'
+            quality: JPEG/WebP quality (1-100)
+            grayscale: True, False or 'auto' (gray unless the page
+                contains embedded images)
+            max_long_edge: Maximum width/height of the output in pixels
+            zoom: Render zoom (2.0 = 144 dpi); lowered to honour
+                max_long_edge, never raised
+        """
+        if image_format not in self.FORMATS:
+            raise ValueError(f"Invalid image format: {image_format}. Use one of {self.FORMATS}")
+        if grayscale not in (True, False, 'auto'):
+            raise ValueError("grayscale must be True, False or 'auto'")
+        
+        self.image_format = image_format
+        self.quality = quality
+        self.grayscale = grayscale
+        self.max_long_edge = max_long_edge
+        self.zoom = zoom
+    
+    @classmethod
+    def from_preset(cls, name: str) -> 'PageImageEncoder':
+        """
+        Create an encoder from a named preset
+        
+        Args:
+            name: Key of PRESETS
+        
+        Returns:
+            PageImageEncoder: Configured encoder
+        """
+        if name not in cls.PRESETS:
+            raise ValueError(f"Unknown preset: {name}. Use one of {list(cls.PRESETS)}")
+        return cls(**cls.PRESETS[name])
+    
+    @property
+    def requires_pil(self) -> bool:
+        """Whether encoding needs Pillow"""
+        return self.image_format == 'webp'
+    
+    @property
+    def config_key(self) -> tuple:
+        """Hashable description of the output (for caches)"""
+        return (self.image_format, self.quality, self.grayscale, self.max_long_edge, self.zoom)
+    
+    def page_zoom(self, page) -> float:
+        """Zoom used for page after applying max_long_edge"""
+        if not self.max_long_edge:
+            return self.zoom
+        long_edge = max(page.rect.width, page.rect.height)
+        return min(self.zoom, self.max_long_edge / long_edge) if long_edge else self.zoom
+    
+    def is_grayscale(self, page) -> bool:
+        """Whether page is rendered in grayscale"""
+        if self.grayscale == 'auto':
+            return not page.get_images()
+        return self.grayscale
+    
+    @property
+    def encoding(self) -> str:
+        """Encoding part of a page cache key (e.g. 'png', 'jpeg-q85')"""
+        if self.image_format == 'png':
+            return 'png'
+        return f"{self.image_format}-q{self.quality}"
+    
+    def render_key(self, page) -> tuple:
+        """
+        (zoom, colorspace, encoding) of page as rendered by this encoder
+        
+        Args:
+            page: PyMuPDF page
+        
+        Returns:
+            tuple: Render parameters for PageRenderCache
+        """
+        colorspace = 'gray' if self.is_grayscale(page) else 'rgb'
+        return self.page_zoom(page), colorspace, self.encoding
+    
+    def render(self, page):
+        """
+        Render page to a pixmap with this encoder's zoom and colorspace
+        
+        Args:
+            page: PyMuPDF page
+        
+        Returns:
+            fitz.Pixmap: Rendered page (no alpha)
+        """
+        zoom = self.page_zoom(page)
+        colorspace = fitz.csGRAY if self.is_grayscale(page) else fitz.csRGB
+        return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=colorspace, alpha=False)
+    
+    def encode_pixmap(self, pix) -> bytes:
+        """
+        Encode a rendered pixmap
+        
+        Args:
+            pix: fitz.Pixmap without alpha
+        
+        Returns:
+            bytes: Encoded image
+        """
+        if self.image_format == 'png':
+            return pix.tobytes(output='png')
+        if self.image_format == 'jpeg':
+            return pix.tobytes(output='jpeg', jpg_quality=self.quality)
+        
+        if not PIL_AVAILABLE:
+            raise RuntimeError("WebP encoding requires Pillow. Install with: pip install Pillow")
+        mode = 'L' if pix.n == 1 else 'RGB'
+        img = Image.frombuffer(mode, (pix.width, pix.height), pix.samples_mv, 'raw', mode, pix.stride, 1)
+        buffered = BytesIO()
+        img.save(buffered, format='WEBP', quality=self.quality)
+        return buffered.getvalue()
+    
+    def encode(self, page) -> bytes:
+        """
+        Render and encode a page
+        
+        Args:
+            page: PyMuPDF page
+        
+        Returns:
+            bytes: Encoded image
+        """
+        return self.encode_pixmap(self.render(page))
+    
+    def encode_base64(self, page) -> str:
+        """
+        Render and encode a page as base64 (Ollama 'images' entry)
+        
+        Args:
+            page: PyMuPDF page
+        
+        Returns:
+            str: Base64 encoded image
+        """
+        return base64.b64encode(self.encode(page)).decode()
+    
+    def __repr__(self) -> str:
+        return (f"<PageImageEncoder(format='{self.image_format}', quality={self.quality}, "
+                f"grayscale={self.grayscale!r}, max_long_edge={self.max_long_edge}, zoom={self.zoom})>")
@@ -0,0 +1,265 @@
+"""
+Ollama HTTP client shared by VLMProcessor instances
+Keep-alive connection pooling, cached model listing and an asyncio variant
+"""
+
+import asyncio
+import json
+import threading
+import time
+import weakref
+from typing import AsyncIterator, Dict, Iterator, List, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+
+class OllamaClient:
+    """
+    Connection-pooling client for one Ollama server
+    
+    All requests go through one requests.Session, so page requests reuse
+    keep-alive connections instead of opening a TCP connection each. The
+    /api/tags model list is cached for model_cache_ttl seconds, so
+    availability checks of several processors cost one round-trip.
+    
+    Async requests use an httpx.AsyncClient per event loop when httpx is
+    installed, and otherwise run the pooled session in a worker thread.
+    
+    Use OllamaClient.shared(host) to get the process-wide client of a host.
+    """
+    
+    _shared: Dict[str, 'OllamaClient'] = {}
+    _shared_lock = threading.Lock()
+    
+    def __init__(
+        self,
+        host: str,
+        pool_size: int = 10,
+        model_cache_ttl: float = 60.0
+    ):
+        """
+        Initialize client
+        
+        Args:
+            host: Ollama server URL
+            pool_size: Keep-alive connections kept open (at least the
+                number of concurrent requests)
+            model_cache_ttl: Seconds the model list is reused
+        """
+        self.host = host.rstrip('/')
+        self.pool_size = pool_size
+        self.model_cache_ttl = model_cache_ttl
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        self._models = None
+        self._models_fetched = 0.0
+        self._models_lock = threading.Lock()
+        self._async_clients = weakref.WeakKeyDictionary()
+    
+    @classmethod
+    def shared(cls, host: str, pool_size: int = 10) -> 'OllamaClient':
+        """
+        Get the process-wide client for host
+        
+        Args:
+            host: Ollama server URL
+            pool_size: Minimum connection pool size; a larger request
+                replaces the shared client with a bigger pool
+        
+        Returns:
+            OllamaClient: Shared client
+        """
+        key = host.rstrip('/')
+        with cls._shared_lock:
+            client = cls._shared.get(key)
+            if client is None or client.pool_size < pool_size:
+                client = cls(host, pool_size=pool_size)
+                cls._shared[key] = client
+            return client
+    
+    def url(self, path: str) -> str:
+        return f"{self.host}{path}"
+    
+    def list_models(self, refresh: bool = False, timeout: float = 5) -> List[Dict]:
+        """
+        Get the server's local models (cached)
+        
+        Args:
+            refresh: Ignore the cached list
+            timeout: Request timeout in seconds
+        
+        Returns:
+            list: Model dicts from /api/tags
+        
+        Raises:
+            requests.exceptions.RequestException: Server unreachable or
+                returned an error status
+        """
+        with self._models_lock:
+            fresh = time.monotonic() - self._models_fetched < self.model_cache_ttl
+            if self._models is not None and fresh and not refresh:
+                return self._models
+            
+            response = self.session.get(self.url("/api/tags"), timeout=timeout)
+            response.raise_for_status()
+            self._models = response.json().get('models', [])
+            self._models_fetched = time.monotonic()
+            return self._models
+    
+    def invalidate_models(self):
+        """Forget the cached model list (e.g. after a pull)"""
+        with self._models_lock:
+            self._models = None
+    
+    def post_json(self, path: str, payload: Dict, timeout: float) -> Tuple[int, Dict]:
+        """
+        POST a JSON request and parse the JSON response
+        
+        Args:
+            path: API path (e.g. '/api/generate')
+            payload: Request body
+            timeout: Request timeout in seconds
+        
+        Returns:
+            tuple: (status_code, response dict; empty if not 200)
+        """
+        response = self.session.post(self.url(path), json=payload, timeout=timeout)
+        if response.status_code != 200:
+            return response.status_code, {}
+        return response.status_code, response.json()
+    
+    async def apost_json(self, path: str, payload: Dict, timeout: float) -> Tuple[int, Dict]:
+        """
+        Async version of post_json()
+        
+        Timeouts and connection errors are raised as the matching
+        requests exceptions, as in the sync client.
+        """
+        if not HTTPX_AVAILABLE:
+            return await asyncio.to_thread(self.post_json, path, payload, timeout)
+        
+        client = self._async_client()
+        try:
+            response = await client.post(self.url(path), json=payload, timeout=timeout)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e))
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e))
+        
+        if response.status_code != 200:
+            return response.status_code, {}
+        return response.status_code, response.json()
+    
+    def stream_json(
+        self,
+        path: str,
+        payload: Dict,
+        timeout: Tuple[float, float]
+    ) -> Iterator[Dict]:
+        """
+        POST a request and yield the objects of its NDJSON response stream
+        
+        A non-200 status is yielded as a single {'error', 'status_code',
+        'done': True} object, the same shape Ollama uses for errors inside
+        a stream. Closing the generator closes the connection, which
+        makes Ollama stop generating.
+        
+        Args:
+            path: API path (e.g. '/api/generate')
+            payload: Request body (with "stream": true)
+            timeout: (connect timeout, read timeout); the read timeout
+                applies to the gap between two chunks
+        
+        Yields:
+            dict: Parsed NDJSON objects
+        """
+        with self.session.post(self.url(path), json=payload, timeout=timeout, stream=True) as response:
+            if response.status_code != 200:
+                yield {
+                    'error': f"Ollama returned status {response.status_code}",
+                    'status_code': response.status_code,
+                    'done': True
+                }
+                return
+            
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+    
+    async def astream_json(
+        self,
+        path: str,
+        payload: Dict,
+        timeout: Tuple[float, float]
+    ) -> AsyncIterator[Dict]:
+        """
+        Async version of stream_json() (requires httpx)
+        
+        Timeouts and connection errors are raised as the matching
+        requests exceptions, as in the sync client.
+        """
+        client = self._async_client()
+        connect_timeout, read_timeout = timeout
+        try:
+            async with client.stream(
+                "POST",
+                self.url(path),
+                json=payload,
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+            ) as response:
+                if response.status_code != 200:
+                    yield {
+                        'error': f"Ollama returned status {response.status_code}",
+                        'status_code': response.status_code,
+                        'done': True
+                    }
+                    return
+                
+                async for line in response.aiter_lines():
+                    if line:
+                        yield json.loads(line)
+        except httpx.ConnectTimeout as e:
+            raise requests.exceptions.ConnectTimeout(str(e))
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.ReadTimeout(str(e) or "Read timed out")
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e))
+    
+    def _async_client(self):
+        """httpx.AsyncClient of the running event loop"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size
+                )
+            )
+            self._async_clients[loop] = client
+        return client
+    
+    async def aclose(self):
+        """Close the async client of the running event loop"""
+        if HTTPX_AVAILABLE:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+            if client is not None:
+                await client.aclose()
+    
+    def close(self):
+        """Close pooled connections of the sync session"""
+        self.session.close()
+    
+    def __repr__(self) -> str:
+        return f"<OllamaClient(host='{self.host}', pool_size={self.pool_size})>"
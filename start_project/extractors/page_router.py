@@ -0,0 +1,181 @@
+"""
+Page router for PDFs
+Decides per page whether the native text layer, table extraction or the VLM is needed
+"""
+
+from typing import Dict, List, Optional
+
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+
+class PageRouter:
+    """
+    Classify PDF pages by how their content can be extracted
+    
+    Routes:
+    - 'text': born-digital page; the text layer is complete
+    - 'table': born-digital page with ruled tables; text layer plus
+      PyMuPDF table extraction
+    - 'vlm': scanned or visual page (little or garbled text next to
+      images or drawings, large image coverage, dense diagrams)
+    
+    Only cheap PyMuPDF calls are used: get_text(), image bounding boxes
+    and the drawing count. Table detection (find_tables()) runs only on
+    pages with enough line drawings.
+    """
+    
+    ROUTES = ('text', 'table', 'vlm')
+    
+    def __init__(
+        self,
+        min_text_chars: int = 100,
+        max_image_coverage: float = 0.5,
+        max_garbled_ratio: float = 0.1,
+        table_min_drawings: int = 10,
+        diagram_min_drawings: int = 500
+    ):
+        """
+        Initialize router
+        
+        Args:
+            min_text_chars: Fewer characters than this (with images or
+                drawings on the page) means the text layer is missing
+            max_image_coverage: Fraction of the page covered by images
+                above which the page is treated as scanned/visual
+            max_garbled_ratio: Fraction of unmapped characters (U+FFFD,
+                private use area) above which the text layer is unusable
+            table_min_drawings: Line drawings needed before looking for
+                tables
+            diagram_min_drawings: Drawings above which a page without
+                tables is treated as a diagram/flowchart
+        """
+        self.min_text_chars = min_text_chars
+        self.max_image_coverage = max_image_coverage
+        self.max_garbled_ratio = max_garbled_ratio
+        self.table_min_drawings = table_min_drawings
+        self.diagram_min_drawings = diagram_min_drawings
+    
+    @staticmethod
+    def _garbled_ratio(text: str) -> float:
+        """Fraction of characters without a usable Unicode mapping"""
+        chars = [c for c in text if not c.isspace()]
+        if not chars:
+            return 0.0
+        garbled = sum(1 for c in chars if c == '\ufffd' or '\ue000' <= c <= '\uf8ff')
+        return garbled / len(chars)
+    
+    @staticmethod
+    def _image_coverage(page) -> float:
+        """Fraction of the page area covered by images (capped at 1)"""
+        page_area = abs(page.rect)
+        if not page_area:
+            return 0.0
+        covered = sum(abs(fitz.Rect(info['bbox']) & page.rect) for info in page.get_image_info())
+        return min(covered / page_area, 1.0)
+    
+    @staticmethod
+    def _drawing_count(page) -> int:
+        if hasattr(page, 'get_cdrawings'):
+            return len(page.get_cdrawings())
+        return len(page.get_drawings())
+    
+    @staticmethod
+    def _find_tables(page) -> List[Dict]:
+        """Tables with at least 2 rows and 2 columns, as table dicts"""
+        if not hasattr(page, 'find_tables'):
+            return []
+        
+        tables = []
+        for table in page.find_tables().tables:
+            if table.row_count < 2 or table.col_count < 2:
+                continue
+            tables.append({
+                'index': len(tables),
+                'page': page.number + 1,
+                'text': table.to_markdown(),
+                'data': table.extract(),
+                'metadata': {
+                    'rows': table.row_count,
+                    'cols': table.col_count,
+                    'bbox': list(table.bbox)
+                }
+            })
+        return tables
+    
+    def classify(self, page, text: Optional[str] = None) -> Dict:
+        """
+        Decide how to extract one page
+        
+        Args:
+            page: PyMuPDF page
+            text: page.get_text() if already available
+        
+        Returns:
+            dict: {
+                'page_number': 1-based page number,
+                'route': 'text' | 'table' | 'vlm',
+                'reason': str,
+                'text': native text layer,
+                'text_chars': int,
+                'image_coverage': float,
+                'drawings': int,
+                'tables': table dicts found on 'table' pages
+            }
+        """
+        if text is None:
+            text = page.get_text()
+        text_chars = len(text.strip())
+        image_coverage = self._image_coverage(page)
+        drawings = self._drawing_count(page)
+        
+        decision = {
+            'page_number': page.number + 1,
+            'route': 'text',
+            'reason': 'text layer',
+            'text': text,
+            'text_chars': text_chars,
+            'image_coverage': round(image_coverage, 3),
+            'drawings': drawings,
+            'tables': []
+        }
+        
+        if image_coverage > self.max_image_coverage:
+            decision.update(route='vlm', reason=f"images cover {image_coverage:.0%} of the page")
+        elif text_chars < self.min_text_chars and (image_coverage > 0 or drawings > 0):
+            decision.update(route='vlm', reason=f"only {text_chars} text characters next to visual content")
+        elif self._garbled_ratio(text) > self.max_garbled_ratio:
+            decision.update(route='vlm', reason="text layer has unmapped characters")
+        else:
+            tables = self._find_tables(page) if drawings >= self.table_min_drawings else []
+            if tables:
+                decision.update(route='table', reason=f"{len(tables)} ruled tables", tables=tables)
+            elif drawings >= self.diagram_min_drawings:
+                decision.update(route='vlm', reason=f"{drawings} drawings without tables (diagram)")
+            elif text_chars == 0:
+                decision['reason'] = 'empty page'
+        
+        return decision
+    
+    def route_document(self, doc) -> List[Dict]:
+        """
+        Classify every page of an open document
+        
+        Args:
+            doc: PyMuPDF document
+        
+        Returns:
+            list: classify() result per page
+        """
+        return [self.classify(page) for page in doc]
+    
+    @staticmethod
+    def summarize(decisions: List[Dict]) -> Dict[str, int]:
+        """Count pages per route"""
+        counts = {route: 0 for route in PageRouter.ROUTES}
+        for decision in decisions:
+            counts[decision['route']] += 1
+        return counts
@@ -0,0 +1,207 @@
+"""
+Persistent cache of VLM responses
+Identical (model, prompt, image, options) requests are answered from the database
+"""
+
+import hashlib
+import json
+import threading
+from typing import Dict, Optional
+
+
+class VLMResponseCache:
+    """
+    Cache /api/generate answers in the vlm_responses table
+    
+    The key covers everything that determines the answer: model name and
+    digest (a re-pulled model with new weights gets new keys), SHA-256 of
+    the prompt, SHA-256 of the image and the generation options. Only
+    requests with temperature <= max_temperature are cached, so sampling
+    runs that are meant to vary are never answered from the cache.
+    
+    Entries expire after ttl_seconds; beyond max_entries the least
+    recently used ones are evicted (checked every prune_interval stores).
+    With bypass=True lookups are skipped but fresh answers are still
+    stored, which refreshes the cache.
+    
+    Example:
+        db = DatabaseManager("document_metadata.db")
+        vlm = VLMProcessor(response_cache=VLMResponseCache(db))
+    """
+    
+    def __init__(
+        self,
+        db,
+        ttl_seconds: Optional[float] = 30 * 24 * 3600,
+        max_entries: Optional[int] = 100000,
+        max_temperature: float = 0.1,
+        bypass: bool = False,
+        prune_interval: int = 500
+    ):
+        """
+        Initialize cache
+        
+        Args:
+            db: DatabaseManager holding the vlm_responses table
+            ttl_seconds: Entry lifetime (None = no expiry)
+            max_entries: Maximum number of entries (None = unbounded)
+            max_temperature: Highest temperature treated as deterministic
+            bypass: Skip lookups (answers are still stored)
+            prune_interval: Stores between eviction runs
+        """
+        self.db = db
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_temperature = max_temperature
+        self.bypass = bypass
+        self.prune_interval = prune_interval
+        
+        self._lock = threading.Lock()
+        self._stores_since_prune = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.skipped = 0
+    
+    @staticmethod
+    def _sha256(text: str) -> str:
+        return hashlib.sha256(text.encode()).hexdigest()
+    
+    def cacheable(self, payload: Dict) -> bool:
+        """Whether a request is deterministic enough to cache"""
+        temperature = payload.get('options', {}).get('temperature', 0.8)
+        return temperature <= self.max_temperature
+    
+    def make_key(self, payload: Dict, model_digest: str = '') -> Optional[Dict]:
+        """
+        Cache key of an /api/generate request
+        
+        Args:
+            payload: Request body
+            model_digest: Digest of the model on the server
+        
+        Returns:
+            dict or None: {'cache_key', 'model', 'model_digest',
+            'prompt_hash', 'image_hash', 'options'}; None if the request
+            is not cacheable
+        """
+        if not self.cacheable(payload):
+            with self._lock:
+                self.skipped += 1
+            return None
+        
+        prompt_hash = self._sha256(payload.get('prompt', ''))
+        image_hash = self._sha256(''.join(payload.get('images') or []))
+        options = payload.get('options', {})
+        cache_key = self._sha256(json.dumps(
+            [payload['model'], model_digest, prompt_hash, image_hash, options],
+            sort_keys=True
+        ))
+        return {
+            'cache_key': cache_key,
+            'model': payload['model'],
+            'model_digest': model_digest,
+            'prompt_hash': prompt_hash,
+            'image_hash': image_hash,
+            'options': options
+        }
+    
+    def get(self, key: Dict) -> Optional[Dict]:
+        """
+        Look up a cached answer
+        
+        Args:
+            key: make_key() result
+        
+        Returns:
+            dict or None: _query_ollama() style result with 'cached': True
+        """
+        if self.bypass:
+            return None
+        
+        entry = self.db.get_vlm_response(key['cache_key'], max_age_seconds=self.ttl_seconds)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        
+        return {
+            'success': True,
+            'response': entry['response'],
+            'tokens': entry['tokens'],
+            'error': None,
+            'cached': True
+        }
+    
+    def put(self, key: Dict, result: Dict) -> bool:
+        """
+        Store a successful, complete answer (partial streamed pages are
+        not cached)
+        
+        Args:
+            key: make_key() result
+            result: _query_ollama() result
+        
+        Returns:
+            bool: True if stored
+        """
+        if not result.get('success') or result.get('partial'):
+            return False
+        
+        stored = self.db.put_vlm_response(
+            cache_key=key['cache_key'],
+            model=key['model'],
+            model_digest=key['model_digest'],
+            prompt_hash=key['prompt_hash'],
+            image_hash=key['image_hash'],
+            options=key['options'],
+            response=result.get('response', ''),
+            tokens=result.get('tokens', 0)
+        )
+        
+        with self._lock:
+            if stored:
+                self.stores += 1
+                self._stores_since_prune += 1
+            prune_now = self._stores_since_prune >= self.prune_interval
+            if prune_now:
+                self._stores_since_prune = 0
+        if prune_now:
+            self.prune()
+        return stored
+    
+    def prune(self) -> int:
+        """
+        Apply TTL and size limits now
+        
+        Returns:
+            int: Number of entries evicted
+        """
+        return self.db.prune_vlm_responses(
+            max_age_seconds=self.ttl_seconds,
+            max_entries=self.max_entries
+        )
+    
+    def stats(self) -> Dict:
+        """
+        Hit/miss statistics
+        
+        Returns:
+            dict: {'hits', 'misses', 'stores', 'skipped', 'hit_rate', 'entries'}
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                'hits': self.hits,
+                'misses': self.misses,
+                'stores': self.stores,
+                'skipped': self.skipped,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+        stats['entries'] = self.db.count_vlm_responses()
+        return stats
+    
+    def __repr__(self) -> str:
+        return (f"<VLMResponseCache(ttl_seconds={self.ttl_seconds}, max_entries={self.max_entries}, "
+                f"max_temperature={self.max_temperature}, bypass={self.bypass})>")
@@ -2,9 +2,12 @@
 Unstructured.io extractor for document content extraction
 """
 
+import io
 import os
-import tempfile
-from typing import Dict, List, Optional
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 from datetime import datetime
 try:
     from .base_extractor import BaseExtractor
@@ -12,12 +15,34 @@ except:
     from base_extractor import BaseExtractor
 
 try:
-    from ..utils import FileUtils, Logger
+    from ..utils import Logger
 except:
-    from utils import FileUtils, Logger
+    from utils import Logger
+
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
 
 # from unstructured.partition.auto import partition
 
+# Extractor owned by each extract_many() worker process
+_worker_extractor = None
+
+
+def _init_worker(config: Dict):
+    """Process initializer: build and warm up one extractor per worker"""
+    global _worker_extractor
+    _worker_extractor = UnstructuredExtractor(**config)
+    _worker_extractor.warmup()
+
+
+def _extract_in_worker(file_path: str) -> Dict:
+    """Extract one file with the worker process's extractor"""
+    return _worker_extractor.extract(file_path)
+
+
 class UnstructuredExtractor(BaseExtractor):
     """
     Extract content using unstructured.io library
@@ -31,7 +56,8 @@ class UnstructuredExtractor(BaseExtractor):
         infer_table_structure: bool = True,
         extract_images: bool = True,
         languages: List[str] = None, 
-        logger: Optional[Logger] = None
+        logger: Optional[Logger] = None,
+        page_batch_size: int = 4
     ):
         """
         Initialize UnstructuredExtractor
@@ -41,6 +67,7 @@ class UnstructuredExtractor(BaseExtractor):
             infer_table_structure: Whether to extract table structure
             extract_images: Whether to extract image descriptions
             logger: Logger instance
+            page_batch_size: Pages partitioned per call in iter_pages()
         """
         super().__init__(name="unstructured", version="0.11.6")
         
@@ -48,6 +75,7 @@ class UnstructuredExtractor(BaseExtractor):
         self.infer_table_structure = infer_table_structure
         self.extract_images = extract_images
         self.languages = languages or ['eng']  # ← Default to English
+        self.page_batch_size = max(page_batch_size, 1)
         self.logger = logger or Logger.get_logger("UnstructuredExtractor")
         
         # Import unstructured library
@@ -59,6 +87,31 @@ class UnstructuredExtractor(BaseExtractor):
             self.logger.error("unstructured library not installed")
             self.available = False
     
+    def warmup(self) -> bool:
+        """
+        Import the partitioners and load the hi_res layout model now
+        
+        Otherwise the first extract() in a process pays for the imports
+        and the model load.
+        
+        Returns:
+            bool: True if warm-up succeeded
+        """
+        if not self.available:
+            return False
+        
+        try:
+            import unstructured.partition.pdf  # noqa: F401 (imported lazily by partition)
+            
+            if self.strategy == 'hi_res':
+                from unstructured_inference.models.base import get_model
+                get_model()
+            return True
+        
+        except Exception as e:
+            self.logger.warning(f"Warm-up failed: {str(e)}")
+            return False
+    
     def extract(self, file_path: str) -> Dict:
         """
         Extract content from file using unstructured.io
@@ -95,90 +148,239 @@ class UnstructuredExtractor(BaseExtractor):
         
         try:
             self.logger.info(f"Extracting content from: {os.path.basename(file_path)}")
-            self.logger.info(f"Languages: {', '.join(self.languages)}") 
-            # Extract content with unstructured
-            elements = self.partition(
-                filename=file_path,
-                strategy=self.strategy,
-                infer_table_structure=self.infer_table_structure,
-                extract_image_block_types=["Image", "Figure"] if self.extract_images else None,
-                languages=self.languages
-               
+            return self._partition_output(
+                start_time,
+                os.path.basename(file_path),
+                os.path.getsize(file_path),
+                filename=file_path
+            )
+        
+        except Exception as e:
+            self.logger.error(f"Extraction failed: {str(e)}", exc_info=True)
+            return self._standardize_output(
+                success=False,
+                error=f"Extraction error: {str(e)}"
             )
+    
+    def _partition_output(self, start_time: datetime, file_name: str, file_size: int, **source) -> Dict:
+        """
+        Partition a document and build the standardized output
+        
+        Args:
+            start_time: When extraction started
+            file_name: Name reported in logs and metadata
+            file_size: Size reported in metadata
+            **source: filename=path, or file=stream with metadata_filename
+            
+        Returns:
+            dict: Extraction results (see extract())
+        """
+        elements = self._partition(**source)
+        text_content, tables, images, all_elements = self._collect_elements(elements)
+        
+        # Combine text
+        full_text = "\n\n".join(text_content)
+        
+        # Calculate duration
+        duration = (datetime.now() - start_time).total_seconds()
+        
+        # Increment counter
+        self._increment_counter()
+        
+        # Log success
+        self.logger.log_extraction(
+            file_name=file_name,
+            extractor=self.name,
+            status="SUCCESS",
+            elements_count=len(elements),
+            duration=duration
+        )
+        
+        return self._standardize_output(
+            success=True,
+            text=full_text,
+            tables=tables,
+            images=images,
+            metadata={
+                'total_elements': len(elements),
+                'text_elements': len(text_content),
+                'table_count': len(tables),
+                'image_count': len(images),
+                'strategy': self.strategy,
+                'duration_seconds': duration,
+                'file_name': file_name,
+                'file_size': file_size,
+                'elements': all_elements
+            }
+        )
+    
+    def _partition(self, **source) -> List:
+        """
+        Run unstructured's partition() with the configured options
+        
+        Args:
+            **source: filename=path, or file=stream with metadata_filename
+            
+        Returns:
+            list: unstructured elements
+        """
+        self.logger.info(f"Languages: {', '.join(self.languages)}") 
+        # Extract content with unstructured
+        return self.partition(
+            **source,
+            strategy=self.strategy,
+            infer_table_structure=self.infer_table_structure,
+            extract_image_block_types=["Image", "Figure"] if self.extract_images else None,
+            languages=self.languages
+           
+        )
+    
+    @staticmethod
+    def _collect_elements(elements: List) -> tuple:
+        """
+        Sort unstructured elements into text, tables and images
+        
+        Args:
+            elements: unstructured elements
             
-            # Process elements
-            text_content = []
-            tables = []
-            images = []
-            all_elements = []
+        Returns:
+            tuple: (text list, table dicts, image dicts, element dicts)
+        """
+        text_content = []
+        tables = []
+        images = []
+        all_elements = []
+        
+        for element in elements:
+            element_dict = {
+                'type': element.category if hasattr(element, 'category') else 'unknown',
+                'text': str(element),
+                'metadata': element.metadata.to_dict() if hasattr(element, 'metadata') else {}
+            }
+            all_elements.append(element_dict)
             
-            for element in elements:
-                element_dict = {
-                    'type': element.category if hasattr(element, 'category') else 'unknown',
+            # Categorize by type
+            if element.category == "Table":
+                tables.append({
+                    'text': str(element),
+                    'metadata': element.metadata.to_dict() if hasattr(element, 'metadata') else {},
+                    'html': getattr(element.metadata, 'text_as_html', None) if hasattr(element, 'metadata') else None
+                })
+            elif element.category in ["Image", "Figure"]:
+                images.append({
+                    'type': element.category,
                     'text': str(element),
                     'metadata': element.metadata.to_dict() if hasattr(element, 'metadata') else {}
-                }
-                all_elements.append(element_dict)
-                
-                # Categorize by type
-                if element.category == "Table":
-                    tables.append({
-                        'text': str(element),
-                        'metadata': element.metadata.to_dict() if hasattr(element, 'metadata') else {},
-                        'html': getattr(element.metadata, 'text_as_html', None) if hasattr(element, 'metadata') else None
-                    })
-                elif element.category in ["Image", "Figure"]:
-                    images.append({
-                        'type': element.category,
-                        'text': str(element),
-                        'metadata': element.metadata.to_dict() if hasattr(element, 'metadata') else {}
-                    })
-                else:
-                    text_content.append(str(element))
-            
-            # Combine text
-            full_text = "\n\n".join(text_content)
+                })
+            else:
+                text_content.append(str(element))
+        
+        return text_content, tables, images, all_elements
+    
+    def iter_pages(self, file_path: str, pages: Optional[Iterable[int]] = None) -> Iterator[Dict]:
+        """
+        Extract a document page by page
+        
+        With PyMuPDF, PDFs are split into in-memory documents of up to
+        page_batch_size consecutive pages that are partitioned one after
+        another, so each run's pages are yielded before the next run
+        starts. Other documents are partitioned whole and their elements
+        grouped by page_number.
+        
+        Args:
+            file_path: Path to file
+            pages: 1-based page numbers to extract (default: all)
             
-            # Calculate duration
-            duration = (datetime.now() - start_time).total_seconds()
+        Yields:
+            dict: Standardized page result
+        """
+        if not self.available:
+            yield self._standardize_page(None, False, error="unstructured library not available")
+            return
+        
+        is_valid, error_msg = self.validate_file(file_path)
+        if not is_valid:
+            yield self._standardize_page(None, False, error=error_msg)
+            return
+        
+        file_name = os.path.basename(file_path)
+        self.logger.info(f"Extracting pages from: {file_name}")
+        wanted = set(pages) if pages is not None else None
+        
+        if not PYMUPDF_AVAILABLE or os.path.splitext(file_path)[1].lower() != '.pdf':
+            try:
+                elements = self._partition(filename=file_path)
+            except Exception as e:
+                self.logger.error(f"Extraction failed: {str(e)}", exc_info=True)
+                yield self._standardize_page(None, False, error=f"Extraction error: {str(e)}")
+                return
             
-            # Increment counter
+            by_page = {}
+            for element in elements:
+                page_number = getattr(getattr(element, 'metadata', None), 'page_number', None) or 1
+                by_page.setdefault(page_number, []).append(element)
+            for page_number in sorted(by_page):
+                if wanted is None or page_number in wanted:
+                    yield self._elements_page(page_number, by_page[page_number], len(by_page))
             self._increment_counter()
+            return
+        
+        with fitz.open(file_path) as doc:
+            total_pages = len(doc)
+            numbers = range(1, total_pages + 1) if wanted is None else sorted(n for n in wanted if 1 <= n <= total_pages)
             
-            # Log success
-            self.logger.log_extraction(
-                file_name=os.path.basename(file_path),
-                extractor=self.name,
-                status="SUCCESS",
-                elements_count=len(elements),
-                duration=duration
-            )
-            
-            return self._standardize_output(
-                success=True,
-                text=full_text,
-                tables=tables,
-                images=images,
-                metadata={
-                    'total_elements': len(elements),
-                    'text_elements': len(text_content),
-                    'table_count': len(tables),
-                    'image_count': len(images),
-                    'strategy': self.strategy,
-                    'duration_seconds': duration,
-                    'file_name': os.path.basename(file_path),
-                    'file_size': os.path.getsize(file_path),
-                    'elements': all_elements
-                }
-            )
+            for first, last in self._page_runs(numbers, self.page_batch_size):
+                try:
+                    with fitz.open() as part:
+                        part.insert_pdf(doc, from_page=first - 1, to_page=last - 1)
+                        data = part.tobytes()
+                    elements = self._partition(file=io.BytesIO(data), metadata_filename=file_name)
+                except Exception as e:
+                    self.logger.error(f"Extraction of pages {first}-{last} failed: {str(e)}", exc_info=True)
+                    for page_number in range(first, last + 1):
+                        yield self._standardize_page(page_number, False, error=f"Extraction error: {str(e)}")
+                    continue
+                
+                # Page numbers of the partial document start at 1
+                by_page = {page_number: [] for page_number in range(first, last + 1)}
+                for element in elements:
+                    part_page = getattr(getattr(element, 'metadata', None), 'page_number', None) or 1
+                    by_page[min(first + part_page - 1, last)].append(element)
+                for page_number in range(first, last + 1):
+                    yield self._elements_page(page_number, by_page[page_number], total_pages)
         
-        except Exception as e:
-            self.logger.error(f"Extraction failed: {str(e)}", exc_info=True)
-            return self._standardize_output(
-                success=False,
-                error=f"Extraction error: {str(e)}"
-            )
+        self._increment_counter()
+    
+    def _elements_page(self, page_number: int, elements: List, total_pages: int) -> Dict:
+        """
+        Build one iter_pages() result from the elements of a page
         
+        Args:
+            page_number: 1-based page number
+            elements: unstructured elements on the page
+            total_pages: Number of pages in the document
+            
+        Returns:
+            dict: Standardized page result
+        """
+        text_content, tables, images, all_elements = self._collect_elements(elements)
+        for element in all_elements + tables + images:
+            element['metadata']['page_number'] = page_number
+        
+        return self._standardize_page(
+            page_number,
+            True,
+            text="\n\n".join(text_content),
+            tables=tables,
+            images=images,
+            metadata={
+                'total_pages': total_pages,
+                'total_elements': len(elements),
+                'strategy': self.strategy,
+                'elements': all_elements
+            }
+        )
+    
     def set_languages(self, languages: List[str]):
         """
         Change OCR languages
@@ -240,12 +442,144 @@ class UnstructuredExtractor(BaseExtractor):
             print(langs)  # ['jpn', 'eng']
         """
         return self.languages.copy()
-    def extract_from_blob(self, blob: bytes, file_extension: str) -> Dict:
+    
+    def extract_many(
+        self,
+        file_paths: Iterable[str],
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None
+    ) -> Iterator[Dict]:
+        """
+        Extract many files in a pool of worker processes
+        
+        Every worker builds its own extractor and warms it up once (see
+        warmup()), then partitions files until the batch is done. Results
+        are yielded as they complete, not in input order.
+        
+        A document that kills its worker (segfault, out of memory) breaks
+        the whole pool. The documents that were in flight at that moment
+        are then re-run one at a time in a single-process pool: the one
+        that crashes again gets a failed result, the others their normal
+        result, and the batch continues in a fresh pool.
+        
+        Args:
+            file_paths: Paths to files
+            workers: Number of worker processes (default: CPU count)
+            max_pending: Files submitted ahead of the results
+                (default: 2 * workers)
+            
+        Yields:
+            dict: Extraction result per file (same format as extract(),
+                with metadata['file_path'] set)
+        """
+        workers = workers or os.cpu_count() or 1
+        max_pending = max(max_pending or workers * 2, workers)
+        queued = deque(file_paths)
+        
+        if not self.available:
+            while queued:
+                yield self._with_path(
+                    self._standardize_output(success=False, error="unstructured library not available"),
+                    queued.popleft()
+                )
+            return
+        
+        pool = self._new_pool(workers)
+        in_flight = {}
+        try:
+            while queued or in_flight:
+                while queued and len(in_flight) < max_pending:
+                    file_path = queued.popleft()
+                    in_flight[pool.submit(_extract_in_worker, file_path)] = file_path
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    file_path = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        broken = True
+                        in_flight[future] = file_path
+                        continue
+                    except Exception as e:
+                        result = self._standardize_output(
+                            success=False,
+                            error=f"Extraction error: {str(e)}"
+                        )
+                    yield self._with_path(result, file_path)
+                
+                if broken:
+                    suspects = list(in_flight.values())
+                    in_flight.clear()
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self.logger.warning(
+                        f"Worker process crashed; re-running {len(suspects)} files one at a time"
+                    )
+                    for result in self._extract_isolated(suspects):
+                        yield result
+                    pool = self._new_pool(workers)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    
+    def _worker_config(self) -> Dict:
+        """Constructor arguments for worker process extractors"""
+        return {
+            'strategy': self.strategy,
+            'infer_table_structure': self.infer_table_structure,
+            'extract_images': self.extract_images,
+            'languages': list(self.languages)
+        }
+    
+    def get_config(self) -> Dict:
+        """Options that change the extraction output (result cache key)"""
+        return self._worker_config()
+    
+    def _new_pool(self, workers: int) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self._worker_config(),)
+        )
+    
+    def _extract_isolated(self, file_paths: List[str]) -> Iterator[Dict]:
+        """Extract files one at a time so a crash identifies its document"""
+        pool = None
+        try:
+            for file_path in file_paths:
+                if pool is None:
+                    pool = self._new_pool(1)
+                try:
+                    result = pool.submit(_extract_in_worker, file_path).result()
+                except BrokenProcessPool:
+                    self.logger.error(f"Worker process crashed while extracting: {file_path}")
+                    pool.shutdown(wait=False)
+                    pool = None
+                    result = self._standardize_output(
+                        success=False,
+                        error="Worker process crashed while extracting this file"
+                    )
+                except Exception as e:
+                    result = self._standardize_output(
+                        success=False,
+                        error=f"Extraction error: {str(e)}"
+                    )
+                yield self._with_path(result, file_path)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+    
+    @staticmethod
+    def _with_path(result: Dict, file_path: str) -> Dict:
+        result.setdefault('metadata', {})['file_path'] = file_path
+        return result
+    
+    def extract_from_blob(self, blob: Union[bytes, str], file_extension: str) -> Dict:
         """
         Extract content from binary data
         
         Args:
-            blob: Binary file content
+            blob: Binary file content, memory-mapped view or path to it
             file_extension: File extension (e.g., '.pdf')
             
         Returns:
@@ -258,23 +592,18 @@ class UnstructuredExtractor(BaseExtractor):
                 error="unstructured library not available"
             )
         
+        def extract_stream(stream, file_name: str, file_size: int) -> Dict:
+            self.logger.info(f"Extracting content from: {file_name} (in memory)")
+            return self._partition_output(
+                datetime.now(),
+                file_name,
+                file_size,
+                file=stream,
+                metadata_filename=file_name
+            )
+        
         try:
-            # Create temporary file
-            temp_path = FileUtils.create_temp_file(blob, suffix=file_extension)
-            
-            if not temp_path:
-                return self._standardize_output(
-                    success=False,
-                    error="Failed to create temporary file"
-                )
-            
-            # Extract from temporary file
-            result = self.extract(temp_path)
-            
-            # Clean up
-            FileUtils.delete_file(temp_path)
-            
-            return result
+            return self._extract_blob(blob, file_extension, extract_stream)
         
         except Exception as e:
             self.logger.error(f"Extraction from blob failed: {str(e)}", exc_info=True)
@@ -293,7 +622,7 @@ class UnstructuredExtractor(BaseExtractor):
         Returns:
             list: List of table dictionaries
         """
-        result = self.extract(file_path)
+        result = self.extract_cached(file_path)
         
         if result['success']:
             return result['tables']
@@ -310,7 +639,7 @@ class UnstructuredExtractor(BaseExtractor):
         Returns:
             str: Extracted text
         """
-        result = self.extract(file_path)
+        result = self.extract_cached(file_path)
         
         if result['success']:
             return result['text']
@@ -4,13 +4,18 @@ Uses Ollama for local model inference
 """
 
 import os
+import asyncio
 import base64
+import hashlib
 import json
+import queue
+import threading
+import time
 import requests
-from typing import Dict, List, Optional, Union
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import BinaryIO, Callable, Dict, Generator, Iterable, Iterator, List, Optional, Tuple, Union
 from datetime import datetime
 from pathlib import Path
-from io import BytesIO
 
 # from .base_extractor import BaseExtractor
 # from ..utils import FileUtils, Logger
@@ -21,15 +26,18 @@ except:
     from base_extractor import BaseExtractor
 
 try:
-    from ..utils import FileUtils, Logger
+    from ..utils import FileUtils, Logger, PageRenderCache
 except:
-    from utils import FileUtils, Logger
+    from utils import FileUtils, Logger, PageRenderCache
 
 try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
+    from .ollama_client import HTTPX_AVAILABLE, OllamaClient
+    from .image_encoder import PIL_AVAILABLE, PageImageEncoder
+    from .response_cache import VLMResponseCache
+except:
+    from ollama_client import HTTPX_AVAILABLE, OllamaClient
+    from image_encoder import PIL_AVAILABLE, PageImageEncoder
+    from response_cache import VLMResponseCache
 
 try:
     import fitz  # PyMuPDF
@@ -38,6 +46,108 @@ except ImportError:
     PYMUPDF_AVAILABLE = False
 
 
+def _stop_reason(done_reason: Optional[str]) -> str:
+    """stop_reason of a completed generation from Ollama's done_reason"""
+    # 'length' = num_predict reached on the server
+    return 'token_budget' if done_reason == 'length' else 'stop'
+
+
+class _PageStream:
+    """
+    Collects one page's NDJSON token stream from /api/generate
+    
+    Each chunk is one token. Consumption stops at the final chunk, at the
+    token budget or when the page's wall-clock timeout is exceeded; the
+    text received so far is kept in every case.
+    """
+    
+    def __init__(
+        self,
+        max_tokens: Optional[int],
+        timeout: float,
+        on_text: Optional[Callable[[str], None]] = None
+    ):
+        self.max_tokens = max_tokens
+        self.timeout = timeout
+        self.on_text = on_text
+        self.start = time.perf_counter()
+        self.first_token_at = None
+        self.chunks = []
+        self.tokens = 0
+        self.eval_count = None
+        self.stop_reason = None
+        self.error = None
+    
+    def feed(self, event: Dict) -> bool:
+        """
+        Add one stream object
+        
+        Returns:
+            bool: True when consumption should stop
+        """
+        if event.get('error'):
+            self.stop_reason = 'error'
+            self.error = event['error']
+            return True
+        
+        text = event.get('response', '')
+        if text:
+            if self.first_token_at is None:
+                self.first_token_at = time.perf_counter()
+            self.chunks.append(text)
+            self.tokens += 1
+            if self.on_text is not None:
+                self.on_text(text)
+        
+        if event.get('done'):
+            self.eval_count = event.get('eval_count')
+            self.stop_reason = _stop_reason(event.get('done_reason'))
+            return True
+        if self.max_tokens and self.tokens >= self.max_tokens:
+            self.stop_reason = 'token_budget'
+            return True
+        if time.perf_counter() - self.start > self.timeout:
+            self.stop_reason = 'timeout'
+            self.error = f"Request timeout (>{self.timeout}s)"
+            return True
+        return False
+    
+    def interrupt(self, error: Exception):
+        """Record a failed or stalled connection"""
+        stalled = isinstance(error, requests.exceptions.ReadTimeout) or 'timed out' in str(error).lower()
+        self.stop_reason = 'stall' if stalled else 'error'
+        self.error = "Stream stalled (no token within stall_timeout)" if stalled else str(error)
+    
+    def result(self) -> Dict:
+        """_query_ollama() result of the stream so far"""
+        now = time.perf_counter()
+        text = ''.join(self.chunks)
+        tokens = self.eval_count or self.tokens
+        
+        stop_reason, error = self.stop_reason, self.error
+        if stop_reason is None:
+            # The connection closed cleanly (server restart, proxy) without
+            # the final chunk, so the page text is truncated
+            stop_reason, error = 'incomplete', "Stream ended before the final chunk"
+        
+        ttft = generation = None
+        if self.first_token_at is not None:
+            ttft = self.first_token_at - self.start
+            generation = now - self.first_token_at
+        
+        return {
+            # Partial text is still a result; only an empty failed stream is not
+            'success': bool(text) or stop_reason in ('stop', 'token_budget'),
+            'response': text,
+            'tokens': tokens,
+            'ttft_seconds': round(ttft, 3) if ttft is not None else None,
+            'tokens_per_second': round((tokens - 1) / generation, 1) if generation and tokens > 1 else None,
+            'stop_reason': stop_reason,
+            'partial': stop_reason in ('timeout', 'stall', 'error', 'incomplete'),
+            'error': error
+        }
+
+
 class VLMProcessor(BaseExtractor):
     """
     Vision Language Model processor using Ollama
@@ -49,13 +159,98 @@ class VLMProcessor(BaseExtractor):
     - Visual understanding tasks
     """
     
+    IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.webp', '.gif']
+    
+    # Prompt for every page of a PDF
+    PAGE_PROMPT = """
+                This is a Japanese document page. Please extract ALL content with complete accuracy:
+
+                IMPORTANT: This document contains Japanese text. Preserve all Japanese characters exactly.
+
+                Extract the following:
+
+                1. ALL TEXT CONTENT:
+                - Transcribe every word, number, and character exactly as shown
+                - Maintain the original reading order (top to bottom, left to right)
+                - Preserve line breaks and paragraph structure
+                - Include headers, footers, page numbers, and any marginal notes
+
+                2. TABLES (if present):
+                - Identify all tables on the page
+                - For each table, provide:
+                    * Table title or caption (if any)
+                    * Number of rows and columns
+                    * Complete table content in a structured format
+                    * Preserve cell alignment and merged cells
+                - Format: Use markdown table syntax or describe clearly
+
+                3. IMAGES/FIGURES (if present):
+                - Identify all images, diagrams, charts, or figures
+                - For each image, provide:
+                    * Image type (photo, diagram, chart, logo, etc.)
+                    * Detailed description of what is shown
+                    * Any text or labels within the image
+                    * Position on the page (top, middle, bottom)
+                - Include figure numbers and captions if present
+
+                4. FLOWCHARTS/DIAGRAMS (if present):
+                - Identify all flowchart boxes and their text content
+                - Describe the flow direction and connections
+                - Note decision points and branches
+                - Explain the process flow logically
+
+                5. LAYOUT INFORMATION:
+                - Note any special formatting (bold, italic, underlined text)
+                - Identify section numbers or bullet points
+                - Preserve hierarchical structure
+
+                OUTPUT FORMAT:
+                Provide a complete, structured transcription maintaining the original document layout and order.
+                Do not summarize - transcribe completely and accurately.
+                """
+    
+    # Prompt for single images
+    IMAGE_PROMPT = """
+            This image may contain Japanese text. Please analyze and extract ALL content:
+
+            1. TEXT CONTENT:
+               - Extract all visible text (Japanese, English, numbers, symbols)
+               - Preserve reading order and layout
+               - Note text size, style, or emphasis
+
+            2. VISUAL ELEMENTS:
+               - Describe all images, diagrams, charts, or graphics
+               - Identify logos, stamps, or seals
+               - Note colors and visual styling if relevant
+
+            3. TABLES (if present):
+               - Describe table structure (rows, columns)
+               - Extract complete table content
+
+            4. STRUCTURAL ELEMENTS:
+               - Identify headers, footers, titles
+               - Note any forms, boxes, or borders
+               - Describe overall layout
+
+            Provide a complete and detailed description of everything visible in this image.
+            """
+    
     def __init__(
         self,
         model_name: str = "qwen2.5vl:3b-q4_K_M",
         ollama_host: str = "http://localhost:11434",
         auto_pull: bool = True,
         timeout: int = 300,
-        logger: Optional[Logger] = None
+        logger: Optional[Logger] = None,
+        max_concurrency: int = 1,
+        render_ahead: int = 2,
+        image_encoder: Optional[PageImageEncoder] = None,
+        page_cache: Optional[PageRenderCache] = None,
+        response_cache: Optional[VLMResponseCache] = None,
+        stream: bool = False,
+        max_tokens: Optional[int] = None,
+        stall_timeout: float = 60.0,
+        on_page_text: Optional[Callable[[int, str], None]] = None
     ):
         """
         Initialize VLM Processor
@@ -66,14 +261,48 @@ class VLMProcessor(BaseExtractor):
             auto_pull: Auto-pull model if not available
             timeout: Request timeout in seconds
             logger: Logger instance
+            max_concurrency: Page requests in flight at once; match the
+                server's OLLAMA_NUM_PARALLEL
+            render_ahead: Pages rendered ahead of the requests by a
+                background thread (0 renders in the calling thread)
+            image_encoder: How PDF pages are rendered and encoded
+                (default: PNG at 2x zoom)
+            page_cache: Cache of rendered pages (default: the
+                process-wide PageRenderCache.shared() memory cache)
+            response_cache: Persistent cache of model answers (default:
+                none, every page is sent to the model)
+            stream: Consume Ollama's token stream; text is available as it
+                is generated and a timeout keeps the partial page
+            max_tokens: Token budget per page (sent as num_predict and
+                enforced while streaming)
+            stall_timeout: Seconds without a new token before a streamed
+                page is cut off
+            on_page_text: Called with (page_num, text chunk) for every
+                streamed chunk (from worker threads)
         """
         super().__init__(name="vlm", version="1.0.0")
         
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        
         self.model_name = model_name
         self.ollama_host = ollama_host
         self.auto_pull = auto_pull
         self.timeout = timeout
         self.logger = logger or Logger.get_logger("VLMProcessor")
+        self.max_concurrency = max_concurrency
+        self.render_ahead = render_ahead
+        self.image_encoder = image_encoder or PageImageEncoder()
+        self.page_cache = page_cache or PageRenderCache.shared()
+        self.response_cache = response_cache
+        self.stream = stream
+        self.max_tokens = max_tokens
+        self.stall_timeout = stall_timeout
+        self.on_page_text = on_page_text
+        
+        # Keep-alive connections and model list shared with other
+        # processors talking to the same server
+        self.client = OllamaClient.shared(ollama_host, pool_size=max(10, max_concurrency))
         
         # Check dependencies
         self.pil_available = PIL_AVAILABLE
@@ -92,9 +321,10 @@ class VLMProcessor(BaseExtractor):
         if self.ollama_available:
             self.model_available = self._check_model_available()
         
-        # Overall availability
+        # Overall availability (pages are encoded by PyMuPDF; Pillow is
+        # only needed for WebP)
         self.available = (
-            self.pil_available and 
+            (self.pil_available or not self.image_encoder.requires_pil) and 
             self.pymupdf_available and 
             self.ollama_available and 
             self.model_available
@@ -111,17 +341,14 @@ class VLMProcessor(BaseExtractor):
             bool: True if Ollama is accessible
         """
         try:
-            response = requests.get(
-                f"{self.ollama_host}/api/tags",
-                timeout=5
-            )
-            
-            if response.status_code == 200:
-                self.logger.info(f"✓ Ollama server running at {self.ollama_host}")
-                return True
-            else:
-                self.logger.error(f"✗ Ollama server returned status {response.status_code}")
-                return False
+            # Also fills the model list cache used by _check_model_available()
+            self.client.list_models(timeout=5)
+            self.logger.info(f"✓ Ollama server running at {self.ollama_host}")
+            return True
+        
+        except requests.exceptions.HTTPError as e:
+            self.logger.error(f"✗ Ollama server returned status {e.response.status_code}")
+            return False
         
         except requests.exceptions.ConnectionError:
             self.logger.error(f"✗ Cannot connect to Ollama at {self.ollama_host}")
@@ -141,17 +368,13 @@ class VLMProcessor(BaseExtractor):
             bool: True if model is available
         """
         try:
-            # List local models
-            response = requests.get(
-                f"{self.ollama_host}/api/tags",
-                timeout=10
-            )
-            
-            if response.status_code != 200:
-                self.logger.error(f"Failed to list models: {response.status_code}")
+            # List local models (cached by the shared client)
+            try:
+                models = self.client.list_models(timeout=10)
+            except requests.exceptions.HTTPError as e:
+                self.logger.error(f"Failed to list models: {e.response.status_code}")
                 return False
             
-            models = response.json().get('models', [])
             model_names = [m.get('name', '') for m in models]
             
             # Check if our model exists
@@ -191,8 +414,8 @@ class VLMProcessor(BaseExtractor):
         try:
             self.logger.info(f"Downloading {self.model_name}... (this may take a few minutes)")
             
-            response = requests.post(
-                f"{self.ollama_host}/api/pull",
+            response = self.client.session.post(
+                self.client.url("/api/pull"),
                 json={"name": self.model_name},
                 timeout=self.timeout,
                 stream=True
@@ -251,6 +474,7 @@ class VLMProcessor(BaseExtractor):
                         
                         # Check if done
                         if status == 'success':
+                            self.client.invalidate_models()
                             if TQDM_AVAILABLE and pbar:
                                 pbar.close()
                             self.logger.info(f"✓ Model '{self.model_name}' downloaded successfully")
@@ -322,7 +546,7 @@ class VLMProcessor(BaseExtractor):
             # Process based on file type
             if ext == '.pdf':
                 result = self._process_pdf(file_path)
-            elif ext in ['.png', '.jpg', '.jpeg', '.webp', '.gif']:
+            elif ext in self.IMAGE_EXTENSIONS:
                 result = self._process_image(file_path)
             else:
                 return self._standardize_output(
@@ -330,22 +554,142 @@ class VLMProcessor(BaseExtractor):
                     error=f"Unsupported file type: {ext}"
                 )
             
-            # Calculate duration
-            duration = (datetime.now() - start_time).total_seconds()
-            result['metadata']['duration_seconds'] = duration
+            return self._finish_extraction(file_path, result, start_time)
+        
+        except Exception as e:
+            self.logger.error(f"VLM processing failed: {str(e)}", exc_info=True)
+            return self._standardize_output(
+                success=False,
+                error=f"VLM processing error: {str(e)}"
+            )
+    
+    def iter_pages(self, file_path: str, pages: Optional[Iterable[int]] = None) -> Iterator[Dict]:
+        """
+        Extract a PDF page by page with the VLM
+        
+        Pages are rendered ahead and queried with up to max_concurrency
+        requests in flight (see _iter_query_pages()); each page is yielded
+        as soon as it and all pages before it are answered. Images are
+        yielded as page 1.
+        
+        Args:
+            file_path: Path to file (PDF or image)
+            pages: 1-based page numbers to extract (default: all)
             
-            # Increment counter
-            self._increment_counter()
+        Yields:
+            dict: Standardized page result; metadata holds the token
+            counts and timings of the page
+        """
+        if not self.available:
+            yield self._standardize_page(None, False, error="VLM processor not available. Check logs for details.")
+            return
+        
+        is_valid, error_msg = self.validate_file(file_path)
+        if not is_valid:
+            yield self._standardize_page(None, False, error=error_msg)
+            return
+        
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext in self.IMAGE_EXTENSIONS:
+            yield from self._split_pages(self.extract(file_path), pages)
+            return
+        if ext != '.pdf':
+            yield self._standardize_page(None, False, error=f"Unsupported file type: {ext}")
+            return
+        
+        self.logger.info(f"Processing pages with VLM: {os.path.basename(file_path)}")
+        doc = fitz.open(file_path)
+        try:
+            total_pages = len(doc)
+            page_numbers = None
+            if pages is not None:
+                page_numbers = [n - 1 for n in sorted(set(pages)) if 1 <= n <= total_pages]
+            
+            for page_num, page_result in self._iter_query_pages(doc, self.PAGE_PROMPT, page_numbers=page_numbers):
+                yield self._page_output(page_num, page_result, total_pages)
+        finally:
+            doc.close()
+        
+        self._increment_counter()
+    
+    def _page_output(self, page_num: int, page_result: Dict, total_pages: int) -> Dict:
+        """
+        Turn one _query_ollama() result into iter_pages() output
+        
+        Args:
+            page_num: 0-based page number
+            page_result: _query_ollama() result
+            total_pages: Number of pages in the PDF
+            
+        Returns:
+            dict: Standardized page result
+        """
+        if not page_result['success']:
+            self.logger.error(f"  Failed to process page {page_num + 1}: {page_result.get('error')}")
+            return self._standardize_page(page_num + 1, False, error=page_result.get('error'))
+        
+        if page_result.get('partial'):
+            self.logger.warning(f"  Page {page_num + 1} is partial ({page_result.get('stop_reason')})")
+        
+        return self._standardize_page(
+            page_num + 1,
+            True,
+            text=page_result['response'],
+            metadata={
+                'total_pages': total_pages,
+                'tokens_used': page_result.get('tokens', 0),
+                'ttft_seconds': page_result.get('ttft_seconds'),
+                'tokens_per_second': page_result.get('tokens_per_second'),
+                'stop_reason': page_result.get('stop_reason'),
+                'partial': bool(page_result.get('partial')),
+                'cached': bool(page_result.get('cached')),
+                'model': self.model_name
+            }
+        )
+    
+    async def aextract(self, file_path: str) -> Dict:
+        """
+        Async version of extract() for use inside asyncio pipelines
+        
+        Page requests are sent with the async client, at most
+        max_concurrency at a time; rendering runs in a worker thread.
+        
+        Args:
+            file_path: Path to file (PDF or image)
             
-            # Log success
-            self.logger.log_extraction(
-                file_name=os.path.basename(file_path),
-                extractor=self.name,
-                status="SUCCESS" if result['success'] else "FAILED",
-                duration=duration
+        Returns:
+            dict: Extraction results (same as extract())
+        """
+        start_time = datetime.now()
+        
+        if not self.available:
+            return self._standardize_output(
+                success=False,
+                error="VLM processor not available. Check logs for details."
+            )
+        
+        is_valid, error_msg = self.validate_file(file_path)
+        if not is_valid:
+            return self._standardize_output(
+                success=False,
+                error=error_msg
             )
+        
+        try:
+            self.logger.info(f"Processing with VLM (async): {os.path.basename(file_path)}")
+            ext = os.path.splitext(file_path)[1].lower()
             
-            return result
+            if ext == '.pdf':
+                result = await self._aprocess_pdf(file_path)
+            elif ext in self.IMAGE_EXTENSIONS:
+                result = await self._aprocess_image(file_path)
+            else:
+                return self._standardize_output(
+                    success=False,
+                    error=f"Unsupported file type: {ext}"
+                )
+            
+            return self._finish_extraction(file_path, result, start_time)
         
         except Exception as e:
             self.logger.error(f"VLM processing failed: {str(e)}", exc_info=True)
@@ -354,126 +698,156 @@ class VLMProcessor(BaseExtractor):
                 error=f"VLM processing error: {str(e)}"
             )
     
-    def _process_pdf(self, pdf_path: str) -> Dict:
+    def _finish_extraction(self, file_path: str, result: Dict, start_time: datetime) -> Dict:
+        """Add duration, count and log a finished extraction"""
+        # Calculate duration
+        duration = (datetime.now() - start_time).total_seconds()
+        result['metadata']['duration_seconds'] = duration
+        
+        # Increment counter
+        self._increment_counter()
+        
+        # Log success
+        self.logger.log_extraction(
+            file_name=os.path.basename(file_path),
+            extractor=self.name,
+            status="SUCCESS" if result['success'] else "FAILED",
+            duration=duration
+        )
+        
+        return result
+    
+    def _process_pdf(
+        self,
+        pdf_path: str,
+        stream: Optional[BinaryIO] = None,
+        file_size: Optional[int] = None
+    ) -> Dict:
         """
         Process PDF file with VLM (with progress bar)
         
+        Pages are rendered ahead and sent with up to max_concurrency
+        requests in flight; pages_data is in page order.
+        
         Args:
-            pdf_path: Path to PDF
+            pdf_path: Path to PDF (name only when stream is given)
+            stream: In-memory PDF content (pages bypass page_cache)
+            file_size: Size of the in-memory content
             
         Returns:
             dict: Processing results
         """
-        try:
-            from tqdm import tqdm
-            TQDM_AVAILABLE = True
-        except ImportError:
-            TQDM_AVAILABLE = False
-        
-        doc = fitz.open(pdf_path)
-        all_text = []
-        all_pages_data = []
-        
+        if stream is not None:
+            doc = fitz.open(stream=stream, filetype='pdf')
+        else:
+            doc = fitz.open(pdf_path)
         total_pages = len(doc)  # ← Get this BEFORE closing
-        self.logger.info(f"Processing {total_pages} pages with VLM...")
+        self.logger.info(f"Processing {total_pages} pages with VLM (concurrency {self.max_concurrency})...")
         
-        # Create progress bar for pages
-        if TQDM_AVAILABLE:
-            page_iterator = tqdm(
-                range(total_pages),
+        try:
+            page_results = self._query_pages(
+                doc,
                 desc="Processing pages",
-                unit="page",
-                ncols=100
+                prompt=self.PAGE_PROMPT
             )
-        else:
-            page_iterator = range(total_pages)
+        finally:
+            doc.close()
         
-        for page_num in page_iterator:
-            if not TQDM_AVAILABLE:
-                self.logger.info(f"  Processing page {page_num + 1}/{total_pages}...")
-            
-            page = doc[page_num]
-            
-            # Convert page to image
-            mat = fitz.Matrix(2, 2)  # 2x zoom for better quality
-            pix = page.get_pixmap(matrix=mat)
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            
-            # Convert to base64
-            buffered = BytesIO()
-            img.save(buffered, format="PNG")
-            img_base64 = base64.b64encode(buffered.getvalue()).decode()
+        return self._pdf_result(pdf_path, total_pages, page_results, file_size=file_size)
+    
+    async def _aprocess_pdf(self, pdf_path: str) -> Dict:
+        """
+        Async version of _process_pdf()
+        
+        Args:
+            pdf_path: Path to PDF
             
-            # Update progress bar description
-            if TQDM_AVAILABLE:
-                page_iterator.set_postfix_str(f"Page {page_num + 1}/{total_pages}")
+        Returns:
+            dict: Processing results
+        """
+        doc = fitz.open(pdf_path)
+        total_pages = len(doc)
+        self.logger.info(f"Processing {total_pages} pages with VLM (async, concurrency {self.max_concurrency})...")
+        
+        in_flight = asyncio.Semaphore(self.max_concurrency)
+        # Rendered pages waiting for a request slot are limited to render_ahead
+        rendered = asyncio.Semaphore(self.max_concurrency + max(self.render_ahead, 0))
+        
+        async def query(page_num: int, img_base64: str) -> Tuple[int, Dict]:
+            try:
+                async with in_flight:
+                    return page_num, await self.a_query_ollama(
+                        img_base64, self.PAGE_PROMPT, on_text=self._page_text_callback(page_num)
+                    )
+            finally:
+                rendered.release()
+        
+        tasks = []
+        try:
+            file_hash = await asyncio.to_thread(self._doc_hash, doc)
+            for page_num in range(total_pages):
+                await rendered.acquire()
+                # The document is only touched by one render at a time
+                img_base64 = await asyncio.to_thread(self._render_page_base64, doc[page_num], file_hash)
+                tasks.append(asyncio.create_task(query(page_num, img_base64)))
             
-            # Process with VLM
-            page_result = self._query_ollama(
-                image_base64=img_base64,
-                prompt="""
-                This is a Japanese document page. Please extract ALL content with complete accuracy:
-
-                IMPORTANT: This document contains Japanese text. Preserve all Japanese characters exactly.
-
-                Extract the following:
-
-                1. ALL TEXT CONTENT:
-                - Transcribe every word, number, and character exactly as shown
-                - Maintain the original reading order (top to bottom, left to right)
-                - Preserve line breaks and paragraph structure
-                - Include headers, footers, page numbers, and any marginal notes
-
-                2. TABLES (if present):
-                - Identify all tables on the page
-                - For each table, provide:
-                    * Table title or caption (if any)
-                    * Number of rows and columns
-                    * Complete table content in a structured format
-                    * Preserve cell alignment and merged cells
-                - Format: Use markdown table syntax or describe clearly
-
-                3. IMAGES/FIGURES (if present):
-                - Identify all images, diagrams, charts, or figures
-                - For each image, provide:
-                    * Image type (photo, diagram, chart, logo, etc.)
-                    * Detailed description of what is shown
-                    * Any text or labels within the image
-                    * Position on the page (top, middle, bottom)
-                - Include figure numbers and captions if present
-
-                4. FLOWCHARTS/DIAGRAMS (if present):
-                - Identify all flowchart boxes and their text content
-                - Describe the flow direction and connections
-                - Note decision points and branches
-                - Explain the process flow logically
-
-                5. LAYOUT INFORMATION:
-                - Note any special formatting (bold, italic, underlined text)
-                - Identify section numbers or bullet points
-                - Preserve hierarchical structure
-
-                OUTPUT FORMAT:
-                Provide a complete, structured transcription maintaining the original document layout and order.
-                Do not summarize - transcribe completely and accurately.
-                """
-            )
+            page_results = sorted(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            doc.close()
+        
+        return self._pdf_result(pdf_path, total_pages, page_results)
+    
+    def _pdf_result(
+        self,
+        pdf_path: str,
+        total_pages: int,
+        page_results: List[Tuple[int, Dict]],
+        file_size: Optional[int] = None
+    ) -> Dict:
+        """
+        Combine per-page VLM results into the extraction output
+        
+        Args:
+            pdf_path: Path to PDF
+            total_pages: Number of pages in the PDF
+            page_results: (page_num, _query_ollama() result) in page order
+            file_size: Size of in-memory content (default: size of pdf_path)
             
+        Returns:
+            dict: Processing results
+        """
+        all_text = []
+        all_pages_data = []
+        failed_pages = []
+        partial_pages = []
+        cached_pages = 0
+        
+        for page_num, page_result in page_results:
             if page_result['success']:
+                cached_pages += page_result.get('cached', False)
+                if page_result.get('partial'):
+                    partial_pages.append(page_num + 1)
+                    self.logger.warning(
+                        f"  Page {page_num + 1} is partial ({page_result.get('stop_reason')})"
+                    )
                 page_text = page_result['response']
                 all_text.append(f"=== Page {page_num + 1} ===\n{page_text}\n")
                 
                 all_pages_data.append({
                     'page_number': page_num + 1,
                     'text': page_text,
-                    'tokens_used': page_result.get('tokens', 0)
+                    'tokens_used': page_result.get('tokens', 0),
+                    'ttft_seconds': page_result.get('ttft_seconds'),
+                    'tokens_per_second': page_result.get('tokens_per_second'),
+                    'stop_reason': page_result.get('stop_reason')
                 })
             else:
-                if not TQDM_AVAILABLE:
-                    self.logger.error(f"  Failed to process page {page_num + 1}: {page_result.get('error')}")
-        
-        # Close document BEFORE using len(doc)
-        doc.close()
+                failed_pages.append(page_num + 1)
+                self.logger.error(f"  Failed to process page {page_num + 1}: {page_result.get('error')}")
         
         # Combine all pages
         full_text = "\n\n".join(all_text)
@@ -486,24 +860,264 @@ class VLMProcessor(BaseExtractor):
                 'total_pages': total_pages,  # ← Use variable, not len(doc)
                 'pages_processed': len(all_pages_data),
                 'pages_data': all_pages_data,
+                'failed_pages': failed_pages,
+                'partial_pages': partial_pages,
+                'cached_pages': cached_pages,
+                'max_concurrency': self.max_concurrency,
                 'model': self.model_name,
                 'file_name': os.path.basename(pdf_path),
-                'file_size': os.path.getsize(pdf_path)
+                'file_size': file_size if file_size is not None else os.path.getsize(pdf_path)
             }
         )
     
-    def _process_image(self, image_path: str) -> Dict:
+    def _render_page_base64(self, page, file_hash: Optional[str] = None) -> str:
+        """
+        Render and encode a PDF page with the configured image encoder
+        
+        Pages of files with a known content hash go through page_cache,
+        so extract(), process_flowchart() and process_tables() on the
+        same document render each page once.
+        
+        Args:
+            page: PyMuPDF page
+            file_hash: Content hash of the PDF (None bypasses the cache)
+            
+        Returns:
+            str: Base64 encoded image
+        """
+        if file_hash is None:
+            return self.image_encoder.encode_base64(page)
+        
+        zoom, colorspace, encoding = self.image_encoder.render_key(page)
+        data = self.page_cache.get_or_render(
+            file_hash, page.number, zoom, colorspace, encoding,
+            lambda: self.image_encoder.encode(page)
+        )
+        return base64.b64encode(data).decode()
+    
+    def _doc_hash(self, doc) -> Optional[str]:
+        """Content hash of an opened PDF file (None for in-memory documents)"""
+        return self.page_cache.file_hash(doc.name) if doc.name else None
+    
+    def _iter_rendered_pages(
+        self,
+        doc,
+        page_numbers: Optional[List[int]] = None
+    ) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (page_num, base64 image) for every page of doc (or only
+        the 0-based page_numbers)
+        
+        With render_ahead > 0 a background thread renders up to
+        render_ahead pages ahead of the consumer, so rasterisation of the
+        next pages overlaps the VLM requests. The thread is the only user
+        of doc until the generator is exhausted or closed.
+        
+        Args:
+            doc: Open PyMuPDF document
+            page_numbers: 0-based pages to render (default: all)
+            
+        Yields:
+            tuple: (page_num, image_base64)
+        """
+        if page_numbers is None:
+            page_numbers = range(len(doc))
+        file_hash = self._doc_hash(doc)
+        
+        if self.render_ahead <= 0:
+            for page_num in page_numbers:
+                yield page_num, self._render_page_base64(doc[page_num], file_hash)
+            return
+        
+        rendered = queue.Queue(maxsize=self.render_ahead)
+        stop = threading.Event()
+        done = object()
+        
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    rendered.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def render():
+            try:
+                for page_num in page_numbers:
+                    if not put((page_num, self._render_page_base64(doc[page_num], file_hash))):
+                        return
+                put(done)
+            except Exception as e:
+                put(e)
+        
+        renderer = threading.Thread(target=render, name="vlm-render", daemon=True)
+        renderer.start()
+        try:
+            while True:
+                item = rendered.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            renderer.join()
+    
+    def _query_pages(
+        self,
+        doc,
+        prompt: str,
+        desc: str = "Processing pages",
+        page_numbers: Optional[List[int]] = None
+    ) -> List[Tuple[int, Dict]]:
+        """
+        Render every page of doc and query the VLM with prompt
+        
+        Args:
+            doc: Open PyMuPDF document
+            prompt: Prompt sent with every page
+            desc: Progress bar description
+            page_numbers: 0-based pages to query (default: all)
+            
+        Returns:
+            list: (page_num, _query_ollama() result) tuples in page order
+        """
+        return list(self._iter_query_pages(doc, prompt, desc, page_numbers))
+    
+    def _iter_query_pages(
+        self,
+        doc,
+        prompt: str,
+        desc: str = "Processing pages",
+        page_numbers: Optional[List[int]] = None
+    ) -> Iterator[Tuple[int, Dict]]:
+        """
+        Query the VLM page by page, yielding results as they complete
+        
+        Up to max_concurrency requests are in flight while the next pages
+        are rendered (see _iter_rendered_pages()). Results are yielded in
+        the order of page_numbers as soon as a page and all pages before
+        it are done.
+        
+        Args:
+            doc: Open PyMuPDF document
+            prompt: Prompt sent with every page
+            desc: Progress bar description
+            page_numbers: 0-based pages to query (default: all)
+            
+        Yields:
+            tuple: (page_num, _query_ollama() result)
+        """
+        try:
+            from tqdm import tqdm
+            TQDM_AVAILABLE = True
+        except ImportError:
+            TQDM_AVAILABLE = False
+        
+        if page_numbers is None:
+            page_numbers = list(range(len(doc)))
+        total_pages = len(page_numbers)
+        pbar = tqdm(total=total_pages, desc=desc, unit="page", ncols=100) if TQDM_AVAILABLE else None
+        results = {}
+        in_flight = {}
+        next_index = 0
+        
+        def collect(return_when):
+            done, _ = wait(in_flight, return_when=return_when)
+            for future in done:
+                page_num = in_flight.pop(future)
+                results[page_num] = future.result()
+                if pbar is not None:
+                    pbar.update(1)
+                else:
+                    self.logger.info(f"  {desc}: page {page_num + 1}/{total_pages} done")
+        
+        def ready():
+            nonlocal next_index
+            while next_index < total_pages and page_numbers[next_index] in results:
+                page_num = page_numbers[next_index]
+                next_index += 1
+                yield page_num, results.pop(page_num)
+        
+        pages = self._iter_rendered_pages(doc, page_numbers)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="vlm-query") as pool:
+                while True:
+                    # Wait for a free slot before taking the next page, so
+                    # render_ahead=0 renders only when a request can start
+                    while len(in_flight) >= self.max_concurrency:
+                        collect(FIRST_COMPLETED)
+                        yield from ready()
+                    
+                    page = next(pages, None)
+                    if page is None:
+                        break
+                    page_num, img_base64 = page
+                    on_text = self._page_text_callback(page_num)
+                    in_flight[pool.submit(self._query_ollama, img_base64, prompt, on_text=on_text)] = page_num
+                
+                while in_flight:
+                    collect(FIRST_COMPLETED)
+                    yield from ready()
+        finally:
+            pages.close()
+            if pbar is not None:
+                pbar.close()
+    
+    def process_pages(
+        self,
+        pdf_path: str,
+        page_numbers: List[int],
+        prompt: Optional[str] = None,
+        doc=None
+    ) -> List[Tuple[int, Dict]]:
+        """
+        Query the VLM for selected pages of a PDF
+        
+        Used by callers that route only some pages to the VLM (see
+        HybridExtractor).
+        
+        Args:
+            pdf_path: Path to PDF
+            page_numbers: 0-based page numbers
+            prompt: Prompt per page (default: PAGE_PROMPT)
+            doc: Already open PyMuPDF document of pdf_path (left open)
+            
+        Returns:
+            list: (page_num, _query_ollama() result) tuples in page order
+        """
+        if not page_numbers:
+            return []
+        
+        owned = doc is None
+        if owned:
+            doc = fitz.open(pdf_path)
+        try:
+            return self._query_pages(
+                doc,
+                prompt or self.PAGE_PROMPT,
+                desc="Processing pages",
+                page_numbers=sorted(page_numbers)
+            )
+        finally:
+            if owned:
+                doc.close()
+    
+    def _process_image(self, image_path: str, stream: Optional[BinaryIO] = None) -> Dict:
         """
         Process single image with VLM
         
         Args:
-            image_path: Path to image
+            image_path: Path to image (name only when stream is given)
+            stream: In-memory image content
             
         Returns:
             dict: Processing results
         """
         # Read and convert image to base64
-        img_bytes = FileUtils.read_file_binary(image_path)
+        img_bytes = stream.read() if stream is not None else FileUtils.read_file_binary(image_path)
         if not img_bytes:
             return self._standardize_output(
                 success=False,
@@ -515,32 +1129,36 @@ class VLMProcessor(BaseExtractor):
         # Process with VLM
         result = self._query_ollama(
             image_base64=img_base64,
-            prompt="""
-            This image may contain Japanese text. Please analyze and extract ALL content:
-
-            1. TEXT CONTENT:
-               - Extract all visible text (Japanese, English, numbers, symbols)
-               - Preserve reading order and layout
-               - Note text size, style, or emphasis
-
-            2. VISUAL ELEMENTS:
-               - Describe all images, diagrams, charts, or graphics
-               - Identify logos, stamps, or seals
-               - Note colors and visual styling if relevant
-
-            3. TABLES (if present):
-               - Describe table structure (rows, columns)
-               - Extract complete table content
-
-            4. STRUCTURAL ELEMENTS:
-               - Identify headers, footers, titles
-               - Note any forms, boxes, or borders
-               - Describe overall layout
-
-            Provide a complete and detailed description of everything visible in this image.
-            """
+            prompt=self.IMAGE_PROMPT
         )
         
+        return self._image_result(image_path, result)
+    
+    async def _aprocess_image(self, image_path: str) -> Dict:
+        """
+        Async version of _process_image()
+        
+        Args:
+            image_path: Path to image
+            
+        Returns:
+            dict: Processing results
+        """
+        img_bytes = await asyncio.to_thread(FileUtils.read_file_binary, image_path)
+        if not img_bytes:
+            return self._standardize_output(
+                success=False,
+                error="Failed to read image file"
+            )
+        
+        result = await self.a_query_ollama(
+            image_base64=base64.b64encode(img_bytes).decode(),
+            prompt=self.IMAGE_PROMPT
+        )
+        return self._image_result(image_path, result)
+    
+    def _image_result(self, image_path: str, result: Dict) -> Dict:
+        """Map a _query_ollama() result for an image to the extraction output"""
         if result['success']:
             return self._standardize_output(
                 success=True,
@@ -561,7 +1179,9 @@ class VLMProcessor(BaseExtractor):
         self,
         image_base64: str,
         prompt: str,
-        temperature: float = 0.1
+        temperature: float = 0.1,
+        on_text: Optional[Callable[[str], None]] = None,
+        stream: Optional[bool] = None
     ) -> Dict:
         """
         Query Ollama with image and prompt
@@ -570,46 +1190,105 @@ class VLMProcessor(BaseExtractor):
             image_base64: Base64 encoded image
             prompt: Text prompt
             temperature: Model temperature
+            on_text: Called with every streamed text chunk
+            stream: Override the processor's stream setting
             
         Returns:
             dict: {
                 'success': bool,
                 'response': str,
                 'tokens': int,
+                'ttft_seconds': float or None,
+                'tokens_per_second': float or None,
+                'stop_reason': str or None,
+                'partial': bool (streamed page cut off early),
                 'error': str
             }
         """
+        stream = self.stream if stream is None else stream
+        payload = self._generate_payload(image_base64, prompt, temperature, stream)
+        cache_key = self._response_cache_key(payload)
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                if on_text is not None:
+                    on_text(cached['response'])
+                return cached
+        
         try:
-            response = requests.post(
-                f"{self.ollama_host}/api/generate",
-                json={
-                    "model": self.model_name,
-                    "prompt": prompt,
-                    "images": [image_base64],
-                    "stream": False,
-                    "options": {
-                        "temperature": temperature
-                    }
-                },
-                timeout=self.timeout
-            )
-            
-            if response.status_code != 200:
-                return {
-                    'success': False,
-                    'error': f"Ollama returned status {response.status_code}"
-                }
-            
-            data = response.json()
-            
+            if stream:
+                result = self._stream_generate(payload, on_text)
+            else:
+                status_code, data = self.client.post_json(
+                    "/api/generate",
+                    payload,
+                    timeout=self.timeout
+                )
+                result = self._generate_result(status_code, data)
+            if cache_key is not None:
+                self.response_cache.put(cache_key, result)
+            return result
+        
+        except requests.exceptions.Timeout:
             return {
-                'success': True,
-                'response': data.get('response', ''),
-                'tokens': data.get('eval_count', 0),
-                'error': None
+                'success': False,
+                'error': f"Request timeout (>{self.timeout}s)"
             }
         
-        except requests.exceptions.Timeout:
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    async def a_query_ollama(
+        self,
+        image_base64: str,
+        prompt: str,
+        temperature: float = 0.1,
+        on_text: Optional[Callable[[str], None]] = None,
+        stream: Optional[bool] = None
+    ) -> Dict:
+        """
+        Async version of _query_ollama()
+        
+        Args:
+            image_base64: Base64 encoded image
+            prompt: Text prompt
+            temperature: Model temperature
+            on_text: Called with every streamed text chunk
+            stream: Override the processor's stream setting
+            
+        Returns:
+            dict: Same as _query_ollama()
+        """
+        stream = self.stream if stream is None else stream
+        payload = self._generate_payload(image_base64, prompt, temperature, stream)
+        cache_key = self._response_cache_key(payload)
+        if cache_key is not None:
+            cached = await asyncio.to_thread(self.response_cache.get, cache_key)
+            if cached is not None:
+                if on_text is not None:
+                    on_text(cached['response'])
+                return cached
+        
+        try:
+            if stream and HTTPX_AVAILABLE:
+                result = await self._astream_generate(payload, on_text)
+            elif stream:
+                result = await asyncio.to_thread(self._stream_generate, payload, on_text)
+            else:
+                status_code, data = await self.client.apost_json(
+                    "/api/generate",
+                    payload,
+                    timeout=self.timeout
+                )
+                result = self._generate_result(status_code, data)
+            if cache_key is not None:
+                await asyncio.to_thread(self.response_cache.put, cache_key, result)
+            return result
+        
+        except (requests.exceptions.Timeout, asyncio.TimeoutError):
             return {
                 'success': False,
                 'error': f"Request timeout (>{self.timeout}s)"
@@ -621,12 +1300,178 @@ class VLMProcessor(BaseExtractor):
                 'error': str(e)
             }
     
-    def extract_from_blob(self, blob: bytes, file_extension: str) -> Dict:
+    def _stream_generate(self, payload: Dict, on_text: Optional[Callable[[str], None]] = None) -> Dict:
+        """
+        Send a streaming /api/generate request and collect the tokens
+        
+        Args:
+            payload: Request body with "stream": true
+            on_text: Called with every text chunk
+            
+        Returns:
+            dict: _query_ollama() result
+        """
+        page = _PageStream(self.max_tokens, self.timeout, on_text)
+        events = self.client.stream_json("/api/generate", payload, timeout=(10, self.stall_timeout))
+        try:
+            for event in events:
+                if page.feed(event):
+                    break
+        except requests.exceptions.RequestException as e:
+            page.interrupt(e)
+        finally:
+            events.close()
+        return page.result()
+    
+    async def _astream_generate(self, payload: Dict, on_text: Optional[Callable[[str], None]] = None) -> Dict:
+        """Async version of _stream_generate()"""
+        page = _PageStream(self.max_tokens, self.timeout, on_text)
+        events = self.client.astream_json("/api/generate", payload, timeout=(10, self.stall_timeout))
+        try:
+            async for event in events:
+                if page.feed(event):
+                    break
+        except requests.exceptions.RequestException as e:
+            page.interrupt(e)
+        finally:
+            await events.aclose()
+        return page.result()
+    
+    def _page_text_callback(self, page_num: int) -> Optional[Callable[[str], None]]:
+        """Bind on_page_text to a page (None if no callback is set)"""
+        if self.on_page_text is None:
+            return None
+        return lambda text: self.on_page_text(page_num, text)
+    
+    def stream_page(
+        self,
+        file_path: str,
+        page_num: int = 0,
+        prompt: Optional[str] = None
+    ) -> Generator[str, None, Dict]:
+        """
+        Transcribe one page and yield the text as it is generated
+        
+        Streams even if the processor was created with stream=False. The
+        final _query_ollama() result is the generator's return value.
+        
+        Args:
+            file_path: Path to PDF or image
+            page_num: 0-based page number (PDFs only)
+            prompt: Prompt (default: PAGE_PROMPT for PDFs, IMAGE_PROMPT
+                for images)
+            
+        Yields:
+            str: Text chunks
+        
+        Example:
+            result = yield from vlm.stream_page("scan.pdf", 0)
+            for chunk in vlm.stream_page("scan.pdf", 0):
+                print(chunk, end="", flush=True)
+        """
+        if os.path.splitext(file_path)[1].lower() == '.pdf':
+            with fitz.open(file_path) as doc:
+                img_base64 = self._render_page_base64(doc[page_num], self._doc_hash(doc))
+            prompt = prompt or self.PAGE_PROMPT
+        else:
+            img_base64 = base64.b64encode(FileUtils.read_file_binary(file_path)).decode()
+            prompt = prompt or self.IMAGE_PROMPT
+        
+        chunks = queue.Queue()
+        done = object()
+        outcome = {}
+        
+        def run():
+            try:
+                outcome['result'] = self._query_ollama(img_base64, prompt, on_text=chunks.put, stream=True)
+            finally:
+                chunks.put(done)
+        
+        worker = threading.Thread(target=run, name="vlm-stream", daemon=True)
+        worker.start()
+        while True:
+            chunk = chunks.get()
+            if chunk is done:
+                break
+            yield chunk
+        worker.join()
+        return outcome['result']
+    
+    def _response_cache_key(self, payload: Dict) -> Optional[Dict]:
+        """Response cache key of a request (None if not cached)"""
+        if self.response_cache is None:
+            return None
+        return self.response_cache.make_key(payload, self._model_digest())
+    
+    def _model_digest(self) -> str:
+        """Digest of the model on the server ('' if unknown)"""
+        try:
+            for model in self.client.list_models():
+                if model.get('name') in (self.model_name, f"{self.model_name}:latest"):
+                    return model.get('digest', '')
+        except Exception:
+            pass
+        return ''
+    
+    def get_config(self) -> Dict:
+        """Options that change the extraction output (result cache key)"""
+        return {
+            'model': self.model_name,
+            'model_digest': self._model_digest(),
+            'image_encoder': list(self.image_encoder.config_key),
+            'max_tokens': self.max_tokens,
+            'page_prompt': hashlib.sha256(self.PAGE_PROMPT.encode()).hexdigest(),
+            'image_prompt': hashlib.sha256(self.IMAGE_PROMPT.encode()).hexdigest()
+        }
+    
+    def _generate_payload(
+        self,
+        image_base64: str,
+        prompt: str,
+        temperature: float,
+        stream: bool = False
+    ) -> Dict:
+        """Request body for /api/generate"""
+        options = {"temperature": temperature}
+        if self.max_tokens:
+            options["num_predict"] = self.max_tokens
+        return {
+            "model": self.model_name,
+            "prompt": prompt,
+            "images": [image_base64],
+            "stream": stream,
+            "options": options
+        }
+    
+    @staticmethod
+    def _generate_result(status_code: int, data: Dict) -> Dict:
+        """Map an /api/generate response to the _query_ollama() result"""
+        if status_code != 200:
+            return {
+                'success': False,
+                'error': f"Ollama returned status {status_code}"
+            }
+        
+        # Server-side timings (nanoseconds), reported by Ollama
+        tokens = data.get('eval_count', 0)
+        eval_duration = data.get('eval_duration')
+        prompt_duration = (data.get('load_duration') or 0) + (data.get('prompt_eval_duration') or 0)
+        return {
+            'success': True,
+            'response': data.get('response', ''),
+            'tokens': tokens,
+            'ttft_seconds': round(prompt_duration / 1e9, 3) if prompt_duration else None,
+            'tokens_per_second': round(tokens / (eval_duration / 1e9), 1) if eval_duration else None,
+            'stop_reason': _stop_reason(data.get('done_reason')),
+            'error': None
+        }
+    
+    def extract_from_blob(self, blob: Union[bytes, str], file_extension: str) -> Dict:
         """
         Extract content from binary data
         
         Args:
-            blob: Binary file content
+            blob: Binary file content, memory-mapped view or path to it
             file_extension: File extension
             
         Returns:
@@ -638,23 +1483,25 @@ class VLMProcessor(BaseExtractor):
                 error="VLM processor not available"
             )
         
-        try:
-            # Create temporary file
-            temp_path = FileUtils.create_temp_file(blob, suffix=file_extension)
+        def extract_stream(stream, file_name: str, file_size: int) -> Dict:
+            start_time = datetime.now()
+            ext = file_extension.lower()
+            self.logger.info(f"Processing with VLM: {file_name} (in memory)")
             
-            if not temp_path:
+            if ext == '.pdf':
+                result = self._process_pdf(file_name, stream=stream, file_size=file_size)
+            elif ext in self.IMAGE_EXTENSIONS:
+                result = self._process_image(file_name, stream=stream)
+            else:
                 return self._standardize_output(
                     success=False,
-                    error="Failed to create temporary file"
+                    error=f"Unsupported file type: {ext}"
                 )
             
-            # Process
-            result = self.extract(temp_path)
-            
-            # Clean up
-            FileUtils.delete_file(temp_path)
-            
-            return result
+            return self._finish_extraction(file_name, result, start_time)
+        
+        try:
+            return self._extract_blob(blob, file_extension, extract_stream)
         
         except Exception as e:
             return self._standardize_output(
@@ -746,36 +1593,23 @@ class VLMProcessor(BaseExtractor):
                 doc = fitz.open(file_path)
                 all_flowcharts = []
                 
-                for page_num in range(len(doc)):
-                    self.logger.info(f"  Processing flowchart on page {page_num + 1}/{len(doc)}...")
-                    
-                    page = doc[page_num]
-                    
-                    # Convert to image
-                    mat = fitz.Matrix(2, 2)
-                    pix = page.get_pixmap(matrix=mat)
-                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                    
-                    buffered = BytesIO()
-                    img.save(buffered, format="PNG")
-                    img_base64 = base64.b64encode(buffered.getvalue()).decode()
-                    
-                    # Query with flowchart prompt
-                    result = self._query_ollama(img_base64, prompt)
-                    
+                # Query every page with the flowchart prompt
+                try:
+                    page_results = self._query_pages(doc, prompt, desc="Processing flowcharts")
+                finally:
+                    doc.close()
+                
+                for page_num, result in page_results:
                     if result['success']:
                         all_flowcharts.append({
                             'page': page_num + 1,
                             'flowchart_data': result['response']
                         })
                 
-                # doc.close()
-                
                 combined = "\n\n".join([
                     f"=== PAGE {fc['page']} FLOWCHART ===\n{fc['flowchart_data']}"
                     for fc in all_flowcharts
                 ])
-                doc.close()
                 return self._standardize_output(
                     success=True,
                     text=combined,
@@ -853,25 +1687,13 @@ class VLMProcessor(BaseExtractor):
             
             doc = fitz.open(file_path)
             all_tables = []
+            total_pages = len(doc)
             
-            for page_num in range(len(doc)):
-                self.logger.info(f"Extracting tables from page {page_num + 1}/{len(doc)}...")
-                
-                page = doc[page_num]
-                
-                # Convert page to image
-                mat = fitz.Matrix(2, 2)
-                pix = page.get_pixmap(matrix=mat)
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                
-                # Convert to base64
-                buffered = BytesIO()
-                img.save(buffered, format="PNG")
-                img_base64 = base64.b64encode(buffered.getvalue()).decode()
-                
+            try:
                 # Table-focused prompt
-                result = self._query_ollama(
-                    image_base64=img_base64,
+                page_results = self._query_pages(
+                    doc,
+                    desc="Extracting tables",
                     prompt="""
                     This page contains Japanese text and may have tables. Focus on TABLE EXTRACTION:
 
@@ -905,29 +1727,28 @@ class VLMProcessor(BaseExtractor):
                     - Note empty cells as "empty" or "-"
                     """
                 )
-                
+            finally:
+                doc.close()
+            
+            for page_num, result in page_results:
                 if result['success']:
                     all_tables.append({
                         'page': page_num + 1,
                         'content': result['response']
                     })
             
-            # doc.close()
-            
             # Combine results
             combined = "\n\n".join([
                 f"=== PAGE {t['page']} TABLES ===\n{t['content']}"
                 for t in all_tables
             ])
-
-            doc.close()
             
             return self._standardize_output(
                 success=True,
                 text=combined,
                 tables=all_tables,
                 metadata={
-                    'total_pages': len(doc),
+                    'total_pages': total_pages,
                     'pages_with_tables': len(all_tables),
                     'model': self.model_name,
                     'extraction_type': 'tables_focused'
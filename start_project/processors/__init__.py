@@ -0,0 +1,20 @@
+"""
+Processors module for turning extracted content into retrievable units
+"""
+
+from .chunker import Chunker, estimate_tokens
+from .embedding_generator import (
+    EmbeddingGenerator,
+    SentenceTransformerModel,
+    decode_vector,
+    encode_vector
+)
+
+__all__ = [
+    'Chunker',
+    'estimate_tokens',
+    'EmbeddingGenerator',
+    'SentenceTransformerModel',
+    'decode_vector',
+    'encode_vector'
+]
@@ -0,0 +1,478 @@
+"""
+Chunker for standardized extractor output
+Splits text and tables into chunks with page/bbox provenance, streaming
+"""
+
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+
+# Sentence ends. Closing brackets and following whitespace stay with the
+# sentence; '.' only ends a sentence before whitespace (not in "3.5")
+_SENTENCE_END = {
+    'character': re.compile(r'[.!?。！？]+[」』）)\]"\']*(?:\s+|$)|[。！？]+|\n+'),
+    'token': re.compile(r'[.!?。！？]+[」』）)\]"\']*(?:\s+|$)|[。！？]+|\n+'),
+    'japanese': re.compile(r'[。！？!?．]+[」』）)\]]*\s*|\n+')
+}
+
+# Finer boundaries for sentences longer than a chunk
+_CLAUSE_END = {
+    'character': re.compile(r'\s+'),
+    'token': re.compile(r'\s+|[、，]'),
+    'japanese': re.compile(r'[、，,]\s*|\s+')
+}
+
+# CJK characters count as one token each in estimate_tokens()
+_TOKEN_PATTERN = re.compile(r'[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff\uff66-\uff9f]|\w+|[^\w\s]')
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate token count without a tokenizer
+    
+    Words and punctuation marks count as one token, Japanese and Chinese
+    characters as one token each (close to BPE tokenizers on CJK text).
+    
+    Args:
+        text: Text to measure
+    
+    Returns:
+        int: Estimated number of tokens
+    """
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def _split_after(text: str, pattern: re.Pattern) -> Iterator[str]:
+    """Split text after every match of pattern, keeping the separators"""
+    start = 0
+    for match in pattern.finditer(text):
+        end = match.end()
+        if end > start:
+            yield text[start:end]
+            start = end
+    if start < len(text):
+        yield text[start:]
+
+
+class _Segment(NamedTuple):
+    """Piece of text that is never split further, with its provenance"""
+    text: str
+    length: int
+    page: Optional[int]
+    bbox: Optional[List[float]]
+
+
+class _ChunkBuffer:
+    """
+    Packs segments into chunks of at most max_length
+    
+    Only the segments of the chunk being built (plus the overlap kept
+    from the previous one) are held in memory.
+    """
+    
+    def __init__(self, max_length: int, overlap: int):
+        self.max_length = max_length
+        self.overlap = overlap
+        self.parts: List[_Segment] = []
+        self.length = 0
+        # Parts not yet part of an emitted chunk
+        self.fresh = 0
+    
+    def push(self, segment: _Segment) -> Iterator[List[_Segment]]:
+        """Add a segment; yields the chunk it does not fit into"""
+        if self.parts and self.length + segment.length > self.max_length:
+            if self.fresh:
+                yield self._emit()
+            if self.length + segment.length > self.max_length:
+                # The overlap alone leaves no room for the segment
+                self.parts, self.length = [], 0
+        
+        self.parts.append(segment)
+        self.length += segment.length
+        self.fresh += 1
+    
+    def flush(self) -> Iterator[List[_Segment]]:
+        """Yield the last, partly filled chunk"""
+        if self.fresh:
+            parts = self.parts
+            self.parts, self.length, self.fresh = [], 0, 0
+            yield parts
+    
+    def _emit(self) -> List[_Segment]:
+        parts = self.parts
+        keep = []
+        kept = 0
+        for segment in reversed(parts):
+            if kept + segment.length > self.overlap:
+                break
+            keep.append(segment)
+            kept += segment.length
+        keep.reverse()
+        
+        self.parts, self.length, self.fresh = keep, kept, 0
+        return parts
+
+
+class Chunker:
+    """
+    Split extractor output into chunks for content_chunks
+    
+    Input is consumed as a stream: a standardized extraction result, the
+    page results of BaseExtractor.iter_pages(), or plain text. Text is cut
+    at sentence ends, then at clause boundaries, and only mid-sentence for
+    sentences longer than a chunk; the pieces are packed into chunks of up
+    to chunk_size with chunk_overlap carried over. Tables become chunks of
+    their own. Every chunk records the pages and bounding boxes
+    (unstructured element coordinates, table bboxes) it came from.
+    
+    Modes:
+    - 'character': sizes in characters, English and Japanese sentence ends
+    - 'token': sizes in tokens (token_counter, by default tiktoken if
+      installed, else estimate_tokens())
+    - 'japanese': sizes in characters, sentences end at 。！？ and long
+      sentences are cut at 、， before anywhere else
+    
+    Example:
+        chunker = Chunker(mode='japanese', chunk_size=400, chunk_overlap=50)
+        pages = extractor.iter_pages_checkpointed(pdf_path, db, file_hash)
+        count = chunker.write_chunks(db, file_hash, pages)
+    """
+    
+    MODES = ('character', 'token', 'japanese')
+    
+    def __init__(
+        self,
+        mode: str = 'character',
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        token_counter: Optional[Callable[[str], int]] = None,
+        include_tables: bool = True,
+        split_pages: bool = False
+    ):
+        """
+        Initialize chunker
+        
+        Args:
+            mode: 'character', 'token' or 'japanese'
+            chunk_size: Maximum chunk length (characters, or tokens in
+                'token' mode)
+            chunk_overlap: Length of trailing text repeated at the start
+                of the next chunk (whole sentences only)
+            token_counter: Counts the tokens of a string ('token' mode)
+            include_tables: Emit table chunks
+            split_pages: Never let a text chunk span two pages
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid mode: {mode}. Use one of {self.MODES}")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        if not 0 <= chunk_overlap < chunk_size:
+            raise ValueError("chunk_overlap must be between 0 and chunk_size - 1")
+        
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.include_tables = include_tables
+        self.split_pages = split_pages
+        self.sentence_end = _SENTENCE_END[mode]
+        self.clause_end = _CLAUSE_END[mode]
+        
+        if mode == 'token':
+            self.length_function = token_counter or self._default_token_counter()
+        else:
+            self.length_function = len
+    
+    @staticmethod
+    def _default_token_counter() -> Callable[[str], int]:
+        """tiktoken's cl100k_base if installed, else estimate_tokens()"""
+        try:
+            import tiktoken
+            encoding = tiktoken.get_encoding('cl100k_base')
+            return lambda text: len(encoding.encode(text, disallowed_special=()))
+        except Exception:
+            return estimate_tokens
+    
+    def get_config(self) -> Dict:
+        """Options that change the chunks"""
+        return {
+            'mode': self.mode,
+            'chunk_size': self.chunk_size,
+            'chunk_overlap': self.chunk_overlap,
+            'include_tables': self.include_tables,
+            'split_pages': self.split_pages
+        }
+    
+    def split_text(self, text: str) -> List[str]:
+        """
+        Split plain text into chunk texts
+        
+        Args:
+            text: Text to split
+        
+        Returns:
+            list: Chunk texts
+        """
+        return [chunk['chunk_text'] for chunk in self.iter_chunks('', text)]
+    
+    def __call__(self, file_hash: str, source: Union[str, Dict, Iterable[Dict]]) -> List[Dict]:
+        """IngestionPipeline chunk_func: all chunks of one file as a list"""
+        return list(self.iter_chunks(file_hash, source))
+    
+    def iter_chunks(
+        self,
+        file_hash: str,
+        source: Union[str, Dict, Iterable[Dict]],
+        start_index: int = 0
+    ) -> Iterator[Dict]:
+        """
+        Chunk extractor output lazily
+        
+        Args:
+            file_hash: MD5 hash of the source file (chunk ids are
+                '<file_hash>_<index>')
+            source: Plain text, a standardized extraction result, or an
+                iterable of iter_pages() page results (consumed as it is
+                produced)
+            start_index: Index of the first chunk
+        
+        Yields:
+            dict: insert_chunks_bulk() chunk with chunk_metadata holding
+            content_type, page_start, page_end, pages, bboxes and length
+        """
+        index = start_index
+        text_buffer = _ChunkBuffer(self.chunk_size, self.chunk_overlap)
+        current_page = None
+        
+        for content_type, text, page, bbox in self._iter_units(source):
+            if content_type == 'table':
+                if not self.include_tables:
+                    continue
+                table_buffer = _ChunkBuffer(self.chunk_size, 0)
+                for parts in self._pack(table_buffer, text, page, bbox):
+                    chunk = self._build_chunk(file_hash, index, 'table', parts)
+                    if chunk is not None:
+                        index += 1
+                        yield chunk
+                continue
+            
+            if self.split_pages and page != current_page:
+                for parts in text_buffer.flush():
+                    chunk = self._build_chunk(file_hash, index, 'text', parts)
+                    if chunk is not None:
+                        index += 1
+                        yield chunk
+                # No overlap across pages either
+                text_buffer.parts, text_buffer.length = [], 0
+            current_page = page
+            
+            for parts in self._pack(text_buffer, text, page, bbox, flush=False):
+                chunk = self._build_chunk(file_hash, index, 'text', parts)
+                if chunk is not None:
+                    index += 1
+                    yield chunk
+        
+        for parts in text_buffer.flush():
+            chunk = self._build_chunk(file_hash, index, 'text', parts)
+            if chunk is not None:
+                yield chunk
+    
+    def write_chunks(
+        self,
+        db,
+        file_hash: str,
+        source: Union[str, Dict, Iterable[Dict]],
+        batch_size: int = 500,
+        replace: bool = True
+    ) -> int:
+        """
+        Chunk extractor output straight into content_chunks
+        
+        Chunks are inserted with insert_chunks_bulk() in batches of
+        batch_size, each batch in its own transaction, so neither the
+        chunk list of the document nor a long write lock is held while
+        pages are still being extracted.
+        
+        Args:
+            db: DatabaseManager
+            file_hash: MD5 hash of the source file
+            source: See iter_chunks()
+            batch_size: Chunks per insert
+            replace: Delete the file's existing chunks first
+        
+        Returns:
+            int: Number of chunks written
+        
+        Raises:
+            RuntimeError: If a batch could not be stored
+        """
+        if replace:
+            db.delete_chunks(file_hash)
+        
+        count = 0
+        batch = []
+        for chunk in self.iter_chunks(file_hash, source):
+            batch.append(chunk)
+            if len(batch) >= batch_size:
+                count += self._insert_batch(db, file_hash, batch)
+                batch = []
+        if batch:
+            count += self._insert_batch(db, file_hash, batch)
+        return count
+    
+    @staticmethod
+    def _insert_batch(db, file_hash: str, batch: List[Dict]) -> int:
+        if not db.insert_chunks_bulk(batch):
+            raise RuntimeError(f"Failed to store chunks for {file_hash}")
+        return len(batch)
+    
+    def _pack(
+        self,
+        buffer: _ChunkBuffer,
+        text: str,
+        page: Optional[int],
+        bbox: Optional[List[float]],
+        flush: bool = True
+    ) -> Iterator[List[_Segment]]:
+        """Push the segments of text into buffer, yielding full chunks"""
+        for segment in self._segments(text, page, bbox):
+            yield from buffer.push(segment)
+        if flush:
+            yield from buffer.flush()
+    
+    def _segments(self, text: str, page: Optional[int], bbox: Optional[List[float]]) -> Iterator[_Segment]:
+        """Sentences of text, cut further where longer than chunk_size"""
+        for sentence in _split_after(text, self.sentence_end):
+            length = self.length_function(sentence)
+            if length <= self.chunk_size:
+                yield _Segment(sentence, length, page, bbox)
+                continue
+            
+            for clause in _split_after(sentence, self.clause_end):
+                length = self.length_function(clause)
+                if length <= self.chunk_size:
+                    yield _Segment(clause, length, page, bbox)
+                else:
+                    yield from self._hard_split(clause, length, page, bbox)
+    
+    def _hard_split(self, text: str, length: int, page: Optional[int], bbox: Optional[List[float]]) -> Iterator[_Segment]:
+        """Cut text without a boundary into pieces of at most chunk_size"""
+        # Characters per piece; in token mode estimated from the token density
+        step = max(1, len(text) * self.chunk_size // max(length, 1))
+        start = 0
+        while start < len(text):
+            piece = text[start:start + step]
+            piece_length = self.length_function(piece)
+            while piece_length > self.chunk_size and len(piece) > 1:
+                piece = piece[:len(piece) // 2]
+                piece_length = self.length_function(piece)
+            yield _Segment(piece, piece_length, page, bbox)
+            start += len(piece)
+    
+    def _build_chunk(self, file_hash: str, index: int, content_type: str, parts: List[_Segment]) -> Optional[Dict]:
+        """Chunk dict for insert_chunks_bulk(); None for whitespace only"""
+        text = ''.join(part.text for part in parts).strip()
+        if not text:
+            return None
+        
+        pages = sorted({part.page for part in parts if part.page is not None})
+        bboxes = []
+        for part in parts:
+            if part.bbox is not None:
+                entry = {'page': part.page, 'bbox': part.bbox}
+                if not bboxes or bboxes[-1] != entry:
+                    bboxes.append(entry)
+        
+        metadata = {
+            'content_type': content_type,
+            'mode': self.mode,
+            'page_start': pages[0] if pages else None,
+            'page_end': pages[-1] if pages else None,
+            'pages': pages,
+            'length': sum(part.length for part in parts)
+        }
+        if bboxes:
+            metadata['bboxes'] = bboxes
+        
+        return {
+            'chunk_id': f"{file_hash}_{index}",
+            'file_hash': file_hash,
+            'chunk_index': index,
+            'chunk_text': text,
+            'chunk_metadata': metadata
+        }
+    
+    def _iter_units(self, source: Union[str, Dict, Iterable[Dict]]) -> Iterator[tuple]:
+        """(content_type, text, page, bbox) for every text block and table"""
+        if isinstance(source, str):
+            yield 'text', source, None, None
+            return
+        
+        pages = self._result_pages(source) if isinstance(source, dict) else source
+        for page in pages:
+            if page.get('success', True):
+                yield from self._page_units(page)
+    
+    @staticmethod
+    def _result_pages(result: Dict) -> Iterator[Dict]:
+        """Pages of a complete extraction result (by pages_data if present)"""
+        if not result.get('success', True):
+            return
+        
+        metadata = result.get('metadata') or {}
+        pages_data = metadata.get('pages_data')
+        if metadata.get('elements') or not pages_data:
+            yield {**result, 'page_number': None}
+            return
+        
+        tables = list(result.get('tables') or [])
+        for page_data in pages_data:
+            page_number = page_data['page_number']
+            on_page = [table for table in tables if _item_page(table) == page_number]
+            tables = [table for table in tables if _item_page(table) != page_number]
+            yield {'page_number': page_number, 'text': page_data.get('text', ''), 'tables': on_page}
+        if tables:
+            yield {'page_number': None, 'text': '', 'tables': tables}
+    
+    @staticmethod
+    def _page_units(page: Dict) -> Iterator[tuple]:
+        """Units of one page; unstructured elements keep their coordinates"""
+        page_number = page.get('page_number')
+        elements = (page.get('metadata') or {}).get('elements')
+        
+        if elements:
+            for element in elements:
+                element_metadata = element.get('metadata') or {}
+                element_page = element_metadata.get('page_number') or page_number
+                bbox = _item_bbox(element)
+                if element.get('type') == 'Table':
+                    yield 'table', element.get('text', ''), element_page, bbox
+                elif element.get('text'):
+                    # Elements are paragraphs: end each with a boundary
+                    yield 'text', element['text'] + '\n\n', element_page, bbox
+            return
+        
+        if page.get('text'):
+            yield 'text', page['text'] + '\n\n', page_number, None
+        for table in page.get('tables') or []:
+            yield 'table', table.get('text') or '', _item_page(table) or page_number, _item_bbox(table)
+
+
+def _item_page(item: Dict) -> Optional[int]:
+    """Page number of a table or element dict"""
+    metadata = item.get('metadata') or {}
+    return item.get('page_number') or item.get('page') or metadata.get('page_number') or metadata.get('page')
+
+
+def _item_bbox(item: Dict) -> Optional[List[float]]:
+    """[x0, y0, x1, y1] of a table or element dict, if it has one"""
+    metadata = item.get('metadata') or {}
+    bbox = item.get('bbox') or metadata.get('bbox')
+    if bbox:
+        return [round(float(value), 2) for value in bbox]
+    
+    points = (metadata.get('coordinates') or {}).get('points')
+    if points:
+        xs = [point[0] for point in points]
+        ys = [point[1] for point in points]
+        return [round(min(xs), 2), round(min(ys), 2), round(max(xs), 2), round(max(ys), 2)]
+    return None
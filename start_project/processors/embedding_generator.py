@@ -0,0 +1,407 @@
+"""
+Embedding generator for content_chunks
+Batches chunks by token count, embeds them with a local model and stores
+compact vectors
+"""
+
+import hashlib
+import struct
+import threading
+import time
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from .chunker import estimate_tokens
+except:
+    from chunker import estimate_tokens
+
+try:
+    from ..utils import Logger
+except:
+    from utils import Logger
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+PRECISIONS = ('float32', 'float16', 'int8')
+
+# Bytes per vector component of each stored precision
+PRECISION_BYTES = {'float32': 4, 'float16': 2, 'int8': 1}
+
+
+def encode_vector(vector: Sequence[float], precision: str = 'float32') -> Tuple[bytes, Optional[float]]:
+    """
+    Pack a vector into contiguous little-endian bytes
+    
+    int8 vectors are quantised symmetrically: component = round(v / scale)
+    with scale = max(|v|) / 127, and the scale is returned alongside.
+    
+    Args:
+        vector: Embedding (NumPy array or sequence of floats)
+        precision: 'float32', 'float16' or 'int8'
+    
+    Returns:
+        tuple: (bytes, scale) - scale is None except for int8
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Invalid precision: {precision}. Use one of {PRECISIONS}")
+    
+    if NUMPY_AVAILABLE:
+        values = np.asarray(vector, dtype=np.float32)
+        if precision == 'float32':
+            return values.astype('<f4').tobytes(), None
+        if precision == 'float16':
+            return values.astype('<f2').tobytes(), None
+        peak = float(np.abs(values).max()) if values.size else 0.0
+        scale = peak / 127 if peak > 0 else 1.0
+        return np.clip(np.rint(values / scale), -127, 127).astype(np.int8).tobytes(), scale
+    
+    values = [float(value) for value in vector]
+    if precision == 'float32':
+        return struct.pack(f'<{len(values)}f', *values), None
+    if precision == 'float16':
+        return struct.pack(f'<{len(values)}e', *values), None
+    peak = max((abs(value) for value in values), default=0.0)
+    scale = peak / 127 if peak > 0 else 1.0
+    return array('b', (max(-127, min(127, round(value / scale))) for value in values)).tobytes(), scale
+
+
+def decode_vector(data: bytes, precision: str = 'float32', scale: Optional[float] = None):
+    """
+    Unpack bytes written by encode_vector()
+    
+    Args:
+        data: Stored embedding bytes
+        precision: Precision the bytes were written with
+        scale: int8 scale
+    
+    Returns:
+        numpy.ndarray (float32) or list of floats without NumPy
+    """
+    if NUMPY_AVAILABLE:
+        if precision == 'float32':
+            return np.frombuffer(data, dtype='<f4')
+        if precision == 'float16':
+            return np.frombuffer(data, dtype='<f2').astype(np.float32)
+        return np.frombuffer(data, dtype=np.int8).astype(np.float32) * np.float32(scale or 1.0)
+    
+    if precision == 'float32':
+        return list(struct.unpack(f'<{len(data) // 4}f', data))
+    if precision == 'float16':
+        return list(struct.unpack(f'<{len(data) // 2}e', data))
+    return [value * (scale or 1.0) for value in array('b', data)]
+
+
+class SentenceTransformerModel:
+    """
+    Local sentence-transformers model on CPU
+    
+    Loaded models are shared by all instances in the process (keyed by
+    model name and device), like DoclingExtractor's converters.
+    """
+    
+    _models: Dict[Tuple[str, str], object] = {}
+    _models_lock = threading.Lock()
+    
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+        device: str = "cpu",
+        threads: Optional[int] = None,
+        normalize: bool = True
+    ):
+        """
+        Initialize model
+        
+        Args:
+            model_name: Hugging Face model id or local path
+            device: Torch device
+            threads: Torch intra-op threads (default: torch's choice)
+            normalize: Return unit-length vectors (cosine = dot product)
+        """
+        self.name = model_name
+        self.device = device
+        self.threads = threads
+        self.normalize = normalize
+        self._model = None
+        
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+    
+    @property
+    def model(self):
+        """The loaded SentenceTransformer (loaded on first use)"""
+        if self._model is None:
+            key = (self.name, self.device)
+            with self._models_lock:
+                if key not in self._models:
+                    from sentence_transformers import SentenceTransformer
+                    self._models[key] = SentenceTransformer(self.name, device=self.device)
+                self._model = self._models[key]
+        return self._model
+    
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+    
+    def encode(self, texts: List[str]):
+        """
+        Embed a batch of texts
+        
+        Args:
+            texts: Texts of one batch
+        
+        Returns:
+            numpy.ndarray: (len(texts), dimension) float32 matrix
+        """
+        return self.model.encode(
+            texts,
+            batch_size=len(texts),
+            convert_to_numpy=True,
+            normalize_embeddings=self.normalize,
+            show_progress_bar=False
+        )
+
+
+class EmbeddingGenerator:
+    """
+    Embed chunks locally and store them in content_chunks
+    
+    - Identical chunk texts are embedded once: texts are deduplicated by
+      hash within a run, and vectors already stored for the same text
+      (same model and precision) are copied instead of recomputed.
+    - Texts are sorted by length and grouped into batches whose padded
+      size (texts x longest text, in tokens) stays within
+      max_batch_tokens, so short chunks go in large batches and long
+      chunks in small ones.
+    - Vectors are stored as contiguous float32, float16 or int8 bytes;
+      content_chunks records model, dimension, precision and int8 scale.
+    
+    Any object with name, dimension and encode(list of str) -> matrix can
+    replace the default SentenceTransformerModel.
+    
+    Example:
+        generator = EmbeddingGenerator(precision='float16', threads=4)
+        stats = generator.embed_file(db, file_hash)
+    """
+    
+    def __init__(
+        self,
+        model=None,
+        model_name: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+        precision: str = 'float32',
+        threads: Optional[int] = None,
+        max_batch_tokens: int = 16384,
+        max_batch_size: int = 128,
+        token_counter: Optional[Callable[[str], int]] = None,
+        logger: Optional[Logger] = None
+    ):
+        """
+        Initialize embedding generator
+        
+        Args:
+            model: Embedding model (default: SentenceTransformerModel of
+                model_name on CPU)
+            model_name: Model for the default backend
+            precision: Stored precision, 'float32', 'float16' or 'int8'
+            threads: CPU threads for the default backend
+            max_batch_tokens: Padded tokens per model call
+            max_batch_size: Texts per model call
+            token_counter: Token count of a text (default:
+                estimate_tokens())
+            logger: Logger instance
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Invalid precision: {precision}. Use one of {PRECISIONS}")
+        
+        self.precision = precision
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.token_counter = token_counter or estimate_tokens
+        self.logger = logger or Logger.get_logger("EmbeddingGenerator")
+        
+        if model is None:
+            try:
+                import sentence_transformers  # noqa: F401
+                model = SentenceTransformerModel(model_name, threads=threads)
+                self.available = True
+            except ImportError:
+                self.logger.error("sentence-transformers not installed. Install with: pip install sentence-transformers")
+                self.available = False
+        else:
+            self.available = True
+        self.model = model
+    
+    @property
+    def model_name(self) -> str:
+        return getattr(self.model, 'name', None) or type(self.model).__name__
+    
+    def batches(self, texts: List[str]) -> List[List[int]]:
+        """
+        Group text indices into model calls by padded token count
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            list: Lists of indices into texts, longest texts first
+        """
+        lengths = [max(1, self.token_counter(text)) for text in texts]
+        order = sorted(range(len(texts)), key=lambda i: lengths[i], reverse=True)
+        
+        batches = []
+        batch = []
+        for i in order:
+            # Sorted longest first: the first text sets the padded length
+            padded = lengths[batch[0]] * (len(batch) + 1) if batch else lengths[i]
+            if batch and (padded > self.max_batch_tokens or len(batch) >= self.max_batch_size):
+                batches.append(batch)
+                batch = []
+            batch.append(i)
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def embed_texts(self, texts: List[str]) -> List:
+        """
+        Embed texts, each distinct text once
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            list: float32 vector per text (in input order)
+        """
+        unique = {}
+        for text in texts:
+            unique.setdefault(hashlib.md5(text.encode('utf-8')).hexdigest(), text)
+        keys = list(unique)
+        vectors = self._embed_unique([unique[key] for key in keys])
+        by_hash = dict(zip(keys, vectors))
+        return [by_hash[hashlib.md5(text.encode('utf-8')).hexdigest()] for text in texts]
+    
+    def _embed_unique(self, texts: List[str]) -> List:
+        """Run the model over texts in token-budgeted batches"""
+        vectors = [None] * len(texts)
+        for batch in self.batches(texts):
+            matrix = self.model.encode([texts[i] for i in batch])
+            for i, vector in zip(batch, matrix):
+                vectors[i] = vector
+        return vectors
+    
+    def embed_chunks(self, db, chunks: Iterable[Dict]) -> Dict:
+        """
+        Embed stored chunks and write their vectors
+        
+        Args:
+            db: DatabaseManager holding the chunks
+            chunks: Dicts with chunk_id and chunk_text (text_hash optional)
+        
+        Returns:
+            dict: Counts of chunks, embedded texts, reused vectors, bytes
+            written and seconds
+        """
+        start = time.perf_counter()
+        stats = {'success': True, 'chunks': 0, 'embedded': 0, 'reused': 0, 'bytes': 0}
+        if not self.available:
+            stats.update(success=False, error="No embedding model available")
+            return stats
+        
+        chunks = list(chunks)
+        for chunk in chunks:
+            chunk.setdefault('text_hash', db.text_hash(chunk['chunk_text']))
+        
+        # Distinct texts, then those another chunk already has a vector for
+        texts = {}
+        for chunk in chunks:
+            texts.setdefault(chunk['text_hash'], chunk['chunk_text'])
+        stored = db.get_embeddings_by_text_hash(texts, self.model_name, self.precision)
+        missing = [text_hash for text_hash in texts if text_hash not in stored]
+        
+        if missing:
+            vectors = self._embed_unique([texts[text_hash] for text_hash in missing])
+            for text_hash, vector in zip(missing, vectors):
+                data, scale = encode_vector(vector, self.precision)
+                stored[text_hash] = (data, len(vector), scale)
+        
+        rows = []
+        for chunk in chunks:
+            data, dimension, scale = stored[chunk['text_hash']]
+            rows.append({
+                'chunk_id': chunk['chunk_id'],
+                'embedding_vector': data,
+                'embedding_model': self.model_name,
+                'embedding_dim': dimension,
+                'embedding_dtype': self.precision,
+                'embedding_scale': scale,
+                'text_hash': chunk['text_hash']
+            })
+            stats['bytes'] += len(data)
+        
+        if rows and not db.update_chunk_embeddings_bulk(rows):
+            stats.update(success=False, error="Failed to store embeddings")
+            return stats
+        
+        stats['chunks'] = len(chunks)
+        stats['embedded'] = len(missing)
+        stats['reused'] = len(chunks) - len(missing)
+        stats['seconds'] = round(time.perf_counter() - start, 3)
+        return stats
+    
+    def embed_file(self, db, file_hash: Optional[str] = None, batch_size: int = 1000) -> Dict:
+        """
+        Embed every chunk without a vector of this model and precision
+        
+        Args:
+            db: DatabaseManager holding the chunks
+            file_hash: Only chunks of this file (default: all files)
+            batch_size: Chunks read and written per step
+        
+        Returns:
+            dict: Summed embed_chunks() counts
+        """
+        totals = {'success': True, 'chunks': 0, 'embedded': 0, 'reused': 0, 'bytes': 0, 'seconds': 0.0}
+        for chunks in db.iter_chunks_to_embed(self.model_name, self.precision, file_hash, batch_size):
+            stats = self.embed_chunks(db, chunks)
+            if not stats['success']:
+                self.logger.error(f"Embedding failed: {stats.get('error')}")
+                return stats
+            for key in ('chunks', 'embedded', 'reused', 'bytes', 'seconds'):
+                totals[key] += stats[key]
+        
+        totals['seconds'] = round(totals['seconds'], 3)
+        if totals['chunks']:
+            self.logger.info(
+                f"Embedded {totals['chunks']} chunks ({totals['embedded']} computed, "
+                f"{totals['reused']} reused) in {totals['seconds']}s"
+            )
+        return totals
+    
+    def embed_func(self, db, index=None) -> Callable[[str, List[Dict]], Dict]:
+        """
+        IngestionPipeline embed_func that stores the vectors in db
+        
+        Args:
+            db: DatabaseManager of the pipeline
+            index: VectorIndex to update with each embedded file
+        
+        Returns:
+            callable: (file_hash, chunks) -> embed_chunks() counts; raises
+                RuntimeError when embedding or storing fails, so the
+                pipeline stage records the error
+        """
+        def embed(file_hash: str, chunks: List[Dict]) -> Dict:
+            stats = self.embed_chunks(db, chunks)
+            if not stats['success']:
+                raise RuntimeError(f"Embedding {file_hash} failed: {stats.get('error')}")
+            if index is not None:
+                index.update_file(db, file_hash)
+            return stats
+        
+        return embed
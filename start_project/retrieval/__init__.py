@@ -0,0 +1,11 @@
+"""
+Retrieval module for searching stored chunks
+"""
+
+from .vector_index import VectorIndex
+from .hybrid_retriever import HybridRetriever
+
+__all__ = [
+    'VectorIndex',
+    'HybridRetriever'
+]
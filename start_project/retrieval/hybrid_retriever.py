@@ -0,0 +1,226 @@
+"""
+Hybrid retrieval over content_chunks
+Fuses the top candidates of the vector index and the FTS5 keyword index
+by chunk id, so a query never scores the whole corpus
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    from ..utils import Logger
+except:
+    from utils import Logger
+
+
+class HybridRetriever:
+    """
+    Vector + keyword search with reciprocal rank or weighted score fusion
+    
+    Each query takes the k_candidates best chunks from VectorIndex.search()
+    and from DatabaseManager.search_chunks(), merges the two lists by
+    chunk_id and reads the texts of the final k chunks only. The cost is
+    that of the two index lookups plus O(k_candidates) fusion, independent
+    of the number of stored chunks.
+    
+    Fusion methods:
+    - 'rrf': alpha / (rrf_k + vector rank) + (1 - alpha) / (rrf_k + keyword
+      rank); ranks only, so the two score scales never need calibrating
+    - 'weighted': alpha * vector score + (1 - alpha) * keyword score, each
+      min-max normalised over its candidate list; a chunk missing from one
+      list scores 0 there
+    
+    Example:
+        retriever = HybridRetriever(db, index, embedder=generator)
+        hits = retriever.retrieve("油圧ポンプの点検", k=5)
+    """
+    
+    FUSIONS = ('rrf', 'weighted')
+    
+    def __init__(
+        self,
+        db,
+        index,
+        embedder=None,
+        fusion: str = 'rrf',
+        alpha: float = 0.5,
+        k_candidates: int = 50,
+        rrf_k: int = 60,
+        nprobe: Optional[int] = None,
+        logger: Optional[Logger] = None
+    ):
+        """
+        Initialize the retriever
+        
+        Args:
+            db: DatabaseManager holding the chunks and their FTS index
+            index: VectorIndex over the chunk embeddings
+            embedder: EmbeddingGenerator (or any callable text -> vector)
+                for query embeddings; without it retrieve() needs
+                query_vector or falls back to keyword search
+            fusion: 'rrf' or 'weighted'
+            alpha: Weight of the vector side (0..1)
+            k_candidates: Candidates taken from each index
+            rrf_k: Rank offset of reciprocal rank fusion
+            nprobe: IVF lists per vector search (default: the index's)
+            logger: Logger instance
+        """
+        if fusion not in self.FUSIONS:
+            raise ValueError(f"Invalid fusion: {fusion}. Use one of {self.FUSIONS}")
+        if not 0.0 <= alpha <= 1.0:
+            raise ValueError(f"alpha must be between 0 and 1, got {alpha}")
+        
+        self.db = db
+        self.index = index
+        self.embedder = embedder
+        self.fusion = fusion
+        self.alpha = alpha
+        self.k_candidates = k_candidates
+        self.rrf_k = rrf_k
+        self.nprobe = nprobe
+        self.logger = logger or Logger.get_logger("HybridRetriever")
+    
+    def embed_query(self, query: str):
+        """Query embedding from the embedder, or None without one"""
+        if self.embedder is None:
+            return None
+        if hasattr(self.embedder, 'embed_texts'):
+            return self.embedder.embed_texts([query])[0]
+        return self.embedder(query)
+    
+    def retrieve(
+        self,
+        query: str,
+        k: int = 5,
+        query_vector=None,
+        file_hash: Optional[str] = None,
+        fusion: Optional[str] = None,
+        alpha: Optional[float] = None
+    ) -> List[Dict]:
+        """
+        Find the chunks best matching a query
+        
+        Args:
+            query: Search text
+            k: Results to return
+            query_vector: Precomputed query embedding (default: embed query)
+            file_hash: Only chunks of this file
+            fusion: Override the fusion method for this query
+            alpha: Override the vector weight for this query
+        
+        Returns:
+            list: Chunk dicts (chunk_id, file_hash, chunk_index, chunk_text,
+                chunk_metadata) with score, vector_rank, vector_score,
+                keyword_rank and keyword_score (None where the chunk was
+                not a candidate of that side), best first
+        """
+        fusion = fusion or self.fusion
+        alpha = self.alpha if alpha is None else alpha
+        if fusion not in self.FUSIONS:
+            raise ValueError(f"Invalid fusion: {fusion}. Use one of {self.FUSIONS}")
+        if k <= 0:
+            return []
+        candidates = max(self.k_candidates, k)
+        
+        if query_vector is None:
+            query_vector = self.embed_query(query)
+        vector_hits = []
+        if query_vector is not None and len(self.index):
+            vector_hits = self.index.search(query_vector, candidates, nprobe=self.nprobe, file_hash=file_hash)
+        keyword_hits = [
+            (hit['chunk_id'], hit['score'])
+            for hit in self.db.search_chunks(query, candidates, file_hash=file_hash)
+        ]
+        
+        if fusion == 'rrf':
+            scores = self.rrf(vector_hits, keyword_hits, alpha, self.rrf_k)
+        else:
+            scores = self.weighted(vector_hits, keyword_hits, alpha)
+        
+        vector = {chunk_id: (rank, score) for rank, (chunk_id, score) in enumerate(vector_hits, 1)}
+        keyword = {chunk_id: (rank, score) for rank, (chunk_id, score) in enumerate(keyword_hits, 1)}
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        
+        results = []
+        # Read texts a batch at a time; ids deleted since indexing are skipped
+        step = k + 8
+        for start in range(0, len(ranked), step):
+            if len(results) == k:
+                break
+            batch = ranked[start:start + step]
+            chunks = self.db.get_chunks_by_ids(chunk_id for chunk_id, _ in batch)
+            for chunk_id, score in batch:
+                chunk = chunks.get(chunk_id)
+                if chunk is None:
+                    continue
+                vector_rank, vector_score = vector.get(chunk_id, (None, None))
+                keyword_rank, keyword_score = keyword.get(chunk_id, (None, None))
+                results.append({
+                    'chunk_id': chunk_id,
+                    'file_hash': chunk['file_hash'],
+                    'chunk_index': chunk['chunk_index'],
+                    'chunk_text': chunk['chunk_text'],
+                    'chunk_metadata': chunk['chunk_metadata'],
+                    'score': score,
+                    'vector_rank': vector_rank,
+                    'vector_score': vector_score,
+                    'keyword_rank': keyword_rank,
+                    'keyword_score': keyword_score
+                })
+                if len(results) == k:
+                    break
+        
+        return results
+    
+    @staticmethod
+    def rrf(
+        vector_hits: Sequence[Tuple[str, float]],
+        keyword_hits: Sequence[Tuple[str, float]],
+        alpha: float = 0.5,
+        rrf_k: int = 60
+    ) -> Dict[str, float]:
+        """
+        Reciprocal rank fusion of two ranked candidate lists
+        
+        Args:
+            vector_hits: (chunk_id, score) pairs, best first
+            keyword_hits: (chunk_id, score) pairs, best first
+            alpha: Weight of the vector list
+            rrf_k: Rank offset (larger flattens the rank weights)
+        
+        Returns:
+            dict: chunk_id -> fused score
+        """
+        scores: Dict[str, float] = {}
+        for hits, weight in ((vector_hits, alpha), (keyword_hits, 1.0 - alpha)):
+            for rank, (chunk_id, _) in enumerate(hits, 1):
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + weight / (rrf_k + rank)
+        return scores
+    
+    @staticmethod
+    def weighted(
+        vector_hits: Sequence[Tuple[str, float]],
+        keyword_hits: Sequence[Tuple[str, float]],
+        alpha: float = 0.5
+    ) -> Dict[str, float]:
+        """
+        Weighted sum of min-max normalised candidate scores
+        
+        Args:
+            vector_hits: (chunk_id, score) pairs
+            keyword_hits: (chunk_id, score) pairs
+            alpha: Weight of the vector scores
+        
+        Returns:
+            dict: chunk_id -> fused score
+        """
+        scores: Dict[str, float] = {}
+        for hits, weight in ((vector_hits, alpha), (keyword_hits, 1.0 - alpha)):
+            if not hits:
+                continue
+            values = [score for _, score in hits]
+            low, high = min(values), max(values)
+            span = high - low
+            for chunk_id, score in hits:
+                normalized = (score - low) / span if span > 0 else 1.0
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + weight * normalized
+        return scores
@@ -0,0 +1,762 @@
+"""
+Persistent vector index over content_chunks embeddings
+Memory-mapped float32 matrix plus an append-only id log, searched exactly
+for small corpora and through IVF inverted lists for large ones
+"""
+
+import json
+import math
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from ..processors.embedding_generator import decode_vector
+except:
+    from processors.embedding_generator import decode_vector
+
+try:
+    from ..utils import Logger
+except:
+    from utils import Logger
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+class VectorIndex:
+    """
+    On-disk nearest-neighbour index of chunk embeddings
+    
+    Files in index_dir:
+    - vectors.f32: float32 matrix (capacity x dimension), memory-mapped and
+      grown by doubling; deleted rows stay until compact()
+    - ids.log: JSON lines, {"row", "add": [[chunk_id, file_hash,
+      text_hash], ...]} and {"delete": [rows]}, replayed on open
+    - centroids.npy / assign.i4: IVF centroids and each row's list
+    - meta.json: dimension, model, metric and IVF settings
+    
+    Search is exact (block-wise matrix products over the memmap) until the
+    index holds ivf_threshold vectors in mode 'auto'. Then rows are
+    clustered with k-means into nlist inverted lists and a query only
+    scores the rows of its nprobe nearest lists. New rows are assigned to
+    the nearest existing centroid; the centroids are retrained once the
+    index has grown 4x since training.
+    
+    Example:
+        index = VectorIndex('vector_index', embedding_model=generator.model_name)
+        index.attach(db)            # delete_file()/delete_chunks() remove rows
+        index.sync(db)              # add new embeddings, drop stale ones
+        hits = index.search(query_vector, k=10)
+    """
+    
+    MODES = ('auto', 'exact', 'ivf')
+    METRICS = ('cosine', 'ip')
+    
+    VECTORS_FILE = 'vectors.f32'
+    ASSIGN_FILE = 'assign.i4'
+    CENTROIDS_FILE = 'centroids.npy'
+    LOG_FILE = 'ids.log'
+    META_FILE = 'meta.json'
+    
+    def __init__(
+        self,
+        index_dir: str,
+        dimension: Optional[int] = None,
+        embedding_model: Optional[str] = None,
+        metric: str = 'cosine',
+        mode: str = 'auto',
+        ivf_threshold: int = 50000,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        block_rows: int = 65536,
+        compact_ratio: float = 0.25,
+        logger: Optional[Logger] = None
+    ):
+        """
+        Open or create an index
+        
+        Args:
+            index_dir: Directory of the index files
+            dimension: Vector dimension (default: taken from the first add)
+            embedding_model: content_chunks.embedding_model to index
+                (default: the model of the first synced chunk)
+            metric: 'cosine' (vectors normalised, inner product) or 'ip'
+            mode: 'auto', 'exact' or 'ivf'
+            ivf_threshold: Vectors before 'auto' switches to IVF
+            nlist: IVF lists (default: 2 * sqrt(vectors))
+            nprobe: Lists scored per query
+            block_rows: Rows per matrix product in exact search
+            compact_ratio: save() compacts when this share of rows is deleted
+            logger: Logger instance
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("NumPy not installed. Install with: pip install numpy")
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid mode: {mode}. Use one of {self.MODES}")
+        if metric not in self.METRICS:
+            raise ValueError(f"Invalid metric: {metric}. Use one of {self.METRICS}")
+        
+        self.index_dir = index_dir
+        self.dimension = dimension
+        self.embedding_model = embedding_model
+        self.metric = metric
+        self.mode = mode
+        self.ivf_threshold = ivf_threshold
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.block_rows = block_rows
+        self.compact_ratio = compact_ratio
+        self.logger = logger or Logger.get_logger("VectorIndex")
+        
+        self._lock = threading.RLock()
+        self._vectors = None
+        self._assign = None
+        self._centroids = None
+        self._lists: List = []
+        self._pending: Dict[int, List[int]] = {}
+        self._trained_count = 0
+        self._attached = []
+        
+        self.count = 0
+        self.capacity = 0
+        self._alive = np.zeros(0, dtype=bool)
+        self._ids: List[Optional[str]] = []
+        self._files: List[Optional[str]] = []
+        self._hashes: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._file_rows: Dict[str, List[int]] = {}
+        
+        os.makedirs(index_dir, exist_ok=True)
+        self._load()
+    
+    def __len__(self) -> int:
+        return len(self._rows)
+    
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self._rows
+    
+    @property
+    def deleted(self) -> int:
+        """Rows deleted but not yet compacted away"""
+        return self.count - len(self._rows)
+    
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+    
+    def info(self) -> Dict:
+        """Size and configuration of the index"""
+        return {
+            'vectors': len(self),
+            'deleted': self.deleted,
+            'capacity': self.capacity,
+            'dimension': self.dimension,
+            'embedding_model': self.embedding_model,
+            'metric': self.metric,
+            'mode': self.mode,
+            'ivf': self._use_ivf(),
+            'nlist': len(self._centroids) if self.trained else None,
+            'nprobe': self.nprobe
+        }
+    
+    def add(
+        self,
+        chunk_ids: Sequence[str],
+        vectors,
+        file_hashes: Optional[Sequence[str]] = None,
+        text_hashes: Optional[Sequence[str]] = None
+    ) -> int:
+        """
+        Add vectors; a chunk id already in the index is replaced
+        
+        Args:
+            chunk_ids: content_chunks.chunk_id per vector
+            vectors: (n, dimension) matrix or sequence of vectors
+            file_hashes: File of each chunk (used by remove_file())
+            text_hashes: content_chunks.text_hash of each chunk (used by
+                sync() to detect re-chunked texts)
+        
+        Returns:
+            int: Vectors added
+        """
+        chunk_ids = list(chunk_ids)
+        if not chunk_ids:
+            return 0
+        
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if len(matrix) != len(chunk_ids):
+            raise ValueError(f"{len(chunk_ids)} chunk ids for {len(matrix)} vectors")
+        
+        file_hashes = list(file_hashes) if file_hashes is not None else [None] * len(chunk_ids)
+        text_hashes = list(text_hashes) if text_hashes is not None else [None] * len(chunk_ids)
+        
+        # Last occurrence of a repeated chunk id wins
+        last = {chunk_id: i for i, chunk_id in enumerate(chunk_ids)}
+        if len(last) < len(chunk_ids):
+            keep = sorted(last.values())
+            matrix = matrix[keep]
+            chunk_ids = [chunk_ids[i] for i in keep]
+            file_hashes = [file_hashes[i] for i in keep]
+            text_hashes = [text_hashes[i] for i in keep]
+        
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = matrix.shape[1]
+                self._write_meta()
+            if matrix.shape[1] != self.dimension:
+                raise ValueError(f"Vector dimension {matrix.shape[1]} != index dimension {self.dimension}")
+            
+            if self.metric == 'cosine':
+                matrix = self._normalize(matrix)
+            
+            self.remove([chunk_id for chunk_id in chunk_ids if chunk_id in self._rows])
+            
+            start = self.count
+            end = start + len(chunk_ids)
+            self._reserve(end)
+            self._vectors[start:end] = matrix
+            if self.trained:
+                labels = self._nearest_centroids(matrix)
+                self._assign[start:end] = labels
+                for row, label in zip(range(start, end), labels.tolist()):
+                    self._pending.setdefault(label, []).append(row)
+            
+            self._append_log({
+                'row': start,
+                'add': [list(entry) for entry in zip(chunk_ids, file_hashes, text_hashes)]
+            })
+            self._register(start, chunk_ids, file_hashes, text_hashes)
+            self.count = end
+            
+            self._maybe_train()
+        return len(chunk_ids)
+    
+    def add_embeddings(self, chunks: Iterable[Dict]) -> int:
+        """
+        Add chunks as read by DatabaseManager.iter_chunk_embeddings()
+        
+        Args:
+            chunks: Dicts with chunk_id, file_hash, text_hash,
+                embedding_vector, embedding_dtype and embedding_scale
+        
+        Returns:
+            int: Vectors added
+        """
+        chunks = list(chunks)
+        if not chunks:
+            return 0
+        
+        vectors = np.stack([
+            np.asarray(
+                decode_vector(chunk['embedding_vector'], chunk.get('embedding_dtype') or 'float32',
+                              chunk.get('embedding_scale')),
+                dtype=np.float32
+            )
+            for chunk in chunks
+        ])
+        return self.add(
+            [chunk['chunk_id'] for chunk in chunks],
+            vectors,
+            [chunk.get('file_hash') for chunk in chunks],
+            [chunk.get('text_hash') for chunk in chunks]
+        )
+    
+    def remove(self, chunk_ids: Iterable[str]) -> int:
+        """
+        Delete vectors by chunk id
+        
+        Args:
+            chunk_ids: Chunk ids (ids not in the index are ignored)
+        
+        Returns:
+            int: Vectors removed
+        """
+        with self._lock:
+            rows = [self._rows[chunk_id] for chunk_id in chunk_ids if chunk_id in self._rows]
+            if rows:
+                self._append_log({'delete': rows})
+                self._unregister(rows)
+            return len(rows)
+    
+    def remove_file(self, file_hash: str) -> int:
+        """
+        Delete all vectors of a file
+        
+        Args:
+            file_hash: MD5 hash of file
+        
+        Returns:
+            int: Vectors removed
+        """
+        with self._lock:
+            rows = [row for row in self._file_rows.get(file_hash, []) if self._alive[row]]
+            if rows:
+                self._append_log({'delete': rows})
+                self._unregister(rows)
+            return len(rows)
+    
+    def attach(self, db):
+        """
+        Remove a file's vectors whenever db deletes its chunks
+        
+        Args:
+            db: DatabaseManager
+        """
+        db.add_delete_listener(self.remove_file)
+        self._attached.append(db)
+    
+    def update_file(self, db, file_hash: str, batch_size: int = 1000) -> int:
+        """
+        Replace a file's vectors with its embeddings stored in db
+        
+        Call after EmbeddingGenerator.embed_chunks()/embed_file() for the file.
+        
+        Args:
+            db: DatabaseManager
+            file_hash: MD5 hash of file
+            batch_size: Chunks read per step
+        
+        Returns:
+            int: Vectors added
+        """
+        with self._lock:
+            self.remove_file(file_hash)
+            added = 0
+            for chunks in db.iter_chunk_embeddings(self._model_filter(db), file_hash=file_hash,
+                                                   batch_size=batch_size):
+                added += self.add_embeddings(chunks)
+            return added
+    
+    def sync(self, db, batch_size: int = 1000) -> Dict:
+        """
+        Bring the index in line with the embeddings stored in db
+        
+        Only chunk ids and text hashes are compared; vectors are read for
+        new or re-chunked chunks only.
+        
+        Args:
+            db: DatabaseManager
+            batch_size: Chunks read per step
+        
+        Returns:
+            dict: Vectors added and removed
+        """
+        with self._lock:
+            model = self._model_filter(db)
+            if model is None:
+                return {'added': 0, 'removed': 0}
+            
+            seen = set()
+            changed = []
+            for chunks in db.iter_chunk_embeddings(model, include_vectors=False, batch_size=batch_size):
+                for chunk in chunks:
+                    chunk_id = chunk['chunk_id']
+                    seen.add(chunk_id)
+                    row = self._rows.get(chunk_id)
+                    if row is None or self._hashes[row] != chunk['text_hash']:
+                        changed.append(chunk_id)
+            
+            removed = self.remove([chunk_id for chunk_id in self._rows if chunk_id not in seen])
+            added = 0
+            for chunks in db.iter_chunk_embeddings(model, chunk_ids=changed, batch_size=batch_size):
+                added += self.add_embeddings(chunks)
+            
+            if added or removed:
+                self.logger.info(f"Synced vector index: {added} added, {removed} removed, {len(self)} total")
+            return {'added': added, 'removed': removed}
+    
+    def _model_filter(self, db) -> Optional[str]:
+        """Model of the index, or the model of the first embedded chunk"""
+        if self.embedding_model is None:
+            for chunks in db.iter_chunk_embeddings(include_vectors=False, batch_size=1):
+                self.embedding_model = chunks[0]['embedding_model']
+                self._write_meta()
+                break
+        return self.embedding_model
+    
+    def search(
+        self,
+        query,
+        k: int = 10,
+        nprobe: Optional[int] = None,
+        exact: Optional[bool] = None,
+        file_hash: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the chunks nearest to a query vector
+        
+        Args:
+            query: Query embedding (same model as the index)
+            k: Results to return
+            nprobe: IVF lists to score (default: self.nprobe)
+            exact: Force exact (True) or IVF (False) search
+            file_hash: Only chunks of this file (scored exactly)
+        
+        Returns:
+            list: (chunk_id, score) pairs, best first
+        """
+        with self._lock:
+            if not self._rows or k <= 0:
+                return []
+            
+            q = np.asarray(query, dtype=np.float32).reshape(-1)
+            if q.shape[0] != self.dimension:
+                raise ValueError(f"Query dimension {q.shape[0]} != index dimension {self.dimension}")
+            if self.metric == 'cosine':
+                q = self._normalize(q.reshape(1, -1))[0]
+            
+            use_ivf = self._use_ivf() if exact is None else not exact
+            if file_hash is not None:
+                rows, scores = self._search_rows(q, k, self._file_rows.get(file_hash, []))
+            elif use_ivf and self.trained:
+                rows, scores = self._search_ivf(q, k, nprobe or self.nprobe)
+            else:
+                rows, scores = self._search_exact(q, k)
+            
+            return [(self._ids[row], float(score)) for row, score in zip(rows.tolist(), scores.tolist())]
+    
+    def _search_exact(self, q, k: int):
+        """Score every live row, block by block"""
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, self.count, self.block_rows):
+            end = min(start + self.block_rows, self.count)
+            scores = self._vectors[start:end] @ q
+            scores[~self._alive[start:end]] = -np.inf
+            rows, scores = self._top_k(scores, k)
+            best_rows = np.concatenate([best_rows, rows + start])
+            best_scores = np.concatenate([best_scores, scores])
+            if len(best_rows) > k:
+                keep = np.argpartition(-best_scores, k)[:k]
+                best_rows, best_scores = best_rows[keep], best_scores[keep]
+        return self._ranked(best_rows, best_scores, k)
+    
+    def _search_ivf(self, q, k: int, nprobe: int):
+        """Score only the rows of the nprobe lists nearest to the query"""
+        centroid_scores = self._centroids @ q
+        nprobe = min(nprobe, len(self._centroids))
+        probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        
+        rows = np.concatenate([self._list(label) for label in probe.tolist()])
+        return self._search_rows(q, k, rows)
+    
+    def _search_rows(self, q, k: int, rows):
+        """Score the given rows only"""
+        rows = np.asarray(rows, dtype=np.int64)
+        rows = rows[self._alive[rows]]
+        if not len(rows):
+            return rows, np.empty(0, dtype=np.float32)
+        rows.sort()
+        scores = self._vectors[rows] @ q
+        top, scores = self._top_k(scores, k)
+        return self._ranked(rows[top], scores, k)
+    
+    @staticmethod
+    def _top_k(scores, k: int):
+        """Indices and scores of the k highest scores (unordered)"""
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            return top, scores[top]
+        return np.arange(len(scores)), scores
+    
+    @staticmethod
+    def _ranked(rows, scores, k: int):
+        """Sort best first and drop deleted rows"""
+        order = np.argsort(-scores, kind='stable')[:k]
+        rows, scores = rows[order], scores[order]
+        valid = np.isfinite(scores)
+        return rows[valid], scores[valid]
+    
+    def _use_ivf(self) -> bool:
+        return self.mode == 'ivf' or (self.mode == 'auto' and len(self) >= self.ivf_threshold)
+    
+    def _maybe_train(self):
+        """Train on reaching the threshold and retrain after 4x growth"""
+        if not self._use_ivf() or len(self) < 2:
+            return
+        if not self.trained or len(self) > 4 * self._trained_count:
+            self.train()
+    
+    def train(self, nlist: Optional[int] = None, iterations: int = 10, seed: int = 0):
+        """
+        Cluster the vectors into inverted lists (k-means)
+        
+        Centroids are fitted on a sample of up to 40 vectors per list,
+        then every row is assigned to its nearest centroid.
+        
+        Args:
+            nlist: Lists (default: self.nlist or 2 * sqrt(vectors))
+            iterations: k-means iterations
+            seed: Random seed of the sample and initial centroids
+        """
+        with self._lock:
+            live = np.flatnonzero(self._alive[:self.count])
+            if not len(live):
+                return
+            
+            nlist = min(len(live), nlist or self.nlist or max(1, int(2 * math.sqrt(len(live)))))
+            rng = np.random.default_rng(seed)
+            sample_size = min(len(live), nlist * 40)
+            sample = np.sort(rng.choice(live, sample_size, replace=False))
+            data = np.asarray(self._vectors[sample])
+            
+            centroids = data[rng.choice(len(data), nlist, replace=False)].copy()
+            for _ in range(iterations):
+                labels = self._nearest_centroids(data, centroids)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, data)
+                counts = np.bincount(labels, minlength=nlist)
+                
+                # Reseed empty lists with random sample vectors
+                empty = counts == 0
+                if empty.any():
+                    sums[empty] = data[rng.choice(len(data), int(empty.sum()), replace=False)]
+                    counts[empty] = 1
+                centroids = sums / counts[:, None].astype(np.float32)
+                if self.metric == 'cosine':
+                    centroids = self._normalize(centroids)
+            
+            self._centroids = centroids.astype(np.float32)
+            np.save(os.path.join(self.index_dir, self.CENTROIDS_FILE), self._centroids)
+            
+            self._open_assign()
+            for start in range(0, self.count, self.block_rows):
+                end = min(start + self.block_rows, self.count)
+                self._assign[start:end] = self._nearest_centroids(self._vectors[start:end])
+            self._assign.flush()
+            self._build_lists()
+            
+            self._trained_count = len(live)
+            self._write_meta()
+            self.logger.info(f"Trained vector index: {nlist} lists over {len(live)} vectors")
+    
+    def _nearest_centroids(self, data, centroids=None):
+        """Index of the highest-scoring centroid per row"""
+        centroids = self._centroids if centroids is None else centroids
+        labels = np.empty(len(data), dtype=np.int32)
+        # Bound the (rows x nlist) score matrix to ~64 MB
+        step = max(1, (16 * 1024 * 1024) // max(len(centroids), 1))
+        for start in range(0, len(data), step):
+            labels[start:start + step] = np.argmax(data[start:start + step] @ centroids.T, axis=1)
+        return labels
+    
+    def _build_lists(self):
+        """Inverted lists (rows per centroid) from the assignments"""
+        assign = np.asarray(self._assign[:self.count])
+        order = np.argsort(assign, kind='stable')
+        bounds = np.searchsorted(assign[order], np.arange(len(self._centroids) + 1))
+        self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self._centroids))]
+        self._pending = {}
+    
+    def _list(self, label: int):
+        """Rows of one inverted list, including rows added since the last merge"""
+        pending = self._pending.pop(label, None)
+        if pending:
+            self._lists[label] = np.concatenate([self._lists[label], np.asarray(pending, dtype=np.int64)])
+        return self._lists[label]
+    
+    def save(self):
+        """Flush vectors to disk and compact when enough rows are deleted"""
+        with self._lock:
+            if self.count and self.deleted > self.compact_ratio * self.count:
+                self.compact()
+            if self._vectors is not None:
+                self._vectors.flush()
+            if self._assign is not None:
+                self._assign.flush()
+            self._write_meta()
+    
+    def close(self):
+        """Save and release the memory maps and delete listeners"""
+        with self._lock:
+            self.save()
+            for db in self._attached:
+                db.remove_delete_listener(self.remove_file)
+            self._attached = []
+            self._vectors = None
+            self._assign = None
+    
+    def compact(self):
+        """Rewrite the files without deleted rows"""
+        with self._lock:
+            live = np.flatnonzero(self._alive[:self.count])
+            capacity = max(1024, len(live))
+            
+            vectors_path = self._path(self.VECTORS_FILE)
+            vectors = np.memmap(vectors_path + '.tmp', dtype=np.float32, mode='w+',
+                                shape=(capacity, self.dimension or 1))
+            assign = None
+            if self.trained:
+                assign = np.memmap(self._path(self.ASSIGN_FILE) + '.tmp', dtype=np.int32, mode='w+',
+                                   shape=(capacity,))
+            for start in range(0, len(live), self.block_rows):
+                rows = live[start:start + self.block_rows]
+                vectors[start:start + len(rows)] = self._vectors[rows]
+                if assign is not None:
+                    assign[start:start + len(rows)] = self._assign[rows]
+            vectors.flush()
+            del vectors
+            if assign is not None:
+                assign.flush()
+                del assign
+            
+            entries = [[self._ids[row], self._files[row], self._hashes[row]] for row in live.tolist()]
+            with open(self._path(self.LOG_FILE) + '.tmp', 'w', encoding='utf-8') as f:
+                if entries:
+                    f.write(json.dumps({'row': 0, 'add': entries}, ensure_ascii=False) + '\n')
+            
+            # Release the old maps before replacing their files
+            self._vectors = None
+            self._assign = None
+            os.replace(vectors_path + '.tmp', vectors_path)
+            if self.trained:
+                os.replace(self._path(self.ASSIGN_FILE) + '.tmp', self._path(self.ASSIGN_FILE))
+            os.replace(self._path(self.LOG_FILE) + '.tmp', self._path(self.LOG_FILE))
+            
+            removed = self.deleted
+            self._load()
+            self.logger.info(f"Compacted vector index: {removed} deleted rows removed")
+    
+    def _path(self, name: str) -> str:
+        return os.path.join(self.index_dir, name)
+    
+    def _load(self):
+        """Open the files of index_dir and replay the id log"""
+        meta_path = self._path(self.META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            for key in ('dimension', 'embedding_model', 'metric'):
+                stored = meta.get(key)
+                if stored is not None and getattr(self, key) not in (None, stored):
+                    raise ValueError(f"Index {key} is {stored!r}, not {getattr(self, key)!r}")
+                if stored is not None:
+                    setattr(self, key, stored)
+            self.nlist = self.nlist or meta.get('nlist')
+            self._trained_count = meta.get('trained_count', 0)
+        
+        ids, files, hashes, deleted = [], [], [], []
+        log_path = self._path(self.LOG_FILE)
+        if os.path.exists(log_path):
+            with open(log_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn last line of an interrupted write
+                        break
+                    if 'add' in record:
+                        start = record['row']
+                        del ids[start:], files[start:], hashes[start:]
+                        for chunk_id, file_hash, text_hash in record['add']:
+                            ids.append(chunk_id)
+                            files.append(file_hash)
+                            hashes.append(text_hash)
+                    else:
+                        deleted.extend(record['delete'])
+        
+        self.count = len(ids)
+        self.capacity = 0
+        if self.dimension is not None and os.path.exists(self._path(self.VECTORS_FILE)):
+            self.capacity = os.path.getsize(self._path(self.VECTORS_FILE)) // (4 * self.dimension)
+            self._open_vectors()
+        
+        self._ids, self._files, self._hashes = [], [], []
+        self._rows, self._file_rows = {}, {}
+        self._alive = np.zeros(max(self.capacity, self.count), dtype=bool)
+        self._register(0, ids, files, hashes)
+        self._unregister([row for row in set(deleted) if row < self.count and self._alive[row]])
+        
+        self._centroids = None
+        centroids_path = self._path(self.CENTROIDS_FILE)
+        if os.path.exists(centroids_path) and os.path.exists(self._path(self.ASSIGN_FILE)):
+            self._centroids = np.load(centroids_path)
+            self._open_assign()
+            self._build_lists()
+    
+    def _register(self, start: int, chunk_ids, file_hashes, text_hashes):
+        """Record the id map of rows start.. (alive)"""
+        self._ids.extend(chunk_ids)
+        self._files.extend(file_hashes)
+        self._hashes.extend(text_hashes)
+        if len(self._alive) < len(self._ids):
+            self._alive = np.concatenate([self._alive, np.zeros(len(self._ids) - len(self._alive), dtype=bool)])
+        self._alive[start:start + len(chunk_ids)] = True
+        for row, (chunk_id, file_hash) in enumerate(zip(chunk_ids, file_hashes), start):
+            self._rows[chunk_id] = row
+            if file_hash is not None:
+                self._file_rows.setdefault(file_hash, []).append(row)
+    
+    def _unregister(self, rows: List[int]):
+        """Mark rows deleted"""
+        for row in rows:
+            self._alive[row] = False
+            chunk_id = self._ids[row]
+            if self._rows.get(chunk_id) == row:
+                del self._rows[chunk_id]
+            file_rows = self._file_rows.get(self._files[row])
+            if file_rows is not None:
+                file_rows.remove(row)
+                if not file_rows:
+                    del self._file_rows[self._files[row]]
+    
+    def _reserve(self, rows: int):
+        """Grow the memory-mapped files to hold rows vectors"""
+        if self._vectors is not None and rows <= self.capacity:
+            return
+        capacity = max(1024, 2 * self.capacity, rows)
+        for name, row_bytes in ((self.VECTORS_FILE, 4 * self.dimension), (self.ASSIGN_FILE, 4)):
+            if name == self.ASSIGN_FILE and not self.trained:
+                continue
+            with open(self._path(name), 'ab') as f:
+                f.truncate(capacity * row_bytes)
+        self.capacity = capacity
+        self._open_vectors()
+        if self.trained:
+            self._open_assign()
+        if len(self._alive) < capacity:
+            self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+    
+    def _open_vectors(self):
+        if self._vectors is not None:
+            self._vectors.flush()
+        self._vectors = np.memmap(self._path(self.VECTORS_FILE), dtype=np.float32, mode='r+',
+                                  shape=(self.capacity, self.dimension))
+    
+    def _open_assign(self):
+        path = self._path(self.ASSIGN_FILE)
+        if not os.path.exists(path) or os.path.getsize(path) < 4 * self.capacity:
+            with open(path, 'ab') as f:
+                f.truncate(4 * self.capacity)
+        if self._assign is not None:
+            self._assign.flush()
+        self._assign = np.memmap(path, dtype=np.int32, mode='r+', shape=(self.capacity,))
+    
+    def _append_log(self, record: Dict):
+        with open(self._path(self.LOG_FILE), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    
+    def _write_meta(self):
+        meta = {
+            'dimension': self.dimension,
+            'embedding_model': self.embedding_model,
+            'metric': self.metric,
+            'nlist': self.nlist,
+            'trained_count': self._trained_count
+        }
+        path = self._path(self.META_FILE)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(path + '.tmp', path)
+    
+    @staticmethod
+    def _normalize(matrix):
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return matrix / norms
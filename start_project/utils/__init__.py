@@ -4,10 +4,12 @@ Utility modules for document processing
 
 from .file_utils import FileUtils
 from .logger import Logger
+from .page_cache import PageRenderCache
 from .pdf_visualizer import PDFVisualizer
 
 __all__ = [
     'FileUtils',
     'Logger',
+    'PageRenderCache',
     'PDFVisualizer'
 ]
\ No newline at end of file
@@ -4,10 +4,15 @@ File utility functions for document processing
 
 import os
 import hashlib
+import io
 import mimetypes
+import mmap
 import shutil
+import stat as stat_module
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
 from datetime import datetime
 
 
@@ -16,14 +21,22 @@ class FileUtils:
     Utility class for file operations
     """
     
+    # tmpfs directories for short-lived copies of in-memory content
+    MEMORY_TEMP_DIRS = ('/dev/shm', '/run/shm')
+    
     @staticmethod
-    def get_file_hash(file_path: str, algorithm: str = 'md5') -> Optional[str]:
+    def get_file_hash(
+        file_path: str,
+        algorithm: str = 'md5',
+        chunk_size: int = 1024 * 1024
+    ) -> Optional[str]:
         """
         Generate hash of file content
         
         Args:
             file_path: Path to file
             algorithm: Hash algorithm ('md5', 'sha256', 'sha1')
+            chunk_size: Bytes read per call
             
         Returns:
             str or None: Hash as hex string
@@ -39,7 +52,7 @@ class FileUtils:
                 raise ValueError(f"Unsupported algorithm: {algorithm}")
             
             with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(8192), b""):
+                for chunk in iter(lambda: f.read(chunk_size), b""):
                     hasher.update(chunk)
             
             return hasher.hexdigest()
@@ -104,12 +117,43 @@ class FileUtils:
         Returns:
             tuple: (is_valid: bool, reason: str)
         """
-        # Check if file exists
-        if not os.path.exists(file_path):
+        # One stat call answers existence, type and size
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
             return (False, "File does not exist")
         
+        return FileUtils.validate_stat(
+            file_path,
+            file_stat,
+            allowed_extensions=allowed_extensions,
+            max_size_mb=max_size_mb,
+            min_size_bytes=min_size_bytes
+        )
+    
+    @staticmethod
+    def validate_stat(
+        file_path: str,
+        file_stat: os.stat_result,
+        allowed_extensions: List[str] = None,
+        max_size_mb: Optional[int] = None,
+        min_size_bytes: int = 1
+    ) -> Tuple[bool, str]:
+        """
+        Validate file from an existing stat result (no filesystem access)
+        
+        Args:
+            file_path: Path to file (used for the extension)
+            file_stat: Result of os.stat() or DirEntry.stat()
+            allowed_extensions: List of allowed extensions
+            max_size_mb: Maximum file size in MB
+            min_size_bytes: Minimum file size in bytes
+            
+        Returns:
+            tuple: (is_valid: bool, reason: str)
+        """
         # Check if it's a file (not directory)
-        if not os.path.isfile(file_path):
+        if not stat_module.S_ISREG(file_stat.st_mode):
             return (False, "Path is not a file")
         
         # Check extension
@@ -119,7 +163,7 @@ class FileUtils:
                 return (False, f"Extension {ext} not in allowed list: {allowed_extensions}")
         
         # Check file size
-        file_size = os.path.getsize(file_path)
+        file_size = file_stat.st_size
         
         if file_size < min_size_bytes:
             return (False, f"File too small (< {min_size_bytes} bytes)")
@@ -155,6 +199,140 @@ class FileUtils:
             print(f"Error creating temp file: {e}")
             return None
     
+    @staticmethod
+    @contextmanager
+    def blob_as_path(blob: Union[bytes, mmap.mmap, str], suffix: str = '') -> Iterator[str]:
+        """
+        Expose blob content as a file path with the given suffix
+        
+        Paths that already carry the suffix are used as-is. Other paths
+        (e.g. suffix-less blob store entries) are hard-linked into a temp
+        directory, falling back to a copy. Bytes-like content is written
+        to a temp file on tmpfs (/dev/shm) where available. Anything
+        created here is removed on exit, also when the body raises.
+        Prefer blob_as_stream() for backends that read streams.
+        
+        Args:
+            blob: File content or path to it
+            suffix: Required file suffix/extension (e.g. '.pdf')
+        
+        Yields:
+            str: Path to a file holding the content
+        """
+        if isinstance(blob, (str, os.PathLike)):
+            path = os.fspath(blob)
+            if path.lower().endswith(suffix.lower()):
+                yield path
+                return
+            
+            temp_dir = tempfile.mkdtemp()
+            temp_path = os.path.join(temp_dir, os.path.basename(path) + suffix)
+            try:
+                try:
+                    os.link(path, temp_path)
+                except OSError:
+                    shutil.copyfile(path, temp_path)
+                yield temp_path
+            finally:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+            return
+        
+        fd, temp_path = tempfile.mkstemp(suffix=suffix, dir=FileUtils.memory_temp_dir())
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(blob)
+            yield temp_path
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    @staticmethod
+    @contextmanager
+    def blob_as_stream(blob: Union[bytes, mmap.mmap, str]) -> Iterator[BinaryIO]:
+        """
+        Expose blob content as a readable binary stream
+        
+        Paths are opened for reading; bytes are wrapped in a BytesIO that
+        shares their buffer (memory-mapped views and memoryviews are
+        copied into memory). Nothing is written to disk and the stream is
+        closed on exit.
+        
+        Args:
+            blob: File content or path to it
+        
+        Yields:
+            BinaryIO: Stream positioned at the start of the content
+        """
+        if isinstance(blob, (str, os.PathLike)):
+            stream = open(blob, 'rb')
+        else:
+            stream = io.BytesIO(blob)
+        try:
+            yield stream
+        finally:
+            stream.close()
+    
+    @staticmethod
+    def blob_size(blob: Union[bytes, mmap.mmap, str]) -> int:
+        """
+        Size in bytes of blob content
+        
+        Args:
+            blob: File content or path to it
+        
+        Returns:
+            int: Content size
+        """
+        if isinstance(blob, (str, os.PathLike)):
+            return os.path.getsize(blob)
+        return memoryview(blob).nbytes
+    
+    @staticmethod
+    def count_pdf_pages(file_path: str) -> Optional[int]:
+        """
+        Number of pages of a PDF without parsing its content
+        
+        Uses PyMuPDF, or pypdfium2 (installed with Docling) as fallback.
+        
+        Args:
+            file_path: Path to PDF
+        
+        Returns:
+            int or None: Page count (None if no PDF library is available
+            or the file cannot be opened)
+        """
+        try:
+            import fitz  # PyMuPDF
+            with fitz.open(file_path) as doc:
+                return len(doc)
+        except ImportError:
+            pass
+        except Exception:
+            return None
+        
+        try:
+            import pypdfium2
+            pdf = pypdfium2.PdfDocument(file_path)
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+        except Exception:
+            return None
+    
+    @staticmethod
+    def memory_temp_dir() -> Optional[str]:
+        """
+        Writable tmpfs directory for temp files, if there is one
+        
+        Returns:
+            str or None: Directory (None = the default temp directory)
+        """
+        for path in FileUtils.MEMORY_TEMP_DIRS:
+            if os.path.isdir(path) and os.access(path, os.W_OK):
+                return path
+        return None
+    
     @staticmethod
     def safe_filename(filename: str, max_length: int = 255) -> str:
         """
@@ -358,6 +536,64 @@ class FileUtils:
         
         return files
     
+    @staticmethod
+    def scan_files(
+        dir_path: str,
+        extensions: List[str] = None,
+        on_error: Optional[Callable[[str, OSError], None]] = None
+    ) -> Iterator[Tuple[str, os.stat_result]]:
+        """
+        Walk a directory tree with os.scandir, yielding files as found
+        
+        File/directory checks use the type cached by scandir, so each
+        yielded file costs a single stat call. Symlinked directories are
+        not followed (no cycles); symlinked files are.
+        
+        Args:
+            dir_path: Directory path
+            extensions: Filter by extensions (e.g., ['.pdf', '.txt'])
+            on_error: Called with (path, error) for unreadable entries
+                instead of aborting the walk
+            
+        Yields:
+            tuple: (file path, stat result)
+        """
+        pending = [dir_path]
+        
+        while pending:
+            current = pending.pop()
+            subdirs = []
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirs.append(entry.path)
+                                continue
+                            if not entry.is_file():
+                                continue
+                            
+                            # Filter by extension if specified
+                            if extensions:
+                                ext = os.path.splitext(entry.name)[1].lower()
+                                if ext not in extensions:
+                                    continue
+                            
+                            file_stat = entry.stat()
+                        except OSError as e:
+                            if on_error:
+                                on_error(entry.path, e)
+                            continue
+                        
+                        yield entry.path, file_stat
+            
+            except OSError as e:
+                if on_error:
+                    on_error(current, e)
+            
+            # Depth-first, in directory listing order
+            pending.extend(reversed(subdirs))
+    
     @staticmethod
     def read_file_binary(file_path: str) -> Optional[bytes]:
         """
@@ -0,0 +1,354 @@
+"""
+Rendered page cache
+Keeps encoded page images in memory (LRU) and optionally on disk
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    from .file_utils import FileUtils
+except:
+    from file_utils import FileUtils
+
+
+class PageRenderCache:
+    """
+    Two-tier cache for rendered PDF pages
+    
+    Entries are encoded images (PNG/JPEG/WebP bytes) keyed by
+    (file hash, page number, zoom, colorspace, encoding), so the same
+    page rendered the same way is rasterised once no matter whether
+    VLMProcessor.extract(), process_flowchart(), process_tables() or
+    PDFVisualizer asks for it. The file hash is the content hash, so a
+    changed file never hits stale entries.
+    
+    The memory tier is an LRU bounded by max_memory_bytes. With cache_dir
+    set, entries are also written to disk (bounded by max_disk_bytes,
+    oldest entries removed first) and survive restarts.
+    
+    Example:
+        cache = PageRenderCache(cache_dir=".page_cache")
+        data = cache.get_or_render(file_hash, 0, 2.0, 'rgb', 'png', lambda: render(page))
+        print(cache.stats())
+    """
+    
+    _shared = None
+    _shared_lock = threading.Lock()
+    
+    def __init__(
+        self,
+        max_memory_bytes: int = 256 * 1024 * 1024,
+        cache_dir: Optional[str] = None,
+        max_disk_bytes: int = 2 * 1024 * 1024 * 1024,
+        max_file_hashes: int = 4096
+    ):
+        """
+        Initialize cache
+        
+        Args:
+            max_memory_bytes: Size of the in-memory tier (0 disables it)
+            cache_dir: Directory of the on-disk tier (None disables it)
+            max_disk_bytes: Size of the on-disk tier
+            max_file_hashes: Files whose content hash is memoized (LRU)
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_file_hashes = max_file_hashes
+        
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._file_hashes = OrderedDict()
+        
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self._disk_bytes = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._disk_bytes = FileUtils.get_directory_size(cache_dir)
+    
+    @classmethod
+    def shared(cls) -> 'PageRenderCache':
+        """
+        Get the process-wide memory cache (used when no cache is passed)
+        
+        Returns:
+            PageRenderCache: Shared cache
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+    
+    def file_hash(self, file_path: str) -> Optional[str]:
+        """
+        Content hash of file_path, memoized by (path, size, mtime)
+        
+        Args:
+            file_path: Path to file
+        
+        Returns:
+            str or None: Hash, or None if the file cannot be read
+        """
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        
+        stat_key = (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            file_hash = self._file_hashes.get(stat_key)
+            if file_hash is not None:
+                self._file_hashes.move_to_end(stat_key)
+                return file_hash
+        
+        file_hash = FileUtils.get_file_hash(file_path, algorithm='sha256')
+        if file_hash is not None:
+            with self._lock:
+                self._file_hashes[stat_key] = file_hash
+                # Bounded: the shared() cache lives as long as the process
+                while len(self._file_hashes) > self.max_file_hashes:
+                    self._file_hashes.popitem(last=False)
+        return file_hash
+    
+    @staticmethod
+    def make_key(
+        file_hash: str,
+        page_number: int,
+        zoom: float,
+        colorspace: str,
+        encoding: str
+    ) -> Tuple:
+        """
+        Cache key of a rendered page
+        
+        Args:
+            file_hash: Content hash of the PDF
+            page_number: 0-based page number
+            zoom: Render zoom
+            colorspace: 'rgb' or 'gray'
+            encoding: Output encoding (e.g. 'png', 'jpeg-q85')
+        
+        Returns:
+            tuple: Key
+        """
+        return (file_hash, page_number, round(zoom, 4), colorspace, encoding)
+    
+    def _disk_path(self, key: Tuple) -> str:
+        file_hash, page_number = key[0], key[1]
+        variant = hashlib.md5(repr(key[2:]).encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, file_hash[:2], file_hash, f"{page_number:05d}_{variant}.bin")
+    
+    def get(self, key: Tuple) -> Optional[bytes]:
+        """
+        Look up a rendered page
+        
+        Args:
+            key: make_key() result
+        
+        Returns:
+            bytes or None: Encoded image
+        """
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return data
+        
+        if self.cache_dir:
+            path = self._disk_path(key)
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                os.utime(path)
+            except OSError:
+                data = None
+            
+            if data is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self._put_memory(key, data)
+                return data
+        
+        with self._lock:
+            self.misses += 1
+        return None
+    
+    def put(self, key: Tuple, data: bytes):
+        """
+        Store a rendered page in both tiers
+        
+        Args:
+            key: make_key() result
+            data: Encoded image
+        """
+        self._put_memory(key, data)
+        if self.cache_dir:
+            self._put_disk(key, data)
+    
+    def get_or_render(
+        self,
+        file_hash: str,
+        page_number: int,
+        zoom: float,
+        colorspace: str,
+        encoding: str,
+        render: Callable[[], bytes]
+    ) -> bytes:
+        """
+        Return the cached page or render and store it
+        
+        Args:
+            file_hash: Content hash of the PDF
+            page_number: 0-based page number
+            zoom: Render zoom
+            colorspace: 'rgb' or 'gray'
+            encoding: Output encoding
+            render: Produces the encoded image on a miss
+        
+        Returns:
+            bytes: Encoded image
+        """
+        key = self.make_key(file_hash, page_number, zoom, colorspace, encoding)
+        data = self.get(key)
+        if data is None:
+            data = render()
+            self.put(key, data)
+        return data
+    
+    def _put_memory(self, key: Tuple, data: bytes):
+        if len(data) > self.max_memory_bytes:
+            return
+        
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old)
+            self._memory[key] = data
+            self._memory_bytes += len(data)
+            
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+                self.evictions += 1
+    
+    def _put_disk(self, key: Tuple, data: bytes):
+        path = self._disk_path(key)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file first so readers never see partial entries
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error writing page cache entry {path}: {e}")
+            return
+        
+        with self._lock:
+            self._disk_bytes += len(data) - replaced
+            over_limit = self._disk_bytes > self.max_disk_bytes
+        if over_limit:
+            self.prune_disk()
+    
+    def prune_disk(self, target_ratio: float = 0.9):
+        """
+        Remove least recently used disk entries until the disk tier is
+        below target_ratio * max_disk_bytes
+        
+        Args:
+            target_ratio: Fill level to prune down to
+        """
+        if not self.cache_dir:
+            return
+        
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        target = self.max_disk_bytes * target_ratio
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+        
+        with self._lock:
+            self._disk_bytes = total
+    
+    def clear(self, disk: bool = False):
+        """
+        Drop all memory entries (and disk entries if disk is True)
+        
+        Args:
+            disk: Also empty the on-disk tier
+        """
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        
+        if disk and self.cache_dir:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with self._lock:
+                self._disk_bytes = 0
+    
+    def stats(self) -> Dict:
+        """
+        Hit/miss statistics
+        
+        Returns:
+            dict: {
+                'memory_hits', 'disk_hits', 'misses', 'hit_rate',
+                'evictions', 'memory_entries', 'memory_bytes', 'disk_bytes'
+            }
+        """
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'disk_bytes': self._disk_bytes
+            }
+    
+    def reset_stats(self):
+        """Zero the hit/miss counters"""
+        with self._lock:
+            self.memory_hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+            self.evictions = 0
+    
+    def __repr__(self) -> str:
+        return (f"<PageRenderCache(max_memory_bytes={self.max_memory_bytes}, "
+                f"cache_dir={self.cache_dir!r})>")
@@ -3,9 +3,15 @@ PDF Visualizer - Mark extracted elements on PDF for visual inspection
 """
 
 import os
+from io import BytesIO
 from typing import Dict, List, Optional
 from pathlib import Path
 
+try:
+    from .page_cache import PageRenderCache
+except:
+    from page_cache import PageRenderCache
+
 try:
     import fitz  # PyMuPDF
     PYMUPDF_AVAILABLE = True
@@ -38,9 +44,16 @@ class PDFVisualizer:
         'default': (0, 0, 0)        # Black
     }
     
-    def __init__(self):
-        """Initialize PDF Visualizer"""
+    def __init__(self, page_cache: Optional[PageRenderCache] = None):
+        """
+        Initialize PDF Visualizer
+        
+        Args:
+            page_cache: Cache of rendered pages (default: the process-wide
+                PageRenderCache.shared() memory cache)
+        """
         self.available = PYMUPDF_AVAILABLE and PIL_AVAILABLE
+        self.page_cache = page_cache or PageRenderCache.shared()
         
         if not PYMUPDF_AVAILABLE:
             print("Warning: PyMuPDF not installed. Install with: pip install PyMuPDF")
@@ -327,16 +340,14 @@ class PDFVisualizer:
             
             # Convert pages to images with annotations
             image_paths = []
+            file_hash = self.page_cache.file_hash(pdf_path)
             
             for page_num in range(len(doc)):
                 page = doc[page_num]
                 
-                # Render page to image
-                mat = fitz.Matrix(dpi / 72, dpi / 72)
-                pix = page.get_pixmap(matrix=mat)
-                
-                # Convert to PIL Image
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                # Render page to image (clean renders are cached, the
+                # annotations are drawn on a fresh copy)
+                img = self._render_page(page, dpi, file_hash)
                 draw = ImageDraw.Draw(img, 'RGBA')
                 
                 # Draw elements for this page
@@ -389,6 +400,29 @@ class PDFVisualizer:
                 'error': str(e)
             }
     
+    def _render_page(self, page, dpi: int, file_hash: Optional[str] = None):
+        """
+        Render page as an RGB PIL image through the page cache
+        
+        Args:
+            page: PyMuPDF page
+            dpi: Image resolution
+            file_hash: Content hash of the PDF (None bypasses the cache)
+            
+        Returns:
+            Image: Rendered page
+        """
+        zoom = dpi / 72
+        
+        def render() -> bytes:
+            return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False).tobytes(output='png')
+        
+        if file_hash is None:
+            data = render()
+        else:
+            data = self.page_cache.get_or_render(file_hash, page.number, zoom, 'rgb', 'png', render)
+        return Image.open(BytesIO(data)).convert("RGB")
+    
     def generate_statistics(self, extraction_result: Dict) -> Dict:
         """
         Generate statistics about extracted elements